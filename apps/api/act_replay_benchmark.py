@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Act Pipeline Replay Benchmark
+Drives N concurrent /act runs through execute_act_task with the replay CLI
+(recorded transcript instead of a live agent) against a scratch database and
+M WebSocket subscribers per project. Reports end-to-end event latency (message
+decoded -> delivered to a subscriber), DB write statements and time, and
+WebSocket fan-out cost.
+
+Record a real transcript with CLI_RECORD_DIR=... and pass it with --transcript;
+otherwise a synthetic Cursor session is generated.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+
+class BenchSocket:
+    """Stand-in WebSocket client that timestamps every delivered chat message"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    async def send_text(self, text: str) -> None:
+        received_at = datetime.utcnow()
+        self.stats["ws_frames"] += 1
+        self.stats["ws_bytes"] += len(text)
+        payload = json.loads(text)
+        if payload.get("type") == "message":
+            created_at = datetime.fromisoformat(payload["data"]["created_at"])
+            self.stats["latencies_ms"].append((received_at - created_at).total_seconds() * 1000)
+
+
+def write_synthetic_transcript(path: str, turns: int) -> None:
+    from stream_decoder_benchmark import synthetic_cursor_transcript
+
+    with open(path, "wb") as f:
+        f.writelines(synthetic_cursor_transcript(turns))
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(replays: int, subscribers: int) -> dict:
+    from sqlalchemy import event, func, select
+
+    from app.api.chat.act import execute_act_task
+    from app.core.websocket.manager import manager
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine, write_engine
+    import app.models  # noqa: F401  register models
+    from app.models.messages import Message
+    from app.models.projects import Project
+    from app.models.sessions import Session as ChatSession
+    from app.services.cli.replay import load_transcript
+    from app.services.cli.unified_manager import CLIType
+    from app.core.config import settings
+
+    Base.metadata.create_all(write_engine)
+    stats = {
+        "ws_frames": 0, "ws_bytes": 0, "ws_seconds": 0.0, "latencies_ms": [],
+        "db_reads": 0, "db_writes": 0, "db_commits": 0, "db_seconds": 0.0,
+    }
+
+    # DB cost: write statements and time spent in the driver
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["bench_started"] = time.perf_counter()
+
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        stats["db_seconds"] += time.perf_counter() - conn.info.pop("bench_started", time.perf_counter())
+        verb = statement.lstrip()[:6].upper()
+        if verb in ("INSERT", "UPDATE", "DELETE"):
+            stats["db_writes"] += 1
+        elif verb == "SELECT":
+            stats["db_reads"] += 1
+
+    def on_commit(conn):
+        stats["db_commits"] += 1
+
+    for bench_engine in {engine, write_engine}:
+        event.listen(bench_engine, "before_cursor_execute", before_execute)
+        event.listen(bench_engine, "after_cursor_execute", after_execute)
+    event.listen(write_engine, "commit", on_commit)
+
+    # WebSocket fan-out cost: time inside the connection manager
+    send_message = manager.send_message
+
+    async def timed_send_message(project_id: str, message_data: dict):
+        started = time.perf_counter()
+        await send_message(project_id, message_data)
+        stats["ws_seconds"] += time.perf_counter() - started
+
+    manager.send_message = timed_send_message
+
+    runs = []
+    setup = SessionLocal()
+    for i in range(replays):
+        project_id = f"replay-{i}-{uuid.uuid4().hex[:6]}"
+        setup.add(Project(id=project_id, name=project_id, preferred_cli="replay", created_at=datetime.utcnow()))
+        session_id = str(uuid.uuid4())
+        setup.add(ChatSession(id=session_id, project_id=project_id, status="active", cli_type="replay"))
+        manager.active_connections[project_id] = [BenchSocket(stats) for _ in range(subscribers)]
+        runs.append((project_id, session_id))
+    setup.commit()
+    setup.close()
+
+    async def one(project_id: str, session_id: str):
+        db = SessionLocal()
+        try:
+            chat_session = db.get(ChatSession, session_id)
+            # End the read transaction so no pooled connection is held while waiting to run
+            db.commit()
+            await execute_act_task(
+                project_info={
+                    "id": project_id,
+                    "repo_path": os.path.join(settings.projects_root, project_id),
+                    "preferred_cli": "replay",
+                    "fallback_enabled": False,
+                    "selected_model": None,
+                },
+                session=chat_session,
+                instruction="Replay benchmark",
+                conversation_id=str(uuid.uuid4()),
+                images=[],
+                db=db,
+                cli_preference=CLIType.REPLAY,
+            )
+        finally:
+            db.close()
+
+    # Reset counters after setup so only the runs are measured
+    stats.update(db_reads=0, db_writes=0, db_commits=0, db_seconds=0.0)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(project_id, session_id) for project_id, session_id in runs))
+    elapsed = time.perf_counter() - started
+    manager.send_message = send_message
+
+    check = SessionLocal()
+    persisted = check.scalar(select(func.count()).select_from(Message).where(
+        Message.project_id.in_([project_id for project_id, _ in runs])
+    ))
+    check.close()
+
+    events = len(load_transcript(settings.replay_transcript).events) * replays
+    return {"elapsed": elapsed, "events": events, "persisted": persisted, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replays", type=int, default=20, help="Concurrent act runs")
+    parser.add_argument("--subscribers", type=int, default=3, help="WebSocket clients per project")
+    parser.add_argument("--speed", type=float, default=0, help="Replay speed factor; 0 = burst")
+    parser.add_argument("--turns", type=int, default=50, help="Tool-use turns in the synthetic transcript")
+    parser.add_argument("--transcript", help="Recorded transcript (CLI_RECORD_DIR output or cursor-agent stream-json)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="act-replay-bench-")
+    transcript = args.transcript or os.path.join(workdir, "transcript.ndjson")
+    if not args.transcript:
+        write_synthetic_transcript(transcript, args.turns)
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ.setdefault("PROJECTS_ROOT", os.path.join(workdir, "projects"))
+    os.environ.setdefault("MESSAGE_BLOB_DIR", os.path.join(workdir, "blobs"))
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["REPLAY_CLI_ENABLED"] = "true"
+    os.environ["REPLAY_TRANSCRIPT"] = transcript
+    os.environ["REPLAY_SPEED"] = str(args.speed)
+
+    from app.core.logging import configure_logging, shutdown_logging
+    configure_logging()
+    try:
+        r = asyncio.run(run(args.replays, args.subscribers))
+    finally:
+        shutdown_logging()
+
+    latencies = r["latencies_ms"]
+    persisted = max(1, r["persisted"])
+    print(f"Act replay benchmark: {args.replays} concurrent runs, {args.subscribers} subscribers each, "
+          f"speed {'burst' if args.speed <= 0 else args.speed}, transcript {transcript}")
+    print(f"  wall time            {r['elapsed']:.2f}s")
+    print(f"  events replayed      {r['events']} ({r['events'] / r['elapsed']:,.0f}/s)")
+    print(f"  messages persisted   {r['persisted']} ({r['persisted'] / r['elapsed']:,.0f}/s)")
+    print(f"  event latency ms     p50 {percentile(latencies, 0.5):.2f}  p95 {percentile(latencies, 0.95):.2f}  "
+          f"p99 {percentile(latencies, 0.99):.2f}  max {max(latencies, default=0):.2f}"
+          f"  mean {statistics.fmean(latencies) if latencies else 0:.2f}")
+    print(f"  DB                   {r['db_writes']} writes, {r['db_reads']} reads, {r['db_commits']} commits, "
+          f"{r['db_seconds'] * 1000:.0f}ms in driver ({r['db_seconds'] * 1e6 / persisted:.0f}us per message)")
+    print(f"  WebSocket fan-out    {r['ws_frames']} frames, {r['ws_bytes'] / 1024:.0f} KiB, "
+          f"{r['ws_seconds'] * 1000:.0f}ms in send_message ({r['ws_seconds'] * 1e6 / persisted:.0f}us per message)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -47,7 +48,7 @@ async def award_student(
     if not player_stats:
         player_stats = PlayerStats(user_id=award.target_user_id)
         db.add(player_stats)
-        db.flush()
+        await asyncio.to_thread(db.flush)
     
     # Process award based on type
     if award.type == AwardType.xp:
@@ -111,7 +112,7 @@ async def award_student(
         if not player_skills:
             player_skills = PlayerSkills(user_id=award.target_user_id)
             db.add(player_skills)
-            db.flush()
+            await asyncio.to_thread(db.flush)
         
         # Update skill
         current_level = getattr(player_skills, award.skill_type.value.lower())
@@ -133,7 +134,7 @@ async def award_student(
     )
     db.add(admin_activity)
     
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     # Send real-time notifications
     try:
@@ -417,7 +418,7 @@ async def reset_student_progress(
     )
     db.add(admin_activity)
     
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return APIResponse(
         success=True,
@@ -3,16 +3,24 @@ Olympics PWA Admin API - Supabase Compatible
 Provides admin functionality for assignment creation and XP awarding using Supabase
 """
 
+import logging
+import os
 from fastapi import APIRouter, HTTPException, status, Depends, Request, File, Form, UploadFile
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel
+from postgrest.exceptions import APIError
 import uuid
 
+from app.core.config import settings
 from app.core.supabase_client import get_supabase_client, get_supabase_auth_client
 from app.api.auth_supabase import get_current_user
+from app.services.uploads import UploadTooLarge, remove_unreferenced_blob, store_upload, unpin_upload
+from app.services.xp_events import xp_event_log
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin", tags=["Admin - Supabase"])
 limiter = Limiter(key_func=get_remote_address)
@@ -111,12 +119,44 @@ async def create_assignment(
             )
             
     except Exception as e:
-        print(f"❌ Create assignment error: {e}")
+        logger.error("❌ Create assignment error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+# PostgREST error code for an RPC to a function that does not exist
+FUNCTION_NOT_FOUND = "PGRST202"
+
+def _award_unit_xp(service_client, user_id: str, unit_id: Optional[str], xp: int) -> None:
+    """
+    Add XP to a student's unit total.
+
+    award_unit_xp (database/add_player_unit_xp.sql) increments the
+    player_unit_xp row and mirrors it into player_stats.unit_xp in one
+    transaction. Until that migration is applied (PostgREST reports the
+    function as not found), fall back to updating the unit_xp blob
+    directly. Any other error is raised: the call may have committed (a
+    lost response) and retrying it as a blob update would count it twice.
+    """
+    if not unit_id:
+        return
+    try:
+        service_client.rpc('award_unit_xp', {
+            "p_user_id": user_id,
+            "p_unit_id": str(unit_id),
+            "p_xp": xp
+        }).execute()
+        return
+    except APIError as e:
+        if e.code != FUNCTION_NOT_FOUND:
+            raise
+        logger.warning("⚠️ award_unit_xp not installed, updating unit_xp directly: %s", e.message)
+    stats = service_client.table('player_stats').select('unit_xp').eq('user_id', user_id).execute()
+    unit_xp = (stats.data[0].get('unit_xp') if stats.data else None) or {}
+    unit_xp[str(unit_id)] = unit_xp.get(str(unit_id), 0) + xp
+    service_client.table('player_stats').update({"unit_xp": unit_xp}).eq('user_id', user_id).execute()
+
 @router.post("/award-xp")
 @limiter.limit("30/minute")
 async def award_assignment_xp(
@@ -154,7 +194,7 @@ async def award_assignment_xp(
                 detail=f"XP awarded ({award_data.xp_awarded}) cannot exceed assignment maximum ({assignment_data['max_xp']})"
             )
         
-        # Create XP entry
+        # Create XP entry (queued; written in bulk with at-least-once delivery)
         xp_entry = {
             "id": str(uuid.uuid4()),
             "user_id": award_data.target_user_id,
@@ -167,14 +207,6 @@ async def award_assignment_xp(
             "created_at": datetime.utcnow().isoformat()
         }
         
-        xp_result = service_client.table('xp_entries').insert(xp_entry).execute()
-        
-        if not xp_result.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create XP entry"
-            )
-        
         # Update player stats (create if doesn't exist)
         player_stats = service_client.table('player_stats').select('*').eq('user_id', award_data.target_user_id).execute()
         
@@ -185,23 +217,17 @@ async def award_assignment_xp(
             new_current_xp = current_stats.get('current_xp', 0) + award_data.xp_awarded
             new_level = max(1, new_total_xp // 200 + 1)  # Every 200 XP = 1 level
             
-            # Update unit-specific XP tracking
-            unit_xp = current_stats.get('unit_xp') or {}
-            unit_key = str(assignment_data['unit_id'])
-            unit_xp[unit_key] = unit_xp.get(unit_key, 0) + award_data.xp_awarded
-            
+            # unit_xp is left out: it is maintained by _award_unit_xp below
             updated_stats = {
                 "total_xp": new_total_xp,
                 "current_xp": new_current_xp,
                 "current_level": new_level,
-                "unit_xp": unit_xp,
                 "updated_at": datetime.utcnow().isoformat()
             }
             
             service_client.table('player_stats').update(updated_stats).eq('user_id', award_data.target_user_id).execute()
         else:
             # Create new stats
-            unit_xp = {str(assignment_data['unit_id']): award_data.xp_awarded}
             new_level = max(1, award_data.xp_awarded // 200 + 1)
             
             new_stats = {
@@ -215,13 +241,18 @@ async def award_assignment_xp(
                 "gameboard_position": 1,
                 "gameboard_moves": 0,
                 "gold": 0,
-                "unit_xp": unit_xp,
+                "unit_xp": {},
                 "created_at": datetime.utcnow().isoformat(),
                 "updated_at": datetime.utcnow().isoformat()
             }
             
             service_client.table('player_stats').insert(new_stats).execute()
         
+        # Per-unit XP (unit leaderboards), incremented atomically
+        _award_unit_xp(service_client, award_data.target_user_id, assignment_data['unit_id'], award_data.xp_awarded)
+        
+        xp_event_log.record(xp_entry)
+        
         return {
             "success": True,
             "message": f"Successfully awarded {award_data.xp_awarded} XP to {student.data[0]['username']} for {assignment_data['name']}",
@@ -235,7 +266,7 @@ async def award_assignment_xp(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Award XP error: {e}")
+        logger.error("❌ Award XP error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -334,7 +365,7 @@ async def bulk_award_students(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Bulk award error: {e}")
+        logger.error("❌ Bulk award error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -365,7 +396,7 @@ async def delete_assignment(
         # Delete the assignment
         result = service_client.table('assignments').delete().eq('id', assignment_id).execute()
         
-        print(f"✅ Assignment deleted: {assignment_name} (ID: {assignment_id}) by admin: {current_admin['email']}")
+        logger.info("✅ Assignment deleted: %s (ID: %s) by admin: %s", assignment_name, assignment_id, current_admin['email'])
         
         return {
             "success": True,
@@ -376,7 +407,7 @@ async def delete_assignment(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Delete assignment error: {e}")
+        logger.error("❌ Delete assignment error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -398,7 +429,7 @@ async def get_assignments(current_admin = Depends(require_admin)):
         }
         
     except Exception as e:
-        print(f"❌ Get assignments error: {e}")
+        logger.error("❌ Get assignments error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -419,7 +450,7 @@ async def get_units(current_admin = Depends(require_admin)):
         }
         
     except Exception as e:
-        print(f"❌ Get units error: {e}")
+        logger.error("❌ Get units error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -453,7 +484,7 @@ async def get_lectures(
         }
         
     except Exception as e:
-        print(f"❌ Get lectures error: {e}")
+        logger.error("❌ Get lectures error: %s", e)
         # Return empty array as fallback instead of error
         return {
             "success": True,
@@ -487,7 +518,7 @@ async def create_lecture(
         result = service_client.table('lectures').insert(new_lecture).execute()
         
         if result.data:
-            print(f"✅ Created lecture: {lecture_data.get('title')} by {current_admin['username']}")
+            logger.info("✅ Created lecture: %s by %s", lecture_data.get('title'), current_admin['username'])
             return {
                 "success": True,
                 "data": result.data[0]
@@ -496,7 +527,7 @@ async def create_lecture(
             raise Exception("Failed to create lecture")
         
     except Exception as e:
-        print(f"❌ Create lecture error: {e}")
+        logger.error("❌ Create lecture error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -534,7 +565,7 @@ async def get_all_students(current_admin = Depends(require_admin)):
         }
         
     except Exception as e:
-        print(f"❌ Get students error: {e}")
+        logger.error("❌ Get students error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -573,7 +604,7 @@ async def get_admin_stats(current_admin = Depends(require_admin)):
         }
         
     except Exception as e:
-        print(f"❌ Get admin stats error: {e}")
+        logger.error("❌ Get admin stats error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -699,7 +730,7 @@ async def batch_register_students(
                     "error": str(student_error)
                 })
         
-        print(f"✅ Batch registration: {len(successful_registrations)} successful, {len(failed_registrations)} failed")
+        logger.info("✅ Batch registration: %s successful, %s failed", len(successful_registrations), len(failed_registrations))
         
         # Generate credentials summary for admin
         credentials_summary = {
@@ -727,7 +758,7 @@ async def batch_register_students(
         }
         
     except Exception as e:
-        print(f"❌ Batch registration error: {e}")
+        logger.error("❌ Batch registration error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -793,7 +824,7 @@ async def add_single_student(
         
         service_client.table('player_stats').insert(initial_stats).execute()
         
-        print(f"✅ Single student added: {student_data.email}")
+        logger.info("✅ Single student added: %s", student_data.email)
         
         return {
             "success": True,
@@ -810,7 +841,7 @@ async def add_single_student(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Add student error: {e}")
+        logger.error("❌ Add student error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -850,7 +881,7 @@ async def reset_student_password(
             "updated_at": datetime.utcnow().isoformat()
         }).eq('id', student_user['id']).execute()
         
-        print(f"✅ Password reset for student: {reset_data.student_email}")
+        logger.info("✅ Password reset for student: %s", reset_data.student_email)
         
         return {
             "success": True,
@@ -865,7 +896,7 @@ async def reset_student_password(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Password reset error: {e}")
+        logger.error("❌ Password reset error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -917,14 +948,14 @@ async def add_incomplete_student(
             del new_user["is_active"]
         
         # Debug: print exactly what we're sending to Supabase
-        print(f"DEBUG: Inserting user data: {new_user}")
+        logger.debug("Inserting user data: %s", new_user)
         
         user_result = service_client.table('users').insert(new_user).execute()
         user_id = user_result.data[0]['id']
         
         # Don't create player stats/skills yet - wait for profile completion
         
-        print(f"✅ Incomplete student account created: {student_data.email}")
+        logger.info("✅ Incomplete student account created: %s", student_data.email)
         
         return {
             "success": True,
@@ -941,7 +972,7 @@ async def add_incomplete_student(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Add incomplete student error: {e}")
+        logger.error("❌ Add incomplete student error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -1006,7 +1037,8 @@ async def upload_file_to_lecture(
     is_public: bool = Form(True),
     current_admin = Depends(require_admin)
 ):
-    """Upload a file to a lecture (simplified - stores file info only)"""
+    """Upload a file to a lecture"""
+    stored = None
     try:
         service_client = get_supabase_auth_client()
         
@@ -1019,20 +1051,20 @@ async def upload_file_to_lecture(
         if not file.filename:
             raise HTTPException(status_code=400, detail="No filename provided")
         
-        # Read file content for size check
-        file_content = await file.read()
-        if len(file_content) > 50 * 1024 * 1024:  # 50MB limit
-            raise HTTPException(status_code=400, detail="File size exceeds 50MB limit")
+        # Stream to disk in chunks with the size limit and SHA-256 applied as bytes
+        # arrive; identical files share one content-addressed copy
+        file_ext = os.path.splitext(os.path.basename(file.filename))[1]
+        # Pinned until the resource row is inserted, so a concurrent delete keeps the file
+        stored = await store_upload(file, settings.resource_upload_dir, settings.upload_max_bytes, file_ext, pin=True)
         
-        # Create resource record (simplified - file path is just the original filename)
         resource_data = {
             "id": str(uuid.uuid4()),
             "lecture_id": lecture_id,
-            "filename": file.filename.replace(' ', '_'),  # Sanitize filename
+            "filename": os.path.basename(stored.path),
             "original_filename": file.filename,
             "file_type": file.content_type or "application/octet-stream",
-            "file_size": len(file_content),
-            "file_path": f"/uploads/lectures/{lecture_id}/{file.filename}",  # Mock path
+            "file_size": stored.size,
+            "file_path": stored.path,
             "description": description,
             "is_public": is_public,
             "uploaded_by": current_admin["id"],
@@ -1047,10 +1079,32 @@ async def upload_file_to_lecture(
             "message": "File uploaded successfully"
         }
         
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
+        if stored is not None:
+            # Also when deduplicated: a delete may have skipped the file while it was pinned
+            unpin_upload(stored)
+            _remove_unreferenced_file(get_supabase_auth_client(), stored.path)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    finally:
+        if stored is not None:
+            unpin_upload(stored)
+
+def _remove_unreferenced_file(service_client, file_path: Optional[str]) -> None:
+    """Delete a stored upload once no lecture resource references it (identical files share one copy)"""
+    if not file_path:
+        return
+    def is_referenced(path: str) -> bool:
+        others = service_client.table('lecture_resources').select('id').eq('file_path', path).limit(1).execute()
+        return bool(others.data)
+
+    try:
+        remove_unreferenced_blob(file_path, is_referenced)
+    except Exception as e:
+        logger.warning(f"Error deleting file {file_path}: {e}")
 
 @router.delete("/resources/{resource_id}")
 async def delete_resource(
@@ -1066,8 +1120,9 @@ async def delete_resource(
         if not existing.data:
             raise HTTPException(status_code=404, detail="Resource not found")
         
-        # Delete resource record
+        # Delete resource record, then its file unless another resource shares it
         service_client.table('lecture_resources').delete().eq('id', resource_id).execute()
+        _remove_unreferenced_file(service_client, existing.data[0].get('file_path'))
         
         return {"success": True, "message": "Resource deleted successfully"}
         
@@ -1117,7 +1172,7 @@ async def get_activity_log(
         }
         
     except Exception as e:
-        print(f"❌ Get activity log error: {e}")
+        logger.error("❌ Get activity log error: %s", e)
         # Return empty array as fallback
         return {
             "success": True,
@@ -1203,6 +1258,9 @@ async def award_student(
             }
             service_client.table('player_stats').insert(new_stats).execute()
         
+        if award_type == "xp":
+            _award_unit_xp(service_client, target_user_id, award_data.get('unit_id'), amount)
+        
         # Create activity log entry (if applicable)
         if award_type == "xp" and award_data.get('assignment_id'):
             xp_entry = {
@@ -1216,7 +1274,7 @@ async def award_student(
                 "description": description or f"XP awarded by admin",
                 "created_at": datetime.utcnow().isoformat()
             }
-            service_client.table('xp_entries').insert(xp_entry).execute()
+            xp_event_log.record(xp_entry)
         
         return {
             "success": True,
@@ -1232,5 +1290,5 @@ async def award_student(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Award error: {e}")
+        logger.error("❌ Award error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -3,11 +3,11 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 import os
 import base64
-import uuid
 from app.api.deps import get_db
 from app.core.config import settings
 from app.models.projects import Project as ProjectModel
 from app.services.assets import write_bytes
+from app.services.uploads import UploadTooLarge, store_upload
 
 router = APIRouter(prefix="/api/assets", tags=["assets"]) 
 
@@ -45,29 +45,26 @@ async def upload_image(project_id: str, file: UploadFile = File(...), db: Sessio
         print(f"❌ Invalid file type: {file.content_type}")
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    # Create assets directory if it doesn't exist
     project_assets = os.path.join(settings.projects_root, project_id, "assets")
     print(f"📁 Assets directory: {project_assets}")
-    os.makedirs(project_assets, exist_ok=True)
-    
-    # Generate unique filename to avoid conflicts
-    file_extension = os.path.splitext(file.filename or 'image.png')[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(project_assets, unique_filename)
-    print(f"💾 Saving to: {file_path}")
     
     try:
-        # Save file
-        content = await file.read()
-        write_bytes(file_path, content)
-        print(f"✅ File saved successfully: {len(content)} bytes")
+        # Stream to disk under a content-hash filename; re-uploading the same image reuses it
+        file_extension = os.path.splitext(file.filename or 'image.png')[1]
+        stored = await store_upload(file, project_assets, settings.upload_max_bytes, file_extension, shard=False)
+        stored_filename = os.path.basename(stored.path)
+        print(f"✅ File saved successfully: {stored.size} bytes -> {stored.path}"
+              f"{' (deduplicated)' if stored.deduplicated else ''}")
         
         return {
-            "path": f"assets/{unique_filename}",
-            "absolute_path": file_path,
-            "filename": unique_filename,
+            "path": f"assets/{stored_filename}",
+            "absolute_path": stored.path,
+            "filename": stored_filename,
             "original_filename": file.filename
         }
+    except UploadTooLarge as e:
+        print(f"❌ {e}")
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         print(f"❌ Failed to save file: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
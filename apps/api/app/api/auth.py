@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
 from fastapi.security import OAuth2PasswordBearer
 from slowapi import Limiter
@@ -15,6 +16,8 @@ from app.core.supabase_db import get_supabase_db
 from app.schemas.olympics import (
     UserCreate, AuthResponse, APIResponse
 )
+from app.services.images import InvalidImage, save_image_upload
+from app.services.uploads import UploadTooLarge
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 limiter = Limiter(key_func=get_remote_address)
@@ -77,6 +80,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def token_subject(token: str) -> Optional[str]:
+    """User id (``sub``) of a valid access token, None if it does not verify"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
@@ -84,12 +95,8 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    user_id = token_subject(token)
+    if user_id is None:
         raise credentials_exception
     
     user = db.query(User).filter(User.id == user_id).first()
@@ -113,44 +120,22 @@ def get_current_admin(current_user: User = Depends(get_current_user)):
 
 
 async def save_profile_picture(file: UploadFile) -> str:
-    """Save uploaded profile picture and return URL"""
+    """Save uploaded profile picture (with thumbnails) and return URL"""
     if not file:
         return None
     
-    # Validate file type
-    allowed_types = {"image/jpeg", "image/png", "image/webp", "image/gif"}
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file type. Only JPEG, PNG, WebP, and GIF are allowed."
-        )
-    
-    # Validate file size (5MB max)
-    file_size = 0
-    content = await file.read()
-    file_size = len(content)
-    
-    if file_size > 5 * 1024 * 1024:  # 5MB
+    try:
+        stored = await save_image_upload(file, 5 * 1024 * 1024)  # 5MB
+    except UploadTooLarge:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File size too large. Maximum 5MB allowed."
         )
-    
-    # Create uploads directory if it doesn't exist
-    upload_dir = "uploads/profile_pictures"
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = file.filename.split(".")[-1]
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        buffer.write(content)
+    except InvalidImage as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     # Return URL path
-    return f"/uploads/profile_pictures/{unique_filename}"
+    return stored.url
 
 
 @router.post("/register", response_model=AuthResponse)
@@ -228,7 +213,7 @@ async def register(
     )
     
     db.add(db_user)
-    db.flush()  # Get the user ID
+    await asyncio.to_thread(db.flush)  # Get the user ID
     
     # Create initial player stats
     player_stats = PlayerStats(user_id=db_user.id)
@@ -242,7 +227,7 @@ async def register(
     player_inventory = PlayerInventory(user_id=db_user.id)
     db.add(player_inventory)
     
-    db.commit()
+    await asyncio.to_thread(db.commit)
     db.refresh(db_user)
     
     # Log development auto-verification
@@ -293,7 +278,7 @@ async def login(
     
     # Update last active
     user.last_active = datetime.utcnow()
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -322,7 +307,7 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
     # Mark email as verified
     user.email_verified = True
     user.email_verification_token = None  # Clear token after use
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return {"message": "Email successfully verified! You can now log in."}
 
@@ -341,7 +326,7 @@ async def resend_verification(email: str = Form(...), db: Session = Depends(get_
     
     # Generate new token
     user.email_verification_token = generate_verification_token()
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     # TODO: Send email in production
     print(f"Email verification link: http://localhost:3001/verify-email?token={user.email_verification_token}")
@@ -364,7 +349,7 @@ async def forgot_password(email: str = Form(...), db: Session = Depends(get_db))
     
     user.password_reset_token = reset_token
     user.password_reset_expires = reset_expires
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     # TODO: Send email in production
     print(f"Password reset link: http://localhost:3001/reset-password?token={reset_token}")
@@ -412,7 +397,7 @@ async def reset_password(
     user.password_hash = get_password_hash(new_password)
     user.password_reset_token = None
     user.password_reset_expires = None
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return {"message": "Password successfully reset! You can now log in with your new password."}
 
@@ -474,7 +459,7 @@ async def initialize_player_data(
     player_inventory = PlayerInventory(user_id=user_id)
     db.add(player_inventory)
     
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return APIResponse(
         success=True,
@@ -3,7 +3,8 @@ Authentication System using Supabase SDK - Multi-User Deployment
 Complete replacement for SQLAlchemy-based auth
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+import logging
+from fastapi import APIRouter, Depends, File, HTTPException, status, Request, UploadFile
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -17,6 +18,10 @@ import uuid
 
 from app.core.supabase_db import get_supabase_db, SupabaseDB
 from app.core.supabase_client import get_supabase_auth_client
+from app.services.images import InvalidImage, image_urls, save_image_base64, save_image_upload
+from app.services.uploads import UploadTooLarge
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["Supabase Authentication"])
 limiter = Limiter(key_func=get_remote_address)
@@ -51,7 +56,7 @@ class APIResponse(BaseModel):
 class CompleteProfileRequest(BaseModel):
     username: str
     user_program: str
-    profile_picture: Optional[str] = None  # Base64 encoded image
+    profile_picture: Optional[str] = None  # Base64 encoded image (or data URL); prefer POST /auth/profile-picture
 
 def validate_email(email: str) -> bool:
     """Validate email format"""
@@ -78,6 +83,14 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def token_subject(token: str) -> Optional[str]:
+    """User id (``sub``) of a valid access token, None if it does not verify"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: SupabaseDB = Depends(get_supabase_db)
@@ -88,12 +101,8 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    user_id = token_subject(token)
+    if user_id is None:
         raise credentials_exception
     
     user = await db.get_user_by_id(user_id)
@@ -276,11 +285,14 @@ async def complete_profile(
             "updated_at": datetime.utcnow().isoformat()
         }
         
-        # Handle profile picture if provided
+        # Handle profile picture if provided: decoded on a worker thread,
+        # stored content-addressed with WebP thumbnails
         if profile_data.profile_picture:
-            # In a real implementation, you'd save this to file storage
-            # For now, we'll just store the filename/reference
-            user_updates["profile_picture"] = f"profile_{current_user['id']}.jpg"
+            try:
+                stored = await save_image_base64(profile_data.profile_picture)
+            except (InvalidImage, UploadTooLarge) as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            user_updates["profile_picture_url"] = stored.url
         
         # Update user in database using service client
         update_result = service_client.table('users').update(user_updates).eq('id', current_user['id']).execute()
@@ -319,7 +331,7 @@ async def complete_profile(
         # await db.create_player_skills(current_user['id'])
         # await db.create_player_inventory(initial_inventory)
         
-        print(f"✅ Profile completed for user: {profile_data.username} ({current_user['email']})")
+        logger.info("✅ Profile completed for user: %s (%s)", profile_data.username, current_user['email'])
         
         return {
             "success": True,
@@ -330,12 +342,46 @@ async def complete_profile(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Profile completion error: {e}")
+        logger.error("❌ Profile completion error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+@router.post("/profile-picture")
+@limiter.limit("10/minute")
+async def upload_profile_picture(
+    request: Request,
+    file: UploadFile = File(...),
+    current_user = Depends(get_current_user)
+):
+    """Upload a profile picture (multipart); returns the original and thumbnail URLs"""
+    try:
+        stored = await save_image_upload(file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except InvalidImage as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        service_client = get_supabase_auth_client()
+        service_client.table('users').update({
+            "profile_picture_url": stored.url,
+            "updated_at": datetime.utcnow().isoformat()
+        }).eq('id', current_user['id']).execute()
+    except Exception as e:
+        logger.error("❌ Profile picture update error: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    return {
+        "success": True,
+        "message": "Profile picture updated",
+        "data": {"profile_picture_url": stored.url, "images": image_urls(stored.url)}
+    }
+
 @router.get("/check-admin-code")
 async def check_admin_code(code: str):
     """Check if provided code is a valid admin code"""
@@ -362,7 +408,7 @@ async def check_admin_code(code: str):
             }
             
     except Exception as e:
-        print(f"❌ Admin code check error: {e}")
+        logger.error("❌ Admin code check error: %s", e)
         return {
             "success": False,
             "valid": False,
@@ -427,7 +473,7 @@ async def initialize_player_data(
         }
         
     except Exception as e:
-        print(f"❌ Initialize player error: {e}")
+        logger.error("❌ Initialize player error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=str(e)
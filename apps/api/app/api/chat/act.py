@@ -17,7 +17,7 @@ from app.models.sessions import Session as ChatSession
 from app.models.commits import Commit
 from app.models.user_requests import UserRequest
 from app.services.cli.unified_manager import UnifiedCLIManager, CLIType
-from app.services.git_ops import commit_all
+from app.services.git_ops import commit_all_async
 from app.core.websocket.manager import manager
 from app.core.terminal_ui import ui
 
@@ -77,7 +77,7 @@ async def execute_act_instruction(
                 started_at=datetime.utcnow()
             )
             db.add(session)
-            db.commit()
+            await asyncio.to_thread(db.commit)
         
         # Extract project info to avoid DetachedInstanceError in background task
         project_info = {
@@ -136,7 +136,7 @@ async def execute_chat_task(
         
         # Update session status to running
         session.status = "running"
-        db.commit()
+        await asyncio.to_thread(db.commit)
         
         # Send chat_start event to trigger loading indicator
         await manager.broadcast_to_project(project_id, {
@@ -211,7 +211,7 @@ async def execute_chat_task(
                 "timestamp": error_msg.created_at.isoformat()
             })
         
-        db.commit()
+        await asyncio.to_thread(db.commit)
         
         # Send chat_complete event to clear loading indicator and notify completion
         await manager.broadcast_to_project(project_id, {
@@ -242,7 +242,7 @@ async def execute_chat_task(
             created_at=datetime.utcnow()
         )
         db.add(error_msg)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         
         # Send chat_complete event even on failure to clear loading indicator
         await manager.broadcast_to_project(project_id, {
@@ -297,7 +297,7 @@ async def execute_act_task(
                 user_request.cli_type_used = cli_preference.value
                 user_request.model_used = project_selected_model
         
-        db.commit()
+        await asyncio.to_thread(db.commit)
         
         # Send act_start event to trigger loading indicator
         await manager.broadcast_to_project(project_id, {
@@ -336,7 +336,7 @@ async def execute_act_task(
             if result.get("has_changes"):
                 try:
                     commit_message = f"🤖 {result.get('cli_used', 'AI')}: {instruction[:100]}"
-                    commit_result = commit_all(project_repo_path, commit_message)
+                    commit_result = await commit_all_async(project_repo_path, commit_message)
                     
                     if commit_result["success"]:
                         commit = Commit(
@@ -348,7 +348,7 @@ async def execute_act_task(
                             created_at=datetime.utcnow()
                         )
                         db.add(commit)
-                        db.commit()
+                        await asyncio.to_thread(db.commit)
                         
                         await manager.send_message(project_id, {
                             "type": "commit",
@@ -433,7 +433,7 @@ async def execute_act_task(
             })
         
         try:
-            db.commit()
+            await asyncio.to_thread(db.commit)
             ui.success(f"Database commit successful for request {request_id[:8] if request_id else 'unknown'}...", "ACT")
         except Exception as commit_error:
             ui.error(f"Database commit failed: {commit_error}", "ACT")
@@ -481,7 +481,7 @@ async def execute_act_task(
             created_at=datetime.utcnow()
         )
         db.add(error_msg)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         
         # Send act_complete event even on failure to clear loading indicator
         await manager.broadcast_to_project(project_id, {
@@ -559,7 +559,7 @@ async def run_act(
     db.add(user_request)
     
     try:
-        db.commit()
+        await asyncio.to_thread(db.commit)
     except Exception as e:
         ui.error(f"Database commit failed: {e}", "ACT API")
         raise
@@ -666,7 +666,7 @@ async def run_chat(
     db.add(session)
     
     try:
-        db.commit()
+        await asyncio.to_thread(db.commit)
     except Exception as e:
         ui.error(f"Database commit failed: {e}", "CHAT API")
         raise
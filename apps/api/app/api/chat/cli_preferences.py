@@ -2,6 +2,7 @@
 CLI Preferences API Endpoints
 Handles CLI selection and configuration
 """
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -92,7 +93,7 @@ async def set_cli_preference(
     
     # Update project preferences
     project.preferred_cli = cli_type.value
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return {
         "preferred_cli": project.preferred_cli,
@@ -112,7 +113,7 @@ async def set_model_preference(
         raise HTTPException(status_code=404, detail="Project not found")
     
     project.selected_model = body.model_id
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return {
         "selected_model": project.selected_model,
@@ -2,18 +2,21 @@
 Chat Messages API Endpoints
 Handles message CRUD operations
 """
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
 from typing import List, Optional
 from datetime import datetime
+import gzip
 import uuid
-from sqlalchemy.orm import Session
+from sqlalchemy import Text, and_, cast, delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db
 from app.models.projects import Project
 from app.models.messages import Message
 from app.models.user_requests import UserRequest
 from app.core.websocket.manager import manager
+from app.services.message_blobs import blob_digests, is_valid_digest, read_blob_compressed
 
 
 router = APIRouter()
@@ -38,28 +41,95 @@ class SendMessageRequest(BaseModel):
     conversation_id: str | None = None
 
 
+def _encode_cursor(message: Message) -> str:
+    return f"{message.created_at.isoformat()}|{message.id}"
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, message_id = cursor.split("|", 1)
+        return datetime.fromisoformat(created_at), message_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _older_than(created_at: datetime, message_id: str):
+    return or_(
+        Message.created_at < created_at,
+        and_(Message.created_at == created_at, Message.id < message_id)
+    )
+
+
+def _newer_than(created_at: datetime, message_id: str):
+    return or_(
+        Message.created_at > created_at,
+        and_(Message.created_at == created_at, Message.id > message_id)
+    )
+
+
 @router.get("/{project_id}/messages", response_model=List[MessageResponse])
 async def get_messages(
     project_id: str, 
+    response: Response,
     conversation_id: Optional[str] = None, 
     cli_filter: Optional[str] = None,
-    limit: int = Query(100, le=1000),
-    db: Session = Depends(get_db)
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get messages for a project with optional filters"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    """
+    Get messages for a project with optional filters, oldest first.
+    
+    Without a cursor the newest ``limit`` messages are returned. ``before``
+    pages back through older history and ``after`` forward through newer
+    messages; ``since=<message_id>`` returns what was added after that
+    message, for clients catching up after a reconnect. When more messages
+    exist past the page, ``X-Before-Cursor`` (older) or ``X-After-Cursor``
+    (newer) holds the cursor to continue with.
+    """
+    if sum(1 for value in (before, after, since) if value) > 1:
+        raise HTTPException(status_code=400, detail="Use only one of before, after or since")
+    
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    query = db.query(Message).filter(Message.project_id == project_id)
+    query = select(Message).where(Message.project_id == project_id)
     
     if conversation_id:
-        query = query.filter(Message.conversation_id == conversation_id)
+        query = query.where(Message.conversation_id == conversation_id)
     
     if cli_filter:
-        query = query.filter(Message.cli_source == cli_filter)
+        query = query.where(Message.cli_source == cli_filter)
+    
+    if since:
+        anchor = await db.get(Message, since)
+        if not anchor or anchor.project_id != project_id:
+            raise HTTPException(status_code=404, detail="Message not found")
+        after = _encode_cursor(anchor)
+    
+    # Keyset pagination on (created_at, id), served by the history indexes
+    if after:
+        query = query.where(_newer_than(*_decode_cursor(after)))
+        query = query.order_by(Message.created_at.asc(), Message.id.asc())
+    else:
+        if before:
+            query = query.where(_older_than(*_decode_cursor(before)))
+        query = query.order_by(Message.created_at.desc(), Message.id.desc())
     
-    messages = query.order_by(Message.created_at.desc()).limit(limit).all()
+    messages = (await db.scalars(query.limit(limit + 1))).all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if not after:
+        messages = list(reversed(messages))
+    
+    if has_more:
+        if after:
+            response.headers["X-After-Cursor"] = _encode_cursor(messages[-1])
+        else:
+            response.headers["X-Before-Cursor"] = _encode_cursor(messages[0])
     
     # Filter out messages marked as hidden from UI
     filtered_messages = []
@@ -80,26 +150,70 @@ async def get_messages(
             conversation_id=msg.conversation_id,
             cli_source=msg.metadata_json.get("cli_type") if msg.metadata_json else None,
             created_at=msg.created_at
-        ) for msg in reversed(filtered_messages)
+        ) for msg in filtered_messages
     ]
 
 
+@router.get("/{project_id}/blobs/{digest}")
+async def get_message_blob(
+    project_id: str,
+    digest: str,
+    accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Full payload of a tool input moved out of a message's metadata
+    (referenced from ``metadata_json["blobs"]``). Only blobs referenced by
+    one of the project's messages are served. Blobs are immutable, so the
+    stored gzip bytes are sent as-is to clients that accept gzip.
+    """
+    if not is_valid_digest(digest):
+        raise HTTPException(status_code=400, detail="Invalid blob digest")
+    
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # The text match narrows the scan; the metadata is then checked for a real reference
+    candidates = await db.scalars(
+        select(Message.metadata_json)
+        .where(Message.project_id == project_id)
+        .where(cast(Message.metadata_json, Text).contains(digest))
+    )
+    if not any(digest in blob_digests(metadata) for metadata in candidates):
+        raise HTTPException(status_code=404, detail="Blob not found")
+    
+    compressed = read_blob_compressed(digest)
+    if compressed is None:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    
+    headers = {
+        "ETag": f'"{digest}"',
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "Vary": "Accept-Encoding",
+    }
+    if accept_encoding and "gzip" in accept_encoding:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=compressed, media_type="application/json", headers=headers)
+    return Response(content=gzip.decompress(compressed), media_type="application/json", headers=headers)
+
+
 @router.get("/{project_id}/active-session")
-async def get_active_session(project_id: str, db: Session = Depends(get_db)):
+async def get_active_session(project_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get the currently active session for a project"""
     from app.models.sessions import Session as ChatSession
     
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Find the most recent active session (not completed or failed)
-    active_session = (
-        db.query(ChatSession)
-        .filter(ChatSession.project_id == project_id)
-        .filter(ChatSession.status.in_(["active", "running"]))  # Include both active and running
+    active_session = await db.scalar(
+        select(ChatSession)
+        .where(ChatSession.project_id == project_id)
+        .where(ChatSession.status.in_(["active", "running"]))  # Include both active and running
         .order_by(ChatSession.started_at.desc())
-        .first()
+        .limit(1)
     )
     
     if not active_session:
@@ -118,10 +232,10 @@ async def get_active_session(project_id: str, db: Session = Depends(get_db)):
 async def send_message(
     project_id: str, 
     body: SendMessageRequest, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a simple message (no CLI execution)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -139,7 +253,7 @@ async def send_message(
     )
     
     db.add(message)
-    db.commit()
+    await db.commit()
     
     # Send to WebSocket clients
     await manager.send_message(project_id, {
@@ -172,19 +286,18 @@ async def send_message(
 
 
 @router.get("/{project_id}/sessions/{session_id}/status")
-async def get_session_status(project_id: str, session_id: str, db: Session = Depends(get_db)):
+async def get_session_status(project_id: str, session_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get the status of a specific session"""
     from app.models.sessions import Session as ChatSession
     
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    session = (
-        db.query(ChatSession)
-        .filter(ChatSession.id == session_id)
-        .filter(ChatSession.project_id == project_id)
-        .first()
+    session = await db.scalar(
+        select(ChatSession)
+        .where(ChatSession.id == session_id)
+        .where(ChatSession.project_id == project_id)
     )
     
     if not session:
@@ -205,20 +318,20 @@ async def get_session_status(project_id: str, session_id: str, db: Session = Dep
 async def clear_messages(
     project_id: str,
     conversation_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Clear messages for a project or conversation"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    query = db.query(Message).filter(Message.project_id == project_id)
+    query = delete(Message).where(Message.project_id == project_id)
     
     if conversation_id:
-        query = query.filter(Message.conversation_id == conversation_id)
+        query = query.where(Message.conversation_id == conversation_id)
     
-    deleted_count = query.delete()
-    db.commit()
+    deleted_count = (await db.execute(query)).rowcount
+    await db.commit()
     
     await manager.send_message(project_id, {
         "type": "messages_cleared",
@@ -231,20 +344,20 @@ async def clear_messages(
 @router.get("/{project_id}/requests/active")
 async def get_active_requests(
     project_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get active user requests for a project (no logging for polling)"""
     # No logging to keep server logs clean
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Count active requests (is_completed = false)
-    active_count = (
-        db.query(UserRequest)
-        .filter(UserRequest.project_id == project_id)
-        .filter(UserRequest.is_completed == False)
-        .count()
+    active_count = await db.scalar(
+        select(func.count())
+        .select_from(UserRequest)
+        .where(UserRequest.project_id == project_id)
+        .where(UserRequest.is_completed == False)
     )
     
     return {"hasActiveRequests": active_count > 0, "activeCount": active_count}
\ No newline at end of file
@@ -1,16 +1,43 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+import json
 import os
+import subprocess
 from app.core.config import settings
-from app.api.deps import get_db
-from sqlalchemy.orm import Session
+from app.api.deps import get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.projects import Project as ProjectModel
-from app.services.git_ops import list_commits, show_diff, hard_reset
+from app.services.git_ops import (
+    DIFF_FILE_MAX_BYTES,
+    list_commits_async,
+    show_diff_async,
+    hard_reset_async,
+    diff_summary_async,
+    show_file_diff_async,
+    stream_diff_files,
+    resolve_commit_async,
+)
 
 router = APIRouter(prefix="/api/commits", tags=["commits"])
 
 
+class DiffFileSummary(BaseModel):
+    path: str
+    old_path: Optional[str] = None
+    additions: int
+    deletions: int
+    binary: bool
+
+
+class DiffSummary(BaseModel):
+    commit_sha: str
+    files: List[DiffFileSummary]
+    additions: int
+    deletions: int
+
+
 class Commit(BaseModel):
     commit_sha: str
     parent_sha: str | None
@@ -20,28 +47,88 @@ class Commit(BaseModel):
 
 
 @router.get("/{project_id}", response_model=List[Commit])
-async def commits(project_id: str, db: Session = Depends(get_db)) -> List[Commit]:
-    row = db.get(ProjectModel, project_id)
+async def commits(
+    project_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    skip: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+) -> List[Commit]:
+    row = await db.get(ProjectModel, project_id)
     if not row:
         raise HTTPException(status_code=404, detail="Project not found")
     repo = os.path.join(settings.projects_root, project_id, "repo")
-    return [Commit(**c) for c in list_commits(repo)]
+    return [Commit(**c) for c in await list_commits_async(repo, limit=limit, skip=skip)]
+
+
+@router.get("/{project_id}/{commit_sha}/files", response_model=DiffSummary)
+async def commit_files(project_id: str, commit_sha: str, db: AsyncSession = Depends(get_async_db)) -> DiffSummary:
+    """File-level summary of a commit; load patches per file via /diff?path=..."""
+    row = await db.get(ProjectModel, project_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+    repo = os.path.join(settings.projects_root, project_id, "repo")
+    if not await resolve_commit_async(repo, commit_sha):
+        raise HTTPException(status_code=404, detail="Commit not found")
+    try:
+        files = await diff_summary_async(repo, commit_sha)
+    except subprocess.CalledProcessError:
+        raise HTTPException(status_code=404, detail="Commit not found")
+    return DiffSummary(
+        commit_sha=commit_sha,
+        files=[DiffFileSummary(**f) for f in files],
+        additions=sum(f["additions"] for f in files),
+        deletions=sum(f["deletions"] for f in files),
+    )
 
 
 @router.get("/{project_id}/{commit_sha}/diff")
-async def commit_diff(project_id: str, commit_sha: str, db: Session = Depends(get_db)):
-    row = db.get(ProjectModel, project_id)
+async def commit_diff(
+    project_id: str,
+    commit_sha: str,
+    path: Optional[str] = None,
+    full: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Diff of a commit. With ``path`` only that file's patch is returned,
+    truncated past DIFF_FILE_MAX_BYTES unless ``full=true``.
+    """
+    row = await db.get(ProjectModel, project_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+    repo = os.path.join(settings.projects_root, project_id, "repo")
+    if not await resolve_commit_async(repo, commit_sha):
+        raise HTTPException(status_code=404, detail="Commit not found")
+    if path is not None:
+        return await show_file_diff_async(repo, commit_sha, path, max_bytes=None if full else DIFF_FILE_MAX_BYTES)
+    return {"diff": await show_diff_async(repo, commit_sha)}
+
+
+@router.get("/{project_id}/{commit_sha}/diff/stream")
+async def commit_diff_stream(project_id: str, commit_sha: str, db: AsyncSession = Depends(get_async_db)):
+    """Stream a commit's diff as NDJSON, one object per file, oversized files truncated"""
+    row = await db.get(ProjectModel, project_id)
     if not row:
         raise HTTPException(status_code=404, detail="Project not found")
     repo = os.path.join(settings.projects_root, project_id, "repo")
-    return {"diff": show_diff(repo, commit_sha)}
+    # Checked up front: once streaming starts the status is already 200
+    if not await resolve_commit_async(repo, commit_sha):
+        raise HTTPException(status_code=404, detail="Commit not found")
+
+    async def ndjson():
+        async for file_diff in stream_diff_files(repo, commit_sha):
+            yield json.dumps(file_diff) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 
 @router.post("/{project_id}/{commit_sha}/revert")
-async def revert_to(project_id: str, commit_sha: str, db: Session = Depends(get_db)):
-    row = db.get(ProjectModel, project_id)
+async def revert_to(project_id: str, commit_sha: str, db: AsyncSession = Depends(get_async_db)):
+    row = await db.get(ProjectModel, project_id)
     if not row:
         raise HTTPException(status_code=404, detail="Project not found")
     repo = os.path.join(settings.projects_root, project_id, "repo")
-    hard_reset(repo, commit_sha)
+    if not await resolve_commit_async(repo, commit_sha):
+        raise HTTPException(status_code=404, detail="Commit not found")
+    await hard_reset_async(repo, commit_sha)
     return {"ok": True}
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, get_async_db
 
 
 def get_db():
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db
 from app.models.env_vars import EnvVar
 from app.models.projects import Project as ProjectModel
 from app.services.env_manager import (
@@ -55,18 +56,18 @@ class ConflictResponse(BaseModel):
 
 
 @router.get("/{project_id}", response_model=List[EnvVarResponse])
-async def get_env_vars(project_id: str, db: Session = Depends(get_db)):
+async def get_env_vars(project_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get all environment variables for a project"""
     # Verify project exists
-    project = db.get(ProjectModel, project_id)
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     try:
         # Get encrypted vars from DB
-        db_env_vars = db.query(EnvVar).filter(
+        db_env_vars = (await db.scalars(select(EnvVar).where(
             EnvVar.project_id == project_id
-        ).all()
+        ))).all()
         
         result = []
         for env_var in db_env_vars:
@@ -93,20 +94,21 @@ async def get_env_vars(project_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/{project_id}")
-async def create_env_variable(project_id: str, body: EnvVarCreate, db: Session = Depends(get_db)):
+async def create_env_variable(project_id: str, body: EnvVarCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new environment variable and sync to .env file"""
     # Verify project exists
-    project = db.get(ProjectModel, project_id)
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     try:
         # Create env var using service (includes sync to file)
-        env_var = create_env_var(
-            db, project_id, body.key, body.value,
+        # env_manager works on a sync Session; run_sync keeps it off the event loop
+        env_var = await db.run_sync(lambda session: create_env_var(
+            session, project_id, body.key, body.value,
             scope=body.scope, var_type=body.var_type,
             is_secret=body.is_secret, description=body.description
-        )
+        ))
         
         return {
             "success": True,
@@ -119,16 +121,16 @@ async def create_env_variable(project_id: str, body: EnvVarCreate, db: Session =
 
 
 @router.put("/{project_id}/{key}")
-async def update_env_variable(project_id: str, key: str, body: EnvVarUpdate, db: Session = Depends(get_db)):
+async def update_env_variable(project_id: str, key: str, body: EnvVarUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update an environment variable and sync to .env file"""
     # Verify project exists
-    project = db.get(ProjectModel, project_id)
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     try:
         # Update env var using service (includes sync to file)
-        success = update_env_var(db, project_id, key, body.value)
+        success = await db.run_sync(update_env_var, project_id, key, body.value)
         
         if not success:
             raise HTTPException(status_code=404, detail=f"Environment variable '{key}' not found")
@@ -145,16 +147,16 @@ async def update_env_variable(project_id: str, key: str, body: EnvVarUpdate, db:
 
 
 @router.delete("/{project_id}/{key}")
-async def delete_env_variable(project_id: str, key: str, db: Session = Depends(get_db)):
+async def delete_env_variable(project_id: str, key: str, db: AsyncSession = Depends(get_async_db)):
     """Delete an environment variable and sync to .env file"""
     # Verify project exists
-    project = db.get(ProjectModel, project_id)
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     try:
         # Delete env var using service (includes sync to file)
-        success = delete_env_var(db, project_id, key)
+        success = await db.run_sync(delete_env_var, project_id, key)
         
         if not success:
             raise HTTPException(status_code=404, detail=f"Environment variable '{key}' not found")
@@ -171,15 +173,15 @@ async def delete_env_variable(project_id: str, key: str, db: Session = Depends(g
 
 
 @router.get("/{project_id}/conflicts", response_model=ConflictResponse)
-async def get_sync_conflicts(project_id: str, db: Session = Depends(get_db)):
+async def get_sync_conflicts(project_id: str, db: AsyncSession = Depends(get_async_db)):
     """Check for conflicts between database and .env file"""
     # Verify project exists
-    project = db.get(ProjectModel, project_id)
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     try:
-        conflicts = get_env_var_conflicts(db, project_id)
+        conflicts = await db.run_sync(get_env_var_conflicts, project_id)
         return ConflictResponse(
             conflicts=conflicts,
             has_conflicts=len(conflicts) > 0
@@ -190,15 +192,15 @@ async def get_sync_conflicts(project_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/{project_id}/sync/file-to-db", response_model=SyncResponse)
-async def sync_file_to_database(project_id: str, db: Session = Depends(get_db)):
+async def sync_file_to_database(project_id: str, db: AsyncSession = Depends(get_async_db)):
     """Sync .env file contents to database (file -> DB)"""
     # Verify project exists
-    project = db.get(ProjectModel, project_id)
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     try:
-        synced_count = sync_env_file_to_db(db, project_id)
+        synced_count = await db.run_sync(sync_env_file_to_db, project_id)
         return SyncResponse(
             success=True,
             synced_count=synced_count,
@@ -210,15 +212,15 @@ async def sync_file_to_database(project_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/{project_id}/sync/db-to-file", response_model=SyncResponse)
-async def sync_database_to_file(project_id: str, db: Session = Depends(get_db)):
+async def sync_database_to_file(project_id: str, db: AsyncSession = Depends(get_async_db)):
     """Sync database contents to .env file (DB -> file)"""
     # Verify project exists
-    project = db.get(ProjectModel, project_id)
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     try:
-        synced_count = sync_db_to_env_file(db, project_id)
+        synced_count = await db.run_sync(sync_db_to_env_file, project_id)
         return SyncResponse(
             success=True,
             synced_count=synced_count,
@@ -231,13 +233,13 @@ async def sync_database_to_file(project_id: str, db: Session = Depends(get_db)):
 
 # Legacy endpoint for backward compatibility
 @router.post("/{project_id}/upsert")
-async def upsert_env(project_id: str, body: EnvVarCreate, db: Session = Depends(get_db)):
+async def upsert_env(project_id: str, body: EnvVarCreate, db: AsyncSession = Depends(get_async_db)):
     """Legacy upsert endpoint - creates or updates an env var"""
     # Check if env var exists
-    existing = db.query(EnvVar).filter(
+    existing = await db.scalar(select(EnvVar).where(
         EnvVar.project_id == project_id,
         EnvVar.key == body.key
-    ).first()
+    ))
     
     if existing:
         # Update existing
@@ -1,6 +1,7 @@
 """
 GitHub integration API endpoints
 """
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -15,10 +16,11 @@ from app.services.github_service import GitHubService, GitHubAPIError, check_rep
 from app.services.token_service import get_token
 from app.services.git_ops import (
     add_remote, 
-    push_to_remote, 
     initialize_main_branch, 
     set_git_config,
-    commit_all
+    commit_all,
+    commit_all_async,
+    push_to_remote_async
 )
 from uuid import uuid4
 
@@ -153,7 +155,7 @@ async def connect_github_repository(
         # Update project repo_path in database if it was changed
         if project.repo_path != repo_path:
             project.repo_path = repo_path
-            db.commit()
+            await asyncio.to_thread(db.commit)
         
         try:
             # Set Git config
@@ -210,7 +212,7 @@ async def connect_github_repository(
                 # Update existing connection
                 existing_connection.service_data = service_data
                 existing_connection.status = "connected"
-                db.commit()
+                await asyncio.to_thread(db.commit)
             else:
                 # Create new connection
                 connection = ProjectServiceConnection(
@@ -221,7 +223,7 @@ async def connect_github_repository(
                     service_data=service_data
                 )
                 db.add(connection)
-                db.commit()
+                await asyncio.to_thread(db.commit)
                 
         except Exception as db_error:
             logger.error(f"Database update failed: {db_error}")
@@ -290,7 +292,7 @@ async def disconnect_github_repository(project_id: str, db: Session = Depends(ge
     
     # Remove the connection
     db.delete(connection)
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return {"message": "GitHub repository disconnected successfully"}
 
@@ -331,10 +333,10 @@ async def push_github_repository(project_id: str, db: Session = Depends(get_db))
     default_branch = connection.service_data.get("default_branch", "main")
 
     # Commit any pending changes (optional harmless)
-    commit_all(repo_path, "Publish from Lovable UI")
+    await commit_all_async(repo_path, "Publish from Lovable UI")
 
     # Push
-    result = push_to_remote(repo_path, "origin", default_branch)
+    result = await push_to_remote_async(repo_path, "origin", default_branch)
     if not result.get("success"):
         raise HTTPException(status_code=500, detail=f"Git push failed: {result.get('error', 'unknown')}")
 
@@ -349,7 +351,7 @@ async def push_github_repository(project_id: str, db: Session = Depends(get_db))
             "last_pushed_branch": default_branch,
         })
         svc.service_data = data
-        db.commit()
+        await asyncio.to_thread(db.commit)
     except Exception as e:
         logger = logging.getLogger(__name__)
         logger.warning(f"Failed updating GitHub connection after push: {e}")
@@ -365,7 +367,7 @@ async def push_github_repository(project_id: str, db: Session = Depends(get_db))
             # Don't set deployment_url until actual deployment happens
             vercel_data["last_published_at"] = data.get("last_push_at")
             vercel_conn.service_data = vercel_data
-            db.commit()
+            await asyncio.to_thread(db.commit)
     except Exception as e:
         logger = logging.getLogger(__name__)
         logger.warning(f"Failed updating Vercel connection after push: {e}")
@@ -4,6 +4,7 @@ from app.core.database import get_db
 from app.api.auth import get_current_user
 from app.models.olympics import User, PlayerStats, PlayerSkills
 from app.schemas.olympics import User as UserSchema
+from app.services.images import thumbnail_url
 from typing import List
 import logging
 
@@ -52,7 +53,8 @@ async def get_leaderboard(
                 "id": user.id,
                 "username": user.username,
                 "user_program": user.user_program,
-                "profile_picture_url": user.profile_picture_url,
+                # Avatar-sized thumbnail; the full image is on the profile
+                "profile_picture_url": thumbnail_url(user.profile_picture_url),
                 "total_xp": stats.total_xp,
                 "current_xp": stats.current_xp,
                 "current_level": stats.current_level,
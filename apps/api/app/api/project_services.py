@@ -1,6 +1,7 @@
 """
 Project services API for managing Git, Supabase, Vercel integrations
 """
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
@@ -101,7 +102,7 @@ async def connect_service(
         # Update existing connection
         existing.service_data = connection_data.service_data
         existing.status = "connected"
-        db.commit()
+        await asyncio.to_thread(db.commit)
         db.refresh(existing)
         
         return {
@@ -119,7 +120,7 @@ async def connect_service(
         )
         
         db.add(connection)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         db.refresh(connection)
         
         return {
@@ -150,7 +151,7 @@ async def disconnect_service(project_id: str, provider: str, db: Session = Depen
     
     # Delete the connection
     db.delete(connection)
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return {"message": f"{provider.capitalize()} service disconnected successfully"}
 
@@ -2,18 +2,18 @@
 Project CRUD Operations
 Handles create, read, update, delete operations for projects
 """
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, Response
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
-from sqlalchemy import desc, func
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, desc, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 import re
 import uuid
 import asyncio
 import os
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db
 from app.models.projects import Project as ProjectModel
 from app.models.messages import Message
 from app.models.project_services import ProjectServiceConnection
@@ -61,6 +61,37 @@ class Project(BaseModel):
 
 router = APIRouter()
 
+SERVICE_PROVIDERS = ["github", "supabase", "vercel"]
+
+
+def _build_services(connections: List[ProjectServiceConnection]) -> dict:
+    """Service connection map for a project, with every provider represented"""
+    services = {}
+    for conn in connections:
+        services[conn.provider] = {
+            "connected": True,
+            "status": conn.status
+        }
+    for provider in SERVICE_PROVIDERS:
+        if provider not in services:
+            services[provider] = {
+                "connected": False,
+                "status": "disconnected"
+            }
+    return services
+
+
+def _encode_cursor(project: ProjectModel) -> str:
+    return f"{project.created_at.isoformat()}|{project.id}"
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, project_id = cursor.split("|", 1)
+        return datetime.fromisoformat(created_at), project_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 # Use the global WebSocket manager instance shared across the app
 
 # Metadata generation removed - using initial prompt directly in chat
@@ -96,7 +127,7 @@ async def initialize_project_background(project_id: str, project_name: str, body
                 project = db_session.query(ProjectModel).filter(ProjectModel.id == project_id).first()
                 if project:
                     project.repo_path = project_path
-                    db_session.commit()
+                    await asyncio.to_thread(db_session.commit)
                 
                 return project_path
             
@@ -111,7 +142,7 @@ async def initialize_project_background(project_id: str, project_name: str, body
             project = db_session.query(ProjectModel).filter(ProjectModel.id == project_id).first()
             if project:
                 project.status = "active"
-                db_session.commit()
+                await asyncio.to_thread(db_session.commit)
             
             # Send final completion status
             await websocket_manager.broadcast_to_project(project_id, {
@@ -135,7 +166,7 @@ async def initialize_project_background(project_id: str, project_name: str, body
             project = error_db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
             if project:
                 project.status = "failed"
-                error_db.commit()
+                await asyncio.to_thread(error_db.commit)
         finally:
             error_db.close()
         
@@ -182,12 +213,12 @@ async def install_dependencies_background(project_id: str, project_path: str):
 async def install_project_dependencies(
     project_id: str,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Install project dependencies in background"""
     
     # Check if project exists
-    project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -200,6 +231,20 @@ async def install_project_dependencies(
     return {"message": "Dependency installation started in background", "project_id": project_id}
 
 
+@router.get("/dependency-cache/stats")
+async def dependency_cache_stats():
+    """Shared node_modules cache usage and the disk space / install time it saved"""
+    from app.services.dependency_cache import dependency_cache
+    return dependency_cache.stats()
+
+
+@router.post("/dependency-cache/gc")
+async def dependency_cache_gc(min_idle_hours: float = 24):
+    """Remove cached dependency sets no project references anymore"""
+    from app.services.dependency_cache import dependency_cache
+    return await asyncio.to_thread(dependency_cache.gc, min_idle_hours * 3600)
+
+
 @router.get("/health")
 async def projects_health():
     """Simple health check for projects router"""
@@ -208,12 +253,25 @@ async def projects_health():
 
 
 @router.get("/", response_model=List[Project])
-async def list_projects(db: Session = Depends(get_db)) -> List[Project]:
-    """List all projects with their status and last activity"""
+async def list_projects(
+    response: Response,
+    status: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> List[Project]:
+    """
+    List projects with their status and last activity, newest first.
+    
+    Always two queries regardless of project count: projects joined with
+    their last message time, then all service connections for the page in
+    one IN query. With ``limit`` set, the ``X-Next-Cursor`` response header
+    holds the cursor for the following page.
+    """
     
     # Get projects with their last message time using subquery
     last_message_subquery = (
-        db.query(
+        select(
             Message.project_id,
             func.max(Message.created_at).label('last_message_at')
         )
@@ -222,37 +280,42 @@ async def list_projects(db: Session = Depends(get_db)) -> List[Project]:
     )
     
     # Query projects with last message time
-    projects_with_last_message = (
-        db.query(ProjectModel, last_message_subquery.c.last_message_at)
+    query = (
+        select(ProjectModel, last_message_subquery.c.last_message_at)
         .outerjoin(
             last_message_subquery,
             ProjectModel.id == last_message_subquery.c.project_id
         )
-        .order_by(desc(ProjectModel.created_at))
-        .all()
     )
+    if status:
+        query = query.where(ProjectModel.status == status)
+    if cursor:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            ProjectModel.created_at < cursor_created_at,
+            and_(ProjectModel.created_at == cursor_created_at, ProjectModel.id < cursor_id)
+        ))
+    query = query.order_by(desc(ProjectModel.created_at), desc(ProjectModel.id))
+    if limit:
+        query = query.limit(limit + 1)
+    projects_with_last_message = (await db.execute(query)).all()
+    
+    if limit and len(projects_with_last_message) > limit:
+        projects_with_last_message = projects_with_last_message[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(projects_with_last_message[-1][0])
+    
+    # Service connections for every project on the page in one query
+    connections_by_project: Dict[str, List[ProjectServiceConnection]] = {}
+    project_ids = [project.id for project, _ in projects_with_last_message]
+    if project_ids:
+        for conn in await db.scalars(select(ProjectServiceConnection).where(
+            ProjectServiceConnection.project_id.in_(project_ids)
+        )):
+            connections_by_project.setdefault(conn.project_id, []).append(conn)
     
     result: List[Project] = []
     for project, last_message_at in projects_with_last_message:
-        # Get service connections for this project
-        services = {}
-        service_connections = db.query(ProjectServiceConnection).filter(
-            ProjectServiceConnection.project_id == project.id
-        ).all()
-        
-        for conn in service_connections:
-            services[conn.provider] = {
-                "connected": True,
-                "status": conn.status
-            }
-        
-        # Ensure all service types are represented
-        for provider in ["github", "supabase", "vercel"]:
-            if provider not in services:
-                services[provider] = {
-                    "connected": False,
-                    "status": "disconnected"
-                }
+        services = _build_services(connections_by_project.get(project.id, []))
         
         # Extract AI-generated info from settings
         ai_info = project.settings or {}
@@ -279,11 +342,11 @@ async def list_projects(db: Session = Depends(get_db)) -> List[Project]:
 
 
 @router.get("/{project_id}", response_model=Project)
-async def get_project(project_id: str, db: Session = Depends(get_db)) -> Project:
+async def get_project(project_id: str, db: AsyncSession = Depends(get_async_db)) -> Project:
     """Get a specific project by ID"""
     
     try:
-        project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+        project = await db.get(ProjectModel, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         
@@ -314,7 +377,7 @@ async def get_project(project_id: str, db: Session = Depends(get_db)) -> Project
 @router.post("/", response_model=Project)
 async def create_project(
     body: ProjectCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Project:
     """Create a new project"""
     
@@ -322,7 +385,7 @@ async def create_project(
     print(f"🔧 [CreateProject] CLI: {body.preferred_cli}, Model: {body.selected_model}")
     
     # Check if project already exists
-    existing = db.query(ProjectModel).filter(ProjectModel.id == body.project_id).first()
+    existing = await db.get(ProjectModel, body.project_id)
     if existing:
         raise HTTPException(status_code=409, detail=f"Project {body.project_id} already exists")
     
@@ -352,8 +415,8 @@ async def create_project(
     )
     
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     # Send immediate status update
     await websocket_manager.broadcast_to_project(project.id, {
@@ -392,43 +455,28 @@ async def create_project(
 async def update_project(
     project_id: str, 
     body: ProjectUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Project:
     """Update a project"""
     
-    project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Update project name
     project.name = body.name
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     # Get last message time
-    last_message = db.query(Message).filter(
-        Message.project_id == project_id
-    ).order_by(desc(Message.created_at)).first()
+    last_message_at = await db.scalar(
+        select(func.max(Message.created_at)).where(Message.project_id == project_id)
+    )
     
     # Get service connections
-    services = {}
-    service_connections = db.query(ProjectServiceConnection).filter(
+    services = _build_services((await db.scalars(select(ProjectServiceConnection).where(
         ProjectServiceConnection.project_id == project.id
-    ).all()
-    
-    for conn in service_connections:
-        services[conn.provider] = {
-            "connected": True,
-            "status": conn.status
-        }
-    
-    # Ensure all service types are represented
-    for provider in ["github", "supabase", "vercel"]:
-        if provider not in services:
-            services[provider] = {
-                "connected": False,
-                "status": "disconnected"
-            }
+    ))).all())
     
     # Extract AI-generated info from settings
     ai_info = project.settings or {}
@@ -441,7 +489,7 @@ async def update_project(
         preview_url=project.preview_url,
         created_at=project.created_at,
         last_active_at=project.last_active_at,
-        last_message_at=last_message.created_at if last_message else None,
+        last_message_at=last_message_at,
         services=services,
         features=ai_info.get('features'),
         tech_stack=ai_info.get('tech_stack'),
@@ -453,28 +501,30 @@ async def update_project(
 
 
 @router.delete("/{project_id}")
-async def delete_project(project_id: str, db: Session = Depends(get_db)):
+async def delete_project(project_id: str, db: AsyncSession = Depends(get_async_db)):
     """Delete a project"""
     
-    project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Delete associated messages
-    db.query(Message).filter(Message.project_id == project_id).delete()
+    await db.execute(delete(Message).where(Message.project_id == project_id))
     
     # Delete service connections
-    db.query(ProjectServiceConnection).filter(
+    await db.execute(delete(ProjectServiceConnection).where(
         ProjectServiceConnection.project_id == project_id
-    ).delete()
+    ))
     
     # Delete project
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     
     # Clean up project files from disk
     try:
         from app.services.project.initializer import cleanup_project
+        from app.services.repo_index import drop_repo_index
+        drop_repo_index(project_id)
         cleanup_success = await cleanup_project(project_id)
         if cleanup_success:
             print(f"✅ Project files deleted successfully for {project_id}")
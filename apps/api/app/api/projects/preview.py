@@ -2,9 +2,12 @@
 Project Preview Management
 Handles preview server operations for projects
 """
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
@@ -14,8 +17,12 @@ from app.services.local_runtime import (
     stop_preview_process,
     preview_status,
     get_preview_logs,
-    get_all_preview_logs
+    get_all_preview_logs,
+    get_preview_port,
+    tail_preview_logs
 )
+from app.services.preview_logs import get_log_buffer, format_sse, parse_cursor, resume_from
+from app.services.preview_supervisor import preview_supervisor
 
 
 router = APIRouter()
@@ -33,9 +40,17 @@ class PreviewStatusResponse(BaseModel):
     error: Optional[str] = None
 
 
+class PreviewLogEntry(BaseModel):
+    seq: int
+    line: str
+
+
 class PreviewLogsResponse(BaseModel):
     logs: str
     running: bool
+    entries: Optional[List[PreviewLogEntry]] = None
+    last_seq: Optional[int] = None
+    epoch: Optional[str] = None
 
 
 @router.post("/{project_id}/preview/start", response_model=PreviewStatusResponse)
@@ -53,11 +68,11 @@ async def start_preview(
     # Check if preview is already running
     status = preview_status(project_id)
     if status == "running":
-        # Get existing port from somewhere or use default
+        port = get_preview_port(project_id)
         return PreviewStatusResponse(
             running=True,
-            port=None,  # TODO: Store port information
-            url=None,
+            port=port,
+            url=f"http://localhost:{port}" if port else None,
             process_id=None
         )
     
@@ -76,7 +91,7 @@ async def start_preview(
     # Update project status
     project.status = "preview_running"
     project.preview_url = result.get("url")
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return PreviewStatusResponse(
         running=True,
@@ -103,6 +118,12 @@ async def get_all_error_logs(
     return {"logs": all_logs, "project_id": project_id}
 
 
+@router.get("/previews/supervisor")
+async def get_preview_supervisor_report():
+    """Running previews with memory use and idle time, budget and recent evictions"""
+    return preview_supervisor.report()
+
+
 @router.post("/{project_id}/preview/stop")
 async def stop_preview(project_id: str, db: Session = Depends(get_db)):
     """Stop preview server for a project"""
@@ -117,7 +138,7 @@ async def stop_preview(project_id: str, db: Session = Depends(get_db)):
     # Update project status
     project.status = "idle"
     project.preview_url = None
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return {"message": "Preview stopped successfully"}
 
@@ -132,10 +153,25 @@ async def get_preview_status(project_id: str, db: Session = Depends(get_db)):
     
     status = preview_status(project_id)
     
+    # Previews stopped by the supervisor come back on the next access
+    if status != "running" and preview_supervisor.was_evicted(project_id) and project.repo_path:
+        try:
+            _, port = start_preview_process(project_id, project.repo_path)
+            project.preview_url = f"http://localhost:{port}"
+            await asyncio.to_thread(db.commit)
+            status = "running"
+        except RuntimeError as e:
+            preview_supervisor.clear_eviction(project_id)
+            return PreviewStatusResponse(running=False, error=str(e))
+    
+    if status == "running":
+        preview_supervisor.touch(project_id)
+    port = get_preview_port(project_id) if status == "running" else None
+    
     return PreviewStatusResponse(
         running=(status == "running"),
-        port=None,  # TODO: Store port information
-        url=None,
+        port=port,
+        url=f"http://localhost:{port}" if port else None,
         process_id=None,
         error=None
     )
@@ -145,20 +181,108 @@ async def get_preview_status(project_id: str, db: Session = Depends(get_db)):
 async def get_preview_logs_endpoint(
     project_id: str,
     lines: int = 100,
+    since: Optional[int] = None,
+    epoch: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get preview server logs for a project"""
+    """
+    Get preview server logs for a project
+    
+    Pass ``since`` and ``epoch`` (the ``last_seq`` and ``epoch`` from a
+    previous response) to receive only lines produced after that cursor, at
+    most ``lines`` at a time, oldest first.
+    """
     
     project = db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    logs = get_preview_logs(project_id, lines=lines)
     status = preview_status(project_id)
+    if status == "running":
+        preview_supervisor.touch(project_id)
+    
+    if since is not None:
+        tail = tail_preview_logs(project_id, since=since, limit=lines, epoch=epoch)
+        return PreviewLogsResponse(
+            logs="\n".join(entry["line"] for entry in tail["entries"]),
+            running=(status == "running"),
+            entries=[PreviewLogEntry(**entry) for entry in tail["entries"]],
+            last_seq=tail["last_seq"],
+            epoch=tail["epoch"]
+        )
+    
+    logs = get_preview_logs(project_id, lines=lines)
+    log_buffer = get_log_buffer(project_id)
     
     return PreviewLogsResponse(
         logs=logs,
-        running=status.get("running", False)
+        running=(status == "running"),
+        last_seq=log_buffer.last_seq if log_buffer else 0,
+        epoch=log_buffer.epoch if log_buffer else None
+    )
+
+
+@router.get("/{project_id}/preview/logs/stream")
+async def stream_preview_logs(
+    project_id: str,
+    since: int = 0,
+    epoch: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream preview server logs as Server-Sent Events
+    
+    Each event's ``id`` is ``epoch:seq`` (the buffer of this preview run and
+    the line's sequence number), so a reconnecting EventSource resumes from
+    ``Last-Event-ID`` automatically, and starts over after a restart. The
+    stream ends with an ``end`` event once the preview stops or exits.
+    """
+    
+    project = db.get(ProjectModel, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    resume = parse_cursor(last_event_id) if last_event_id else None
+    if resume:
+        epoch, since = resume
+    
+    async def event_stream():
+        cursor_epoch, cursor = epoch, since
+        idle_ticks = 0
+        while True:
+            log_buffer = get_log_buffer(project_id)
+            if log_buffer is None:
+                yield "event: end\ndata: preview stopped\n\n"
+                return
+            
+            if cursor_epoch != log_buffer.epoch:
+                # First read, or the preview restarted with a fresh buffer
+                cursor = resume_from(log_buffer, cursor_epoch, cursor)
+                cursor_epoch = log_buffer.epoch
+            
+            entries = log_buffer.tail(cursor)
+            if entries:
+                idle_ticks = 0
+                for seq, line in entries:
+                    yield format_sse(seq, line, epoch=cursor_epoch)
+                cursor = entries[-1][0]
+                continue
+            
+            if log_buffer.closed:
+                yield "event: end\ndata: preview stopped\n\n"
+                return
+            
+            # Keep proxies from closing an idle connection
+            idle_ticks += 1
+            if idle_ticks % 30 == 0:
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(0.5)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
@@ -195,7 +319,7 @@ async def restart_preview(
     # Update project status
     project.status = "preview_running"
     project.preview_url = result.get("url")
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return PreviewStatusResponse(
         running=True,
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.websocket_manager import connection_manager
 from app.models.olympics import User
+from app.services.images import thumbnail_url
 # from app.api.students import get_current_leaderboard
 
 router = APIRouter()
@@ -194,7 +195,8 @@ async def get_leaderboard_data(db: Session):
                         "id": str(user.id),
                         "username": user.username,
                         "user_program": user.user_program,
-                        "profile_picture_url": user.profile_picture_url
+                        # Avatar-sized thumbnail; the full image is on the profile
+                        "profile_picture_url": thumbnail_url(user.profile_picture_url)
                     },
                     "stats": {
                         "total_xp": stats.total_xp,
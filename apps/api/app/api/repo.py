@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Header
 from pydantic import BaseModel
 from typing import List, Optional
+import mimetypes
 import os
 from pathlib import Path
 from app.core.config import settings
 from app.api.deps import get_db
 from sqlalchemy.orm import Session
 from app.models.projects import Project as ProjectModel
+from app.services.repo_index import get_repo_index_async
+from app.services.file_streaming import is_binary_file, ranged_file_response
+
+# Largest file returned inline by /file; bigger files are truncated (use /raw)
+MAX_INLINE_FILE_BYTES = 1024 * 1024
 
 router = APIRouter(prefix="/api/repo", tags=["repo"])
 
@@ -17,6 +23,14 @@ class RepoEntry(BaseModel):
     size: Optional[int] = None
 
 
+class RepoFileStat(BaseModel):
+    path: str
+    type: str
+    size: Optional[int] = None
+    mtime: float
+    binary: Optional[bool] = None
+
+
 def _safe_join(repo_root: str, rel_path: str) -> str:
     full = os.path.normpath(os.path.join(repo_root, rel_path))
     if not full.startswith(os.path.normpath(repo_root) + os.sep) and os.path.normpath(full) != os.path.normpath(repo_root):
@@ -24,26 +38,41 @@ def _safe_join(repo_root: str, rel_path: str) -> str:
     return full
 
 
-@router.get("/{project_id}/tree", response_model=List[RepoEntry])
-async def repo_tree(project_id: str, dir: str = Query("."), db: Session = Depends(get_db)) -> List[RepoEntry]:
+def _repo_root_for(project_id: str, db: Session) -> str:
     row = db.get(ProjectModel, project_id)
     if not row:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Check if project is still initializing
     if row.status == "initializing":
         raise HTTPException(status_code=400, detail="Project is still initializing")
-    
     repo_root = os.path.join(settings.projects_root, project_id, "repo")
-    
-    # Check if repo directory exists
     if not os.path.exists(repo_root):
         if row.status == "failed":
             raise HTTPException(status_code=400, detail="Project initialization failed")
+        raise HTTPException(status_code=400, detail="Project repository not found")
+    return repo_root
+
+
+@router.get("/{project_id}/tree", response_model=List[RepoEntry])
+async def repo_tree(
+    project_id: str,
+    dir: str = Query("."),
+    recursive: bool = False,
+    depth: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db)
+) -> List[RepoEntry]:
+    repo_root = _repo_root_for(project_id, db)
+    target = _safe_join(repo_root, dir)
+    rel_dir = os.path.relpath(target, repo_root).replace(os.sep, "/")
+    
+    # Served from the in-memory index; ignored dirs (node_modules, .next) are listed on demand
+    index = await get_repo_index_async(project_id, repo_root)
+    if index.is_indexed(rel_dir):
+        if recursive:
+            indexed = index.walk(rel_dir, max_depth=depth)
         else:
-            raise HTTPException(status_code=400, detail="Project repository not found")
+            indexed = index.list_dir(rel_dir) or []
+        return [RepoEntry(path=e["path"], type=e["type"], size=e["size"]) for e in indexed]
     
-    target = _safe_join(repo_root, dir)
     if not os.path.isdir(target):
         raise HTTPException(status_code=400, detail="Not a directory")
     
@@ -59,12 +88,68 @@ async def repo_tree(project_id: str, dir: str = Query("."), db: Session = Depend
 
 @router.get("/{project_id}/file")
 async def repo_file(project_id: str, path: str, db: Session = Depends(get_db)):
-    row = db.get(ProjectModel, project_id)
-    if not row:
-        raise HTTPException(status_code=404, detail="Project not found")
-    repo_root = os.path.join(settings.projects_root, project_id, "repo")
+    repo_root = _repo_root_for(project_id, db)
     target = _safe_join(repo_root, path)
     if not os.path.isfile(target):
         raise HTTPException(status_code=404, detail="File not found")
+    size = os.path.getsize(target)
+    if is_binary_file(target):
+        return {"path": path, "content": "", "binary": True, "size": size, "truncated": False}
     with open(target, "r", encoding="utf-8", errors="ignore") as f:
-        return {"path": path, "content": f.read()}
+        content = f.read(MAX_INLINE_FILE_BYTES)
+    return {
+        "path": path,
+        "content": content,
+        "binary": False,
+        "size": size,
+        "truncated": size > MAX_INLINE_FILE_BYTES
+    }
+
+
+@router.get("/{project_id}/raw")
+async def repo_file_raw(
+    project_id: str,
+    path: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    db: Session = Depends(get_db)
+):
+    """Stream a file's bytes, honouring Range requests"""
+    repo_root = _repo_root_for(project_id, db)
+    target = _safe_join(repo_root, path)
+    if not os.path.isfile(target):
+        raise HTTPException(status_code=404, detail="File not found")
+    media_type = mimetypes.guess_type(target)[0] or "application/octet-stream"
+    return ranged_file_response(target, range_header, media_type=media_type)
+
+
+@router.get("/{project_id}/search", response_model=List[RepoEntry])
+async def repo_search(
+    project_id: str,
+    q: str,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+) -> List[RepoEntry]:
+    """Fuzzy path search over the indexed tree"""
+    repo_root = _repo_root_for(project_id, db)
+    index = await get_repo_index_async(project_id, repo_root)
+    return [RepoEntry(path=e["path"], type=e["type"], size=e["size"]) for e in index.search(q, limit=limit)]
+
+
+@router.get("/{project_id}/stat", response_model=RepoFileStat)
+async def repo_stat(project_id: str, path: str, db: Session = Depends(get_db)) -> RepoFileStat:
+    """Live file metadata (a single stat, so it is never behind the index)"""
+    repo_root = _repo_root_for(project_id, db)
+    target = _safe_join(repo_root, path)
+    rel = os.path.relpath(target, repo_root).replace(os.sep, "/")
+    try:
+        st = os.stat(target)
+    except OSError:
+        raise HTTPException(status_code=404, detail="File not found")
+    is_dir = os.path.isdir(target)
+    return RepoFileStat(
+        path=rel,
+        type="dir" if is_dir else "file",
+        size=None if is_dir else st.st_size,
+        mtime=st.st_mtime,
+        binary=None if is_dir else is_binary_file(target)
+    )
@@ -1,10 +1,9 @@
 import os
-import uuid
 import mimetypes
 from typing import List, Optional
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, Request
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, UploadFile, Request
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db, get_current_user
 from app.models.olympics import User, Lecture, LectureResource, FileAccessLog, Unit
 from app.schemas.olympics import (
@@ -12,12 +11,15 @@ from app.schemas.olympics import (
     LectureResourceCreate, LectureResource as LectureResourceSchema,
     FileUploadResponse, FileAccessLogCreate
 )
+from app.services.access_log import access_log_writer
+from app.services.file_streaming import content_disposition, file_etag, ranged_file_response
+from app.services.uploads import UploadTooLarge, content_digest, remove_unreferenced_blob, store_stream, unpin_upload
 
 router = APIRouter()
 
-# File upload configuration
-UPLOAD_DIR = "uploads/resources"
-MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+# File upload configuration; files are stored content-addressed (see app.services.uploads)
+UPLOAD_DIR = settings.resource_upload_dir
+MAX_FILE_SIZE = settings.upload_max_bytes
 ALLOWED_EXTENSIONS = {
     '.pdf', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx',
     '.txt', '.md', '.html', '.zip', '.rar', '.7z',
@@ -60,6 +62,10 @@ ALLOWED_MIME_TYPES = {
     '.wav': ['audio/wav'],
 }
 
+# Content-addressed files never change under their name; others are revalidated by ETag
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -105,6 +111,17 @@ def validate_mime_type(file_ext: str, detected_type: str) -> bool:
     allowed_types = ALLOWED_MIME_TYPES[file_ext]
     return detected_type in allowed_types or detected_type.startswith('application/octet-stream')
 
+def remove_unreferenced_files(db: Session, file_paths) -> None:
+    """Delete stored files that no resource points at any more (identical uploads share one file)"""
+    def is_referenced(file_path: str) -> bool:
+        return db.query(LectureResource.id).filter(LectureResource.file_path == file_path).first() is not None
+
+    for file_path in set(file_paths):
+        try:
+            remove_unreferenced_blob(file_path, is_referenced)
+        except Exception as e:
+            print(f"Error deleting file {file_path}: {e}")
+
 @router.get("/lectures", response_model=List[LectureWithResources])
 def get_all_lectures(
     db: Session = Depends(get_db),
@@ -204,16 +221,12 @@ def delete_lecture(
     if not lecture:
         raise HTTPException(status_code=404, detail="Lecture not found")
     
-    # Delete associated files from filesystem
-    for resource in lecture.resources:
-        try:
-            if os.path.exists(resource.file_path):
-                os.remove(resource.file_path)
-        except Exception as e:
-            print(f"Error deleting file {resource.file_path}: {e}")
-    
+    file_paths = [resource.file_path for resource in lecture.resources]
     db.delete(lecture)
     db.commit()
+    
+    # Delete associated files from filesystem
+    remove_unreferenced_files(db, file_paths)
     return {"success": True, "message": "Lecture deleted successfully"}
 
 @router.post("/lectures/{lecture_id}/upload", response_model=FileUploadResponse)
@@ -236,38 +249,26 @@ def upload_file_to_lecture(
     if not is_valid:
         raise HTTPException(status_code=400, detail=error_msg)
     
+    # Get file type and validate it
+    file_ext = os.path.splitext(file.filename)[1]
+    file_type = mimetypes.guess_type(file.filename)[0] or "application/octet-stream"
+    if not validate_mime_type(file_ext.lower(), file_type):
+        raise HTTPException(status_code=400, detail=f"MIME type {file_type} doesn't match file extension {file_ext}")
+    
+    stored = None
     try:
-        # Read file content
-        file_content = file.file.read()
-        
-        # Check file size
-        if len(file_content) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail=f"File size exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit")
-        
-        # Generate unique filename
-        file_ext = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
-        
-        # Save file to disk
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-        
-        # Get file type and validate it
-        file_type = mimetypes.guess_type(file.filename)[0] or "application/octet-stream"
-        
-        # Additional MIME type validation
-        if not validate_mime_type(file_ext, file_type):
-            raise HTTPException(status_code=400, detail=f"MIME type {file_type} doesn't match file extension {file_ext}")
+        # Stream to disk in chunks, hashing as we go; identical content is stored once
+        # Pinned until the resource row is committed, so a concurrent delete keeps the file
+        stored = store_stream(file.file, UPLOAD_DIR, MAX_FILE_SIZE, file_ext, pin=True)
         
         # Create database record
         resource = LectureResource(
             lecture_id=lecture_id,
-            filename=unique_filename,
+            filename=os.path.basename(stored.path),
             original_filename=file.filename,
             file_type=file_type,
-            file_size=len(file_content),
-            file_path=file_path,
+            file_size=stored.size,
+            file_path=stored.path,
             description=description,
             is_public=is_public,
             uploaded_by=current_user.id
@@ -283,13 +284,21 @@ def upload_file_to_lecture(
             message="File uploaded successfully"
         )
         
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
     except Exception as e:
         # Clean up file if database operation fails
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
+        db.rollback()
+        if stored is not None:
+            # Also when deduplicated: a delete may have skipped the file while it was pinned
+            unpin_upload(stored)
+            remove_unreferenced_files(db, [stored.path])
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
     
     finally:
+        if stored is not None:
+            unpin_upload(stored)
         file.file.close()
 
 @router.get("/resources/{resource_id}/download")
@@ -297,9 +306,12 @@ def download_file(
     resource_id: str,
     request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    if_range: Optional[str] = Header(None, alias="If-Range"),
 ):
-    """Download a file resource"""
+    """Download a file resource (supports Range resume and ETag revalidation)"""
     resource = db.query(LectureResource).filter(LectureResource.id == resource_id).first()
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
@@ -312,26 +324,34 @@ def download_file(
     if not os.path.exists(resource.file_path):
         raise HTTPException(status_code=404, detail="File not found on server")
     
-    # Log file access
-    try:
-        access_log = FileAccessLog(
+    # Content-addressed files carry their SHA-256 in the name: a strong, free ETag
+    digest = content_digest(resource.file_path)
+    response = ranged_file_response(
+        resource.file_path,
+        range_header,
+        media_type=resource.file_type or "application/octet-stream",
+        headers={
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if digest else REVALIDATE_CACHE_CONTROL,
+            "Content-Disposition": content_disposition(resource.original_filename or resource.filename),
+        },
+        etag=f'"{digest}"' if digest else file_etag(resource.file_path),
+        if_none_match=if_none_match,
+        if_range=if_range,
+    )
+    
+    # Log file access (queued, written in batches); revalidations and resumed
+    # ranges are not counted as new downloads
+    if response.status_code == 200 or response.headers.get("content-range", "").startswith("bytes 0-"):
+        access_log_writer.record(
+            db.get_bind(),
             resource_id=resource_id,
             user_id=current_user.id,
             access_type="download",
-            ip_address=request.client.host,
+            ip_address=request.client.host if request.client else None,
             user_agent=request.headers.get("user-agent")
         )
-        db.add(access_log)
-        db.commit()
-    except Exception as e:
-        print(f"Error logging file access: {e}")
     
-    # Return file
-    return FileResponse(
-        path=resource.file_path,
-        filename=resource.original_filename,
-        media_type=resource.file_type
-    )
+    return response
 
 @router.delete("/resources/{resource_id}")
 def delete_resource(
@@ -344,16 +364,13 @@ def delete_resource(
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
     
-    # Delete file from filesystem
-    try:
-        if os.path.exists(resource.file_path):
-            os.remove(resource.file_path)
-    except Exception as e:
-        print(f"Error deleting file {resource.file_path}: {e}")
-    
     # Delete database record
+    file_path = resource.file_path
     db.delete(resource)
     db.commit()
+    
+    # Delete file from filesystem unless another resource shares its content
+    remove_unreferenced_files(db, [file_path])
     return {"success": True, "message": "Resource deleted successfully"}
 
 @router.get("/resources/{resource_id}/access-logs")
@@ -369,6 +386,7 @@ def get_resource_access_logs(
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
     
+    access_log_writer.flush()
     logs = db.query(FileAccessLog)\
         .filter(FileAccessLog.resource_id == resource_id)\
         .order_by(FileAccessLog.accessed_at.desc())\
@@ -387,6 +405,7 @@ def get_download_stats(
     # Most downloaded resources
     from sqlalchemy import func
     
+    access_log_writer.flush()
     most_downloaded = db.query(
         LectureResource.id,
         LectureResource.original_filename,
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
@@ -34,7 +35,7 @@ async def get_my_complete_profile(
     if not stats:
         stats = PlayerStats(user_id=current_user.id)
         db.add(stats)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         db.refresh(stats)
     
     # Get player skills
@@ -42,7 +43,7 @@ async def get_my_complete_profile(
     if not skills:
         skills = PlayerSkills(user_id=current_user.id)
         db.add(skills)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         db.refresh(skills)
     
     # Get player inventory
@@ -50,7 +51,7 @@ async def get_my_complete_profile(
     if not inventory:
         inventory = PlayerInventory(user_id=current_user.id)
         db.add(inventory)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         db.refresh(inventory)
     
     # Get recent XP entries (last 10)
@@ -82,7 +83,7 @@ async def get_my_stats(
     if not stats:
         stats = PlayerStats(user_id=current_user.id)
         db.add(stats)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         db.refresh(stats)
     
     return PlayerStatsSchema.from_orm(stats)
@@ -99,7 +100,7 @@ async def get_my_skills(
     if not skills:
         skills = PlayerSkills(user_id=current_user.id)
         db.add(skills)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         db.refresh(skills)
     
     return PlayerSkillsSchema.from_orm(skills)
@@ -116,7 +117,7 @@ async def get_my_inventory(
     if not inventory:
         inventory = PlayerInventory(user_id=current_user.id)
         db.add(inventory)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         db.refresh(inventory)
     
     return PlayerInventorySchema.from_orm(inventory)
@@ -244,7 +245,7 @@ async def roll_dice(
     else:
         message += f"Failed to complete {station.name}. Try again with better skills!"
     
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return APIResponse(
         success=True,
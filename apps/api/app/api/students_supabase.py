@@ -3,14 +3,23 @@ Olympics PWA Student API - Supabase Compatible
 Provides student dashboard functionality using Supabase
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends
+import logging
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from typing import Dict, Any, List
 from datetime import datetime
 import uuid
 
 from app.core.supabase_client import get_supabase_client, get_supabase_auth_client
 from app.api.auth_supabase import get_current_user
-from pydantic import BaseModel
+from app.core.config import settings
+from app.services.gameboard import (
+    GameboardConflict, MovesResult, PlayerStatsNotFound, play_moves, station_table,
+)
+from app.services.images import image_urls, thumbnail_url
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/students", tags=["Students - Supabase"])
 
@@ -20,11 +29,8 @@ class ChangePasswordRequest(BaseModel):
     new_password: str
     confirm_password: str
 
-class UpdateStatsRequest(BaseModel):
-    gameboardPosition: int = None
-    gameboardMoves: int = None
-    gameboardXP: int = None
-    gold: int = None
+class RollManyRequest(BaseModel):
+    count: int = Field(..., ge=1)
 
 # Student authorization dependency
 async def require_student(current_user = Depends(get_current_user)):
@@ -46,14 +52,14 @@ async def get_my_profile(current_student = Depends(require_student)):
         # Get student's player stats
         stats_response = service_client.table('player_stats').select('*').eq('user_id', current_student['id']).execute()
         
-        print(f"🔍 Stats query for user {current_student['id']}: found {len(stats_response.data) if stats_response.data else 0} records")
+        logger.debug("🔍 Stats query for user %s: found %s records", current_student['id'], len(stats_response.data) if stats_response.data else 0)
         
         # Get student's XP entries
         xp_response = service_client.table('xp_entries').select('*').eq('user_id', current_student['id']).order('created_at', desc=True).limit(10).execute()
         
         # If no stats exist, create initial stats
         if not stats_response.data:
-            print(f"📝 Creating new player stats for user {current_student['id']} ({current_student['username']})")
+            logger.debug("📝 Creating new player stats for user %s (%s)", current_student['id'], current_student['username'])
             initial_stats = {
                 "id": str(uuid.uuid4()),
                 "user_id": current_student['id'],
@@ -72,10 +78,10 @@ async def get_my_profile(current_student = Depends(require_student)):
             
             create_result = service_client.table('player_stats').insert(initial_stats).execute()
             stats = create_result.data[0] if create_result.data else initial_stats
-            print(f"✅ Created player stats: moves={stats.get('gameboard_moves')}, gold={stats.get('gold')}")
+            logger.info("✅ Created player stats: moves=%s, gold=%s", stats.get('gameboard_moves'), stats.get('gold'))
         else:
             stats = stats_response.data[0]
-            print(f"🎯 Loaded existing stats for {current_student['username']}: moves={stats.get('gameboard_moves')}, gold={stats.get('gold')}, position={stats.get('gameboard_position')}")
+            logger.debug("🎯 Loaded existing stats for %s: moves=%s, gold=%s, position=%s", current_student['username'], stats.get('gameboard_moves'), stats.get('gold'), stats.get('gameboard_position'))
             
         # Transform snake_case to camelCase for frontend compatibility
         stats_camelcase = {
@@ -126,12 +132,14 @@ async def get_my_profile(current_student = Depends(require_student)):
                 "stats": stats_camelcase,
                 "skills": skills,
                 "inventory": inventory,
-                "recent_xp": xp_response.data
+                "recent_xp": xp_response.data,
+                # Original and thumbnail URLs of the profile picture
+                "avatar": image_urls(current_student.get('profile_picture_url'))
             }
         }
         
     except Exception as e:
-        print(f"❌ Get profile error: {e}")
+        logger.error("❌ Get profile error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -184,7 +192,7 @@ async def get_my_stats(current_student = Depends(require_student)):
             }
             
     except Exception as e:
-        print(f"❌ Get stats error: {e}")
+        logger.error("❌ Get stats error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -211,7 +219,7 @@ async def get_my_skills(current_student = Depends(require_student)):
         }
             
     except Exception as e:
-        print(f"❌ Get skills error: {e}")
+        logger.error("❌ Get skills error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -232,7 +240,7 @@ async def get_my_xp_history(current_student = Depends(require_student)):
         }
             
     except Exception as e:
-        print(f"❌ Get XP history error: {e}")
+        logger.error("❌ Get XP history error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -243,42 +251,68 @@ async def get_gameboard_stations(current_student = Depends(require_student)):
     """Get gameboard stations for student"""
     
     try:
-        # Return mock gameboard stations for now
-        # In a full implementation, these would be stored in Supabase
-        stations = [
-            {
-                "id": 1,
-                "name": "Training Camp",
-                "description": "Build your fundamental skills",
-                "skill_required": "strength",
-                "min_level": 1,
-                "xp_reward": 10
-            },
-            {
-                "id": 2,
-                "name": "Endurance Challenge",
-                "description": "Test your stamina",
-                "skill_required": "endurance", 
-                "min_level": 1,
-                "xp_reward": 15
-            },
-            {
-                "id": 3,
-                "name": "Strategy Room",
-                "description": "Plan your Olympic approach",
-                "skill_required": "tactics",
-                "min_level": 1,
-                "xp_reward": 20
-            }
-        ]
+        table = await run_in_threadpool(station_table)
+        
+        return {
+            "success": True,
+            "data": [station.to_dict() for station in table.stations]
+        }
+            
+    except Exception as e:
+        logger.error("❌ Get gameboard stations error: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/leaderboard/units/{unit_id}")
+async def get_unit_leaderboard(
+    unit_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    current_student = Depends(require_student)
+):
+    """Top students in one unit (quest) by the XP earned in it"""
+    
+    try:
+        uuid.UUID(unit_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Unit not found")
+    
+    try:
+        service_client = get_supabase_auth_client()
+        
+        # One range scan of idx_player_unit_xp_unit_xp (unit_id, xp DESC, user_id)
+        result = service_client.table('player_unit_xp')\
+            .select('user_id,xp,users(username,user_program,profile_picture_url)')\
+            .eq('unit_id', unit_id)\
+            .order('xp', desc=True)\
+            .order('user_id')\
+            .limit(limit)\
+            .execute()
+        
+        leaderboard = []
+        for rank, row in enumerate(result.data or [], 1):
+            user = row.get('users') or {}
+            leaderboard.append({
+                "rank": rank,
+                "id": row['user_id'],
+                "username": user.get('username'),
+                "user_program": user.get('user_program'),
+                # Avatar-sized thumbnail; the full image is on the profile
+                "profile_picture_url": thumbnail_url(user.get('profile_picture_url')),
+                "unit_xp": row['xp']
+            })
         
         return {
             "success": True,
-            "data": stations
+            "data": {
+                "unit_id": unit_id,
+                "leaderboard": leaderboard
+            }
         }
             
     except Exception as e:
-        print(f"❌ Get gameboard stations error: {e}")
+        logger.error("❌ Get unit leaderboard error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -330,7 +364,7 @@ async def change_password(
             "updated_at": datetime.utcnow().isoformat()
         }).eq('id', current_student['id']).execute()
         
-        print(f"✅ Password changed for student: {current_student['email']}")
+        logger.info("✅ Password changed for student: %s", current_student['email'])
         
         return {
             "success": True,
@@ -340,7 +374,7 @@ async def change_password(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Change password error: {e}")
+        logger.error("❌ Change password error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -358,206 +392,118 @@ async def get_my_health(current_student = Depends(require_student)):
         "email": current_student['email']
     }
 
+def _updated_stats(result: MovesResult) -> Dict[str, Any]:
+    stats = result.stats
+    return {
+        "moves_remaining": stats["gameboard_moves"],
+        "gameboard_position": stats["gameboard_position"],
+        "total_xp": stats["total_xp"],
+        "current_level": stats["current_level"],
+        "gold": stats["gold"],
+        "gameboard_xp": stats["gameboard_xp"]
+    }
+
+async def _play(current_student, count: int) -> MovesResult:
+    try:
+        return await run_in_threadpool(play_moves, current_student['id'], count)
+    except PlayerStatsNotFound:
+        raise HTTPException(status_code=404, detail="Player stats not found")
+    except GameboardConflict:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Player stats changed during the roll, please retry"
+        )
+
 @router.post("/gameboard/roll-dice")
 async def roll_dice(
     dice_data: dict,
     current_student = Depends(require_student)
 ):
-    """Roll dice for gameboard gameplay"""
+    """Roll dice for gameboard gameplay (one move at the student's current station)"""
     try:
-        from app.core.supabase_client import get_supabase_auth_client
-        import random
-        from datetime import datetime
+        # The roll, success chance and skill level are decided server-side;
+        # station_id, roll_result, success_chance and skill_level in the body are ignored
+        result = await _play(current_student, 1)
         
-        service_client = get_supabase_auth_client()
-        
-        # Extract dice roll parameters
-        station_id = dice_data.get('station_id')
-        skill_level = dice_data.get('skill_level', 1)
-        success_chance = dice_data.get('success_chance', 50)
-        
-        # Generate dice roll result
-        roll_result = dice_data.get('roll_result', random.randint(1, 100))
-        was_successful = roll_result <= success_chance
-        
-        # Get current player stats
-        stats_result = service_client.table('player_stats').select('*').eq('user_id', current_student['id']).execute()
-        
-        if not stats_result.data:
-            raise HTTPException(status_code=404, detail="Player stats not found")
-        
-        current_stats = stats_result.data[0]
-        current_moves = current_stats.get('gameboard_moves', 0)
-        
-        # Check if student has moves available
-        if current_moves <= 0:
+        if not result.outcomes:
             return {
                 "success": False,
                 "error": "No moves available",
                 "data": {
-                    "roll_result": roll_result,
+                    "roll_result": None,
                     "was_successful": False,
                     "moves_remaining": 0
                 }
             }
         
-        # Calculate rewards based on success
-        xp_gained = 0
-        gold_gained = 0
-        
-        if was_successful:
-            # Base rewards for successful roll
-            xp_gained = skill_level * 10 + random.randint(5, 15)
-            gold_gained = random.randint(1, 5)
-            
-            # Bonus for higher skill levels
-            if skill_level >= 3:
-                xp_gained += 10
-                gold_gained += 2
-        else:
-            # Small consolation rewards
-            xp_gained = random.randint(1, 5)
-            gold_gained = 0
-        
-        # Update player stats
-        new_moves = current_moves - 1
-        new_total_xp = current_stats.get('total_xp', 0) + xp_gained
-        new_current_xp = current_stats.get('current_xp', 0) + xp_gained
-        new_level = max(1, new_total_xp // 200 + 1)
-        new_gold = current_stats.get('gold', 0) + gold_gained
-        new_gameboard_xp = current_stats.get('gameboard_xp', 0) + xp_gained
-        
-        # Update database
-        update_data = {
-            "gameboard_moves": new_moves,
-            "total_xp": new_total_xp,
-            "current_xp": new_current_xp,
-            "current_level": new_level,
-            "gold": new_gold,
-            "gameboard_xp": new_gameboard_xp,
-            "updated_at": datetime.utcnow().isoformat()
-        }
-        
-        service_client.table('player_stats').update(update_data).eq('user_id', current_student['id']).execute()
-        
-        # Create XP entry for tracking
-        if xp_gained > 0:
-            xp_entry = {
-                "id": str(uuid.uuid4()),
-                "user_id": current_student['id'],
-                "assignment_id": None,
-                "assignment_name": f"Gameboard Station {station_id}",
-                "unit_id": None,
-                "xp_amount": xp_gained,
-                "awarded_by": current_student['id'],  # Self-awarded through gameplay
-                "description": f"Dice roll reward - {'Success' if was_successful else 'Attempt'}",
-                "created_at": datetime.utcnow().isoformat()
-            }
-            
-            try:
-                service_client.table('xp_entries').insert(xp_entry).execute()
-            except Exception as e:
-                print(f"Warning: Could not log XP entry: {e}")
-        
+        outcome = result.outcomes[0]
         return {
             "success": True,
             "data": {
-                "roll_result": roll_result,
-                "was_successful": was_successful,
-                "success_chance": success_chance,
-                "skill_level": skill_level,
-                "station_id": station_id,
+                "roll_result": outcome.roll_result,
+                "was_successful": outcome.was_successful,
+                "success_chance": outcome.success_chance,
+                "skill_level": outcome.skill_level,
+                "station_id": outcome.station_id,
                 "rewards": {
-                    "xp_gained": xp_gained,
-                    "gold_gained": gold_gained
+                    "xp_gained": outcome.xp_gained,
+                    "gold_gained": outcome.gold_gained
                 },
-                "updated_stats": {
-                    "moves_remaining": new_moves,
-                    "total_xp": new_total_xp,
-                    "current_level": new_level,
-                    "gold": new_gold,
-                    "gameboard_xp": new_gameboard_xp
-                }
+                "updated_stats": _updated_stats(result)
             }
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Roll dice error: {e}")
+        logger.error("❌ Roll dice error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=str(e)
         )
 
-@router.post("/me/update-stats")
-async def update_my_stats(
-    stats_data: UpdateStatsRequest,
+@router.post("/gameboard/roll-many")
+async def roll_many(
+    roll_data: RollManyRequest,
     current_student = Depends(require_student)
 ):
-    """Update current student's game stats (position, moves, XP, gold)"""
-    
+    """Play up to ``count`` banked moves in one request and return every move's outcome"""
     try:
-        service_client = get_supabase_auth_client()
-        
-        # Build update data from non-None values
-        update_data = {}
-        if stats_data.gameboardPosition is not None:
-            update_data['gameboard_position'] = stats_data.gameboardPosition
-        if stats_data.gameboardMoves is not None:
-            update_data['gameboard_moves'] = stats_data.gameboardMoves
-        if stats_data.gameboardXP is not None:
-            update_data['gameboard_xp'] = stats_data.gameboardXP
-        if stats_data.gold is not None:
-            update_data['gold'] = stats_data.gold
-        
-        if not update_data:
+        if roll_data.count > settings.gameboard_max_moves_per_request:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No valid stats provided to update"
+                detail=f"At most {settings.gameboard_max_moves_per_request} moves per request"
             )
         
-        # Update the player stats record
-        update_data['updated_at'] = datetime.utcnow().isoformat()
-        
-        update_response = service_client.table('player_stats').update(update_data).eq('user_id', current_student['id']).execute()
-        
-        if not update_response.data:
-            # If no existing record, create one
-            create_data = {
-                'user_id': current_student['id'],
-                'current_xp': 0,
-                'total_xp': 0,
-                'current_level': 1,
-                'current_rank': 100,
-                'gameboard_xp': 0,
-                'gameboard_position': 0,
-                'gameboard_moves': 3,
-                'gold': 3,
-                **update_data,
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat()
-            }
-            
-            create_response = service_client.table('player_stats').insert(create_data).execute()
-            
-            print(f"✅ Created new stats record for user {current_student['id']}")
+        result = await _play(current_student, roll_data.count)
+        
+        if not result.outcomes:
             return {
-                "success": True,
-                "message": "Player stats created and updated successfully",
-                "data": create_response.data[0] if create_response.data else None
+                "success": False,
+                "error": "No moves available",
+                "data": {
+                    "moves": [],
+                    "moves_remaining": 0
+                }
             }
-        else:
-            print(f"✅ Updated stats for user {current_student['id']}: {update_data}")
-            return {
-                "success": True,
-                "message": "Player stats updated successfully",
-                "data": update_response.data[0] if update_response.data else None
+        
+        return {
+            "success": True,
+            "data": {
+                "moves": result.moves(),
+                "rewards": {
+                    "xp_gained": result.xp_gained,
+                    "gold_gained": result.gold_gained
+                },
+                "updated_stats": _updated_stats(result)
             }
-            
+        }
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Update stats error: {e}")
+        logger.error("❌ Roll many error: %s", e)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=500,
             detail=str(e)
-        )
\ No newline at end of file
+        )
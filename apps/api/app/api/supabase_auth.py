@@ -4,6 +4,7 @@ Complete replacement for custom auth using Supabase's built-in authentication
 Bypasses all PostgreSQL connection issues by using REST API
 """
 
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from slowapi import Limiter
@@ -15,49 +16,38 @@ import asyncio
 from datetime import datetime
 
 from app.core.supabase_auth_service import supabase_auth
+from app.services.images import InvalidImage, save_image_upload
+from app.services.uploads import UploadTooLarge
 from app.schemas.olympics import AuthResponse, APIResponse, User as UserSchema
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/supabase-auth", tags=["Supabase Authentication"])
 limiter = Limiter(key_func=get_remote_address)
 security = HTTPBearer()
 
 # Configuration
 ADMIN_CODE = os.getenv("ADMIN_CODE", "OLYMPICS2024ADMIN")
+PROFILE_PICTURE_MAX_BYTES = 5 * 1024 * 1024  # 5MB
 
 async def save_profile_picture_supabase(file: UploadFile) -> Optional[str]:
-    """Save uploaded profile picture using Supabase Storage"""
+    """Store an uploaded profile picture with its thumbnails and return the original's URL"""
     if not file:
         return None
     
-    # Validate file type
-    allowed_types = {"image/jpeg", "image/png", "image/webp", "image/gif"}
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file type. Only JPEG, PNG, WebP, and GIF are allowed."
-        )
-    
-    # Validate file size (5MB max)
-    content = await file.read()
-    if len(content) > 5 * 1024 * 1024:  # 5MB
+    try:
+        stored = await save_image_upload(file, PROFILE_PICTURE_MAX_BYTES)
+    except UploadTooLarge:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File size too large. Maximum 5MB allowed."
         )
-    
-    try:
-        # Generate unique filename
-        file_extension = file.filename.split(".")[-1] if file.filename else "jpg"
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        
-        # Upload to Supabase Storage (if configured)
-        # For now, return a placeholder URL
-        # TODO: Implement actual Supabase Storage upload
-        return f"/storage/profile_pictures/{unique_filename}"
-        
+    except InvalidImage as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        print(f"❌ Profile picture upload failed: {e}")
+        logger.error("❌ Profile picture upload failed: %s", e)
         return None
+    return stored.url
 
 @router.post("/register", response_model=AuthResponse)
 @limiter.limit("5/minute")
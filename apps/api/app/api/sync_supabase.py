@@ -0,0 +1,120 @@
+"""
+Olympics PWA Offline Sync API
+Applies the actions the PWA queued while offline, in order, in one request
+"""
+
+import json
+import logging
+from fastapi import APIRouter, HTTPException, status, Depends, Request
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field
+import httpx
+
+from app.core.config import settings
+from app.api.auth_supabase import get_current_user
+from app.services.idempotency import IDEMPOTENT_PATHS, MAX_KEY_LENGTH
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/sync", tags=["Sync - Supabase"])
+
+# Request Models
+class SyncAction(BaseModel):
+    # Generated by the client when the action is queued; sent as its Idempotency-Key
+    id: str = Field(..., min_length=1, max_length=MAX_KEY_LENGTH)
+    path: str  # e.g. "/students/gameboard/roll-dice" (with or without the /api prefix)
+    body: Dict[str, Any] = {}
+
+class SyncRequest(BaseModel):
+    actions: List[SyncAction]
+    stop_on_error: bool = False  # Skip the remaining actions after the first failure
+
+def _action_path(api_prefix: str, path: str) -> Optional[str]:
+    """Full path of a syncable action, None for any other endpoint"""
+    if not path.startswith(api_prefix + "/"):
+        path = api_prefix + "/" + path.lstrip("/")
+    if any(path == api_prefix + allowed for allowed in IDEMPOTENT_PATHS):
+        return path
+    return None
+
+@router.post("")
+async def sync_actions(
+    request: Request,
+    sync_data: SyncRequest,
+    current_user = Depends(get_current_user)
+):
+    """
+    Replay queued offline actions in order and return a result per action.
+
+    Each action is dispatched in-process to its endpoint with the caller's
+    credentials and its ``id`` as the Idempotency-Key, so it goes through
+    the same validation, authorization and rate limits as a direct call,
+    and re-sending a batch (or part of one) after a lost response does not
+    apply anything twice.
+    """
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+    if len(sync_data.actions) > settings.sync_max_actions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.sync_max_actions} actions per sync"
+        )
+
+    api_prefix = request.url.path[:-len("/sync")] if request.url.path.endswith("/sync") else ""
+    paths = [_action_path(api_prefix, action.path) for action in sync_data.actions]
+    unsupported = [action.path for action, path in zip(sync_data.actions, paths) if path is None]
+    if unsupported:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Actions not supported by sync: {', '.join(sorted(set(unsupported)))}"
+        )
+
+    headers = {"authorization": request.headers.get("authorization", "")}
+    # Keep the caller's address so per-client rate limits still apply
+    client = (request.client.host, request.client.port) if request.client else ("127.0.0.1", 123)
+    transport = httpx.ASGITransport(app=request.app, client=client)
+
+    results = []
+    applied = failed = 0
+    async with httpx.AsyncClient(transport=transport, base_url=str(request.base_url), timeout=None) as dispatcher:
+        for action, path in zip(sync_data.actions, paths):
+            if failed and sync_data.stop_on_error:
+                results.append({"id": action.id, "path": path, "status": None, "skipped": True})
+                continue
+            try:
+                response = await dispatcher.post(
+                    path, json=action.body, headers={**headers, "idempotency-key": action.id}
+                )
+                try:
+                    body = response.json()
+                except json.JSONDecodeError:
+                    body = response.text
+                ok = response.is_success and not (isinstance(body, dict) and body.get("success") is False)
+                results.append({
+                    "id": action.id,
+                    "path": path,
+                    "status": response.status_code,
+                    "replayed": response.headers.get("idempotent-replayed") == "true",
+                    "body": body
+                })
+            except Exception as e:
+                logger.error("❌ Sync action %s (%s) error: %s", action.id, path, e)
+                ok = False
+                results.append({"id": action.id, "path": path, "status": 500, "replayed": False, "body": {"detail": str(e)}})
+            if ok:
+                applied += 1
+            else:
+                failed += 1
+
+    return {
+        "success": failed == 0,
+        "data": {
+            "applied": applied,
+            "failed": failed,
+            "skipped": len(results) - applied - failed,
+            "results": results
+        }
+    }
@@ -1,6 +1,7 @@
 """
 Vercel integration API endpoints
 """
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -12,7 +13,7 @@ from datetime import datetime
 from app.api.deps import get_db
 from app.models.projects import Project
 from app.models.project_services import ProjectServiceConnection
-from app.services.vercel_service import VercelService, VercelAPIError, check_project_availability, start_deployment_monitoring, stop_deployment_monitoring, get_active_monitoring_projects
+from app.services.vercel_service import VercelService, VercelAPIError, check_project_availability, start_deployment_monitoring, stop_deployment_monitoring, get_active_monitoring_projects, deployment_scheduler
 from app.services.token_service import get_token
 
 logger = logging.getLogger(__name__)
@@ -184,7 +185,7 @@ async def connect_vercel_project(
                 # Update existing connection
                 existing_connection.service_data = service_data
                 existing_connection.status = "connected"
-                db.commit()
+                await asyncio.to_thread(db.commit)
             else:
                 # Create new connection
                 connection = ProjectServiceConnection(
@@ -195,7 +196,7 @@ async def connect_vercel_project(
                     service_data=service_data
                 )
                 db.add(connection)
-                db.commit()
+                await asyncio.to_thread(db.commit)
                 
         except Exception as db_error:
             logger.error(f"Database update failed: {db_error}")
@@ -299,7 +300,7 @@ async def deploy_to_vercel(
             }
             
             vercel_connection.service_data = vercel_data
-            db.commit()
+            await asyncio.to_thread(db.commit)
         except Exception:
             pass
 
@@ -311,7 +312,8 @@ async def deploy_to_vercel(
                 project_id=project_id,
                 deployment_id=deployment_result["deployment_id"],
                 vercel_token=vercel_token,
-                db_session_factory=SessionLocal
+                db_session_factory=SessionLocal,
+                initial_status=deployment_result["status"]
             )
             logger.info(f"🚀 Background monitoring started successfully")
         except Exception as e:
@@ -402,7 +404,7 @@ async def disconnect_vercel_project(project_id: str, db: Session = Depends(get_d
     
     # Remove the connection
     db.delete(connection)
-    db.commit()
+    await asyncio.to_thread(db.commit)
     
     return {"message": "Vercel project disconnected successfully"}
 
@@ -439,12 +441,19 @@ async def get_current_deployment_status(project_id: str, db: Session = Depends(g
         }
     
     # 진행 중인 배포가 있음
+    last_checked_at = current_deployment.get("last_checked_at")
+    
+    # The scheduler only writes state changes; take the latest check time from it
+    tracked = deployment_scheduler.get(project_id)
+    if tracked and tracked["deployment_id"] == current_deployment["deployment_id"] and tracked["last_checked_at"]:
+        last_checked_at = datetime.utcfromtimestamp(tracked["last_checked_at"]).isoformat() + "Z"
+    
     return {
         "has_deployment": True,
         "deployment_id": current_deployment["deployment_id"],
         "status": current_deployment["status"],
         "deployment_url": current_deployment["deployment_url"],
-        "last_checked_at": current_deployment["last_checked_at"]
+        "last_checked_at": last_checked_at
     }
 
 
@@ -464,7 +473,10 @@ async def get_active_monitoring():
     """현재 활성화된 모니터링 목록"""
     try:
         active_projects = get_active_monitoring_projects()
-        return {"active_projects": active_projects}
+        return {
+            "active_projects": active_projects,
+            "deployments": deployment_scheduler.snapshot()
+        }
     except Exception as e:
         logger.error(f"Failed to get active monitoring: {e}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -47,5 +47,136 @@ class Settings(BaseModel):
     preview_port_start: int = int(os.getenv("PREVIEW_PORT_START", "3100"))
     preview_port_end: int = int(os.getenv("PREVIEW_PORT_END", "3999"))
 
+    # Preview log ring buffer (lines kept in memory per project) and optional
+    # directory for rotating on-disk spill files
+    preview_log_capacity: int = int(os.getenv("PREVIEW_LOG_CAPACITY", "1000"))
+    preview_log_spill_dir: str = os.getenv("PREVIEW_LOG_SPILL_DIR", "")
+
+    # Number of pre-scaffolded, pre-installed Next.js templates kept ready
+    # for new projects. Off by default: each slot runs create-next-app and
+    # npm install in the background at boot
+    template_pool_size: int = int(os.getenv("TEMPLATE_POOL_SIZE", "0"))
+
+    # Preview supervisor budget: least recently used idle previews are stopped
+    # when more than preview_max_running run or their combined RSS exceeds
+    # preview_memory_budget_mb (0 disables a limit). Previews untouched for
+    # preview_idle_timeout seconds are stopped regardless.
+    preview_max_running: int = int(os.getenv("PREVIEW_MAX_RUNNING", "10"))
+    preview_memory_budget_mb: int = int(os.getenv("PREVIEW_MEMORY_BUDGET_MB", "4096"))
+    preview_idle_timeout: int = int(os.getenv("PREVIEW_IDLE_TIMEOUT", "1800"))
+    preview_min_idle_seconds: int = int(os.getenv("PREVIEW_MIN_IDLE_SECONDS", "120"))
+    preview_reaper_interval: int = int(os.getenv("PREVIEW_REAPER_INTERVAL", "30"))
+
+    # SQLite storage engine: "wal" enables WAL journaling, tuned pragmas and a
+    # single serialized writer (shared by the sync and async sessions) next
+    # to pools of readers (sqlite_read_pool_size connections, plus up to
+    # sqlite_read_max_overflow extra under load); "legacy" keeps the plain
+    # default engine
+    sqlite_engine_mode: str = os.getenv("SQLITE_ENGINE_MODE", "wal")
+    sqlite_read_pool_size: int = int(os.getenv("SQLITE_READ_POOL_SIZE", "8"))
+    sqlite_read_max_overflow: int = int(os.getenv("SQLITE_READ_MAX_OVERFLOW", "10"))
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    sqlite_cache_size_kb: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+    # Driver URL for the async session layer; derived from database_url
+    # (sqlite+aiosqlite) when empty
+    async_database_url: str = os.getenv("ASYNC_DATABASE_URL", "")
+
+    # Tool payloads in message metadata larger than message_blob_threshold
+    # bytes are moved to the compressed, content-addressed blob store and
+    # replaced by a preview with strings cut to message_preview_chars
+    message_blob_dir: str = os.getenv("MESSAGE_BLOB_DIR", str(PROJECT_ROOT / "data" / "blobs"))
+    message_blob_threshold: int = int(os.getenv("MESSAGE_BLOB_THRESHOLD", "4096"))
+    message_preview_chars: int = int(os.getenv("MESSAGE_PREVIEW_CHARS", "500"))
+
+    # Shared keep-alive HTTP clients for the GitHub and Vercel APIs. Requests
+    # are retried with exponential backoff on 429 (and on 5xx/network errors
+    # for idempotent methods); when a rate limit is exhausted, requests wait
+    # up to http_rate_limit_max_wait seconds for it to reset
+    github_api_url: str = os.getenv("GITHUB_API_URL", "https://api.github.com")
+    vercel_api_url: str = os.getenv("VERCEL_API_URL", "https://api.vercel.com")
+    http_timeout: float = float(os.getenv("HTTP_TIMEOUT", "15"))
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    http_max_retries: int = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    http_backoff_base: float = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+    http_rate_limit_max_wait: float = float(os.getenv("HTTP_RATE_LIMIT_MAX_WAIT", "60"))
+
+    # Agent transcripts: when cli_record_dir is set, every Claude/Cursor
+    # output stream is recorded there as NDJSON. The "replay" CLI type
+    # (only with replay_cli_enabled) plays replay_transcript back through the
+    # normal streaming pipeline at replay_speed times the recorded pace;
+    # 0 is burst mode. Events without timestamps are replay_event_interval
+    # seconds apart
+    cli_record_dir: str = os.getenv("CLI_RECORD_DIR", "")
+    replay_cli_enabled: bool = os.getenv("REPLAY_CLI_ENABLED", "false").lower() == "true"
+    replay_transcript: str = os.getenv("REPLAY_TRANSCRIPT", "")
+    replay_speed: float = float(os.getenv("REPLAY_SPEED", "1.0"))
+    replay_event_interval: float = float(os.getenv("REPLAY_EVENT_INTERVAL", "0.05"))
+
+    # Uploads (lecture resources, project assets) are streamed to disk
+    # upload_chunk_size bytes at a time, hashed with SHA-256 on the way and
+    # stored once per content. Bodies over upload_max_bytes are rejected
+    # while they arrive
+    resource_upload_dir: str = os.getenv("RESOURCE_UPLOAD_DIR", "uploads/resources")
+    upload_max_bytes: int = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+    upload_chunk_size: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+    # Resource download access logs are queued and inserted in batches of up
+    # to access_log_batch_size by a background writer, at least every
+    # access_log_flush_interval seconds. Entries beyond access_log_queue_size
+    # pending rows are dropped rather than slowing downloads
+    access_log_batch_size: int = int(os.getenv("ACCESS_LOG_BATCH_SIZE", "200"))
+    access_log_flush_interval: float = float(os.getenv("ACCESS_LOG_FLUSH_INTERVAL", "1.0"))
+    access_log_queue_size: int = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+
+    # Profile pictures and other user images: originals are stored
+    # content-addressed under image_upload_dir (served at image_url_prefix)
+    # next to square WebP thumbnails for each of image_thumbnail_sizes px.
+    # Decoding runs on image_workers dedicated threads. The local directory
+    # does not survive a redeploy on hosts with ephemeral disks (Render): set
+    # image_storage_bucket to a public Supabase Storage bucket and every file
+    # is also uploaded there, URLs point at the bucket and the directory is
+    # only a working cache
+    image_upload_dir: str = os.getenv("IMAGE_UPLOAD_DIR", "uploads/images")
+    image_storage_bucket: str = os.getenv("IMAGE_STORAGE_BUCKET", "")
+    image_url_prefix: str = os.getenv("IMAGE_URL_PREFIX") or (
+        f"{os.getenv('SUPABASE_URL', '').rstrip('/')}/storage/v1/object/public/{os.getenv('IMAGE_STORAGE_BUCKET')}"
+        if os.getenv("IMAGE_STORAGE_BUCKET") else "/uploads/images"
+    )
+    image_thumbnail_sizes: str = os.getenv("IMAGE_THUMBNAIL_SIZES", "64,128,256")
+    image_avatar_size: int = int(os.getenv("IMAGE_AVATAR_SIZE", "128"))
+    image_webp_quality: int = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+    image_max_bytes: int = int(os.getenv("IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+    image_max_pixels: int = int(os.getenv("IMAGE_MAX_PIXELS", str(40_000_000)))
+    image_workers: int = int(os.getenv("IMAGE_WORKERS", "2"))
+
+    # Gameplay and award XP entries are queued and upserted into xp_entries
+    # in batches of up to xp_event_batch_size every xp_event_flush_interval
+    # seconds; failed batches are retried with backoff capped at
+    # xp_event_retry_max_delay seconds. With xp_event_spool_path set, events
+    # are also appended to that file and replayed after a restart until
+    # they are acknowledged
+    xp_event_batch_size: int = int(os.getenv("XP_EVENT_BATCH_SIZE", "500"))
+    xp_event_flush_interval: float = float(os.getenv("XP_EVENT_FLUSH_INTERVAL", "0.25"))
+    xp_event_queue_size: int = int(os.getenv("XP_EVENT_QUEUE_SIZE", "10000"))
+    xp_event_retry_max_delay: float = float(os.getenv("XP_EVENT_RETRY_MAX_DELAY", "30"))
+    xp_event_spool_path: str = os.getenv("XP_EVENT_SPOOL_PATH", "")
+
+    # Gameboard stations are read once and cached for
+    # gameboard_station_cache_ttl seconds (0 = until restart); roll-many
+    # resolves at most gameboard_max_moves_per_request moves per call
+    gameboard_station_cache_ttl: float = float(os.getenv("GAMEBOARD_STATION_CACHE_TTL", "300"))
+    gameboard_max_moves_per_request: int = int(os.getenv("GAMEBOARD_MAX_MOVES_PER_REQUEST", "20"))
+
+    # Responses to award/roll POSTs sent with an Idempotency-Key are kept for
+    # idempotency_ttl seconds (at most idempotency_max_keys) and replayed for
+    # retries; a retry of a request still running waits up to
+    # idempotency_wait seconds for it. /sync takes up to sync_max_actions
+    idempotency_ttl: float = float(os.getenv("IDEMPOTENCY_TTL", str(24 * 3600)))
+    idempotency_max_keys: int = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+    idempotency_wait: float = float(os.getenv("IDEMPOTENCY_WAIT", "10"))
+    sync_max_actions: int = int(os.getenv("SYNC_MAX_ACTIONS", "100"))
+
 
 settings = Settings()
\ No newline at end of file
@@ -1,31 +1,110 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
-from app.core.terminal_ui import TerminalUIHandler
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.terminal_ui import TerminalUIHandler, ui
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted.
+
+    The stock handler merges ``msg % args`` in the emitting thread; here the
+    listener thread does it, so a log call on a hot path costs a level check
+    and a queue put. Records stay in-process, so nothing needs pickling.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """One compact JSON object per line, for production log collectors"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        component = getattr(record, "component", None)
+        if component:
+            entry["component"] = component
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
 
 
 def configure_logging() -> None:
-    """Configure logging with clean terminal UI"""
+    """
+    Configure logging with clean terminal UI.
+
+    Every record (including ``ui.*`` calls) goes through a queue; a
+    background QueueListener formats and writes it. Output is rich console
+    text in development and JSON lines in production (``LOG_FORMAT=json``
+    or ``ENVIRONMENT=production``). ``LOG_LEVEL`` sets the threshold.
+    """
+    global _listener
+
     # Clear existing handlers
     root = logging.getLogger()
     root.handlers.clear()
-    
-    # Add our custom terminal UI handler
-    terminal_handler = TerminalUIHandler()
-    terminal_handler.setLevel(logging.INFO)
-    
-    # Add standard handler for file logging if needed
-    stream_handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        fmt="%(asctime)s %(levelname)s [%(name)s] %(message)s",
-        datefmt="%Y-%m-%dT%H:%M:%S%z",
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    debug = os.getenv("DEBUG", "false").lower() == "true"
+    json_output = os.getenv("LOG_FORMAT", "").lower() == "json" or (
+        not os.getenv("LOG_FORMAT") and os.getenv("ENVIRONMENT", "development") == "production"
     )
-    stream_handler.setFormatter(formatter)
-    stream_handler.setLevel(logging.DEBUG)
-    
-    root.setLevel(logging.INFO)
-    root.addHandler(terminal_handler)
-    
+    level_name = os.getenv("LOG_LEVEL", "DEBUG" if debug else "INFO").upper()
+
+    if json_output:
+        output_handler = logging.StreamHandler(sys.stdout)
+        output_handler.setFormatter(JSONFormatter())
+    else:
+        # Add our custom terminal UI handler
+        output_handler = TerminalUIHandler()
+    handlers = [output_handler]
+
     # Add stream handler only in debug mode
-    import os
-    if os.getenv("DEBUG", "false").lower() == "true":
-        root.addHandler(stream_handler)
+    if debug and not json_output:
+        stream_handler = logging.StreamHandler(sys.stdout)
+        formatter = logging.Formatter(
+            fmt="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+            datefmt="%Y-%m-%dT%H:%M:%S%z",
+        )
+        stream_handler.setFormatter(formatter)
+        # Rich panels/logo are for the terminal handler only
+        stream_handler.addFilter(lambda record: not hasattr(record, "renderable"))
+        handlers.append(stream_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.setLevel(getattr(logging, level_name, logging.INFO))
+    root.addHandler(DeferredQueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    ui.json_output = json_output
+    ui.pipeline_active = True
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    ui.pipeline_active = False
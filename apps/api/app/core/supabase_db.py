@@ -7,6 +7,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 import bcrypt
 from .supabase_client import supabase_client
+from app.services.images import thumbnail_url
 
 class SupabaseDB:
     """Complete database service using Supabase SDK"""
@@ -188,7 +189,8 @@ class SupabaseDB:
                     "id": user['id'],
                     "username": user['username'],
                     "user_program": user['user_program'],
-                    "profile_picture_url": user.get('profile_picture_url'),
+                    # Avatar-sized thumbnail; the full image is on the profile
+                    "profile_picture_url": thumbnail_url(user.get('profile_picture_url')),
                     "current_rank": rank,
                     "medal_tier": medal_tier,
                     **stats,
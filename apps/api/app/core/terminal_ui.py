@@ -23,11 +23,35 @@ class LogLevel(Enum):
     ERROR = "error"
 
 
+# SUCCESS sits between INFO and WARNING so it passes an INFO threshold
+SUCCESS_LEVEL = 25
+logging.addLevelName(SUCCESS_LEVEL, "SUCCESS")
+
+LOGGING_LEVELS = {
+    LogLevel.DEBUG: logging.DEBUG,
+    LogLevel.INFO: logging.INFO,
+    LogLevel.SUCCESS: SUCCESS_LEVEL,
+    LogLevel.WARNING: logging.WARNING,
+    LogLevel.ERROR: logging.ERROR
+}
+
+
 class TerminalUI:
-    """Clean terminal interface without emojis"""
+    """
+    Clean terminal interface without emojis.
+    
+    Once ``configure_logging`` has run, messages are handed to the logging
+    queue and rendered by a background listener (``render``), so callers
+    never wait on the console. Messages below the logger's level are
+    dropped before anything is formatted.
+    """
     
     def __init__(self):
         self.console = Console(file=sys.stdout, force_terminal=True)
+        self.logger = logging.getLogger("app.ui")
+        # Set by configure_logging
+        self.pipeline_active = False
+        self.json_output = False
         self._setup_colors()
     
     def _setup_colors(self):
@@ -48,8 +72,20 @@ class TerminalUI:
             LogLevel.ERROR: "[ERROR]"
         }
     
+    def is_enabled(self, level: LogLevel) -> bool:
+        return not self.pipeline_active or self.logger.isEnabledFor(LOGGING_LEVELS[level])
+    
     def log(self, message: str, level: LogLevel = LogLevel.INFO, component: Optional[str] = None):
         """Log a message with clean formatting"""
+        if not self.pipeline_active:
+            self.render(message, level, component)
+            return
+        levelno = LOGGING_LEVELS[level]
+        if self.logger.isEnabledFor(levelno):
+            self.logger.log(levelno, message, extra={"component": component or None, "ui_level": level})
+    
+    def render(self, message: str, level: LogLevel = LogLevel.INFO, component: Optional[str] = None):
+        """Write a message to the console (called from the log listener thread)"""
         prefix = self.prefixes[level]
         color = self.colors[level]
         
@@ -61,6 +97,13 @@ class TerminalUI:
         text = Text(formatted_message, style=color)
         self.console.print(text)
     
+    def _print(self, renderable="") -> None:
+        """Print a rich renderable, in order with queued log messages"""
+        if self.pipeline_active:
+            self.logger.log(logging.CRITICAL, "", extra={"renderable": renderable})
+        else:
+            self.console.print(renderable)
+    
     def debug(self, message: str, component: Optional[str] = None):
         """Debug level message"""
         self.log(message, LogLevel.DEBUG, component)
@@ -83,6 +126,9 @@ class TerminalUI:
     
     def panel(self, content: str, title: Optional[str] = None, style: str = "blue"):
         """Display content in a clean panel"""
+        if self.json_output:
+            self.info(content.replace("\n", "; "), title)
+            return
         panel = Panel(
             content,
             title=title,
@@ -90,10 +136,12 @@ class TerminalUI:
             box=box.ROUNDED,
             padding=(1, 2)
         )
-        self.console.print(panel)
+        self._print(panel)
     
     def ascii_logo(self):
         """Display ASCII art logo for Claudable"""
+        if self.json_output:
+            return
         # Create "CLAUDABLE" logo with orange color from the image
         logo_text = Text()
         
@@ -105,20 +153,23 @@ class TerminalUI:
         logo_text.append("╚██████╗███████╗██║  ██║╚██████╔╝██████╔╝██║  ██║██████╔╝███████╗███████╗\n", style="rgb(182,109,77)")
         logo_text.append(" ╚═════╝╚══════╝╚═╝  ╚═╝ ╚═════╝ ╚═════╝ ╚═╝  ╚═╝╚═════╝ ╚══════╝╚══════╝", style="rgb(182,109,77)")
         
-        self.console.print()
+        self._print()
         
         # Print the logo
-        self.console.print(logo_text)
-        self.console.print()
+        self._print(logo_text)
+        self._print()
         
         # Tagline
         tagline = Text("Connect Claude Code. Build what you want. Deploy instantly.", style="rgb(182,109,77) bold")
         
-        self.console.print(tagline)
-        self.console.print()  # Add blank line
+        self._print(tagline)
+        self._print()  # Add blank line
     
     def status_line(self, items: Dict[str, str]):
         """Display a status line with key-value pairs"""
+        if self.json_output:
+            self.info(", ".join(f"{key}={value}" for key, value in items.items()))
+            return
         table = Table.grid(padding=1)
         
         for key, value in items.items():
@@ -133,7 +184,7 @@ class TerminalUI:
         # Add values row  
         table.add_row(*[Text(value, style="white") for value in values])
         
-        self.console.print(table)
+        self._print(table)
     
     def connection_status(self, project_id: str, status: str):
         """WebSocket connection status"""
@@ -170,14 +221,25 @@ class TerminalUIHandler(logging.Handler):
             level_map = {
                 logging.DEBUG: LogLevel.DEBUG,
                 logging.INFO: LogLevel.INFO,
+                SUCCESS_LEVEL: LogLevel.SUCCESS,
                 logging.WARNING: LogLevel.WARNING,
                 logging.ERROR: LogLevel.ERROR,
                 logging.CRITICAL: LogLevel.ERROR
             }
             
-            level = level_map.get(record.levelno, LogLevel.INFO)
-            component = record.name if record.name != "root" else None
+            if hasattr(record, "renderable"):
+                self.ui.console.print(record.renderable)
+                return
+            
+            level = getattr(record, "ui_level", None) or level_map.get(record.levelno, LogLevel.INFO)
+            if hasattr(record, "component"):
+                component = record.component
+            else:
+                component = record.name if record.name != "root" else None
             
-            self.ui.log(record.getMessage(), level, component)
+            message = record.getMessage()
+            if record.exc_info:
+                message += "\n" + logging.Formatter().formatException(record.exc_info)
+            self.ui.render(message, level, component)
         except Exception:
             self.handleError(record)
\ No newline at end of file
@@ -1,5 +1,8 @@
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session as OrmSession, sessionmaker
+from sqlalchemy.sql import Delete, Insert, Update
+from sqlalchemy.sql.elements import TextClause
 from pathlib import Path
 from app.core.config import settings
 
@@ -7,26 +10,180 @@ from app.core.config import settings
 db_path = settings.database_url.replace("sqlite:///", "")
 Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
+is_sqlite = settings.database_url.startswith("sqlite")
+use_wal = is_sqlite and settings.sqlite_engine_mode == "wal"
+
 # Create engine with SQLite-specific settings
 connect_args = {}
-if settings.database_url.startswith("sqlite"):
+if is_sqlite:
     connect_args = {"check_same_thread": False}
+    if use_wal:
+        # Seconds the driver waits on a locked database before raising
+        connect_args["timeout"] = settings.sqlite_busy_timeout_ms / 1000
+
+engine_kwargs = {}
+if use_wal:
+    # Overflow connections keep sync sessions used inside async routes from
+    # blocking the event loop on an exhausted pool
+    engine_kwargs = {"pool_size": settings.sqlite_read_pool_size, "max_overflow": settings.sqlite_read_max_overflow}
 
 engine = create_engine(
-    settings.database_url, 
+    settings.database_url,
     connect_args=connect_args,
-    pool_pre_ping=True
+    pool_pre_ping=True,
+    **engine_kwargs
+)
+
+# Single writer: SQLite allows one writer at a time, so writers queue for it
+# instead of failing with "database is locked". The sync and async engines
+# each keep one writer connection; writer transactions start with BEGIN
+# IMMEDIATE, so the two wait for each other in SQLite's busy handler (up to
+# sqlite_busy_timeout_ms) when they begin, rather than failing on a read to
+# write upgrade. No Python lock is shared between them: a sync write that
+# runs on the event loop must never block on a holder that needs the loop
+write_engine = engine
+if use_wal:
+    write_engine = create_engine(
+        settings.database_url,
+        connect_args=connect_args,
+        pool_pre_ping=True,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.sqlite_busy_timeout_ms / 1000,
+    )
+
+
+def _use_explicit_begin(dbapi_conn, connection_record):
+    # Stop the driver issuing its own deferred BEGIN before DML
+    dbapi_conn.isolation_level = None
+
+
+def _begin_immediate(conn):
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _set_sqlite_pragma(dbapi_conn, connection_record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    if use_wal:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+# Async engines for routers on the event loop (aiosqlite runs SQLite calls in
+# its own thread, so queries no longer block WebSocket delivery)
+async_database_url = settings.async_database_url
+if not async_database_url and is_sqlite:
+    async_database_url = settings.database_url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+if not async_database_url:
+    async_database_url = settings.database_url
+
+async_connect_args = {"timeout": connect_args["timeout"]} if "timeout" in connect_args else {}
+async_engine = create_async_engine(
+    async_database_url,
+    connect_args=async_connect_args,
+    pool_pre_ping=True,
+    **engine_kwargs
 )
+async_write_engine = async_engine
+if use_wal:
+    async_write_engine = create_async_engine(
+        async_database_url,
+        connect_args=async_connect_args,
+        pool_pre_ping=True,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.sqlite_busy_timeout_ms / 1000,
+    )
+
+# Enable foreign key constraints (and WAL tuning) for SQLite
+if is_sqlite:
+    for _engine in {engine, write_engine, async_engine.sync_engine, async_write_engine.sync_engine}:
+        event.listen(_engine, "connect", _set_sqlite_pragma)
+
+if use_wal:
+    for _engine in (write_engine, async_write_engine.sync_engine):
+        event.listen(_engine, "connect", _use_explicit_begin)
+        event.listen(_engine, "begin", _begin_immediate)
+
 
-# Enable foreign key constraints for SQLite
-if settings.database_url.startswith("sqlite"):
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_conn, connection_record):
-        cursor = dbapi_conn.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+class RoutingSession(OrmSession):
+    """
+    Session that reads from the read pool and writes through the single
+    writer connection.
+
+    Once a session has flushed in the current transaction, all further
+    statements also go to the writer so the session sees its own
+    uncommitted changes.
+    """
+
+    _wrote = False
+    _read_bind = engine
+    _write_bind = write_engine
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if isinstance(clause, (Insert, Update, Delete, TextClause)):
+            self._wrote = True
+        if self._flushing or self._wrote:
+            return self._write_bind
+        return self._read_bind
+
+
+class AsyncRoutingSession(RoutingSession):
+    """RoutingSession over the async engines, used as AsyncSession's sync session"""
+
+    _read_bind = async_engine.sync_engine
+    _write_bind = async_write_engine.sync_engine
+
+
+if use_wal:
+    @event.listens_for(RoutingSession, "after_flush")
+    def _mark_written(session, flush_context):
+        session._wrote = True
+
+    @event.listens_for(RoutingSession, "after_transaction_end")
+    def _reset_written(session, transaction):
+        if transaction.parent is None:
+            session._wrote = False
+
+    SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+    AsyncSessionLocal = async_sessionmaker(
+        sync_session_class=AsyncRoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+else:
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+def ensure_indexes() -> None:
+    """
+    Create indexes declared on the models that are missing from existing
+    tables (create_all only adds indexes together with new tables)
+    """
+    from sqlalchemy import inspect
+    from app.db.base import Base
+    import app.models  # noqa: F401  register models
+
+    inspector = inspect(write_engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(write_engine)
 
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 def get_db():
     """Database session dependency"""
@@ -35,3 +192,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Async database session dependency"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -15,16 +16,28 @@ from app.api.settings import router as settings_router
 from app.api.project_services import router as project_services_router
 from app.api.github import router as github_router
 from app.api.vercel import router as vercel_router
-from app.api.auth_supabase import router as auth_router
+from app.api.auth_supabase import router as auth_router, token_subject
 from app.api.students_supabase import router as students_router
 from app.api.supabase_auth import router as supabase_auth_router
 from app.api.admin_supabase import router as admin_router
+from app.api.sync_supabase import router as sync_router
 from app.api.leaderboard import router as leaderboard_router
 from app.api.general import router as general_router
 from app.api.resources import router as resources_router
 from app.api.realtime import router as realtime_router
+from app.db.session import ensure_indexes
 from app.core.logging import configure_logging
 from app.core.terminal_ui import ui
+from app.services.local_runtime import reconcile_preview_ports
+from app.services.project.template_pool import template_pool
+from app.services.preview_supervisor import preview_supervisor
+from app.services.http_clients import close_http_clients
+from app.services.access_log import access_log_writer
+from app.services.images import shutdown_image_workers
+from app.services.xp_events import xp_event_log
+from app.core.config import settings
+from app.services.uploads import UploadSizeLimitMiddleware
+from app.services.idempotency import IdempotencyMiddleware
 # Removed SQLAlchemy imports - using Supabase SDK only
 from app.core.database_supabase import get_supabase_client_instance
 import os
@@ -57,6 +70,13 @@ class LogFilterMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(LogFilterMiddleware)
 
+# Reject oversized upload bodies (POST .../upload, profile pictures) with 413 before they are spooled
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.image_max_bytes, path_suffix="/auth/profile-picture")
+
+# Retried award/roll POSTs with an Idempotency-Key get the stored response instead of applying twice
+app.add_middleware(IdempotencyMiddleware, token_subject=token_subject)
+
 # Environment-based CORS configuration
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
@@ -79,9 +99,16 @@ app.add_middleware(
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"] if ENVIRONMENT == "production" else ["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    # Pagination cursors are returned in headers
+    expose_headers=["X-Next-Cursor", "X-Before-Cursor", "X-After-Cursor", "Idempotent-Replayed"]
 )
 
+# Profile pictures and their thumbnails (content-addressed, see app.services.images)
+if settings.image_url_prefix.startswith("/"):
+    # Served from the bucket instead when image_storage_bucket is set
+    app.mount(settings.image_url_prefix, StaticFiles(directory=settings.image_upload_dir, check_dir=False), name="images")
+
 # Routers
 app.include_router(projects_router, prefix="/api/projects")
 app.include_router(repo_router)
@@ -98,6 +125,7 @@ app.include_router(auth_router, prefix="/api")  # Olympics authentication API (S
 app.include_router(supabase_auth_router, prefix="/api")  # Olympics Supabase SDK authentication API
 app.include_router(students_router, prefix="/api")  # Olympics students API (Supabase)
 app.include_router(admin_router, prefix="/api")  # Olympics admin API (Supabase)
+app.include_router(sync_router, prefix="/api")  # Olympics offline action sync (Supabase)
 app.include_router(leaderboard_router, prefix="/api")  # Olympics leaderboard API
 app.include_router(general_router, prefix="/api")  # Olympics general endpoints API
 app.include_router(resources_router, prefix="/api")  # Olympics resources API  
@@ -117,6 +145,18 @@ def on_startup() -> None:
     get_supabase_client_instance()  # Test connection
     ui.success("Supabase multi-user deployment ready")
     
+    # Add indexes introduced since the local database was created
+    ensure_indexes()
+    
+    # Sync preview port leases with ports already in use on this host
+    reconcile_preview_ports()
+    
+    # Start filling the warm Next.js template pool in the background
+    template_pool.start()
+    
+    # Stop least recently used previews when over the memory/count budget
+    preview_supervisor.start()
+    
     # Show available endpoints
     ui.info("API server ready")
     ui.panel(
@@ -135,3 +175,14 @@ def on_startup() -> None:
         "Port": os.getenv("PORT", "8000")
     }
     ui.status_line(env_info)
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    # Close the shared GitHub/Vercel connection pools
+    await close_http_clients()
+    # Write queued resource download logs
+    access_log_writer.shutdown()
+    shutdown_image_workers()
+    # Deliver queued XP audit entries
+    xp_event_log.shutdown()
@@ -7,12 +7,16 @@ import os
 import logging
 
 from app.core.database import engine, Base
-from app.api.auth import router as auth_router
+from app.api.auth import router as auth_router, token_subject
 from app.api.admin import router as admin_router  
 from app.api.students import router as students_router
 from app.api.resources import router as resources_router
 from app.api.realtime import router as realtime_router
 from app.models import olympics  # Import models to register them
+from app.services.uploads import UploadSizeLimitMiddleware
+from app.services.idempotency import IdempotencyMiddleware
+from app.services.access_log import access_log_writer
+from app.services.images import shutdown_image_workers
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -41,6 +45,12 @@ class LogFilterMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(LogFilterMiddleware)
 
+# Reject oversized upload bodies (POST .../upload) with 413 before they are spooled
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Retried award/roll POSTs with an Idempotency-Key get the stored response instead of applying twice
+app.add_middleware(IdempotencyMiddleware, token_subject=token_subject)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -135,6 +145,9 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("🏁 Shutting down Olympics RPG API...")
+    # Write queued resource download logs
+    access_log_writer.shutdown()
+    shutdown_image_workers()
     logger.info("👋 Thanks for playing!")
 
 # Error handlers
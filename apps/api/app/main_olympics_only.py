@@ -6,19 +6,26 @@ NO SQLite dependencies - Pure Supabase PostgreSQL
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 # Olympics-only imports - NO SQLite dependencies
-from app.api.auth_supabase import router as auth_router
+from app.api.auth_supabase import router as auth_router, token_subject
 from app.api.supabase_auth import router as supabase_auth_router
 from app.api.admin_supabase import router as admin_supabase_router
 from app.api.students_supabase import router as students_supabase_router
+from app.api.sync_supabase import router as sync_router
 from app.core.logging import configure_logging
 from app.core.terminal_ui import ui
 from app.core.database_supabase import get_supabase_client_instance
+from app.services.uploads import UploadSizeLimitMiddleware
+from app.services.idempotency import IdempotencyMiddleware
+from app.services.images import shutdown_image_workers
+from app.services.xp_events import xp_event_log
+from app.core.config import settings
 import os
 from typing import List
 
@@ -49,6 +56,13 @@ class LogFilterMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(LogFilterMiddleware)
 
+# Reject oversized upload bodies (POST .../upload, profile pictures) with 413 before they are spooled
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.image_max_bytes, path_suffix="/auth/profile-picture")
+
+# Retried award/roll POSTs with an Idempotency-Key get the stored response instead of applying twice
+app.add_middleware(IdempotencyMiddleware, token_subject=token_subject)
+
 # Environment-based CORS configuration
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
@@ -91,14 +105,22 @@ app.add_middleware(
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"] if ENVIRONMENT == "production" else ["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    # Set on responses replayed for a retried Idempotency-Key
+    expose_headers=["Idempotent-Replayed"]
 )
 
+# Profile pictures and their thumbnails (content-addressed, see app.services.images)
+if settings.image_url_prefix.startswith("/"):
+    # Served from the bucket instead when image_storage_bucket is set
+    app.mount(settings.image_url_prefix, StaticFiles(directory=settings.image_upload_dir, check_dir=False), name="images")
+
 # Olympics PWA Routers ONLY - No SQLite dependencies
 app.include_router(auth_router, prefix="/api")  # Olympics Supabase authentication
 app.include_router(supabase_auth_router, prefix="/api")  # Olympics Supabase SDK authentication
 app.include_router(admin_supabase_router, prefix="/api")  # Olympics Admin Management
 app.include_router(students_supabase_router, prefix="/api")  # Olympics Student Dashboard
+app.include_router(sync_router, prefix="/api")  # Olympics Offline Action Sync
 
 @app.get("/")
 def root():
@@ -282,4 +304,11 @@ def on_startup() -> None:
         "Database Dependencies": "Supabase Only ✅",
         "Render Ready": "✅" if ENVIRONMENT == "production" else "Development Mode"
     }
-    ui.status_line(deployment_info)
\ No newline at end of file
+    ui.status_line(deployment_info)
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    """Stop background workers"""
+    shutdown_image_workers()
+    xp_event_log.shutdown()
@@ -1,7 +1,7 @@
 """
 Unified message model for all chat, Claude Code SDK, and tool interactions
 """
-from sqlalchemy import String, DateTime, ForeignKey, Text, JSON, Integer, Numeric, Boolean
+from sqlalchemy import String, DateTime, ForeignKey, Text, JSON, Integer, Numeric, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.db.base import Base
@@ -10,6 +10,11 @@ from app.db.base import Base
 class Message(Base):
     """Unified message table for all interactions"""
     __tablename__ = "messages"
+    __table_args__ = (
+        # Keyset pagination of message history, per conversation and per project
+        Index('idx_messages_conversation_history', 'project_id', 'conversation_id', 'created_at', 'id'),
+        Index('idx_messages_project_history', 'project_id', 'created_at', 'id'),
+    )
 
     id: Mapped[str] = mapped_column(String(64), primary_key=True)
     project_id: Mapped[str] = mapped_column(String(64), ForeignKey("projects.id", ondelete="CASCADE"), index=True)
@@ -0,0 +1,148 @@
+"""
+File Access Log Writer
+Write-behind batching of FileAccessLog rows off the download request path
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.olympics import FileAccessLog
+
+logger = logging.getLogger(__name__)
+
+
+class AccessLogWriter:
+    """
+    Queues access-log rows and inserts them in batches from one thread.
+
+    ``record`` only enqueues (stamping ``accessed_at`` at request time), so
+    a download never waits on a database write or commit. The writer thread
+    flushes whenever ``access_log_batch_size`` rows are pending or
+    ``access_log_flush_interval`` seconds have passed, one multi-row INSERT
+    and commit per batch. When the queue is full, new rows are dropped and
+    counted instead of blocking downloads.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Tuple[Any, Dict[str, Any]]]" = queue.Queue(maxsize=settings.access_log_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flush_requested = threading.Event()
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def record(self, bind, **row: Any) -> None:
+        """Queue one FileAccessLog row for the database ``bind`` (engine/connection)"""
+        row.setdefault("accessed_at", datetime.now(timezone.utc))
+        try:
+            self._queue.put_nowait((bind, row))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._ensure_running()
+
+    def pending(self) -> int:
+        """Rows queued or in flight (task_done is only called once their batch is written)"""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: float = 5.0) -> int:
+        """
+        Write everything queued so far from the calling thread, then wait (up
+        to ``timeout``) for a batch the writer thread has already taken, so
+        queries that follow see every recorded row; returns rows written here
+        """
+        written = 0
+        self._flush_requested.set()
+        try:
+            while True:
+                batch = self._take(block=False)
+                if not batch:
+                    break
+                written += self._write(batch)
+            deadline = time.monotonic() + timeout
+            while self.pending():
+                if time.monotonic() >= deadline:
+                    logger.warning("Access log flush timed out with %s rows still in flight", self.pending())
+                    break
+                time.sleep(0.01)
+        finally:
+            self._flush_requested.clear()
+        return written
+
+    def shutdown(self) -> None:
+        """Stop the writer thread and write what is still queued"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _ensure_running(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+                self._thread.start()
+
+    def _take(self, block: bool) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Up to one batch of queued rows, waiting at most one flush interval for the first"""
+        batch: List[Tuple[Any, Dict[str, Any]]] = []
+        deadline = time.monotonic() + settings.access_log_flush_interval
+        while len(batch) < settings.access_log_batch_size:
+            if not block:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (batch and self._flush_requested.is_set()):
+                break
+            try:
+                # Short waits once a batch is started, so flush() need not sit out the interval
+                batch.append(self._queue.get(timeout=min(remaining, 0.05) if batch else remaining))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _write(self, batch: List[Tuple[Any, Dict[str, Any]]]) -> int:
+        by_bind: Dict[Any, List[Dict[str, Any]]] = {}
+        for bind, row in batch:
+            by_bind.setdefault(bind, []).append(row)
+        written = 0
+        with self._flush_lock:
+            for bind, rows in by_bind.items():
+                try:
+                    with Session(bind=bind) as db:
+                        db.execute(insert(FileAccessLog), rows)
+                        db.commit()
+                    written += len(rows)
+                except Exception as e:
+                    self.dropped += len(rows)
+                    logger.error("Failed to write %s access log rows: %s", len(rows), e)
+            self.written += written
+            self.batches += 1
+        for _ in batch:
+            self._queue.task_done()
+        return written
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._take(block=True)
+            if batch:
+                self._write(batch)
+
+
+access_log_writer = AccessLogWriter()
@@ -0,0 +1,190 @@
+"""
+CLI Transcript Record & Replay
+Records raw agent output streams as NDJSON transcripts and plays them back offline
+"""
+import asyncio
+import dataclasses
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.cli.stream_decoder import json_loads, sdk_types
+
+
+# Transcript formats: raw stream-json lines (Cursor) or Claude Code SDK message objects
+TRANSCRIPT_NDJSON = "ndjson"
+TRANSCRIPT_SDK = "sdk"
+
+# Marks a serialized SDK dataclass inside a transcript event
+SDK_CLASS_KEY = "__sdk__"
+
+
+def sdk_to_record(value: Any) -> Any:
+    """JSON-safe form of an SDK message, keeping the class of each object and content block"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        record = {SDK_CLASS_KEY: type(value).__name__}
+        for field in dataclasses.fields(value):
+            record[field.name] = sdk_to_record(getattr(value, field.name))
+        return record
+    if isinstance(value, list):
+        return [sdk_to_record(item) for item in value]
+    return value
+
+
+def sdk_from_record(value: Any) -> Any:
+    """Rebuild SDK objects from ``sdk_to_record`` output"""
+    if isinstance(value, list):
+        return [sdk_from_record(item) for item in value]
+    if isinstance(value, dict) and SDK_CLASS_KEY in value:
+        cls = getattr(sdk_types, value[SDK_CLASS_KEY], None) if sdk_types is not None else None
+        if cls is None:
+            raise ValueError(f"Unknown SDK type in transcript: {value[SDK_CLASS_KEY]}")
+        return cls(**{key: sdk_from_record(item) for key, item in value.items() if key != SDK_CLASS_KEY})
+    return value
+
+
+class TranscriptRecorder:
+    """
+    Writes one agent output stream to ``cli_record_dir``.
+
+    The first line is a header (``{"transcript": <format>, ...}``), each
+    following line ``{"t": <seconds since start>, "event": <event>}``.
+    """
+
+    def __init__(self, cli_name: str, transcript_format: str):
+        os.makedirs(settings.cli_record_dir, exist_ok=True)
+        started_at = datetime.utcnow()
+        self.transcript_format = transcript_format
+        self.path = os.path.join(
+            settings.cli_record_dir,
+            f"{cli_name}-{started_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.ndjson",
+        )
+        # Line buffered so a stream that is abandoned mid-way is still complete up to its last event
+        self._file = open(self.path, "w", encoding="utf-8", buffering=1)
+        self._started = time.monotonic()
+        self._file.write(json.dumps({
+            "transcript": transcript_format,
+            "cli": cli_name,
+            "recorded_at": started_at.isoformat(),
+        }) + "\n")
+
+    def write(self, item: Any) -> None:
+        if self.transcript_format == TRANSCRIPT_SDK:
+            event = sdk_to_record(item)
+        else:
+            try:
+                event = json_loads(item)
+            except ValueError:
+                event = {"raw": item.decode("utf-8", errors="replace").rstrip("\n")}
+        line = {"t": round(time.monotonic() - self._started, 4), "event": event}
+        self._file.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+async def _recorded(source: AsyncIterator[Any], recorder: TranscriptRecorder) -> AsyncIterator[Any]:
+    try:
+        async for item in source:
+            try:
+                recorder.write(item)
+            except (OSError, TypeError, ValueError) as e:
+                print(f"[Replay] Could not record event: {e}")
+            yield item
+    finally:
+        recorder.close()
+
+
+def record_stream(source: AsyncIterator[Any], cli_name: str, transcript_format: str) -> AsyncIterator[Any]:
+    """``source`` unchanged, teed into a transcript file when ``cli_record_dir`` is set"""
+    if not settings.cli_record_dir:
+        return source
+    try:
+        recorder = TranscriptRecorder(cli_name, transcript_format)
+    except OSError as e:
+        print(f"[Replay] Could not start transcript recording: {e}")
+        return source
+    print(f"[Replay] Recording {cli_name} transcript to {recorder.path}")
+    return _recorded(source, recorder)
+
+
+@dataclasses.dataclass
+class Transcript:
+    format: str
+    # (seconds since start or None when not recorded, stdout line or SDK object)
+    events: List[Tuple[Optional[float], Any]]
+
+
+_transcript_cache: Dict[str, Tuple[float, Transcript]] = {}
+
+
+def load_transcript(path: str) -> Transcript:
+    """
+    Parse a transcript file (cached until it changes on disk).
+
+    Besides recorder output, a bare ``cursor-agent --output-format
+    stream-json`` capture is accepted; its events get no timestamps.
+    """
+    mtime = os.path.getmtime(path)
+    cached = _transcript_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    transcript_format = TRANSCRIPT_NDJSON
+    events: List[Tuple[Optional[float], Any]] = []
+    with open(path, "rb") as f:
+        for number, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json_loads(line)
+            if number == 0 and isinstance(record, dict) and "transcript" in record:
+                transcript_format = record["transcript"]
+                continue
+            if isinstance(record, dict) and "event" in record and "t" in record:
+                offset, event = record["t"], record["event"]
+            else:
+                offset, event = None, record
+            if transcript_format == TRANSCRIPT_SDK:
+                events.append((offset, sdk_from_record(event)))
+            elif isinstance(event, dict) and set(event) == {"raw"}:
+                events.append((offset, (event["raw"] + "\n").encode("utf-8")))
+            else:
+                # Replayed as stdout lines so the Cursor stream loop parses them as live output
+                events.append((offset, json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n"))
+
+    transcript = Transcript(transcript_format, events)
+    _transcript_cache[path] = (mtime, transcript)
+    return transcript
+
+
+async def replay_stream(
+    transcript: Transcript,
+    speed: Optional[float] = None,
+    event_interval: Optional[float] = None
+) -> AsyncIterator[Any]:
+    """
+    Yield transcript events at ``speed`` times the recorded pace.
+
+    Events without timestamps are spaced ``event_interval`` seconds apart
+    (before scaling). ``speed <= 0`` is burst mode: no delays, only a yield
+    to the event loop between events so concurrent replays interleave.
+    """
+    if speed is None:
+        speed = settings.replay_speed
+    if event_interval is None:
+        event_interval = settings.replay_event_interval
+
+    started = time.monotonic()
+    offset = 0.0
+    for recorded_offset, event in transcript.events:
+        if speed <= 0:
+            await asyncio.sleep(0)
+        else:
+            offset = recorded_offset if recorded_offset is not None else offset + event_interval
+            # Scheduled against the start time so per-event overhead does not accumulate
+            await asyncio.sleep(max(0.0, started + offset / speed - time.monotonic()))
+        yield event
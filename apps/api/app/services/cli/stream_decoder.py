@@ -0,0 +1,355 @@
+"""
+CLI Stream Decoder
+Table-driven decoding of Claude SDK messages and Cursor stream-json events into Message rows
+"""
+import importlib
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.orm.instrumentation import manager_of_class
+
+from app.models.messages import Message
+
+try:
+    import orjson
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers keep one except clause
+    json_loads: Callable[[Any], Any] = orjson.loads
+except ImportError:  # pragma: no cover - optional speedup
+    json_loads = json.loads
+
+
+# Session id keys Cursor has used across versions, top level and under "message"
+CURSOR_SESSION_KEYS = ("sessionId", "chatId", "session_id", "chat_id", "threadId", "thread_id")
+CURSOR_NESTED_SESSION_KEYS = ("sessionId", "chatId", "session_id", "chat_id")
+
+_new_message_instance = None
+
+
+def build_message(
+    project_id: str,
+    role: str,
+    message_type: str,
+    content: str,
+    metadata_json: Optional[Dict[str, Any]],
+    session_id: Optional[str],
+) -> Message:
+    """
+    Create a transient Message without the declarative constructor.
+
+    ``Message(**kwargs)`` validates every keyword against the mapped class
+    and fires the ORM init event; streamed rows only ever set these fields,
+    so they are assigned directly on a fresh instance.
+    """
+    global _new_message_instance
+    if _new_message_instance is None:
+        # The constructor would configure pending mappers; do it once here
+        configure_mappers()
+        _new_message_instance = manager_of_class(Message).new_instance
+    message = _new_message_instance()
+    message.id = str(uuid.uuid4())
+    message.project_id = project_id
+    message.role = role
+    message.message_type = message_type
+    message.content = content
+    message.metadata_json = metadata_json
+    message.session_id = session_id
+    message.created_at = datetime.utcnow()
+    return message
+
+
+def _resolve_sdk_types():
+    """The Claude Code SDK types module, imported once (None when unavailable)"""
+    for module_name in ("anthropic.claude_code.types", "claude_code_sdk.types"):
+        try:
+            return importlib.import_module(module_name)
+        except ImportError:
+            continue
+    return None
+
+
+sdk_types = _resolve_sdk_types()
+
+_MESSAGE_KIND_NAMES = {
+    "SystemMessage": "system",
+    "AssistantMessage": "assistant",
+    "UserMessage": "user",
+    "ResultMessage": "result",
+}
+_BLOCK_KIND_NAMES = {
+    "TextBlock": "text",
+    "ToolUseBlock": "tool_use",
+    "ToolResultBlock": "tool_result",
+}
+
+# SDK class -> kind. Seeded from the SDK; other classes (the same SDK under
+# another import path, subclasses) are classified by name once and cached
+_MESSAGE_KINDS: Dict[type, Optional[str]] = {}
+_BLOCK_KINDS: Dict[type, Optional[str]] = {}
+if sdk_types is not None:
+    for _names, _kinds in ((_MESSAGE_KIND_NAMES, _MESSAGE_KINDS), (_BLOCK_KIND_NAMES, _BLOCK_KINDS)):
+        for _name, _kind in _names.items():
+            if hasattr(sdk_types, _name):
+                _kinds[getattr(sdk_types, _name)] = _kind
+
+
+def _kind_by_name(cls: type, names: Dict[str, str]) -> Optional[str]:
+    for candidate in cls.__mro__:
+        kind = names.get(candidate.__name__)
+        if kind:
+            return kind
+    return None
+
+
+def claude_message_kind(message_obj: Any) -> Optional[str]:
+    """``system`` / ``assistant`` / ``user`` / ``result`` or None for an SDK message"""
+    cls = type(message_obj)
+    try:
+        return _MESSAGE_KINDS[cls]
+    except KeyError:
+        pass
+    kind = _kind_by_name(cls, _MESSAGE_KIND_NAMES)
+    if kind is None and getattr(message_obj, "type", None) == "result":
+        # Duck-typed result objects are not cached: the class may carry other types
+        return "result"
+    _MESSAGE_KINDS[cls] = kind
+    return kind
+
+
+def _claude_block_kind(block: Any) -> Optional[str]:
+    cls = type(block)
+    try:
+        return _BLOCK_KINDS[cls]
+    except KeyError:
+        kind = _BLOCK_KINDS[cls] = _kind_by_name(cls, _BLOCK_KIND_NAMES)
+        return kind
+
+
+class ClaudeStreamDecoder:
+    """
+    Turns Claude Code SDK messages into Message rows.
+
+    ``decode`` returns ``(kind, messages)``; side effects (session storage,
+    terminal output, ending the stream on ``result``) stay with the adapter.
+    """
+
+    def __init__(self, cli, project_path: str, session_id: Optional[str], model: str):
+        self.cli = cli
+        self.cli_type = cli.cli_type.value
+        self.project_path = project_path
+        self.session_id = session_id
+        self.model = model
+        self._handlers = {
+            "system": self._on_system,
+            "assistant": self._on_assistant,
+            "user": self._on_user,
+            "result": self._on_result,
+        }
+
+    def decode(self, message_obj: Any) -> Tuple[Optional[str], List[Message]]:
+        kind = claude_message_kind(message_obj)
+        handler = self._handlers.get(kind)
+        if handler is None:
+            return None, []
+        return kind, handler(message_obj)
+
+    def _on_system(self, message_obj: Any) -> List[Message]:
+        return [build_message(
+            self.project_path, "system", "system",
+            f"Claude Code SDK initialized (Model: {self.model})",
+            {
+                "cli_type": self.cli_type,
+                "mode": "SDK",
+                "model": self.model,
+                "session_id": getattr(message_obj, "session_id", None),
+                "hidden_from_ui": True
+            },
+            self.session_id,
+        )]
+
+    def _on_assistant(self, message_obj: Any) -> List[Message]:
+        blocks = getattr(message_obj, "content", None)
+        if not isinstance(blocks, list):
+            return []
+
+        messages = []
+        text_parts = []
+        for block in blocks:
+            kind = _claude_block_kind(block)
+            if kind == "text":
+                text_parts.append(block.text)
+            elif kind == "tool_use":
+                messages.append(build_message(
+                    self.project_path, "assistant", "tool_use",
+                    self.cli._create_tool_summary(block.name, block.input),
+                    {
+                        "cli_type": self.cli_type,
+                        "mode": "SDK",
+                        "tool_name": block.name,
+                        "tool_input": block.input,
+                        "tool_id": block.id
+                    },
+                    self.session_id,
+                ))
+
+        content = "".join(text_parts).strip()
+        if content:
+            messages.append(build_message(
+                self.project_path, "assistant", "chat", content,
+                {"cli_type": self.cli_type, "mode": "SDK"},
+                self.session_id,
+            ))
+        return messages
+
+    def _on_user(self, message_obj: Any) -> List[Message]:
+        # UserMessages carry tool results, which are not shown
+        return []
+
+    def _on_result(self, message_obj: Any) -> List[Message]:
+        duration_ms = getattr(message_obj, "duration_ms", 0)
+        return [build_message(
+            self.project_path, "system", "result",
+            f"Session completed in {duration_ms}ms",
+            {
+                "cli_type": self.cli_type,
+                "mode": "SDK",
+                "duration_ms": duration_ms,
+                "duration_api_ms": getattr(message_obj, "duration_api_ms", 0),
+                "total_cost_usd": getattr(message_obj, "total_cost_usd", 0),
+                "num_turns": getattr(message_obj, "num_turns", 0),
+                "is_error": getattr(message_obj, "is_error", False),
+                "subtype": getattr(message_obj, "subtype", None),
+                "session_id": getattr(message_obj, "session_id", None),
+                "hidden_from_ui": True  # Don't show to user
+            },
+            self.session_id,
+        )]
+
+
+class CursorStreamDecoder:
+    """
+    Turns Cursor ``stream-json`` (NDJSON) events into Message rows.
+
+    Events are dispatched on ``type`` (and ``subtype`` for tool calls)
+    through lookup tables instead of an if/elif chain. Assistant text and
+    tool-start summaries are aggregated by the adapter into one chat
+    message, so for those ``decode`` returns the plain text and no row is
+    built per delta.
+    """
+
+    def __init__(self, cli, project_path: str, session_id: Optional[str]):
+        self.cli = cli
+        self.cli_type = cli.cli_type.value
+        self.project_path = project_path
+        self.session_id = session_id
+        self._handlers = {
+            "system": self._on_system,
+            "user": self._on_user,
+            "assistant": self._on_assistant,
+            "tool_call": self._on_tool_call,
+            "result": self._on_result,
+        }
+        self._tool_call_handlers = {
+            "started": self._on_tool_started,
+            "completed": self._on_tool_completed,
+        }
+
+    def decode(self, event: Dict[str, Any]) -> Union[Message, str, None]:
+        """A Message to emit, text to add to the assistant buffer, or None"""
+        handler = self._handlers.get(event.get("type"))
+        if handler is None:
+            return None
+        return handler(event)
+
+    @staticmethod
+    def extract_session_id(event: Dict[str, Any]) -> Optional[str]:
+        """First session/chat/thread id found on the event or its nested message"""
+        for key in CURSOR_SESSION_KEYS:
+            value = event.get(key)
+            if value:
+                return value
+        nested = event.get("message")
+        if isinstance(nested, dict):
+            for key in CURSOR_NESTED_SESSION_KEYS:
+                value = nested.get(key)
+                if value:
+                    return value
+        return None
+
+    def _on_system(self, event: Dict[str, Any]) -> Optional[Message]:
+        return build_message(
+            self.project_path, "system", "system",
+            f"🔧 Cursor Agent initialized (Model: {event.get('model', 'unknown')})",
+            {
+                "cli_type": self.cli_type,
+                "event_type": "system",
+                "cwd": event.get("cwd"),
+                "api_key_source": event.get("apiKeySource"),
+                "original_event": event,
+                "hidden_from_ui": True  # Hide system init messages
+            },
+            self.session_id,
+        )
+
+    def _on_user(self, event: Dict[str, Any]) -> Optional[Message]:
+        # Cursor echoes back the user's prompt. Suppress it to avoid duplicates.
+        return None
+
+    def _on_assistant(self, event: Dict[str, Any]) -> Optional[str]:
+        parts = event.get("message", {}).get("content", [])
+        if not parts or not isinstance(parts, list):
+            return None
+        return "".join(part.get("text", "") for part in parts if part.get("type") == "text") or None
+
+    def _on_tool_call(self, event: Dict[str, Any]) -> Union[Message, str, None]:
+        handler = self._tool_call_handlers.get(event.get("subtype"))
+        tool_call_data = event.get("tool_call", {})
+        if handler is None or not tool_call_data:
+            return None
+        tool_name_raw = next(iter(tool_call_data), None)
+        if not tool_name_raw:
+            return None
+        # Normalize tool name: lsToolCall -> ls
+        return handler(event, tool_name_raw.replace("ToolCall", ""), tool_call_data[tool_name_raw])
+
+    def _on_tool_started(self, event: Dict[str, Any], tool_name: str, call: Dict[str, Any]) -> str:
+        return self.cli._create_tool_summary(tool_name, call.get("args", {}))
+
+    def _on_tool_completed(self, event: Dict[str, Any], tool_name: str, call: Dict[str, Any]) -> Message:
+        result = call.get("result", {})
+        content = ""
+        if "success" in result:
+            content = json.dumps(result["success"])
+        elif "error" in result:
+            content = json.dumps(result["error"])
+        return build_message(
+            self.project_path, "system", "tool_result", content,
+            {
+                "cli_type": self.cli_type,
+                "original_format": event,
+                "tool_name": tool_name,
+                "hidden_from_ui": True
+            },
+            self.session_id,
+        )
+
+    def _on_result(self, event: Dict[str, Any]) -> Optional[Message]:
+        result_text = event.get("result", "")
+        if not result_text:
+            return None
+        duration = event.get("duration_ms", 0)
+        return build_message(
+            self.project_path, "system", "system",
+            f"Execution completed in {duration}ms. Final result: {result_text}",
+            {
+                "cli_type": self.cli_type,
+                "event_type": "result",
+                "duration_ms": duration,
+                "original_event": event,
+                "hidden_from_ui": True
+            },
+            self.session_id,
+        )
@@ -4,12 +4,13 @@ Supports Claude Code SDK, Cursor Agent, Qwen Code, Gemini CLI, and Codex CLI
 """
 import asyncio
 import json
+import logging
 import os
 import subprocess
 import uuid
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional, Callable, Dict, Any, AsyncGenerator, List
+from typing import Optional, Callable, Dict, Any, AsyncGenerator, AsyncIterator, List
 from enum import Enum
 import tempfile
 import base64
@@ -39,7 +40,18 @@ def get_display_path(file_path: str) -> str:
 from app.models.messages import Message
 from app.models.sessions import Session
 from app.core.websocket.manager import manager as ws_manager
+from app.core.config import settings
 from app.core.terminal_ui import ui
+from app.services.message_blobs import compact_metadata
+from app.services.cli.stream_decoder import (
+    ClaudeStreamDecoder,
+    CursorStreamDecoder,
+    build_message,
+    json_loads,
+)
+from app.services.cli.replay import TRANSCRIPT_NDJSON, TRANSCRIPT_SDK, load_transcript, record_stream, replay_stream
+
+logger = logging.getLogger("app.cli")
 
 # Claude Code SDK imports
 from claude_code_sdk import ClaudeSDKClient, ClaudeCodeOptions
@@ -80,6 +92,7 @@ MODEL_MAPPING = {
 class CLIType(str, Enum):
     CLAUDE = "claude"
     CURSOR = "cursor"
+    REPLAY = "replay"  # Recorded transcripts, for offline runs and benchmarks
 
 
 class BaseCLI(ABC):
@@ -640,158 +653,11 @@ node_modules/
                     await client.query(instruction)
                     
                     # Stream responses and extract session_id
-                    claude_session_id = None
-                    
-                    async for message_obj in client.receive_messages():
-                        
-                        # Import SDK types for isinstance checks
-                        try:
-                            from anthropic.claude_code.types import SystemMessage, AssistantMessage, UserMessage, ResultMessage
-                        except ImportError:
-                            try:
-                                from claude_code_sdk.types import SystemMessage, AssistantMessage, UserMessage, ResultMessage
-                            except ImportError:
-                                # Fallback - check type name strings
-                                SystemMessage = type(None)
-                                AssistantMessage = type(None)
-                                UserMessage = type(None)
-                                ResultMessage = type(None)
-                        
-                        # Handle SystemMessage for session_id extraction
-                        if (isinstance(message_obj, SystemMessage) or 
-                            'SystemMessage' in str(type(message_obj))):
-                            # Extract session_id if available
-                            if hasattr(message_obj, 'session_id') and message_obj.session_id:
-                                claude_session_id = message_obj.session_id
-                                await self.set_session_id(project_id, claude_session_id)
-                            
-                            # Send init message (hidden from UI)
-                            init_message = Message(
-                                id=str(uuid.uuid4()),
-                                project_id=project_path,
-                                role="system",
-                                message_type="system",
-                                content=f"Claude Code SDK initialized (Model: {cli_model})",
-                                metadata_json={
-                                    "cli_type": self.cli_type.value,
-                                    "mode": "SDK",
-                                    "model": cli_model,
-                                    "session_id": getattr(message_obj, 'session_id', None),
-                                    "hidden_from_ui": True
-                                },
-                                session_id=session_id,
-                                created_at=datetime.utcnow()
-                            )
-                            yield init_message
-                        
-                        # Handle AssistantMessage (complete messages)
-                        elif (isinstance(message_obj, AssistantMessage) or 
-                              'AssistantMessage' in str(type(message_obj))):
-                            
-                            content = ""
-                            
-                            # Process content - AssistantMessage has content: list[ContentBlock]
-                            if hasattr(message_obj, 'content') and isinstance(message_obj.content, list):
-                                for block in message_obj.content:
-                                    
-                                    # Import block types for comparison
-                                    from claude_code_sdk.types import TextBlock, ToolUseBlock, ToolResultBlock
-                                    
-                                    if isinstance(block, TextBlock):
-                                        # TextBlock has 'text' attribute
-                                        content += block.text
-                                    elif isinstance(block, ToolUseBlock):
-                                        # ToolUseBlock has 'id', 'name', 'input' attributes
-                                        tool_name = block.name
-                                        tool_input = block.input
-                                        tool_id = block.id
-                                        summary = self._create_tool_summary(tool_name, tool_input)
-                                            
-                                        # Yield tool use message immediately
-                                        tool_message = Message(
-                                            id=str(uuid.uuid4()),
-                                            project_id=project_path,
-                                            role="assistant",
-                                            message_type="tool_use",
-                                            content=summary,
-                                            metadata_json={
-                                                "cli_type": self.cli_type.value,
-                                                "mode": "SDK",
-                                                "tool_name": tool_name,
-                                                "tool_input": tool_input,
-                                                "tool_id": tool_id
-                                            },
-                                            session_id=session_id,
-                                            created_at=datetime.utcnow()
-                                        )
-                                        # Display clean tool usage like Claude Code
-                                        tool_display = self._get_clean_tool_display(tool_name, tool_input)
-                                        ui.info(tool_display, "")
-                                        yield tool_message
-                                    elif isinstance(block, ToolResultBlock):
-                                        # Handle tool result blocks if needed
-                                        pass
-                            
-                            # Yield complete assistant text message if there's text content
-                            if content and content.strip():
-                                text_message = Message(
-                                    id=str(uuid.uuid4()),
-                                    project_id=project_path,
-                                    role="assistant",
-                                    message_type="chat",
-                                    content=content.strip(),
-                                    metadata_json={
-                                        "cli_type": self.cli_type.value,
-                                        "mode": "SDK"
-                                    },
-                                    session_id=session_id,
-                                    created_at=datetime.utcnow()
-                                )
-                                yield text_message
-                        
-                        # Handle UserMessage (tool results, etc.)
-                        elif (isinstance(message_obj, UserMessage) or 
-                              'UserMessage' in str(type(message_obj))):
-                            # UserMessage has content: str according to types.py
-                            # UserMessages are typically tool results - we don't need to show them
-                            pass
-                        
-                        # Handle ResultMessage (final session completion)
-                        elif (
-                            isinstance(message_obj, ResultMessage) or
-                            'ResultMessage' in str(type(message_obj)) or
-                            (hasattr(message_obj, 'type') and getattr(message_obj, 'type', None) == 'result')
-                        ):
-                            ui.success(f"Session completed in {getattr(message_obj, 'duration_ms', 0)}ms", "Claude SDK")
-                            
-                            # Create internal result message (hidden from UI)
-                            result_message = Message(
-                                id=str(uuid.uuid4()),
-                                project_id=project_path,
-                                role="system",
-                                message_type="result",
-                                content=f"Session completed in {getattr(message_obj, 'duration_ms', 0)}ms",
-                                metadata_json={
-                                    "cli_type": self.cli_type.value,
-                                    "mode": "SDK",
-                                    "duration_ms": getattr(message_obj, 'duration_ms', 0),
-                                    "duration_api_ms": getattr(message_obj, 'duration_api_ms', 0),
-                                    "total_cost_usd": getattr(message_obj, 'total_cost_usd', 0),
-                                    "num_turns": getattr(message_obj, 'num_turns', 0),
-                                    "is_error": getattr(message_obj, 'is_error', False),
-                                    "subtype": getattr(message_obj, 'subtype', None),
-                                    "session_id": getattr(message_obj, 'session_id', None),
-                                    "hidden_from_ui": True  # Don't show to user
-                                },
-                                session_id=session_id,
-                                created_at=datetime.utcnow()
-                            )
-                            yield result_message
-                            break
-                        
-                        # Handle unknown message types
-                        else:
-                            ui.debug(f"Unknown message type: {type(message_obj)}", "Claude SDK")
+                    messages = record_stream(client.receive_messages(), "claude", TRANSCRIPT_SDK)
+                    async for message in self._stream_sdk_messages(
+                        messages, project_path, project_id, session_id, cli_model
+                    ):
+                        yield message
             
             finally:
                 # Restore original working directory
@@ -804,6 +670,40 @@ node_modules/
             raise
     
     
+    async def _stream_sdk_messages(
+        self,
+        messages: AsyncIterator[Any],
+        project_path: str,
+        project_id: str,
+        session_id: Optional[str],
+        cli_model: str
+    ) -> AsyncGenerator[Message, None]:
+        """Decode SDK messages into messages until the result message, storing the session id"""
+        decoder = ClaudeStreamDecoder(self, project_path, session_id, cli_model)
+        
+        async for message_obj in messages:
+            kind, decoded = decoder.decode(message_obj)
+            
+            if kind is None:
+                ui.debug(f"Unknown message type: {type(message_obj)}", "Claude SDK")
+                continue
+            
+            # Extract session_id from the init message
+            if kind == "system" and getattr(message_obj, 'session_id', None):
+                await self.set_session_id(project_id, message_obj.session_id)
+            elif kind == "result":
+                ui.success(f"Session completed in {getattr(message_obj, 'duration_ms', 0)}ms", "Claude SDK")
+            
+            for message in decoded:
+                if message.message_type == "tool_use":
+                    # Display clean tool usage like Claude Code
+                    metadata = message.metadata_json
+                    ui.info(self._get_clean_tool_display(metadata["tool_name"], metadata["tool_input"]), "")
+                yield message
+            
+            if kind == "result":
+                break
+    
     async def get_session_id(self, project_id: str) -> Optional[str]:
         """Get current session ID for project from database"""
         try:
@@ -873,143 +773,6 @@ class CursorAgentCLI(BaseCLI):
                 "error": f"Failed to check Cursor Agent: {str(e)}\n\nTo install:\n1. Install Cursor: curl https://cursor.com/install -fsS | bash\n2. Login to Cursor: cursor-agent login"
             }
     
-    def _handle_cursor_stream_json(self, event: Dict[str, Any], project_path: str, session_id: str) -> Optional[Message]:
-        """Handle Cursor stream-json format (NDJSON events) to be compatible with Claude Code CLI output"""
-        event_type = event.get("type")
-
-        if event_type == "system":
-            # System initialization event
-            return Message(
-                id=str(uuid.uuid4()),
-                project_id=project_path,
-                role="system",
-                message_type="system",
-                content=f"🔧 Cursor Agent initialized (Model: {event.get('model', 'unknown')})",
-                metadata_json={
-                    "cli_type": self.cli_type.value,
-                    "event_type": "system",
-                    "cwd": event.get("cwd"),
-                    "api_key_source": event.get("apiKeySource"),
-                    "original_event": event,
-                    "hidden_from_ui": True  # Hide system init messages
-                },
-                session_id=session_id,
-                created_at=datetime.utcnow()
-            )
-
-        elif event_type == "user":
-            # Cursor echoes back the user's prompt. Suppress it to avoid duplicates.
-            return None
-
-        elif event_type == "assistant":
-            # Assistant response event (text delta)
-            message_content = event.get("message", {}).get("content", [])
-            content = ""
-
-            if message_content and isinstance(message_content, list):
-                for part in message_content:
-                    if part.get("type") == "text":
-                        content += part.get("text", "")
-
-            if content:
-                return Message(
-                    id=str(uuid.uuid4()),
-                    project_id=project_path,
-                    role="assistant",
-                    message_type="chat",
-                    content=content,
-                    metadata_json={
-                        "cli_type": self.cli_type.value,
-                        "event_type": "assistant",
-                        "original_event": event
-                    },
-                    session_id=session_id,
-                    created_at=datetime.utcnow()
-                )
-
-        elif event_type == "tool_call":
-            subtype = event.get("subtype")
-            tool_call_data = event.get("tool_call", {})
-            if not tool_call_data:
-                return None
-
-            tool_name_raw = next(iter(tool_call_data), None)
-            if not tool_name_raw:
-                return None
-
-            # Normalize tool name: lsToolCall -> ls
-            tool_name = tool_name_raw.replace("ToolCall", "")
-
-            if subtype == "started":
-                tool_input = tool_call_data[tool_name_raw].get("args", {})
-                summary = self._create_tool_summary(tool_name, tool_input)
-
-                return Message(
-                    id=str(uuid.uuid4()),
-                    project_id=project_path,
-                    role="assistant",
-                    message_type="chat",
-                    content=summary,
-                    metadata_json={
-                        "cli_type": self.cli_type.value,
-                        "event_type": "tool_call_started",
-                        "tool_name": tool_name,
-                        "tool_input": tool_input,
-                        "original_event": event
-                    },
-                    session_id=session_id,
-                    created_at=datetime.utcnow()
-                )
-
-            elif subtype == "completed":
-                result = tool_call_data[tool_name_raw].get("result", {})
-                content = ""
-                if "success" in result:
-                    content = json.dumps(result["success"])
-                elif "error" in result:
-                    content = json.dumps(result["error"])
-
-                return Message(
-                    id=str(uuid.uuid4()),
-                    project_id=project_path,
-                    role="system",
-                    message_type="tool_result",
-                    content=content,
-                    metadata_json={
-                        "cli_type": self.cli_type.value,
-                        "original_format": event,
-                        "tool_name": tool_name,
-                        "hidden_from_ui": True
-                    },
-                    session_id=session_id,
-                    created_at=datetime.utcnow()
-                )
-
-        elif event_type == "result":
-            # Final result event
-            duration = event.get("duration_ms", 0)
-            result_text = event.get("result", "")
-
-            if result_text:
-                return Message(
-                    id=str(uuid.uuid4()),
-                    project_id=project_path,
-                    role="system",
-                    message_type="system",
-                    content=f"Execution completed in {duration}ms. Final result: {result_text}",
-                    metadata_json={
-                        "cli_type": self.cli_type.value,
-                        "event_type": "result",
-                        "duration_ms": duration,
-                        "original_event": event,
-                        "hidden_from_ui": True
-                    },
-                    session_id=session_id,
-                    created_at=datetime.utcnow()
-                )
-
-        return None
-    
     async def _ensure_agent_md(self, project_path: str) -> None:
         """Ensure AGENT.md exists in project repo with system prompt"""
         # Determine the repo path
@@ -1047,6 +810,106 @@ class CursorAgentCLI(BaseCLI):
         except Exception as e:
             print(f"❌ [Cursor] Failed to create AGENT.md: {e}")
 
+    async def _stream_events(
+        self,
+        lines: AsyncIterator[bytes],
+        project_path: str,
+        project_id: str,
+        session_id: Optional[str],
+        active_session_id: Optional[str],
+        log_callback: Optional[Callable] = None,
+        on_result: Optional[Callable[[], None]] = None
+    ) -> AsyncGenerator[Message, None]:
+        """Decode stream-json lines into messages, tracking the Cursor session id"""
+        cursor_session_id = None
+        assistant_message_buffer: List[str] = []
+        result_received = False  # Track if we received result event
+        
+        decoder = CursorStreamDecoder(self, project_path, session_id)
+        
+        async for line in lines:
+            # Parse NDJSON events straight from bytes (orjson when installed)
+            if not line.strip():
+                continue
+            
+            try:
+                event = json_loads(line)
+                
+                event_type = event.get("type")
+                
+                # Priority: Extract session ID from type: "result" event (most reliable)
+                if event_type == "result" and not cursor_session_id:
+                    logger.debug("🔍 [Cursor] Result event received: %s", event)
+                    session_id_from_result = event.get("session_id")
+                    if session_id_from_result:
+                        cursor_session_id = session_id_from_result
+                        await self.set_session_id(project_id, cursor_session_id)
+                        print(f"💾 [Cursor] Session ID extracted from result event: {cursor_session_id}")
+                    
+                    # Mark that we received result event
+                    result_received = True
+                
+                # Extract session ID from any event that carries one
+                if not cursor_session_id:
+                    potential_session_id = decoder.extract_session_id(event)
+                    if potential_session_id and potential_session_id != active_session_id:
+                        cursor_session_id = potential_session_id
+                        await self.set_session_id(project_id, cursor_session_id)
+                        print(f"💾 [Cursor] Updated session ID for project {project_id}: {cursor_session_id}")
+                        print(f"   Previous: {active_session_id}")
+                        print(f"   New: {cursor_session_id}")
+                
+                # If we receive a non-assistant message, flush the buffer first
+                if event_type != "assistant" and assistant_message_buffer:
+                    yield build_message(
+                        project_path, "assistant", "chat", "".join(assistant_message_buffer),
+                        {"cli_type": "cursor", "event_type": "assistant_aggregated"},
+                        session_id,
+                    )
+                    assistant_message_buffer = []
+                
+                # Process the event: assistant text is buffered, anything else emitted
+                message = decoder.decode(event)
+                
+                if isinstance(message, str):
+                    assistant_message_buffer.append(message)
+                elif message:
+                    if log_callback:
+                        await log_callback(f"📝 [Cursor] {message.content}")
+                    yield message
+                
+                # ★ CRITICAL: Break after result event to end streaming
+                if result_received:
+                    print(f"🏁 [Cursor] Result event received, terminating stream early")
+                    if on_result:
+                        on_result()
+                    break
+            
+            except json.JSONDecodeError as e:
+                # Handle malformed JSON
+                line_str = line.decode(errors="replace").strip()
+                print(f"⚠️ [Cursor] JSON decode error: {e}")
+                print(f"⚠️ [Cursor] Raw line: {line_str}")
+                
+                # Still yield as raw output
+                yield build_message(
+                    project_path, "assistant", "chat", line_str,
+                    {"cli_type": "cursor", "raw_output": line_str, "parse_error": str(e)},
+                    session_id,
+                )
+        
+        # Flush any remaining content in the buffer
+        if assistant_message_buffer:
+            yield build_message(
+                project_path, "assistant", "chat", "".join(assistant_message_buffer),
+                {"cli_type": "cursor", "event_type": "assistant_aggregated"},
+                session_id,
+            )
+
+        # Log completion
+        if cursor_session_id:
+            print(f"✅ [Cursor] Session completed: {cursor_session_id}")
+
     async def execute_with_streaming(
         self,
         instruction: str,
@@ -1111,132 +974,20 @@ class CursorAgentCLI(BaseCLI):
                 cwd=project_repo_path
             )
             
-            cursor_session_id = None
-            assistant_message_buffer = ""
-            result_received = False  # Track if we received result event
-            
-            async for line in process.stdout:
-                line_str = line.decode().strip()
-                if not line_str:
-                    continue
-                    
+            def terminate():
                 try:
-                    # Parse NDJSON event
-                    event = json.loads(line_str)
-                    
-                    event_type = event.get("type")
-                    
-                    # Priority: Extract session ID from type: "result" event (most reliable)
-                    if event_type == "result" and not cursor_session_id:
-                        print(f"🔍 [Cursor] Result event received: {event}")
-                        session_id_from_result = event.get("session_id")
-                        if session_id_from_result:
-                            cursor_session_id = session_id_from_result
-                            await self.set_session_id(project_id, cursor_session_id)
-                            print(f"💾 [Cursor] Session ID extracted from result event: {cursor_session_id}")
-                        
-                        # Mark that we received result event
-                        result_received = True
-                    
-                    # Extract session ID from various event types
-                    if not cursor_session_id:
-                        # Try to extract session ID from any event that contains it
-                        potential_session_id = (
-                            event.get("sessionId") or 
-                            event.get("chatId") or 
-                            event.get("session_id") or 
-                            event.get("chat_id") or
-                            event.get("threadId") or
-                            event.get("thread_id")
-                        )
-                        
-                        # Also check in nested structures
-                        if not potential_session_id and isinstance(event.get("message"), dict):
-                            potential_session_id = (
-                                event["message"].get("sessionId") or
-                                event["message"].get("chatId") or
-                                event["message"].get("session_id") or
-                                event["message"].get("chat_id")
-                            )
-                        
-                        if potential_session_id and potential_session_id != active_session_id:
-                            cursor_session_id = potential_session_id
-                            await self.set_session_id(project_id, cursor_session_id)
-                            print(f"💾 [Cursor] Updated session ID for project {project_id}: {cursor_session_id}")
-                            print(f"   Previous: {active_session_id}")
-                            print(f"   New: {cursor_session_id}")
-                    
-                    # If we receive a non-assistant message, flush the buffer first
-                    if event.get("type") != "assistant" and assistant_message_buffer:
-                        yield Message(
-                            id=str(uuid.uuid4()),
-                            project_id=project_path,
-                            role="assistant",
-                            message_type="chat",
-                            content=assistant_message_buffer,
-                            metadata_json={"cli_type": "cursor", "event_type": "assistant_aggregated"},
-                            session_id=session_id,
-                            created_at=datetime.utcnow()
-                        )
-                        assistant_message_buffer = ""
-
-                    # Process the event
-                    message = self._handle_cursor_stream_json(event, project_path, session_id)
-                    
-                    if message:
-                        if message.role == "assistant" and message.message_type == "chat":
-                            assistant_message_buffer += message.content
-                        else:
-                            if log_callback:
-                                await log_callback(f"📝 [Cursor] {message.content}")
-                            yield message
-                    
-                    # ★ CRITICAL: Break after result event to end streaming
-                    if result_received:
-                        print(f"🏁 [Cursor] Result event received, terminating stream early")
-                        try:
-                            process.terminate()
-                            print(f"🔪 [Cursor] Process terminated")
-                        except Exception as e:
-                            print(f"⚠️ [Cursor] Failed to terminate process: {e}")
-                        break
-                    
-                except json.JSONDecodeError as e:
-                    # Handle malformed JSON
-                    print(f"⚠️ [Cursor] JSON decode error: {e}")
-                    print(f"⚠️ [Cursor] Raw line: {line_str}")
-                    
-                    # Still yield as raw output
-                    message = Message(
-                        id=str(uuid.uuid4()),
-                        project_id=project_path,
-                        role="assistant",
-                        message_type="chat",
-                        content=line_str,
-                        metadata_json={"cli_type": "cursor", "raw_output": line_str, "parse_error": str(e)},
-                        session_id=session_id,
-                        created_at=datetime.utcnow()
-                    )
-                    yield message
+                    process.terminate()
+                    print(f"🔪 [Cursor] Process terminated")
+                except Exception as e:
+                    print(f"⚠️ [Cursor] Failed to terminate process: {e}")
             
-            # Flush any remaining content in the buffer
-            if assistant_message_buffer:
-                yield Message(
-                    id=str(uuid.uuid4()),
-                    project_id=project_path,
-                    role="assistant",
-                    message_type="chat",
-                    content=assistant_message_buffer,
-                    metadata_json={"cli_type": "cursor", "event_type": "assistant_aggregated"},
-                    session_id=session_id,
-                    created_at=datetime.utcnow()
-                )
-
-            await process.wait()
+            lines = record_stream(process.stdout, "cursor", TRANSCRIPT_NDJSON)
+            async for message in self._stream_events(
+                lines, project_path, project_id, session_id, active_session_id, log_callback, on_result=terminate
+            ):
+                yield message
             
-            # Log completion
-            if cursor_session_id:
-                print(f"✅ [Cursor] Session completed: {cursor_session_id}")
+            await process.wait()
             
         except FileNotFoundError:
             error_msg = "❌ Cursor Agent CLI not found. Please install with: curl https://cursor.com/install -fsS | bash"
@@ -1287,7 +1038,7 @@ class CursorAgentCLI(BaseCLI):
                 project = self.db_session.query(Project).filter(Project.id == project_id).first()
                 if project:
                     project.active_cursor_session_id = session_id
-                    self.db_session.commit()
+                    await asyncio.to_thread(self.db_session.commit)
                     print(f"💾 [Cursor] Session ID saved to DB for project {project_id}: {session_id}")
                     return
                 else:
@@ -1307,6 +1058,82 @@ class CursorAgentCLI(BaseCLI):
 
 
 
+class ReplayCLI(BaseCLI):
+    """
+    Plays a recorded transcript back through the Claude or Cursor stream
+    loop, so the whole pipeline (persistence, WebSocket fan-out) runs
+    without an agent binary or SDK session.
+    """
+    
+    def __init__(self, transcript_path: Optional[str] = None, speed: Optional[float] = None):
+        super().__init__(CLIType.REPLAY)
+        self.transcript_path = transcript_path
+        self.speed = speed
+        # Adapters whose stream loops decode the replayed events
+        self._claude = ClaudeCodeCLI()
+        self._cursor = CursorAgentCLI()
+    
+    def _get_transcript_path(self) -> str:
+        return self.transcript_path or settings.replay_transcript
+    
+    async def check_availability(self) -> Dict[str, Any]:
+        """Available when replay is enabled and the transcript exists"""
+        if not settings.replay_cli_enabled:
+            return {
+                "available": False,
+                "configured": False,
+                "error": "Replay CLI is disabled. Set REPLAY_CLI_ENABLED=true to use recorded transcripts."
+            }
+        transcript_path = self._get_transcript_path()
+        if not transcript_path or not os.path.exists(transcript_path):
+            return {
+                "available": False,
+                "configured": False,
+                "error": f"Replay transcript not found: {transcript_path or '(REPLAY_TRANSCRIPT not set)'}"
+            }
+        return {
+            "available": True,
+            "configured": True,
+            "models": [],
+            "default_models": [],
+            "transcript": transcript_path
+        }
+    
+    async def execute_with_streaming(
+        self,
+        instruction: str,
+        project_path: str,
+        session_id: Optional[str] = None,
+        log_callback: Optional[Callable] = None,
+        images: Optional[List[Dict[str, Any]]] = None,
+        model: Optional[str] = None,
+        is_initial_prompt: bool = False
+    ) -> AsyncGenerator[Message, None]:
+        """Replay the configured transcript; the instruction is ignored"""
+        transcript_path = self._get_transcript_path()
+        transcript = load_transcript(transcript_path)
+        ui.info(f"Replaying {len(transcript.events)} {transcript.format} events from {transcript_path}", "Replay")
+        
+        project_id = project_path.rstrip("/").split("/")[-1]
+        events = replay_stream(transcript, self.speed)
+        if transcript.format == TRANSCRIPT_SDK:
+            stream = self._claude._stream_sdk_messages(
+                events, project_path, project_id, session_id, model or "replay"
+            )
+        else:
+            stream = self._cursor._stream_events(
+                events, project_path, project_id, session_id, None, log_callback
+            )
+        async for message in stream:
+            yield message
+    
+    async def get_session_id(self, project_id: str) -> Optional[str]:
+        return await self._claude.get_session_id(project_id)
+    
+    async def set_session_id(self, project_id: str, session_id: str) -> None:
+        await self._claude.set_session_id(project_id, session_id)
+
+
 class UnifiedCLIManager:
     """Unified manager for all CLI implementations"""
     
@@ -1327,7 +1154,8 @@ class UnifiedCLIManager:
         # Initialize CLI adapters with database session
         self.cli_adapters = {
             CLIType.CLAUDE: ClaudeCodeCLI(),  # Use SDK implementation if available
-            CLIType.CURSOR: CursorAgentCLI(db_session=db)
+            CLIType.CURSOR: CursorAgentCLI(db_session=db),
+            CLIType.REPLAY: ReplayCLI()
         }
     
     async def execute_instruction(
@@ -1386,7 +1214,9 @@ class UnifiedCLIManager:
         if model:
             ui.debug(f"Using model: {model}", "CLI")
         
-        messages_collected = []
+        # Count rather than keep saved messages: the session holds rows only
+        # weakly, and every commit expires each row still referenced
+        messages_saved = 0
         has_changes = False
         has_error = False  # Track if any error occurred
         result_success = None  # Track result event success status
@@ -1398,6 +1228,10 @@ class UnifiedCLIManager:
         
         message_count = 0
         
+        # End any open read transaction so no pooled connection stays checked
+        # out while waiting for the agent's first event
+        await asyncio.to_thread(self.db.commit)
+        
         async for message in cli.execute_with_streaming(
             instruction=instruction,
             project_path=self.project_path,
@@ -1424,14 +1258,11 @@ class UnifiedCLIManager:
                     is_error = original_event.get("is_error", False)
                     subtype = original_event.get("subtype", "")
                     
-                    # ★ DEBUG: Log the complete result event structure
-                    ui.info(f"🔍 [Cursor] Result event received:", "DEBUG")
-                    ui.info(f"   Full event: {original_event}", "DEBUG")
-                    ui.info(f"   is_error: {is_error}", "DEBUG")
-                    ui.info(f"   subtype: '{subtype}'", "DEBUG")
-                    ui.info(f"   has event.result: {'result' in original_event}", "DEBUG")
-                    ui.info(f"   has event.status: {'status' in original_event}", "DEBUG")
-                    ui.info(f"   has event.success: {'success' in original_event}", "DEBUG")
+                    # Full event dump only at DEBUG; formatted lazily by the log listener
+                    logger.debug(
+                        "[Cursor] Result event: is_error=%s subtype=%r event=%s",
+                        is_error, subtype, original_event
+                    )
                     
                     if is_error or subtype == "error":
                         has_error = True
@@ -1448,18 +1279,23 @@ class UnifiedCLIManager:
                             result_success = True
                             ui.success(f"Cursor result: assuming success (no error detected)", "CLI")
             
-            # Save message to database
+            # Save message to database, with large tool payloads moved to the blob store
             message.project_id = self.project_id
             message.conversation_id = self.conversation_id
-            self.db.add(message)
-            self.db.commit()
+            message.metadata_json = compact_metadata(message.metadata_json)
+            metadata = message.metadata_json
             
-            messages_collected.append(message)
+            # Check if changes were made
+            if metadata and "changes_made" in metadata:
+                has_changes = True
             
             # Check if message should be hidden from UI
-            should_hide = message.metadata_json and message.metadata_json.get("hidden_from_ui", False)
+            should_hide = metadata and metadata.get("hidden_from_ui", False)
             
-            # Send message via WebSocket only if not hidden
+            # Build the WebSocket payload before committing: reading the
+            # expired row afterwards would reload it and keep a pooled
+            # connection checked out until the next commit
+            ws_message = None
             if not should_hide:
                 ws_message = {
                     "type": "message",
@@ -1468,7 +1304,7 @@ class UnifiedCLIManager:
                         "role": message.role,
                         "message_type": message.message_type,
                         "content": message.content,
-                        "metadata": message.metadata_json,
+                        "metadata": metadata,
                         "parent_message_id": getattr(message, 'parent_message_id', None),
                         "session_id": message.session_id,
                         "conversation_id": self.conversation_id,
@@ -1476,31 +1312,40 @@ class UnifiedCLIManager:
                     },
                     "timestamp": message.created_at.isoformat()
                 }
+            
+            # Committed on a worker thread: waiting for the SQLite writer
+            # here must not stall the event loop the current writer needs
+            self.db.add(message)
+            await asyncio.to_thread(self.db.commit)
+            
+            messages_saved += 1
+            
+            # Send message via WebSocket only if not hidden
+            if ws_message:
                 try:
                     await ws_manager.send_message(self.project_id, ws_message)
                 except Exception as e:
                     ui.error(f"WebSocket send failed: {e}", "Message")
-            
-            # Check if changes were made
-            if message.metadata_json and "changes_made" in message.metadata_json:
-                has_changes = True
         
         # Determine final success status
-        # For Cursor: check result_success if available, otherwise check has_error
+        # For Cursor (and replayed Cursor transcripts): check result_success if available, otherwise check has_error
         # For Claude: check has_error
-        ui.info(f"🔍 Final success determination: cli_type={cli.cli_type}, result_success={result_success}, has_error={has_error}", "CLI")
+        logger.debug(
+            "Final success determination: cli_type=%s, result_success=%s, has_error=%s",
+            cli.cli_type, result_success, has_error
+        )
         
-        if cli.cli_type == CLIType.CURSOR and result_success is not None:
+        if cli.cli_type in (CLIType.CURSOR, CLIType.REPLAY) and result_success is not None:
             success = result_success
-            ui.info(f"Using Cursor result_success: {result_success}", "CLI")
+            logger.debug("Using Cursor result_success: %s", result_success)
         else:
             success = not has_error
-            ui.info(f"Using has_error logic: not {has_error} = {success}", "CLI")
+            logger.debug("Using has_error logic: not %s = %s", has_error, success)
         
         if success:
-            ui.success(f"Streaming completed successfully. Total messages: {len(messages_collected)}", "CLI")
+            ui.success(f"Streaming completed successfully. Total messages: {messages_saved}", "CLI")
         else:
-            ui.error(f"Streaming completed with errors. Total messages: {len(messages_collected)}", "CLI")
+            ui.error(f"Streaming completed with errors. Total messages: {messages_saved}", "CLI")
         
         return {
             "success": success,
@@ -1508,7 +1353,7 @@ class UnifiedCLIManager:
             "has_changes": has_changes,
             "message": f"{'Successfully' if success else 'Failed to'} execute with {cli.cli_type.value}",
             "error": "Execution failed" if not success else None,
-            "messages_count": len(messages_collected)
+            "messages_count": messages_saved
         }
     
     async def check_cli_status(self, cli_type: CLIType, selected_model: Optional[str] = None) -> Dict[str, Any]:
@@ -0,0 +1,255 @@
+"""
+Dependency Cache Service
+Content-addressed node_modules cache shared by all generated projects
+"""
+import errno
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+
+# Tool caches written at runtime must never be shared between projects
+_EXCLUDED_DIRS = {".cache"}
+
+
+def repo_keys(repo_path: str) -> List[str]:
+    """Cache keys of a repo's package-lock.json and package.json, in that order, for the files that exist"""
+    keys = []
+    for name in ("package-lock.json", "package.json"):
+        path = os.path.join(repo_path, name)
+        if os.path.exists(path):
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            keys.append(f"{name.split('.')[0]}-{digest.hexdigest()}")
+    return keys
+
+
+def lockfile_key(repo_path: str) -> Optional[str]:
+    """
+    Cache key for a repo's dependency set.
+
+    Uses package-lock.json when present (it pins the full tree), otherwise
+    package.json. Returns None if neither exists. Take it before running
+    ``npm install``: the install writes a lockfile, which changes the key.
+    """
+    keys = repo_keys(repo_path)
+    return keys[0] if keys else None
+
+
+def _tree_size(path: str) -> int:
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hardlink a file, falling back to a copy across filesystems"""
+    try:
+        os.link(src, dst)
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+            raise
+        shutil.copy2(src, dst)
+
+
+def _link_tree(src: str, dst: str) -> None:
+    shutil.copytree(
+        src,
+        dst,
+        symlinks=True,
+        copy_function=_link_or_copy,
+        ignore=lambda _dir, names: [n for n in names if n in _EXCLUDED_DIRS],
+    )
+
+
+class DependencyCache:
+    """
+    Stores one ``node_modules`` tree per lockfile hash and materializes it into
+    projects as a hardlink farm, so identical dependency sets are installed
+    once and share disk blocks.
+
+    ``index.json`` tracks, per entry, its size, how long the original install
+    took, which repos reference it, and aggregate savings.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.root, "index.json")
+
+    def _load_index(self) -> Dict:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"entries": {}, "hits": 0, "bytes_saved": 0, "seconds_saved": 0.0}
+
+    def _save_index(self, index: Dict) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{self._index_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self._index_path)
+
+    def _entry_modules(self, key: str) -> str:
+        return os.path.join(self.root, key, "node_modules")
+
+    def materialize(self, repo_path: str) -> bool:
+        """
+        Populate ``repo_path/node_modules`` from the cache.
+
+        Returns True on a cache hit; False means the caller has to run
+        ``npm install`` (and should call :meth:`store` afterwards with the
+        :func:`lockfile_key` it took before installing).
+        """
+        key = lockfile_key(repo_path)
+        if not key:
+            return False
+
+        source = self._entry_modules(key)
+        if not os.path.isdir(source):
+            return False
+
+        target = os.path.join(repo_path, "node_modules")
+        staging = f"{target}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            _link_tree(source, staging)
+            if os.path.lexists(target):
+                shutil.rmtree(target, ignore_errors=True)
+            os.replace(staging, target)
+        except OSError as e:
+            print(f"[DependencyCache] Failed to materialize {key[:20]}... into {repo_path}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+
+        with self._lock:
+            index = self._load_index()
+            entry = index["entries"].get(key)
+            if entry is not None:
+                refs = set(entry.get("refs", []))
+                refs.add(os.path.abspath(repo_path))
+                entry["refs"] = sorted(refs)
+                entry["last_used"] = time.time()
+                index["hits"] += 1
+                index["bytes_saved"] += entry.get("size_bytes", 0)
+                index["seconds_saved"] += entry.get("install_seconds", 0.0)
+                self._save_index(index)
+
+        print(f"[DependencyCache] Reused cached node_modules ({key[:20]}...) for {repo_path}")
+        return True
+
+    def store(self, repo_path: str, install_seconds: float, key: Optional[str] = None) -> None:
+        """
+        Add a freshly installed ``node_modules`` to the cache.
+
+        ``key`` is the :func:`lockfile_key` taken before the install, i.e.
+        the key :meth:`materialize` looked up and missed. When the install
+        wrote a new package-lock.json the tree is stored under that key too,
+        so the repo (and copies of it) hit on their next start.
+        """
+        source = os.path.join(repo_path, "node_modules")
+        if not os.path.isdir(source):
+            return
+        keys = [key] if key else []
+        current = lockfile_key(repo_path)
+        if current and current not in keys:
+            keys.append(current)
+        for entry_key in keys:
+            self._store_entry(entry_key, source, repo_path, install_seconds)
+
+    def _store_entry(self, key: str, source: str, repo_path: str, install_seconds: float) -> None:
+        entry_modules = self._entry_modules(key)
+        if not os.path.isdir(entry_modules):
+            staging = os.path.join(self.root, f".{key}.{uuid.uuid4().hex[:8]}.tmp")
+            try:
+                _link_tree(source, staging)
+                os.makedirs(os.path.dirname(entry_modules), exist_ok=True)
+                os.rename(staging, entry_modules)
+            except OSError as e:
+                # Another store may have won the race; either way the staging copy goes
+                shutil.rmtree(staging, ignore_errors=True)
+                if not os.path.isdir(entry_modules):
+                    print(f"[DependencyCache] Failed to store {key[:20]}...: {e}")
+                    return
+
+        with self._lock:
+            index = self._load_index()
+            entry = index["entries"].setdefault(key, {
+                "size_bytes": _tree_size(entry_modules),
+                "install_seconds": round(install_seconds, 2),
+                "created_at": time.time(),
+                "refs": [],
+            })
+            refs = set(entry["refs"])
+            refs.add(os.path.abspath(repo_path))
+            entry["refs"] = sorted(refs)
+            entry["last_used"] = time.time()
+            self._save_index(index)
+
+        print(f"[DependencyCache] Stored node_modules for {key[:20]}...")
+
+    def stats(self) -> Dict:
+        """Cache size and the disk space / install time avoided so far"""
+        with self._lock:
+            index = self._load_index()
+        entries = index["entries"]
+        return {
+            "entries": len(entries),
+            "cache_bytes": sum(e.get("size_bytes", 0) for e in entries.values()),
+            "references": sum(len(e.get("refs", [])) for e in entries.values()),
+            "hits": index["hits"],
+            "bytes_saved": index["bytes_saved"],
+            "seconds_saved": round(index["seconds_saved"], 2),
+        }
+
+    def gc(self, min_idle_seconds: float = 24 * 3600) -> Dict:
+        """
+        Drop references from repos that were deleted or moved to a different
+        lockfile, then delete entries that have had no references for at
+        least ``min_idle_seconds``.
+        """
+        removed = []
+        freed = 0
+        now = time.time()
+        with self._lock:
+            index = self._load_index()
+            for key, entry in list(index["entries"].items()):
+                entry["refs"] = [
+                    ref for ref in entry.get("refs", [])
+                    if os.path.isdir(ref) and key in repo_keys(ref)
+                ]
+                if entry["refs"] or now - entry.get("last_used", 0) < min_idle_seconds:
+                    continue
+                shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+                freed += entry.get("size_bytes", 0)
+                removed.append(key)
+                del index["entries"][key]
+            self._save_index(index)
+
+        # Leftover staging directories from interrupted stores
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith(".tmp"):
+                    shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+        return {"removed": removed, "bytes_freed": freed}
+
+
+dependency_cache = DependencyCache(os.path.join(settings.projects_root, ".deps-cache"))
@@ -0,0 +1,144 @@
+"""
+File Streaming Helpers
+Chunked file responses with HTTP Range, ETag revalidation and binary detection
+"""
+import os
+import re
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+
+CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def is_binary_file(path: str, sample_size: int = 8192) -> bool:
+    """Heuristic used by git: a NUL byte in the first few KB means binary"""
+    try:
+        with open(path, "rb") as f:
+            return b"\0" in f.read(sample_size)
+    except OSError:
+        return False
+
+
+def parse_range(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=start-end`` range into an inclusive ``(start, end)``.
+
+    Returns None when there is no usable Range header (serve the whole file)
+    and raises 416 when the range cannot be satisfied. Multi-range requests
+    are answered with the full file.
+    """
+    if not range_header:
+        return None
+    match = _RANGE_RE.match(range_header.strip())
+    if not match:
+        return None
+    start_s, end_s = match.groups()
+    if not start_s and not end_s:
+        return None
+    if not start_s:
+        # Suffix range: last N bytes
+        length = int(end_s)
+        if length == 0:
+            raise HTTPException(status_code=416, detail="Range not satisfiable",
+                                headers={"Content-Range": f"bytes */{file_size}"})
+        start, end = max(0, file_size - length), file_size - 1
+    else:
+        start = int(start_s)
+        end = int(end_s) if end_s else file_size - 1
+        end = min(end, file_size - 1)
+    if start >= file_size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable",
+                            headers={"Content-Range": f"bytes */{file_size}"})
+    return start, end
+
+
+def file_etag(path: str) -> str:
+    """Strong validator from size and modification time, for files that may change in place"""
+    stat = os.stat(path)
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` list contains ``etag`` (weak comparison) or is ``*``"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def content_disposition(filename: str, disposition: str = "attachment") -> str:
+    """``Content-Disposition`` value, RFC 5987-encoded when the name is not plain ASCII"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+
+def iter_file(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """Yield a file's bytes from ``start`` to ``end`` (inclusive) in fixed-size chunks"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = None if end is None else end - start + 1
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def ranged_file_response(
+    path: str,
+    range_header: Optional[str],
+    media_type: str = "application/octet-stream",
+    headers: Optional[Dict[str, str]] = None,
+    etag: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+    if_range: Optional[str] = None,
+) -> Response:
+    """
+    Stream a file, answering ``Range`` requests with 206 Partial Content.
+
+    With an ``etag``, a matching ``If-None-Match`` gets 304 Not Modified and
+    a ``Range`` is only honoured when ``If-Range`` is absent or still equals
+    the ETag, so a resumed download never mixes two versions of a file.
+    """
+    response_headers = {"Accept-Ranges": "bytes"}
+    response_headers.update(headers or {})
+    if etag:
+        response_headers["ETag"] = etag
+        if etag_matches(if_none_match, etag):
+            response_headers.pop("Content-Disposition", None)
+            return Response(status_code=304, headers=response_headers)
+        if if_range and if_range.strip() != etag:
+            range_header = None
+
+    file_size = os.path.getsize(path)
+    byte_range = parse_range(range_header, file_size)
+    if byte_range is None:
+        response_headers["Content-Length"] = str(file_size)
+        return StreamingResponse(iter_file(path), media_type=media_type, headers=response_headers)
+
+    start, end = byte_range
+    response_headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    response_headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file(path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=response_headers,
+    )
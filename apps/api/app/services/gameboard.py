@@ -0,0 +1,306 @@
+"""
+Gameboard Engine
+Server-side dice rolls and the board position state machine over cached station tables
+"""
+import logging
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Success chance (%) by skill level; level 1 keeps the 50% the PWA used to send
+SUCCESS_CHANCE_BY_LEVEL = (0, 50, 60, 70, 80, 90)
+MAX_SKILL_LEVEL = len(SUCCESS_CHANCE_BY_LEVEL) - 1
+# Per-roll rewards: skill_level * 10 + 5..15 XP and 1..5 gold on success,
+# plus a bonus from VETERAN_SKILL_LEVEL; 1..5 consolation XP on a miss
+VETERAN_SKILL_LEVEL = 3
+VETERAN_BONUS_XP = 10
+VETERAN_BONUS_GOLD = 2
+XP_PER_LEVEL = 200
+# Compare-and-set attempts before a contended move is reported as a conflict,
+# with a random pause of up to attempt * WRITE_RETRY_JITTER seconds between them
+MAX_WRITE_ATTEMPTS = 5
+WRITE_RETRY_JITTER = 0.05
+
+# Board used when the gameboard_stations table is unavailable (same content
+# as database/update_correct_game_data.sql, without the narratives)
+DEFAULT_STATIONS: Tuple[Dict[str, Any], ...] = (
+    {"id": 1, "name": "Saddledome Challenge", "description": "Primary venue for ice hockey and figure skating with ticket bidding war", "required_skill": "Strength", "completion_reward_xp": 750, "position_x": 15, "position_y": 15},
+    {"id": 2, "name": "McMahon Stadium", "description": "Closing ceremony tickets and volunteer scalping situation", "required_skill": "Strength", "completion_reward_xp": 500, "position_x": 25, "position_y": 25},
+    {"id": 3, "name": "Nakiska Ski Venue Downhill Course", "description": "Controversial venue with snow machine debate", "required_skill": "Climbing", "completion_reward_xp": 500, "position_x": 35, "position_y": 35},
+    {"id": 4, "name": "Winsport Ski Jumping", "description": "Chinook winds threatening to delay the jumping event", "required_skill": "Speed", "completion_reward_xp": 750, "position_x": 45, "position_y": 45},
+    {"id": 5, "name": "Canmore Nordic Centre Cross Country", "description": "Mass start 50km event with broken pole dilemma", "required_skill": "Endurance", "completion_reward_xp": 750, "position_x": 55, "position_y": 55},
+    {"id": 6, "name": "Canmore Nordic Centre Biathlon", "description": "Poor Canadian performance and media attention dilemma", "required_skill": "Endurance", "completion_reward_xp": 500, "position_x": 65, "position_y": 65},
+    {"id": 7, "name": "Olympic Oval Short Track Event", "description": "Ice surface specifications controversy", "required_skill": "Speed", "completion_reward_xp": 750, "position_x": 75, "position_y": 75},
+    {"id": 8, "name": "Olympic Oval Long Track Event", "description": "World record ice and scheduling conflicts", "required_skill": "Endurance", "completion_reward_xp": 750, "position_x": 85, "position_y": 85},
+    {"id": 9, "name": "Ski Jumping", "description": "Eddie the Eagle and Todd Gilman media crisis", "required_skill": "Climbing", "completion_reward_xp": 500, "position_x": 95, "position_y": 95},
+    {"id": 10, "name": "Luge", "description": "East German doping rumors and media interview", "required_skill": "Speed", "completion_reward_xp": 500, "position_x": 105, "position_y": 105},
+    {"id": 11, "name": "Figure Skating", "description": "Brian Orser vs Brian Boitano controversy and technical scoring", "required_skill": "Strength", "completion_reward_xp": 500, "position_x": 115, "position_y": 115},
+)
+
+
+class PlayerStatsNotFound(LookupError):
+    """The student has no player_stats row"""
+
+
+class GameboardConflict(Exception):
+    """The stats row kept changing underneath the move; nothing was applied"""
+
+
+@dataclass(frozen=True)
+class Station:
+    id: int
+    name: str
+    description: str
+    narrative: str
+    # player_skills column the roll is made against (lower case)
+    skill: str
+    completion_reward_xp: int
+    position_x: int
+    position_y: int
+
+    def success_chance(self, skill_level: int) -> int:
+        return SUCCESS_CHANCE_BY_LEVEL[max(1, min(MAX_SKILL_LEVEL, skill_level))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "narrative": self.narrative,
+            "skill_required": self.skill,
+            "min_level": 1,
+            "xp_reward": self.completion_reward_xp,
+            "position": {"x": self.position_x, "y": self.position_y},
+            "success_chance_by_level": list(SUCCESS_CHANCE_BY_LEVEL[1:]),
+        }
+
+
+@dataclass(frozen=True)
+class StationTable:
+    """The board in position order; position N is ``stations[N - 1]``"""
+    stations: Tuple[Station, ...]
+
+    @property
+    def last_position(self) -> int:
+        return len(self.stations)
+
+    def at(self, position: int) -> Station:
+        return self.stations[max(1, min(self.last_position, position)) - 1]
+
+
+@dataclass
+class MoveOutcome:
+    move: int
+    station_id: int
+    station_name: str
+    skill: str
+    skill_level: int
+    success_chance: int
+    roll_result: int
+    was_successful: bool
+    xp_gained: int
+    gold_gained: int
+    position_before: int
+    position_after: int
+
+
+@dataclass
+class MovesResult:
+    outcomes: List[MoveOutcome] = field(default_factory=list)
+    # player_stats columns after the moves (empty when none were made)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def xp_gained(self) -> int:
+        return sum(o.xp_gained for o in self.outcomes)
+
+    @property
+    def gold_gained(self) -> int:
+        return sum(o.gold_gained for o in self.outcomes)
+
+    def moves(self) -> List[Dict[str, Any]]:
+        return [asdict(o) for o in self.outcomes]
+
+
+def _station_from_row(row: Dict[str, Any]) -> Station:
+    return Station(
+        id=int(row["id"]),
+        name=row.get("name") or f"Station {row['id']}",
+        description=row.get("description") or "",
+        narrative=row.get("narrative") or "",
+        skill=(row.get("required_skill") or "strength").lower(),
+        completion_reward_xp=int(row.get("completion_reward_xp") or 0),
+        position_x=int(row.get("position_x") or 0),
+        position_y=int(row.get("position_y") or 0),
+    )
+
+
+def _load_stations() -> StationTable:
+    rows: List[Dict[str, Any]] = []
+    try:
+        from app.core.supabase_client import get_supabase_auth_client
+
+        rows = get_supabase_auth_client().table('gameboard_stations').select('*').order('id').execute().data or []
+    except Exception as e:
+        logger.warning("Gameboard stations could not be loaded, using the built-in board: %s", e)
+    if not rows:
+        rows = list(DEFAULT_STATIONS)
+    return StationTable(tuple(_station_from_row(row) for row in rows))
+
+
+_table: Optional[StationTable] = None
+_table_loaded_at = 0.0
+_table_lock = threading.Lock()
+
+
+def station_table() -> StationTable:
+    """The cached board, reloaded after ``gameboard_station_cache_ttl`` seconds (0 = never)"""
+    global _table, _table_loaded_at
+    ttl = settings.gameboard_station_cache_ttl
+    if _table is not None and (ttl <= 0 or time.monotonic() - _table_loaded_at < ttl):
+        return _table
+    with _table_lock:
+        if _table is None or (ttl > 0 and time.monotonic() - _table_loaded_at >= ttl):
+            _table = _load_stations()
+            _table_loaded_at = time.monotonic()
+    return _table
+
+
+_system_rng = random.SystemRandom()
+
+
+def resolve_moves(
+    stats: Dict[str, Any],
+    skills: Dict[str, Any],
+    count: int,
+    table: Optional[StationTable] = None,
+    rng: Optional[random.Random] = None,
+) -> MovesResult:
+    """
+    Play up to ``count`` moves from ``stats`` (a player_stats row) without
+    any I/O.
+
+    Each move spends one gameboard move and rolls 1-100 at the station on
+    the player's position against the success chance of their level in
+    the station's skill. A success advances the position (the last station
+    is the end of the board) and pays the skill-based reward; a miss stays
+    put and pays consolation XP. Stops early when the moves run out.
+    """
+    table = table or station_table()
+    rng = rng or _system_rng
+    moves = int(stats.get('gameboard_moves') or 0)
+    position = max(1, min(table.last_position, int(stats.get('gameboard_position') or 1)))
+    result = MovesResult()
+
+    for move in range(1, min(count, moves) + 1):
+        station = table.at(position)
+        skill_level = max(1, min(MAX_SKILL_LEVEL, int(skills.get(station.skill) or 1)))
+        chance = station.success_chance(skill_level)
+        roll = rng.randint(1, 100)
+        success = roll <= chance
+        if success:
+            xp = skill_level * 10 + rng.randint(5, 15)
+            gold = rng.randint(1, 5)
+            if skill_level >= VETERAN_SKILL_LEVEL:
+                xp += VETERAN_BONUS_XP
+                gold += VETERAN_BONUS_GOLD
+            next_position = min(table.last_position, position + 1)
+        else:
+            xp = rng.randint(1, 5)
+            gold = 0
+            next_position = position
+        result.outcomes.append(MoveOutcome(
+            move=move, station_id=station.id, station_name=station.name, skill=station.skill,
+            skill_level=skill_level, success_chance=chance, roll_result=roll, was_successful=success,
+            xp_gained=xp, gold_gained=gold, position_before=position, position_after=next_position,
+        ))
+        position = next_position
+
+    if result.outcomes:
+        total_xp = int(stats.get('total_xp') or 0) + result.xp_gained
+        result.stats = {
+            "gameboard_moves": moves - len(result.outcomes),
+            "gameboard_position": position,
+            "total_xp": total_xp,
+            "current_xp": int(stats.get('current_xp') or 0) + result.xp_gained,
+            "current_level": max(1, total_xp // XP_PER_LEVEL + 1),
+            "gold": int(stats.get('gold') or 0) + result.gold_gained,
+            "gameboard_xp": int(stats.get('gameboard_xp') or 0) + result.xp_gained,
+        }
+    return result
+
+
+def _load_skills(client, user_id: str) -> Dict[str, Any]:
+    """The student's player_skills row; every skill is level 1 without one"""
+    try:
+        rows = client.table('player_skills').select('*').eq('user_id', user_id).execute().data
+    except Exception as e:
+        logger.warning("Player skills for %s could not be loaded, using level 1: %s", user_id, e)
+        return {}
+    return rows[0] if rows else {}
+
+
+def play_moves(user_id: str, count: int, client=None, rng: Optional[random.Random] = None) -> MovesResult:
+    """
+    Resolve ``count`` moves for a student and apply them in one write.
+
+    The player_stats update is a compare-and-set on the moves, position and
+    ``updated_at`` that were read, so concurrent rolls (or an admin award
+    landing mid-roll) cannot spend the same move twice or lose an update;
+    on a conflict the moves are re-resolved from the fresh row. The XP
+    entries for the moves are queued on the XP event log.
+    """
+    from app.services.xp_events import xp_event_log
+
+    if client is None:
+        from app.core.supabase_client import get_supabase_auth_client
+
+        client = get_supabase_auth_client()
+    table = station_table()
+    skills = _load_skills(client, user_id)
+
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        if attempt:
+            time.sleep(random.uniform(0, attempt * WRITE_RETRY_JITTER))
+        rows = client.table('player_stats').select('*').eq('user_id', user_id).execute().data
+        if not rows:
+            raise PlayerStatsNotFound(user_id)
+        stats = rows[0]
+        result = resolve_moves(stats, skills, count, table, rng)
+        if not result.outcomes:
+            return result
+
+        update = client.table('player_stats').update(
+            {**result.stats, "updated_at": datetime.utcnow().isoformat()}
+        ).eq('user_id', user_id)
+        for column in ('gameboard_moves', 'gameboard_position', 'updated_at'):
+            value = stats.get(column)
+            update = update.is_(column, 'null') if value is None else update.eq(column, value)
+        if not update.execute().data:
+            continue
+
+        now = datetime.utcnow().isoformat()
+        for outcome in result.outcomes:
+            if outcome.xp_gained > 0:
+                xp_event_log.record({
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "assignment_id": None,
+                    "assignment_name": f"Gameboard Station {outcome.station_id}",
+                    "unit_id": None,
+                    "xp_amount": outcome.xp_gained,
+                    "awarded_by": user_id,  # Self-awarded through gameplay
+                    "description": f"Dice roll reward - {'Success' if outcome.was_successful else 'Attempt'}",
+                    "created_at": now,
+                })
+        return result
+
+    raise GameboardConflict(user_id)
@@ -1,16 +1,21 @@
+import asyncio
+import re
 import subprocess
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional
 import os
 
 
+_LOG_FORMAT = "%H%x01%P%x01%an%x01%ad%x01%s"
+_FULL_SHA = re.compile(r"^[0-9a-f]{40}$")
+
+
 def _run(cmd: list[str], cwd: str) -> str:
     res = subprocess.run(cmd, cwd=cwd, check=True, capture_output=True, text=True)
     return res.stdout.strip()
 
 
-def list_commits(repo_path: str, limit: int = 50) -> list[dict]:
-    fmt = "%H%x01%P%x01%an%x01%ad%x01%s"
-    out = _run(["git", "log", f"-n{limit}", f"--pretty=format:{fmt}", "--date=iso"], cwd=repo_path)
+def _parse_log(out: str) -> list[dict]:
     commits: list[dict] = []
     if not out:
         return commits
@@ -26,6 +31,11 @@ def list_commits(repo_path: str, limit: int = 50) -> list[dict]:
     return commits
 
 
+def list_commits(repo_path: str, limit: int = 50) -> list[dict]:
+    out = _run(["git", "log", f"-n{limit}", f"--pretty=format:{_LOG_FORMAT}", "--date=iso"], cwd=repo_path)
+    return _parse_log(out)
+
+
 def show_diff(repo_path: str, commit_sha: str) -> str:
     return _run(["git", "show", "--format=", commit_sha], cwd=repo_path)
 
@@ -171,3 +181,317 @@ def commit_all(repo_path: str, message: str) -> dict:
             "error": str(e),
             "message": message
         }
+
+
+# ---------------------------------------------------------------------------
+# Async git service
+#
+# The functions above block the event loop when called from async routes.
+# The async variants below run git through asyncio subprocesses, serialize
+# mutating operations per repository, and cache immutable objects (diffs and
+# commit lists below a known HEAD) by SHA.
+# ---------------------------------------------------------------------------
+
+class _LRUCache:
+    """Small LRU map used for immutable git objects"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+_diff_cache = _LRUCache(256)
+_log_cache = _LRUCache(512)
+_repo_locks: Dict[str, asyncio.Lock] = {}
+
+
+def repo_lock(repo_path: str) -> asyncio.Lock:
+    """Per-repository lock serializing operations that write to the repo"""
+    key = os.path.realpath(repo_path)
+    lock = _repo_locks.get(key)
+    if lock is None:
+        lock = _repo_locks[key] = asyncio.Lock()
+    return lock
+
+
+async def _run_async(cmd: list[str], cwd: str) -> str:
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(
+            proc.returncode, cmd,
+            output=stdout.decode("utf-8", errors="replace"),
+            stderr=stderr.decode("utf-8", errors="replace"),
+        )
+    return stdout.decode("utf-8", errors="replace").strip()
+
+
+async def resolve_commit_async(repo_path: str, commit_sha: str) -> Optional[str]:
+    """Full SHA of ``commit_sha`` if it names a commit in the repo, else None"""
+    if not commit_sha or commit_sha.startswith("-"):
+        return None
+    try:
+        return await _run_async(["git", "rev-parse", "--verify", "--quiet", f"{commit_sha}^{{commit}}"], cwd=repo_path)
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+
+async def current_head_async(repo_path: str) -> str:
+    return await _run_async(["git", "rev-parse", "HEAD"], cwd=repo_path)
+
+
+async def list_commits_async(repo_path: str, limit: int = 50, skip: int = 0) -> list[dict]:
+    """
+    Paginated ``git log`` starting at HEAD.
+
+    A page is immutable once HEAD is known, so pages are cached by
+    ``(HEAD sha, skip, limit)``; a new commit simply produces new keys.
+    """
+    try:
+        head = await current_head_async(repo_path)
+    except subprocess.CalledProcessError:
+        return []  # No commits yet
+
+    key = (head, skip, limit)
+    cached = _log_cache.get(key)
+    if cached is not None:
+        return cached
+
+    out = await _run_async(
+        ["git", "log", head, f"-n{limit}", f"--skip={skip}", f"--pretty=format:{_LOG_FORMAT}", "--date=iso"],
+        cwd=repo_path,
+    )
+    commits = _parse_log(out)
+    _log_cache.put(key, commits)
+    return commits
+
+
+async def show_diff_async(repo_path: str, commit_sha: str) -> str:
+    """``git show`` for a commit; full SHAs are cached since their diff never changes"""
+    cacheable = bool(_FULL_SHA.match(commit_sha))
+    if cacheable:
+        cached = _diff_cache.get(commit_sha)
+        if cached is not None:
+            return cached
+
+    diff = await _run_async(["git", "show", "--format=", "--end-of-options", commit_sha], cwd=repo_path)
+    if cacheable:
+        _diff_cache.put(commit_sha, diff)
+    return diff
+
+
+async def hard_reset_async(repo_path: str, commit_sha: str) -> None:
+    async with repo_lock(repo_path):
+        await _run_async(["git", "reset", "--hard", commit_sha], cwd=repo_path)
+
+
+async def commit_all_async(repo_path: str, message: str) -> dict:
+    """Async version of :func:`commit_all`"""
+    async with repo_lock(repo_path):
+        try:
+            await _run_async(["git", "add", "-A"], cwd=repo_path)
+            await _run_async(["git", "commit", "-m", message], cwd=repo_path)
+            commit_sha = await current_head_async(repo_path)
+            return {
+                "success": True,
+                "commit_hash": commit_sha,
+                "message": message
+            }
+        except subprocess.CalledProcessError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": message
+            }
+
+
+async def push_to_remote_async(repo_path: str, remote_name: str = "origin", branch: str = "main") -> dict:
+    """Async version of :func:`push_to_remote`"""
+    async with repo_lock(repo_path):
+        try:
+            try:
+                result = await _run_async(["git", "push", "-u", remote_name, branch], cwd=repo_path)
+            except subprocess.CalledProcessError:
+                # Same fallback as push_to_remote for a freshly connected repo
+                result = await _run_async(["git", "push", "-u", "--force", remote_name, branch], cwd=repo_path)
+            return {
+                "success": True,
+                "output": result,
+                "remote": remote_name,
+                "branch": branch
+            }
+        except subprocess.CalledProcessError as e:
+            return {
+                "success": False,
+                "error": e.stderr if e.stderr else str(e),
+                "remote": remote_name,
+                "branch": branch
+            }
+
+
+# Per-file diff content above this size is truncated unless explicitly requested
+DIFF_FILE_MAX_BYTES = 256 * 1024
+
+_summary_cache = _LRUCache(256)
+
+
+def _parse_numstat(out: str) -> list[dict]:
+    """Parse ``git show --numstat -z`` output into per-file summaries"""
+    files: list[dict] = []
+    tokens = out.split("\0")
+    i = 0
+    while i < len(tokens):
+        token = tokens[i].lstrip("\n")
+        i += 1
+        if not token:
+            continue
+        parts = token.split("\t")
+        if len(parts) < 3:
+            continue
+        added, deleted, path = parts[0], parts[1], parts[2]
+        old_path = None
+        if path == "" and i + 1 < len(tokens):
+            # Rename/copy: the old and new paths follow as separate fields
+            old_path, path = tokens[i], tokens[i + 1]
+            i += 2
+        binary = added == "-" and deleted == "-"
+        files.append({
+            "path": path,
+            "old_path": old_path,
+            "additions": 0 if binary else int(added),
+            "deletions": 0 if binary else int(deleted),
+            "binary": binary,
+        })
+    return files
+
+
+async def diff_summary_async(repo_path: str, commit_sha: str) -> list[dict]:
+    """File-level summary of a commit: paths, additions, deletions, binary flag"""
+    cacheable = bool(_FULL_SHA.match(commit_sha))
+    if cacheable:
+        cached = _summary_cache.get(commit_sha)
+        if cached is not None:
+            return cached
+
+    out = await _run_async(["git", "show", "--format=", "--numstat", "-z", "-M", "--end-of-options", commit_sha], cwd=repo_path)
+    files = _parse_numstat(out)
+    if cacheable:
+        _summary_cache.put(commit_sha, files)
+    return files
+
+
+def _truncate_patch(patch: str, max_bytes: Optional[int]) -> dict:
+    size = len(patch.encode("utf-8"))
+    if max_bytes is not None and size > max_bytes:
+        patch = patch.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+        # Cut back to the last complete line
+        patch = patch[:patch.rfind("\n") + 1] if "\n" in patch else patch
+        return {"patch": patch, "size": size, "truncated": True}
+    return {"patch": patch, "size": size, "truncated": False}
+
+
+async def show_file_diff_async(
+    repo_path: str,
+    commit_sha: str,
+    path: str,
+    max_bytes: Optional[int] = DIFF_FILE_MAX_BYTES,
+) -> dict:
+    """
+    Patch for a single file in a commit, truncated past ``max_bytes``.
+
+    For a renamed file both paths go into the pathspec; with only the new
+    one git cannot pair it with its source and shows a whole-file add.
+    """
+    old_path = next((f["old_path"] for f in await diff_summary_async(repo_path, commit_sha) if f["path"] == path), None)
+    pathspec = [old_path, path] if old_path else [path]
+    patch = await _run_async(["git", "show", "--format=", "-M", "--end-of-options", commit_sha, "--", *pathspec], cwd=repo_path)
+    result = _truncate_patch(patch, max_bytes)
+    result["path"] = path
+    result["old_path"] = old_path
+    return result
+
+
+async def stream_diff_files(repo_path: str, commit_sha: str, max_bytes: Optional[int] = DIFF_FILE_MAX_BYTES):
+    """
+    Yield one dict per file in a commit's diff as git produces it.
+
+    Only one file's patch is held in memory at a time, and lines beyond
+    ``max_bytes`` for a file are dropped rather than buffered. Callers
+    check the commit with :func:`resolve_commit_async` first: an unknown
+    SHA yields nothing. Paths come from the commit's numstat summary (same
+    file order as the patch), since ``diff --git a/<old> b/<new>`` headers
+    cannot be split reliably when a path contains " b/".
+    """
+    try:
+        summary = await diff_summary_async(repo_path, commit_sha)
+    except subprocess.CalledProcessError:
+        return
+    proc = await asyncio.create_subprocess_exec(
+        "git", "show", "--format=", "-M", "--end-of-options", commit_sha,
+        cwd=repo_path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        limit=1024 * 1024,
+    )
+
+    def finish(index: int, lines: list[str], size: int) -> dict:
+        entry = summary[index] if index < len(summary) else {"path": None, "old_path": None}
+        patch = "".join(lines)
+        return {
+            "path": entry["path"],
+            "old_path": entry["old_path"],
+            "binary": any(line.startswith("Binary files ") for line in lines[:8]),
+            "patch": patch,
+            "size": size,
+            "truncated": max_bytes is not None and size > max_bytes,
+        }
+
+    index = -1
+    lines: list[str] = []
+    size = 0
+    try:
+        while True:
+            try:
+                raw = await proc.stdout.readline()
+            except ValueError:
+                # Single line longer than the stream limit (minified asset); skip it
+                raw = b"\n"
+            if not raw:
+                break
+            line = raw.decode("utf-8", errors="replace")
+            if line.startswith("diff --git "):
+                if index >= 0:
+                    yield finish(index, lines, size)
+                index, lines, size = index + 1, [line], len(raw)
+                continue
+            size += len(raw)
+            if max_bytes is None or size <= max_bytes:
+                lines.append(line)
+        if index >= 0:
+            yield finish(index, lines, size)
+        await proc.wait()
+    finally:
+        # Client went away mid-stream: don't leave git running
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
@@ -0,0 +1,171 @@
+"""
+Shared HTTP Clients
+Keep-alive connection pools per external provider with retry, backoff and rate-limit handling
+"""
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Delay requested by the server through ``Retry-After`` (seconds or HTTP date)"""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class PooledHTTPClient:
+    """
+    One ``httpx.AsyncClient`` per provider, shared by every service instance.
+
+    Connections are kept alive between calls so polling and repeated API
+    calls skip DNS and TLS setup. ``request`` retries 429 responses (and 5xx
+    responses or network errors for idempotent methods) with exponential
+    backoff and jitter, honouring ``Retry-After``. ``X-RateLimit-Remaining``
+    / ``X-RateLimit-Reset`` are tracked per token so that once a quota is
+    used up, further requests wait for the reset instead of failing.
+    """
+
+    def __init__(self, name: str, base_url: str):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._rate_limit_resets: Dict[str, float] = {}
+        self.stats = {"requests": 0, "retries": 0, "rate_limited_waits": 0}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(settings.http_timeout, connect=min(5.0, settings.http_timeout)),
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_connections,
+                    keepalive_expiry=60,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _track_rate_limit(self, key: str, response: httpx.Response) -> None:
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset = response.headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            if int(remaining) > 0:
+                self._rate_limit_resets.pop(key, None)
+                return
+            self._rate_limit_resets[key] = float(reset)
+        except ValueError:
+            return
+
+    async def _wait_for_rate_limit(self, key: str) -> None:
+        reset_at = self._rate_limit_resets.get(key)
+        if reset_at is None:
+            return
+        delay = reset_at - time.time()
+        if delay <= 0:
+            self._rate_limit_resets.pop(key, None)
+            return
+        if delay > settings.http_rate_limit_max_wait:
+            # Let the request through; the API answers with its own 403/429
+            return
+        self.stats["rate_limited_waits"] += 1
+        print(f"[HTTP:{self.name}] Rate limit exhausted, waiting {delay:.1f}s for reset")
+        await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = _retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, settings.http_rate_limit_max_wait)
+        return settings.http_backoff_base * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared pool; returns the final response"""
+        method = method.upper()
+        headers = kwargs.get("headers") or {}
+        key = headers.get("Authorization", "")
+        retryable = method in IDEMPOTENT_METHODS
+        max_retries = max(0, settings.http_max_retries)
+
+        attempt = 0
+        while True:
+            await self._wait_for_rate_limit(key)
+            self.stats["requests"] += 1
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                # Requests that never reached the server are safe to resend
+                # whatever the method; others only when idempotent
+                sent = not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                if attempt >= max_retries or (sent and not retryable):
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                self._track_rate_limit(key, response)
+                should_retry = response.status_code == 429 or (
+                    retryable and response.status_code in RETRY_STATUS_CODES
+                )
+                if not should_retry or attempt >= max_retries:
+                    return response
+                delay = self._backoff(attempt, response)
+                await response.aclose()
+
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+
+_clients: Dict[str, PooledHTTPClient] = {}
+
+
+def get_http_client(provider: str) -> PooledHTTPClient:
+    """Shared client for ``"github"`` or ``"vercel"``"""
+    client = _clients.get(provider)
+    if client is None:
+        base_urls = {
+            "github": settings.github_api_url,
+            "vercel": settings.vercel_api_url,
+        }
+        if provider not in base_urls:
+            raise ValueError(f"Unknown HTTP provider: {provider}")
+        client = PooledHTTPClient(provider, base_urls[provider])
+        _clients[provider] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close every shared client (application shutdown)"""
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
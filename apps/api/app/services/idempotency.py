@@ -0,0 +1,242 @@
+"""
+Idempotency Keys
+Replays the stored response when a non-idempotent request is retried with the same Idempotency-Key
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# POST endpoints (path suffixes) where a retried request must not apply twice
+IDEMPOTENT_PATHS = (
+    "/admin/award-xp",
+    "/admin/award",
+    "/admin/bulk-award",
+    "/students/gameboard/roll-dice",
+    "/students/gameboard/roll-many",
+)
+
+# Responses not stored: the request did not run (429) or may not have completed (5xx)
+_RETRYABLE_STATUS = 429
+
+
+@dataclass
+class StoredResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    expires_at: float
+    # None while the first request is still running
+    response: Optional[StoredResponse] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class IdempotencyStore:
+    """
+    In-process TTL map of idempotency key -> response.
+
+    ``begin`` claims a key for a request body fingerprint; the request's
+    response is then stored with ``complete`` (kept ``idempotency_ttl``
+    seconds) or the claim dropped with ``release`` so a retry runs again.
+    At most ``idempotency_max_keys`` keys are kept, oldest evicted first.
+    Keys live in this process only: run one worker per deployment, or
+    retries may land on a worker that has not seen the key.
+    """
+
+    NEW = "new"
+    REPLAY = "replay"
+    PENDING = "pending"
+    MISMATCH = "mismatch"
+
+    def __init__(self, ttl: Optional[float] = None, max_keys: Optional[int] = None):
+        self.ttl = settings.idempotency_ttl if ttl is None else ttl
+        self.max_keys = settings.idempotency_max_keys if max_keys is None else max_keys
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.replayed = 0
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[_Entry]]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(fingerprint, now + self.ttl)
+                self._entries[key] = entry
+                return self.NEW, entry
+            if entry.fingerprint != fingerprint:
+                return self.MISMATCH, entry
+            if entry.response is None:
+                return self.PENDING, entry
+            self.replayed += 1
+            return self.REPLAY, entry
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.response = response
+                entry.done.set()
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        # Entries are kept in insertion order, which is also expiry order
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now and len(self._entries) < self.max_keys:
+                break
+            self._entries.popitem(last=False)
+            entry.done.set()
+
+
+idempotency_store = IdempotencyStore()
+
+
+async def _send_json(send, status: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_stored(send, response: StoredResponse) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": response.status,
+        "headers": response.headers + [(REPLAYED_HEADER, b"true")],
+    })
+    await send({"type": "http.response.body", "body": response.body})
+
+
+class IdempotencyMiddleware:
+    """
+    Makes POSTs to ``paths`` safe to retry when they carry ``Idempotency-Key``.
+
+    The key is scoped to the caller and path. The caller is the user id that
+    ``token_subject`` verifies from the bearer token (the JWT ``sub``), so a
+    retry sent with a refreshed token still matches; requests without a
+    valid token pass through untouched and are rejected by the endpoint. The first
+    request runs normally and its response is stored; a retry with the same
+    key and body gets that response back (``Idempotent-Replayed: true``)
+    without running the endpoint again. A retry arriving while the first
+    is still running waits for it; reusing a key with a different body is
+    rejected with 422. Requests without the header are not affected.
+    """
+
+    def __init__(
+        self,
+        app,
+        token_subject: Callable[[str], Optional[str]],
+        paths: Tuple[str, ...] = IDEMPOTENT_PATHS,
+        store: Optional[IdempotencyStore] = None,
+    ):
+        self.app = app
+        self.token_subject = token_subject
+        self.paths = tuple(paths)
+        self.store = store or idempotency_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].endswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers", []))
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+            return
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        user_id = self.token_subject(token.strip()) if scheme.lower() == "bearer" and token.strip() else None
+        if not user_id:
+            await self.app(scope, receive, send)
+            return
+
+        # The body is needed up front for the fingerprint; these are small JSON requests
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        key = hashlib.sha256(b"\0".join([str(user_id).encode(), scope["path"].encode(), idempotency_key])).hexdigest()
+        state, entry = self.store.begin(key, hashlib.sha256(body).hexdigest())
+        if state == IdempotencyStore.PENDING:
+            try:
+                await asyncio.wait_for(entry.done.wait(), settings.idempotency_wait)
+            except asyncio.TimeoutError:
+                pass
+            state, entry = self.store.begin(key, hashlib.sha256(body).hexdigest())
+            if state == IdempotencyStore.PENDING:
+                await _send_json(send, 409, "A request with this Idempotency-Key is still being processed")
+                return
+        if state == IdempotencyStore.MISMATCH:
+            await _send_json(send, 422, "Idempotency-Key was already used with a different request body")
+            return
+        if state == IdempotencyStore.REPLAY:
+            await _send_stored(send, entry.response)
+            return
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status: Optional[int] = None
+        response_headers: List[Tuple[bytes, bytes]] = []
+        response_body: List[bytes] = []
+
+        async def capture_send(message):
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            self.store.release(key)
+            raise
+        if status is None or status >= 500 or status == _RETRYABLE_STATUS:
+            self.store.release(key)
+        else:
+            self.store.complete(key, StoredResponse(status, response_headers, b"".join(response_body)))
@@ -0,0 +1,242 @@
+"""
+Image Pipeline
+Decodes uploaded images on worker threads and renders content-addressed WebP thumbnails
+"""
+import asyncio
+import base64
+import binascii
+import io
+import mimetypes
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.services.uploads import UploadTooLarge, content_digest, store_stream
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional dependency, originals are still stored
+    Image = None
+    ImageOps = None
+
+
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+_FORMAT_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif"}
+
+
+class InvalidImage(ValueError):
+    """The upload is not a decodable image of an allowed type"""
+
+
+@dataclass
+class StoredImage:
+    sha256: str
+    url: str
+    # Thumbnail edge length (px) -> URL
+    thumbnails: Dict[int, str] = field(default_factory=dict)
+    deduplicated: bool = False
+
+
+def thumbnail_sizes() -> List[int]:
+    return sorted({int(size) for size in settings.image_thumbnail_sizes.split(",") if size.strip()})
+
+
+def _url_for(path: str) -> str:
+    relative = os.path.relpath(path, settings.image_upload_dir).replace(os.sep, "/")
+    return f"{settings.image_url_prefix.rstrip('/')}/{relative}"
+
+
+def _thumbnail_path(digest: str, size: int) -> str:
+    return os.path.join(settings.image_upload_dir, digest[:2], f"{digest}-{size}.webp")
+
+
+def thumbnail_url(url: Optional[str], size: Optional[int] = None) -> Optional[str]:
+    """
+    URL of the ``size`` px thumbnail (default ``image_avatar_size``) of an
+    image stored by this pipeline: the smallest configured size that is at
+    least ``size``. Any other URL is returned unchanged.
+    """
+    prefix = settings.image_url_prefix.rstrip("/") + "/"
+    if not url or Image is None or not url.startswith(prefix):
+        return url
+    digest = content_digest(url)
+    sizes = thumbnail_sizes()
+    if digest is None or not sizes:
+        return url
+    wanted = size or settings.image_avatar_size
+    chosen = next((s for s in sizes if s >= wanted), sizes[-1])
+    return f"{prefix}{digest[:2]}/{digest}-{chosen}.webp"
+
+
+def image_urls(url: Optional[str]) -> Optional[Dict[str, Optional[str]]]:
+    """The original URL plus every thumbnail URL, keyed ``"original"`` / ``"<size>"``"""
+    if not url:
+        return None
+    urls: Dict[str, Optional[str]] = {"original": url}
+    for size in thumbnail_sizes():
+        urls[str(size)] = thumbnail_url(url, size)
+    return urls
+
+
+def _save_webp(image, path: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".thumb-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, "WEBP", quality=settings.image_webp_quality, method=4)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _render_thumbnails(path: str, digest: str) -> Dict[int, str]:
+    """Write missing square WebP thumbnails for the stored original at ``path``"""
+    sizes = thumbnail_sizes()
+    targets = {size: _thumbnail_path(digest, size) for size in sizes}
+    missing = [size for size, target in targets.items() if not os.path.exists(target)]
+    if missing:
+        with Image.open(path) as image:
+            # Opening only reads the header; oversized images fail before decoding
+            _check_dimensions(image)
+            # JPEG: let the decoder downscale by up to 8x while decoding
+            image.draft("RGB", (max(missing) * 2, max(missing) * 2))
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info or "A" in image.mode else "RGB")
+            # Largest first; smaller sizes are resampled from the previous thumbnail
+            source = image
+            for size in sorted(missing, reverse=True):
+                source = ImageOps.fit(source, (size, size), Image.LANCZOS)
+                _save_webp(source, targets[size])
+    return {size: _url_for(target) for size, target in targets.items()}
+
+
+def _check_dimensions(image) -> None:
+    # An explicit check rather than escalating DecompressionBombWarning with
+    # warnings filters, which are process-wide and not thread-safe
+    if image.width * image.height > settings.image_max_pixels:
+        raise InvalidImage("Image dimensions are too large")
+
+
+def _upload_to_bucket(paths: List[str]) -> None:
+    """Copy stored files to image_storage_bucket under their URL path (no-op without a bucket)"""
+    if not settings.image_storage_bucket or not paths:
+        return
+    from app.core.supabase_client import get_supabase_auth_client
+
+    bucket = get_supabase_auth_client().storage.from_(settings.image_storage_bucket)
+    for path in paths:
+        relative = os.path.relpath(path, settings.image_upload_dir).replace(os.sep, "/")
+        with open(path, "rb") as f:
+            # Content-addressed, so existing objects are identical and cacheable forever
+            bucket.upload(relative, f.read(), {
+                "content-type": mimetypes.guess_type(path)[0] or "application/octet-stream",
+                "cache-control": "31536000",
+                "upsert": "true",
+            })
+
+
+def process_image(source: BinaryIO, max_bytes: Optional[int] = None, extension: str = "") -> StoredImage:
+    """
+    Store an image and its thumbnails (blocking; run on a worker thread).
+
+    The original is streamed to disk content-addressed (see
+    ``store_stream``), verified with Pillow and reduced to the configured
+    thumbnail sizes. Identical images map to the same files, so re-uploads
+    render nothing.
+    """
+    stored = store_stream(source, settings.image_upload_dir, max_bytes or settings.image_max_bytes, extension)
+    if Image is None:
+        _upload_to_bucket([] if stored.deduplicated else [stored.path])
+        return StoredImage(stored.sha256, _url_for(stored.path), {}, stored.deduplicated)
+    try:
+        with Image.open(stored.path) as probe:
+            if probe.format not in _FORMAT_EXTENSIONS:
+                raise InvalidImage(f"Unsupported image format: {probe.format}")
+            _check_dimensions(probe)
+            probe.verify()
+        new_files = [] if stored.deduplicated else [stored.path]
+        new_files += [path for path in (_thumbnail_path(stored.sha256, size) for size in thumbnail_sizes())
+                      if not os.path.exists(path)]
+        thumbnails = _render_thumbnails(stored.path, stored.sha256)
+    except Exception as e:
+        if not stored.deduplicated and os.path.exists(stored.path):
+            os.unlink(stored.path)
+        if isinstance(e, InvalidImage):
+            raise
+        if isinstance(e, Image.DecompressionBombError):
+            raise InvalidImage("Image dimensions are too large") from e
+        raise InvalidImage("File is not a valid image") from e
+    _upload_to_bucket(new_files)
+    return StoredImage(stored.sha256, _url_for(stored.path), thumbnails, stored.deduplicated)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _image_executor() -> ThreadPoolExecutor:
+    """Dedicated decode threads, so image work cannot starve the shared threadpool"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, settings.image_workers), thread_name_prefix="image")
+    return _executor
+
+
+async def save_image_upload(file: UploadFile, max_bytes: Optional[int] = None) -> StoredImage:
+    """Validate the declared type of an uploaded image and process it on a worker thread"""
+    extension = IMAGE_EXTENSIONS.get(file.content_type or "")
+    if extension is None:
+        raise InvalidImage("Invalid file type. Only JPEG, PNG, WebP, and GIF are allowed.")
+    await file.seek(0)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_image_executor(), process_image, file.file, max_bytes, extension)
+
+
+async def save_image_base64(data: str, max_bytes: Optional[int] = None) -> StoredImage:
+    """Process a base64 image (optionally a ``data:image/...;base64,`` URL) on a worker thread"""
+    limit = max_bytes or settings.image_max_bytes
+    extension = ""
+    if data.startswith("data:"):
+        header, _, data = data.partition(",")
+        extension = IMAGE_EXTENSIONS.get(header[5:].split(";")[0], "")
+        if not extension:
+            raise InvalidImage("Invalid file type. Only JPEG, PNG, WebP, and GIF are allowed.")
+    # Reject on the encoded length before decoding anything
+    if len(data) * 3 // 4 > limit + 3:
+        raise UploadTooLarge(limit)
+
+    def decode_and_process() -> StoredImage:
+        try:
+            raw = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError) as e:
+            raise InvalidImage("Invalid base64 image data") from e
+        stored_extension = extension
+        if not stored_extension and Image is not None:
+            # Bare base64 has no type; take the extension from the image header
+            try:
+                with Image.open(io.BytesIO(raw)) as probe:
+                    stored_extension = _FORMAT_EXTENSIONS.get(probe.format, "")
+            except Exception as e:
+                raise InvalidImage("File is not a valid image") from e
+        return process_image(io.BytesIO(raw), limit, stored_extension)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_image_executor(), decode_and_process)
+
+
+def shutdown_image_workers() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
@@ -1,22 +1,42 @@
 import subprocess
-import socket
 import signal
 import os
 import time
 import hashlib
 import threading
 import re
-from contextlib import closing
 from typing import Optional, Dict
 from app.core.config import settings
+from app.services.preview_logs import (
+    PreviewLogBuffer,
+    create_log_buffer,
+    get_log_buffer,
+    close_log_buffer,
+    resume_from,
+)
+from app.services.preview_ports import PreviewPortAllocator
+from app.services.dependency_cache import dependency_cache, lockfile_key
+from app.services.preview_supervisor import preview_supervisor
 
 
-# Global process registry to track running Next.js processes
+# Global process registry to track running Next.js processes; shared by API
+# requests and the preview supervisor thread, so changes go through _process_lock
 _running_processes: Dict[str, subprocess.Popen] = {}
-_process_logs: Dict[str, list] = {}  # Store process logs for each project
+# Log buffer of each registered process, closed when the process is reaped
+_process_log_buffers: Dict[str, PreviewLogBuffer] = {}
+_process_lock = threading.Lock()
+# Cached deduplicated output of get_all_preview_logs, keyed by project: (last_seq, text)
+_dedup_log_cache: Dict[str, tuple[int, str]] = {}
+# Port leases for the processes in _running_processes (reconciled with the OS on first use)
+_port_allocator = PreviewPortAllocator(settings.preview_port_start, settings.preview_port_end)
 
-def _monitor_preview_errors(project_id: str, process: subprocess.Popen):
-    """간단한 Preview 서버 에러 모니터링"""
+def _monitor_preview_errors(project_id: str, process: subprocess.Popen, log_buffer: PreviewLogBuffer):
+    """
+    간단한 Preview 서버 에러 모니터링
+
+    This thread is the only reader of the process stdout pipe; every line goes
+    into the project's log buffer, which the log APIs read from.
+    """
     from app.core.websocket.manager import manager
     import asyncio
     
@@ -81,23 +101,13 @@ def _monitor_preview_errors(project_id: str, process: subprocess.Popen):
         """에러 관련 컨텍스트 수집"""
         nonlocal current_error, error_lines
         
-        # 프로젝트별 로그 저장 (전체 로그 수집용)
-        if project_id not in _process_logs:
-            _process_logs[project_id] = []
-        
-        # 중복 로그 제거 (같은 라인이 연속으로 오는 경우)
-        stripped_line = line_text.strip()
-        if not stripped_line:  # 빈 라인 무시
-            return
-            
-        # 마지막 로그와 같은 경우 무시 (중복 제거)
-        if _process_logs[project_id] and _process_logs[project_id][-1] == stripped_line:
+        # 프로젝트별 로그 저장 (링 버퍼가 빈 라인과 연속 중복 라인을 무시)
+        if log_buffer.append(line_text.strip()) is None:
             return
-            
-        _process_logs[project_id].append(stripped_line)
-        # 최대 1000라인까지만 저장
-        if len(_process_logs[project_id]) > 1000:
-            _process_logs[project_id] = _process_logs[project_id][-1000:]
+        
+        # Dev server request log ("GET /about 200 in 12ms") counts as preview access
+        if line_text.lstrip().startswith(("GET /", "POST /", "HEAD /")):
+            preview_supervisor.touch(project_id)
         
         # 성공 패턴 감지 - 에러 상태 클리어
         for pattern in success_patterns:
@@ -178,39 +188,47 @@ def _monitor_preview_errors(project_id: str, process: subprocess.Popen):
         except Exception as e:
             print(f"[PreviewError] WebSocket 전송 실패: {e}")
     
-    while process.poll() is None:
-        try:
-            if process.stdout:
-                line = process.stdout.readline()
-                if line:
-                    line_text = line if isinstance(line, str) else line.decode('utf-8', errors='ignore')
-                    collect_error_context(line_text)
-            
-            time.sleep(0.1)
-        except Exception as e:
-            print(f"[PreviewError] 모니터링 에러: {e}")
-            break
+    try:
+        # Blocking readline until EOF; the pipe is never shared with other readers
+        for line in iter(process.stdout.readline, ""):
+            line_text = line if isinstance(line, str) else line.decode('utf-8', errors='ignore')
+            collect_error_context(line_text)
+    except Exception as e:
+        print(f"[PreviewError] 모니터링 에러: {e}")
     
     # 프로세스 종료 시 마지막 에러 전송
     if current_error and error_lines:
         send_error_with_context(current_error, error_lines)
     
+    # EOF: the server exited; log streams end once they have read the last lines
+    log_buffer.close()
+    
     print(f"[PreviewError] {project_id} 모니터링 종료")
 
 
-def _is_port_free(port: int) -> bool:
-    """Check if a port is available"""
-    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
-        sock.settimeout(0.2)
-        return sock.connect_ex(("127.0.0.1", port)) != 0
+def _unregister_process(project_id: str, process: subprocess.Popen) -> bool:
+    """
+    Remove ``process`` from the registry if it is still the one registered
+    and close its log buffer (kept readable until the next start); True if removed
+    """
+    with _process_lock:
+        if _running_processes.get(project_id) is not process:
+            return False
+        _running_processes.pop(project_id, None)
+        log_buffer = _process_log_buffers.pop(project_id, None)
+    if log_buffer:
+        log_buffer.close()
+    return True
 
 
-def find_free_preview_port() -> int:
-    """Find a free port in the preview range"""
-    for port in range(settings.preview_port_start, settings.preview_port_end + 1):
-        if _is_port_free(port):
-            return port
-    raise RuntimeError("No free preview port available")
+def get_preview_port(project_id: str) -> Optional[int]:
+    """Get the port leased to a project's preview server"""
+    return _port_allocator.get(project_id)
+
+
+def reconcile_preview_ports() -> None:
+    """Rebuild the preview port free list from the ports currently listening on this host"""
+    _port_allocator.reconcile()
 
 
 def _should_install_dependencies(repo_path: str) -> bool:
@@ -299,13 +317,11 @@ def start_preview_process(project_id: str, repo_path: str, port: Optional[int] =
     # Stop existing process if any
     stop_preview_process(project_id)
     
-    # Clear previous logs for this project
-    if project_id in _process_logs:
-        _process_logs[project_id] = []
-        print(f"[PreviewError] Cleared previous logs for {project_id}")
+    # Evict idle previews if this one would push us over budget
+    preview_supervisor.enforce(reserve=1)
     
-    # Assign port
-    port = port or find_free_preview_port()
+    # Lease port (held until stop_preview_process releases it)
+    port = _port_allocator.acquire(project_id, preferred=port)
     process_name = f"next-dev-{project_id}"
     
     # Check if project has package.json
@@ -324,8 +340,16 @@ def start_preview_process(project_id: str, repo_path: str, port: Optional[int] =
     
     try:
         # Only install dependencies if needed
-        if _should_install_dependencies(repo_path):
+        needs_install = _should_install_dependencies(repo_path)
+        # Taken before npm install writes a lockfile, so the store below uses the key looked up here
+        cache_key = lockfile_key(repo_path)
+        if needs_install and dependency_cache.materialize(repo_path):
+            # Same lockfile already installed elsewhere; hardlinked from the shared cache
+            _save_install_hash(repo_path)
+            print(f"Dependencies restored from shared cache for project {project_id}")
+        elif needs_install:
             print(f"Installing dependencies for project {project_id}...")
+            install_started = time.monotonic()
             install_result = subprocess.run(
                 ["npm", "install"],
                 cwd=repo_path,
@@ -338,8 +362,9 @@ def start_preview_process(project_id: str, repo_path: str, port: Optional[int] =
             if install_result.returncode != 0:
                 raise RuntimeError(f"npm install failed: {install_result.stderr}")
             
-            # Save hash after successful install
+            # Save hash after successful install and share the result
             _save_install_hash(repo_path)
+            dependency_cache.store(repo_path, time.monotonic() - install_started, key=cache_key)
             print(f"Dependencies installed successfully for project {project_id}")
         else:
             print(f"Dependencies already up to date for project {project_id}, skipping npm install")
@@ -364,24 +389,31 @@ def start_preview_process(project_id: str, repo_path: str, port: Optional[int] =
             stdout, _ = process.communicate()
             raise RuntimeError(f"Next.js server failed to start: {stdout}")
         
-        # Start error monitoring thread
+        # Start error monitoring thread (single capture path for process output)
+        log_buffer = create_log_buffer(project_id)
+        _dedup_log_cache.pop(project_id, None)
         error_thread = threading.Thread(
             target=_monitor_preview_errors,
-            args=(project_id, process),
+            args=(project_id, process, log_buffer),
             daemon=True
         )
         error_thread.start()
         print(f"[PreviewError] {project_id} 에러 모니터링 시작")
         
         # Store process reference
-        _running_processes[project_id] = process
+        with _process_lock:
+            _running_processes[project_id] = process
+            _process_log_buffers[project_id] = log_buffer
+        preview_supervisor.touch(project_id)
         
         print(f"Next.js dev server started for {project_id} on port {port} (PID: {process.pid})")
         return process_name, port
         
     except subprocess.TimeoutExpired:
+        _port_allocator.release(project_id)
         raise RuntimeError("npm install timed out after 2 minutes")
     except Exception as e:
+        _port_allocator.release(project_id)
         raise RuntimeError(f"Failed to start preview process: {str(e)}")
 
 
@@ -394,6 +426,7 @@ def stop_preview_process(project_id: str, cleanup_cache: bool = False) -> None:
         cleanup_cache: Whether to cleanup npm cache (optional)
     """
     process = _running_processes.get(project_id)
+    preview_supervisor.forget(project_id)
     
     if process:
         try:
@@ -414,11 +447,14 @@ def stop_preview_process(project_id: str, cleanup_cache: bool = False) -> None:
             # Process already terminated
             pass
         finally:
-            # Remove from registry
-            del _running_processes[project_id]
+            # Remove from registry and give the port back, unless a concurrent
+            # status check or the supervisor already reaped it
+            if _unregister_process(project_id, process):
+                _port_allocator.release(project_id)
             # Clear logs when process stops
-            if project_id in _process_logs:
-                del _process_logs[project_id]
+            if get_log_buffer(project_id):
+                close_log_buffer(project_id)
+                _dedup_log_cache.pop(project_id, None)
                 print(f"[PreviewStop] Cleared logs for {project_id}")
     
     # Optionally cleanup npm cache
@@ -459,19 +495,22 @@ def preview_status(project_id: str) -> str:
         return "running"
     else:
         # Process has terminated, remove from registry
-        del _running_processes[project_id]
+        if _unregister_process(project_id, process):
+            _port_allocator.release(project_id)
         return "stopped"
 
 
 def get_running_processes() -> Dict[str, int]:
     """Get all currently running processes with their PIDs"""
     active_processes = {}
-    for project_id, process in list(_running_processes.items()):
+    with _process_lock:
+        processes = list(_running_processes.items())
+    for project_id, process in processes:
         if process.poll() is None:
             active_processes[project_id] = process.pid
-        else:
+        elif _unregister_process(project_id, process):
             # Clean up terminated processes
-            del _running_processes[project_id]
+            _port_allocator.release(project_id)
     
     return active_processes
 
@@ -486,13 +525,17 @@ def get_all_preview_logs(project_id: str) -> str:
     Returns:
         String containing all stored logs
     """
-    if project_id not in _process_logs:
+    log_buffer = get_log_buffer(project_id)
+    if not log_buffer or log_buffer.last_seq == 0:
         return "No logs available for this project"
     
-    # 추가 중복 제거: 같은 에러 블록이 반복되는 경우
-    logs = _process_logs[project_id]
-    if not logs:
-        return "No logs available for this project"
+    # The deduplicated view only changes when new lines arrive
+    cached = _dedup_log_cache.get(project_id)
+    if cached and cached[0] == log_buffer.last_seq:
+        return cached[1]
+    
+    last_seq = log_buffer.last_seq
+    logs = log_buffer.lines()
     
     # 큰 중복 블록 제거 (같은 에러가 여러 번 반복되는 경우)
     unique_logs = []
@@ -504,23 +547,21 @@ def get_all_preview_logs(project_id: str) -> str:
         
         # 에러 블록이 끝나는 시점 감지 (GET 요청이나 새로운 시작)
         if line.startswith('GET /') or line.startswith('> ') or len(current_block) > 50:
-            block_str = '\n'.join(current_block)
-            block_hash = hash(block_str)
+            block_key = tuple(current_block)
             
-            if block_hash not in seen_blocks:
-                seen_blocks.add(block_hash)
+            if block_key not in seen_blocks:
+                seen_blocks.add(block_key)
                 unique_logs.extend(current_block)
             
             current_block = []
     
     # 마지막 블록 처리
-    if current_block:
-        block_str = '\n'.join(current_block)
-        block_hash = hash(block_str)
-        if block_hash not in seen_blocks:
-            unique_logs.extend(current_block)
+    if current_block and tuple(current_block) not in seen_blocks:
+        unique_logs.extend(current_block)
     
-    return '\n'.join(unique_logs) if unique_logs else "No unique logs available"
+    result = '\n'.join(unique_logs) if unique_logs else "No unique logs available"
+    _dedup_log_cache[project_id] = (last_seq, result)
+    return result
 
 def get_preview_error_logs(project_id: str) -> str:
     """
@@ -532,38 +573,16 @@ def get_preview_error_logs(project_id: str) -> str:
     Returns:
         String containing all error logs
     """
-    process = _running_processes.get(project_id)
-    
-    if not process:
+    if project_id not in _running_processes:
         return "No preview process running"
     
-    # Get all available output
-    logs = []
-    try:
-        if process.stdout and hasattr(process.stdout, 'read'):
-            # Read all available data
-            import fcntl
-            import os
-            fd = process.stdout.fileno()
-            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
-            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
-            
-            try:
-                while True:
-                    line = process.stdout.readline()
-                    if not line:
-                        break
-                    logs.append(line)
-            except (IOError, OSError):
-                pass  # No more data available
-    except Exception as e:
-        return f"Error reading logs: {str(e)}"
+    log_buffer = get_log_buffer(project_id)
+    logs = log_buffer.lines() if log_buffer else []
     
     if not logs:
         return "No error logs available"
     
-    # Join all logs and return
-    return ''.join(logs)
+    return '\n'.join(logs)
 
 def get_preview_logs(project_id: str, lines: int = 100) -> str:
     """
@@ -576,30 +595,45 @@ def get_preview_logs(project_id: str, lines: int = 100) -> str:
     Returns:
         String containing the logs
     """
-    process = _running_processes.get(project_id)
+    log_buffer = get_log_buffer(project_id)
     
-    if not process or not process.stdout:
+    if project_id not in _running_processes or not log_buffer:
         return "No logs available - process not running or no output"
     
-    # Read available output without blocking
-    logs = []
-    try:
-        # Set stdout to non-blocking mode
-        import fcntl
-        import os
-        fd = process.stdout.fileno()
-        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
-        fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
-        
-        # Read available lines
-        while len(logs) < lines:
-            line = process.stdout.readline()
-            if not line:
-                break
-            logs.append(line)
-        
-    except (IOError, OSError):
-        # No more data available
-        pass
+    entries = log_buffer.latest(lines)
+    return '\n'.join(line for _, line in entries) if entries else "No recent logs available"
+
+
+def tail_preview_logs(
+    project_id: str,
+    since: int = 0,
+    limit: Optional[int] = None,
+    epoch: Optional[str] = None
+) -> dict:
+    """
+    Get log lines newer than a cursor
     
-    return ''.join(logs[-lines:]) if logs else "No recent logs available"
\ No newline at end of file
+    Args:
+        project_id: Project identifier
+        since: Last sequence number the client has seen (0 for everything)
+        limit: Optional maximum number of lines to return (the oldest first;
+            call again with the returned cursor for the rest)
+        epoch: Epoch of the buffer ``since`` came from; a different one
+            means the preview was restarted and everything is new
+    
+    Returns:
+        Dict with the matching entries and the cursor (``epoch``, ``last_seq``)
+        to use for the next call
+    """
+    log_buffer = get_log_buffer(project_id)
+    if not log_buffer:
+        return {"entries": [], "first_seq": 0, "last_seq": since, "epoch": epoch}
+    
+    since = resume_from(log_buffer, epoch, since)
+    entries = log_buffer.tail(since, limit=limit)
+    return {
+        "entries": [{"seq": seq, "line": line} for seq, line in entries],
+        "first_seq": log_buffer.first_seq,
+        "last_seq": entries[-1][0] if entries else since,
+        "epoch": log_buffer.epoch,
+    }
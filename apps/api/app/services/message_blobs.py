@@ -0,0 +1,124 @@
+"""
+Message Blob Store
+Content-addressed, gzip-compressed storage for large tool payloads in message metadata
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+
+
+# Metadata keys that can carry whole file bodies (Write/MultiEdit inputs, raw Cursor events)
+COMPACTED_KEYS = ("tool_input", "original_event")
+MAX_PREVIEW_ITEMS = 20
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(settings.message_blob_dir, digest[:2], f"{digest}.json.gz")
+
+
+def is_valid_digest(digest: str) -> bool:
+    return bool(_DIGEST_RE.match(digest))
+
+
+def blob_digests(metadata: Optional[Dict[str, Any]]) -> Set[str]:
+    """Digests of the blobs a message's metadata references"""
+    refs = (metadata or {}).get("blobs") or {}
+    if not isinstance(refs, dict):
+        return set()
+    return {ref["sha256"] for ref in refs.values() if isinstance(ref, dict) and ref.get("sha256")}
+
+
+def put_blob(value: Any) -> Dict[str, Any]:
+    """
+    Store a JSON value and return its reference ``{"sha256", "size"}``.
+
+    The key is the SHA-256 of the canonical JSON encoding, so identical
+    payloads (the same file written twice) are stored once.
+    """
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(data, mtime=0))
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    return {"sha256": digest, "size": len(data)}
+
+
+def read_blob_compressed(digest: str) -> Optional[bytes]:
+    """Stored gzip bytes of a blob, or None if unknown"""
+    if not is_valid_digest(digest):
+        return None
+    try:
+        with open(_blob_path(digest), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def get_blob(digest: str) -> Optional[Any]:
+    compressed = read_blob_compressed(digest)
+    if compressed is None:
+        return None
+    return json.loads(gzip.decompress(compressed))
+
+
+def make_preview(value: Any, max_chars: Optional[int] = None) -> Any:
+    """Copy of ``value`` with long strings truncated and long lists shortened"""
+    if max_chars is None:
+        max_chars = settings.message_preview_chars
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars] + "…"
+    if isinstance(value, dict):
+        return {key: make_preview(item, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [make_preview(item, max_chars) for item in value[:MAX_PREVIEW_ITEMS]]
+    return value
+
+
+def compact_metadata(metadata: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Move oversized tool payloads out of message metadata.
+
+    Each payload in ``COMPACTED_KEYS`` larger than ``message_blob_threshold``
+    is stored as a blob and replaced by a truncated preview (which keeps
+    small fields such as ``file_path`` intact). ``metadata["blobs"]`` maps
+    the key to its blob reference for lazy loading of the full payload.
+    """
+    if not metadata or settings.message_blob_threshold <= 0:
+        return metadata
+
+    compacted = None
+    for key in COMPACTED_KEYS:
+        value = metadata.get(key)
+        if value is None:
+            continue
+        size = len(json.dumps(value, ensure_ascii=False, default=str))
+        if size <= settings.message_blob_threshold:
+            continue
+        try:
+            ref = put_blob(json.loads(json.dumps(value, default=str)))
+        except OSError as e:
+            print(f"[MessageBlobs] Could not store {key} payload: {e}")
+            continue
+        if compacted is None:
+            compacted = dict(metadata)
+            compacted["blobs"] = dict(metadata.get("blobs") or {})
+        compacted["blobs"][key] = ref
+        compacted[key] = make_preview(value)
+
+    return compacted if compacted is not None else metadata
@@ -0,0 +1,197 @@
+"""
+Preview Log Store
+Fixed-capacity ring buffer for preview server output with cursor-based tailing
+"""
+import os
+import threading
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class PreviewLogBuffer:
+    """
+    Ring buffer of preview log lines.
+
+    Every appended line gets a monotonically increasing sequence number, so
+    clients can ask for everything after the last ``seq`` they have seen and
+    only receive new lines. Sequence numbers restart with every buffer (one
+    per preview run), so cursors carry the buffer's ``epoch`` too. When the
+    buffer is full the oldest lines are dropped (and optionally kept in a
+    rotating spill file on disk).
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        spill_path: Optional[str] = None,
+        spill_max_bytes: int = 5 * 1024 * 1024,
+        spill_backups: int = 3,
+    ):
+        self.capacity = capacity
+        self._lines: Deque[Tuple[int, str]] = deque(maxlen=capacity)
+        self.epoch = uuid.uuid4().hex[:8]
+        self._next_seq = 1
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._spill_path = spill_path
+        self._spill_max_bytes = spill_max_bytes
+        self._spill_backups = spill_backups
+        self._spill_file = None
+        if spill_path:
+            os.makedirs(os.path.dirname(spill_path), exist_ok=True)
+            self._spill_file = open(spill_path, "a", encoding="utf-8")
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest line (0 when empty)"""
+        return self._next_seq - 1
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest line still held in memory"""
+        with self._lock:
+            return self._lines[0][0] if self._lines else self._next_seq
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def append(self, line: str) -> Optional[int]:
+        """
+        Append a line and return its sequence number.
+
+        Blank lines and immediate repeats of the previous line are skipped
+        (returns None), matching what the preview monitor always stored.
+        """
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            return None
+
+        with self._lock:
+            if self._lines and self._lines[-1][1] == line:
+                return None
+            seq = self._next_seq
+            self._next_seq += 1
+            self._lines.append((seq, line))
+            if self._spill_file:
+                self._spill(line)
+            return seq
+
+    def tail(self, since: int = 0, limit: Optional[int] = None) -> List[Tuple[int, str]]:
+        """
+        Return ``(seq, line)`` pairs with ``seq > since``, oldest first.
+
+        If ``limit`` is given at most the first ``limit`` matching lines are
+        returned; pass the last returned ``seq`` as ``since`` for the rest.
+        """
+        with self._lock:
+            if since >= self.last_seq:
+                return []
+            first = self._lines[0][0] if self._lines else self._next_seq
+            # Sequence numbers are contiguous, so the start offset is direct
+            start = max(0, since + 1 - first)
+            end = len(self._lines)
+            if limit is not None and limit >= 0:
+                end = min(end, start + limit)
+            return [self._lines[i] for i in range(start, end)]
+
+    def latest(self, limit: int) -> List[Tuple[int, str]]:
+        """Return the newest ``limit`` ``(seq, line)`` pairs, oldest first"""
+        with self._lock:
+            start = max(0, len(self._lines) - max(limit, 0))
+            return [self._lines[i] for i in range(start, len(self._lines))]
+
+    def lines(self) -> List[str]:
+        """Return all in-memory lines, oldest first"""
+        with self._lock:
+            return [line for _, line in self._lines]
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            if self._spill_file:
+                try:
+                    self._spill_file.close()
+                except OSError:
+                    pass
+                self._spill_file = None
+
+    def _spill(self, line: str) -> None:
+        """Write a line to the on-disk spill file, rotating when it gets too big"""
+        try:
+            self._spill_file.write(line + "\n")
+            self._spill_file.flush()
+            if self._spill_file.tell() >= self._spill_max_bytes:
+                self._spill_file.close()
+                for i in range(self._spill_backups - 1, 0, -1):
+                    src = f"{self._spill_path}.{i}"
+                    if os.path.exists(src):
+                        os.replace(src, f"{self._spill_path}.{i + 1}")
+                if self._spill_backups > 0:
+                    os.replace(self._spill_path, f"{self._spill_path}.1")
+                else:
+                    os.remove(self._spill_path)
+                self._spill_file = open(self._spill_path, "a", encoding="utf-8")
+        except OSError as e:
+            print(f"[PreviewLogs] Spill write failed, disabling spill: {e}")
+            self._spill_file = None
+
+
+def format_sse(seq: int, line: str, event: str = "log", epoch: Optional[str] = None) -> str:
+    """Format one log line as a Server-Sent Events frame (id is ``epoch:seq`` when given an epoch)"""
+    data = "\n".join(f"data: {part}" for part in line.split("\n"))
+    event_id = f"{epoch}:{seq}" if epoch else str(seq)
+    return f"id: {event_id}\nevent: {event}\n{data}\n\n"
+
+
+def parse_cursor(value: str) -> Optional[Tuple[Optional[str], int]]:
+    """Split an ``epoch:seq`` (or bare ``seq``) cursor; None if malformed"""
+    epoch, _, seq = value.rpartition(":")
+    if not seq.isdigit():
+        return None
+    return (epoch or None), int(seq)
+
+
+def resume_from(buffer: PreviewLogBuffer, epoch: Optional[str], since: int) -> int:
+    """
+    Sequence number to tail ``buffer`` from for a client cursor.
+
+    A cursor from another buffer (the preview was restarted) starts over at
+    0, so the new run's first lines are not skipped. Cursors without an
+    epoch only start over when they are ahead of the buffer.
+    """
+    if epoch is not None:
+        return since if epoch == buffer.epoch else 0
+    return 0 if since > buffer.last_seq else since
+
+
+# Registry of log buffers keyed by project id
+_log_buffers: Dict[str, PreviewLogBuffer] = {}
+
+
+def create_log_buffer(project_id: str) -> PreviewLogBuffer:
+    """Create a fresh buffer for a project, closing any previous one"""
+    from app.core.config import settings
+
+    close_log_buffer(project_id)
+    spill_path = None
+    if settings.preview_log_spill_dir:
+        spill_path = os.path.join(settings.preview_log_spill_dir, f"{project_id}.log")
+    buffer = PreviewLogBuffer(
+        capacity=settings.preview_log_capacity,
+        spill_path=spill_path,
+    )
+    _log_buffers[project_id] = buffer
+    return buffer
+
+
+def get_log_buffer(project_id: str) -> Optional[PreviewLogBuffer]:
+    return _log_buffers.get(project_id)
+
+
+def close_log_buffer(project_id: str) -> None:
+    buffer = _log_buffers.pop(project_id, None)
+    if buffer:
+        buffer.close()
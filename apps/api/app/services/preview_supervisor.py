@@ -0,0 +1,181 @@
+"""
+Preview Supervisor
+Tracks preview usage and stops least recently used previews when over budget
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_tree_rss(pid: int) -> int:
+    """
+    Resident memory (bytes) of every process in ``pid``'s process group.
+
+    Previews are started with ``os.setsid`` so the group id equals the npm
+    PID and covers the node/next children. Returns 0 where /proc is missing.
+    """
+    total = 0
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+            # Fields after the parenthesised command: state ppid pgrp ...
+            pgrp = int(stat.rsplit(")", 1)[1].split()[2])
+            if pgrp != pid:
+                continue
+            with open(f"/proc/{entry}/statm", "r") as f:
+                total += int(f.read().split()[1]) * _PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+class PreviewSupervisor:
+    """
+    Enforces a count and memory budget over running previews.
+
+    Access times are recorded whenever a preview is started, polled through
+    the API, or serves an HTTP request (seen in its log output). When the
+    budget is exceeded, idle previews are stopped least recently used first.
+    Evicted previews are remembered so the next status check restarts them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_access: Dict[str, float] = {}
+        self._evicted: Dict[str, dict] = {}
+        self._recent_evictions: Deque[dict] = deque(maxlen=100)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def touch(self, project_id: str) -> None:
+        self._last_access[project_id] = time.time()
+
+    def forget(self, project_id: str) -> None:
+        """Stop tracking a preview that was stopped on purpose"""
+        self._last_access.pop(project_id, None)
+        self._evicted.pop(project_id, None)
+
+    def was_evicted(self, project_id: str) -> bool:
+        return project_id in self._evicted
+
+    def clear_eviction(self, project_id: str) -> None:
+        self._evicted.pop(project_id, None)
+
+    def start(self) -> None:
+        """Start the background reaper thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.preview_reaper_interval):
+            try:
+                self.enforce()
+            except Exception as e:
+                print(f"[PreviewSupervisor] Enforcement failed: {e}")
+
+    def snapshot(self) -> List[dict]:
+        """Running previews with memory use and idle time, least recently used first"""
+        from app.services.local_runtime import get_running_processes, get_preview_port
+
+        now = time.time()
+        previews = []
+        for project_id, pid in get_running_processes().items():
+            last_access = self._last_access.setdefault(project_id, now)
+            previews.append({
+                "project_id": project_id,
+                "pid": pid,
+                "port": get_preview_port(project_id),
+                "rss_bytes": process_tree_rss(pid),
+                "last_access": last_access,
+                "idle_seconds": round(now - last_access, 1),
+            })
+        previews.sort(key=lambda p: p["last_access"])
+        return previews
+
+    def enforce(self, reserve: int = 0) -> List[dict]:
+        """
+        Stop idle previews until the budget is met.
+
+        ``reserve`` makes room for previews about to be started. Previews
+        accessed within ``preview_min_idle_seconds`` are never evicted, so the
+        budget can be exceeded temporarily when everything is in use.
+        """
+        from app.services.local_runtime import stop_preview_process
+
+        with self._lock:
+            previews = self.snapshot()
+            max_count = settings.preview_max_running
+            memory_budget = settings.preview_memory_budget_mb * 1024 * 1024
+            idle_timeout = settings.preview_idle_timeout
+
+            count = len(previews) + reserve
+            total_rss = sum(p["rss_bytes"] for p in previews)
+            evicted = []
+
+            for preview in previews:
+                over_count = max_count > 0 and count > max_count
+                over_memory = memory_budget > 0 and total_rss > memory_budget
+                timed_out = idle_timeout > 0 and preview["idle_seconds"] >= idle_timeout
+                if not (over_count or over_memory or timed_out):
+                    continue
+                if preview["idle_seconds"] < settings.preview_min_idle_seconds:
+                    continue
+
+                reason = "idle_timeout" if timed_out else ("count_budget" if over_count else "memory_budget")
+                project_id = preview["project_id"]
+                stop_preview_process(project_id)
+
+                record = {
+                    "project_id": project_id,
+                    "reason": reason,
+                    "rss_bytes": preview["rss_bytes"],
+                    "idle_seconds": preview["idle_seconds"],
+                    "evicted_at": time.time(),
+                }
+                # stop_preview_process forgets the preview; remember it as evicted
+                self._evicted[project_id] = record
+                self._recent_evictions.append(record)
+                evicted.append(record)
+                count -= 1
+                total_rss -= preview["rss_bytes"]
+                print(f"[PreviewSupervisor] Evicted {project_id} ({reason}, {preview['rss_bytes'] // (1024 * 1024)} MB, idle {preview['idle_seconds']}s)")
+
+            return evicted
+
+    def report(self) -> dict:
+        previews = self.snapshot()
+        return {
+            "budget": {
+                "max_running": settings.preview_max_running,
+                "memory_budget_mb": settings.preview_memory_budget_mb,
+                "idle_timeout_seconds": settings.preview_idle_timeout,
+                "min_idle_seconds": settings.preview_min_idle_seconds,
+            },
+            "running": previews,
+            "total_rss_bytes": sum(p["rss_bytes"] for p in previews),
+            "evicted": list(self._evicted.keys()),
+            "recent_evictions": list(self._recent_evictions),
+        }
+
+
+preview_supervisor = PreviewSupervisor()
@@ -2,6 +2,7 @@
 Project Initializer Service
 Handles project initialization, scaffolding, and setup
 """
+import asyncio
 import os
 import json
 import shutil
@@ -15,6 +16,7 @@ from app.services.filesystem import (
     init_git_repo,
     write_env_file
 )
+from app.services.project.template_pool import template_pool
 
 
 async def initialize_project(project_id: str, name: str) -> str:
@@ -38,8 +40,10 @@ async def initialize_project(project_id: str, name: str) -> str:
     ensure_dir(assets_path)
     
     try:
-        # Scaffold NextJS project using create-next-app (includes automatic git init)
-        scaffold_nextjs_minimal(project_path)
+        # Take a warm template from the pool when available, otherwise
+        # scaffold NextJS project using create-next-app (includes automatic git init)
+        if not template_pool.claim(project_path):
+            scaffold_nextjs_minimal(project_path)
         
         # CRITICAL: Force create independent git repository for each project
         # create-next-app inherits parent .git when run inside existing repo
@@ -200,7 +204,7 @@ async def parse_and_update_project_metadata(project_id: str, db_session) -> dict
                 "ai_generated": True
             }
             
-            db_session.commit()
+            await asyncio.to_thread(db_session.commit)
             ui.success(f"Updated project {project_id} with metadata", "Project")
         
         return metadata
@@ -0,0 +1,155 @@
+"""
+Template Pool Service
+Keeps pre-scaffolded, pre-installed Next.js repos ready for new projects
+"""
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+from app.services.dependency_cache import dependency_cache, lockfile_key
+from app.services.filesystem import ensure_dir, scaffold_nextjs_minimal
+
+
+READY_MARKER = ".pool_ready"
+
+
+class TemplatePool:
+    """
+    Pool of K warm Next.js templates stored under ``projects_root``.
+
+    Each slot is ``<pool_dir>/<slot-id>/repo`` with dependencies installed and
+    no git history. Claiming a slot is a single ``os.rename`` into the new
+    project's directory (same filesystem, so it is instant); the pool is then
+    topped up again by a background thread.
+    """
+
+    def __init__(self, pool_dir: str, size: int):
+        self.pool_dir = pool_dir
+        self.size = size
+        self._lock = threading.Lock()
+        self._refill_thread: Optional[threading.Thread] = None
+
+    def _ready_slots(self) -> List[str]:
+        if not os.path.isdir(self.pool_dir):
+            return []
+        slots = []
+        for name in sorted(os.listdir(self.pool_dir)):
+            slot = os.path.join(self.pool_dir, name)
+            if os.path.exists(os.path.join(slot, READY_MARKER)):
+                slots.append(slot)
+        return slots
+
+    def ready_count(self) -> int:
+        return len(self._ready_slots())
+
+    def start(self) -> None:
+        """Remove half-built slots left by a previous run and begin filling the pool"""
+        if self.size <= 0:
+            return
+        ensure_dir(self.pool_dir)
+        for name in os.listdir(self.pool_dir):
+            slot = os.path.join(self.pool_dir, name)
+            if not os.path.exists(os.path.join(slot, READY_MARKER)):
+                shutil.rmtree(slot, ignore_errors=True)
+        self.refill()
+
+    def claim(self, repo_path: str) -> bool:
+        """
+        Move a warm template into ``repo_path``.
+
+        Returns False when the pool is disabled or empty, in which case the
+        caller should scaffold from scratch.
+        """
+        if self.size <= 0:
+            return False
+
+        with self._lock:
+            for slot in self._ready_slots():
+                src = os.path.join(slot, "repo")
+                try:
+                    # rename() needs the destination to be absent or an empty directory
+                    if os.path.isdir(repo_path) and not os.listdir(repo_path):
+                        os.rmdir(repo_path)
+                    os.rename(src, repo_path)
+                except OSError as e:
+                    ui.warning(f"Failed to claim template {slot}: {e}", "TemplatePool")
+                    shutil.rmtree(slot, ignore_errors=True)
+                    continue
+                shutil.rmtree(slot, ignore_errors=True)
+                ui.success(f"Claimed warm template for {repo_path}", "TemplatePool")
+                break
+            else:
+                return False
+
+        self.refill()
+        return True
+
+    def refill(self) -> None:
+        """Top the pool up to ``size`` in a background thread (no-op if already running)"""
+        if self.size <= 0:
+            return
+        with self._lock:
+            if self._refill_thread and self._refill_thread.is_alive():
+                return
+            self._refill_thread = threading.Thread(target=self._refill_loop, daemon=True)
+            self._refill_thread.start()
+
+    def _refill_loop(self) -> None:
+        while self.ready_count() < self.size:
+            try:
+                self._build_slot()
+            except Exception as e:
+                ui.error(f"Failed to build template: {e}", "TemplatePool")
+                return
+
+    def _build_slot(self) -> None:
+        slot = os.path.join(self.pool_dir, f"slot-{uuid.uuid4().hex[:12]}")
+        repo_path = os.path.join(slot, "repo")
+        ensure_dir(slot)
+        try:
+            ui.info(f"Building warm template in {slot}", "TemplatePool")
+            scaffold_nextjs_minimal(repo_path)
+
+            # Each project gets its own history after it is claimed
+            shutil.rmtree(os.path.join(repo_path, ".git"), ignore_errors=True)
+
+            env = os.environ.copy()
+            env.update({
+                "NEXT_TELEMETRY_DISABLED": "1",
+                "NPM_CONFIG_UPDATE_NOTIFIER": "false",
+            })
+            cache_key = lockfile_key(repo_path)
+            install_started = time.monotonic()
+            result = subprocess.run(
+                ["npm", "install"],
+                cwd=repo_path,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=600
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"npm install failed: {result.stderr}")
+            dependency_cache.store(repo_path, time.monotonic() - install_started, key=cache_key)
+
+            # Lets the preview runtime skip a redundant install after claim
+            from app.services.local_runtime import _save_install_hash
+            _save_install_hash(repo_path)
+
+            open(os.path.join(slot, READY_MARKER), "w").close()
+            ui.success(f"Warm template ready ({self.ready_count()}/{self.size})", "TemplatePool")
+        except Exception:
+            shutil.rmtree(slot, ignore_errors=True)
+            raise
+
+
+template_pool = TemplatePool(
+    pool_dir=os.path.join(settings.projects_root, ".template-pool"),
+    size=settings.template_pool_size,
+)
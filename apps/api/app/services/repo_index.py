@@ -0,0 +1,320 @@
+"""
+Repository Tree Index
+In-memory, watch-invalidated index of a project repo for the file explorer
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:  # Fall back to polling directory mtimes
+    FileSystemEventHandler = object
+    Observer = None
+    WATCHDOG_AVAILABLE = False
+
+
+# Directories listed in their parent but never indexed (expanded on demand)
+IGNORED_DIRS = {"node_modules", ".next", ".git"}
+
+POLL_INTERVAL = 2.0
+# Indexes not used for this long are dropped (and rebuilt on next use)
+IDLE_TIMEOUT = 600.0
+
+
+def _sort_key(entry: dict):
+    return (entry["type"] == "file", entry["name"].lower())
+
+
+class RepoTreeIndex:
+    """
+    Directory tree of one repo held in memory.
+
+    Each indexed directory keeps its entries (name, type, size, mtime) and
+    its own mtime. Changes are picked up either from inotify events
+    (through watchdog, when installed) or by polling, and only the affected
+    directory is rescanned. Polling rescans directories whose mtime changed
+    and re-stats the files of the others, since editing a file in place
+    does not change its directory's mtime.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.normpath(root)
+        self._lock = threading.RLock()
+        self._dirs: Dict[str, Dict[str, dict]] = {}
+        self._sorted: Dict[str, List[dict]] = {}
+        self._dir_mtimes: Dict[str, float] = {}
+        self._observer = None
+        self.last_used = time.monotonic()
+        self.build()
+
+    def _abs(self, rel: str) -> str:
+        return self.root if rel in ("", ".") else os.path.join(self.root, rel)
+
+    @staticmethod
+    def _rel(parent: str, name: str) -> str:
+        return name if parent in ("", ".") else f"{parent}/{name}"
+
+    def build(self) -> None:
+        with self._lock:
+            self._dirs.clear()
+            self._sorted.clear()
+            self._dir_mtimes.clear()
+            self._scan_dir(".")
+
+    def _scan_dir(self, rel: str) -> None:
+        """(Re)scan a single directory, recursing into new subdirectories"""
+        path = self._abs(rel)
+        try:
+            dir_mtime = os.stat(path).st_mtime
+            scanned = list(os.scandir(path))
+        except OSError:
+            self._drop_subtree(rel)
+            return
+
+        previous = self._dirs.get(rel, {})
+        entries: Dict[str, dict] = {}
+        for item in scanned:
+            try:
+                is_dir = item.is_dir(follow_symlinks=False)
+                st = item.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            child = self._rel(rel, item.name)
+            entries[item.name] = {
+                "name": item.name,
+                "path": child,
+                "type": "dir" if is_dir else "file",
+                "size": None if is_dir else st.st_size,
+                "mtime": st.st_mtime,
+            }
+
+        self._dirs[rel] = entries
+        self._sorted.pop(rel, None)
+        self._dir_mtimes[rel] = dir_mtime
+
+        for name, old in previous.items():
+            new = entries.get(name)
+            if old["type"] == "dir" and (new is None or new["type"] != "dir"):
+                self._drop_subtree(old["path"])
+        for name, entry in entries.items():
+            if entry["type"] == "dir" and name not in IGNORED_DIRS and entry["path"] not in self._dirs:
+                self._scan_dir(entry["path"])
+
+    def _drop_subtree(self, rel: str) -> None:
+        prefix = rel + "/"
+        for key in [k for k in self._dirs if k == rel or k.startswith(prefix)]:
+            self._dirs.pop(key, None)
+            self._sorted.pop(key, None)
+            self._dir_mtimes.pop(key, None)
+
+    def invalidate(self, rel_dir: str) -> None:
+        """Rescan one directory (called from watch events)"""
+        rel_dir = os.path.normpath(rel_dir).replace(os.sep, "/")
+        if rel_dir == "":
+            rel_dir = "."
+        with self._lock:
+            # Events for a dir we have not indexed yet: rescan the closest indexed ancestor
+            while rel_dir not in self._dirs and rel_dir != ".":
+                rel_dir = os.path.dirname(rel_dir) or "."
+            self._scan_dir(rel_dir)
+
+    def poll(self) -> None:
+        """Rescan directories whose mtime changed; refresh file size/mtime in the rest"""
+        with self._lock:
+            for rel, mtime in list(self._dir_mtimes.items()):
+                if rel not in self._dirs:
+                    continue
+                try:
+                    current = os.stat(self._abs(rel)).st_mtime
+                except OSError:
+                    self._drop_subtree(rel)
+                    continue
+                if current != mtime:
+                    self._scan_dir(rel)
+                else:
+                    self._restat_files(rel)
+
+    def _restat_files(self, rel: str) -> None:
+        for entry in list(self._dirs[rel].values()):
+            if entry["type"] != "file":
+                continue
+            try:
+                st = os.stat(self._abs(entry["path"]), follow_symlinks=False)
+            except OSError:
+                # Removed since the scan; the directory mtime catches it next poll
+                continue
+            if st.st_mtime != entry["mtime"] or st.st_size != entry["size"]:
+                # Updated in place: the sorted listing holds the same dicts
+                entry["size"] = st.st_size
+                entry["mtime"] = st.st_mtime
+
+    def is_indexed(self, rel: str) -> bool:
+        return rel in self._dirs
+
+    def list_dir(self, rel: str = ".") -> Optional[List[dict]]:
+        """Entries of an indexed directory, dirs first; None if not indexed"""
+        with self._lock:
+            cached = self._sorted.get(rel)
+            if cached is None:
+                entries = self._dirs.get(rel)
+                if entries is None:
+                    return None
+                cached = sorted(entries.values(), key=_sort_key)
+                self._sorted[rel] = cached
+            return cached
+
+    def walk(self, rel: str = ".", max_depth: Optional[int] = None) -> List[dict]:
+        """Recursive listing below ``rel`` in depth-first, explorer order"""
+        result: List[dict] = []
+
+        def visit(dir_rel: str, depth: int) -> None:
+            for entry in self.list_dir(dir_rel) or []:
+                result.append(entry)
+                if entry["type"] == "dir" and (max_depth is None or depth < max_depth):
+                    visit(entry["path"], depth + 1)
+
+        with self._lock:
+            visit(rel, 1)
+        return result
+
+    def search(self, query: str, limit: int = 50) -> List[dict]:
+        """
+        Fuzzy path search: every query character must appear in order.
+        Matches in the file name and contiguous runs score higher.
+        """
+        query = query.lower().strip()
+        if not query:
+            return []
+
+        scored = []
+        with self._lock:
+            for entries in self._dirs.values():
+                for entry in entries.values():
+                    score = _fuzzy_score(query, entry["path"].lower(), entry["name"].lower())
+                    if score is not None:
+                        scored.append((score, len(entry["path"]), entry))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [entry for _, _, entry in scored[:limit]]
+
+    def start_watching(self) -> bool:
+        """Start an inotify watch via watchdog; returns False if unavailable"""
+        if not WATCHDOG_AVAILABLE or self._observer is not None:
+            return self._observer is not None
+        observer = Observer()
+        observer.schedule(_IndexEventHandler(self), self.root, recursive=True)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        return True
+
+    def close(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+
+def _fuzzy_score(query: str, path: str, name: str) -> Optional[int]:
+    if query in name:
+        return 1000 - name.index(query) + (500 if name.startswith(query) else 0)
+    if query in path:
+        return 500 - path.index(query) // 10
+    pos = -1
+    score = 0
+    last = -2
+    for ch in query:
+        pos = path.find(ch, pos + 1)
+        if pos == -1:
+            return None
+        score += 5 if pos == last + 1 else 1
+        last = pos
+    return score
+
+
+class _IndexEventHandler(FileSystemEventHandler):
+    def __init__(self, index: RepoTreeIndex):
+        self.index = index
+
+    def _touch(self, path: str) -> None:
+        rel = os.path.relpath(path, self.index.root)
+        parts = rel.split(os.sep)
+        if any(part in IGNORED_DIRS for part in parts[:-1]):
+            return
+        self.index.invalidate(os.path.dirname(rel))
+
+    def on_any_event(self, event):
+        self._touch(event.src_path)
+        dest = getattr(event, "dest_path", None)
+        if dest:
+            self._touch(dest)
+
+
+# Registry of indexes by project id, with one shared thread that polls the
+# unwatched ones and drops indexes idle for IDLE_TIMEOUT
+_indexes: Dict[str, RepoTreeIndex] = {}
+_registry_lock = threading.Lock()
+_poller: Optional[threading.Thread] = None
+
+
+def _evict_idle() -> None:
+    cutoff = time.monotonic() - IDLE_TIMEOUT
+    with _registry_lock:
+        idle = [pid for pid, index in _indexes.items() if index.last_used < cutoff]
+        evicted = [_indexes.pop(pid) for pid in idle]
+    for index in evicted:
+        index.close()
+
+
+def _poll_loop() -> None:
+    while True:
+        time.sleep(POLL_INTERVAL)
+        _evict_idle()
+        for index in list(_indexes.values()):
+            if index._observer is None:
+                try:
+                    index.poll()
+                except Exception as e:
+                    print(f"[RepoIndex] Poll failed for {index.root}: {e}")
+
+
+def get_repo_index(project_id: str, repo_root: str) -> RepoTreeIndex:
+    """Get (building on first use) the tree index for a project repo"""
+    global _poller
+    index = _indexes.get(project_id)
+    if index is not None and index.root == os.path.normpath(repo_root):
+        index.last_used = time.monotonic()
+        return index
+
+    with _registry_lock:
+        index = _indexes.get(project_id)
+        if index is None or index.root != os.path.normpath(repo_root):
+            if index is not None:
+                index.close()
+            index = RepoTreeIndex(repo_root)
+            index.start_watching()
+            if _poller is None:
+                _poller = threading.Thread(target=_poll_loop, daemon=True)
+                _poller.start()
+            _indexes[project_id] = index
+        index.last_used = time.monotonic()
+    return index
+
+
+async def get_repo_index_async(project_id: str, repo_root: str) -> RepoTreeIndex:
+    """:func:`get_repo_index` for routes: the first build walks the repo, so it runs off the event loop"""
+    index = _indexes.get(project_id)
+    if index is not None and index.root == os.path.normpath(repo_root):
+        index.last_used = time.monotonic()
+        return index
+    return await asyncio.to_thread(get_repo_index, project_id, repo_root)
+
+
+def drop_repo_index(project_id: str) -> None:
+    with _registry_lock:
+        index = _indexes.pop(project_id, None)
+    if index is not None:
+        index.close()
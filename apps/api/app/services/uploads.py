@@ -0,0 +1,261 @@
+"""
+Streaming Uploads
+Chunked, size-limited, SHA-256 content-addressed storage for uploaded files
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+# Room for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Identical uploads share one file, so storing a blob and deleting it once
+# unreferenced are serialized per path; a pin marks an upload whose
+# database reference is not recorded yet, which deletes must leave alone
+_locks_guard = threading.Lock()
+_path_locks: Dict[str, List] = {}  # path -> [lock, holders and waiters]
+_pins: Dict[str, int] = {}
+
+
+class UploadTooLarge(Exception):
+    """The upload exceeded its size limit; nothing was stored"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"File size exceeds {max_bytes // (1024 * 1024)}MB limit")
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    sha256: str
+    size: int
+    # True when identical content was already stored and the upload was dropped
+    deduplicated: bool
+    # True until ``unpin_upload``; the blob is not deleted while pinned
+    pinned: bool = False
+
+
+def content_path(dest_dir: str, digest: str, extension: str = "", shard: bool = True) -> str:
+    """Storage path of a blob: ``dest_dir/ab/<sha256><ext>`` (flat without ``shard``)"""
+    filename = f"{digest}{extension.lower()}"
+    if shard:
+        return os.path.join(dest_dir, digest[:2], filename)
+    return os.path.join(dest_dir, filename)
+
+
+def content_digest(path: str) -> Optional[str]:
+    """SHA-256 a content-addressed file is stored under, None for any other path"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem if _DIGEST_RE.match(stem) else None
+
+
+@contextmanager
+def blob_lock(path: str):
+    """Hold the lock of one stored blob; yields the normalized path"""
+    key = os.path.abspath(path)
+    with _locks_guard:
+        entry = _path_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield key
+    finally:
+        with _locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _path_locks[key]
+
+
+def unpin_upload(stored: StoredUpload) -> None:
+    """Allow the blob to be deleted again, once its reference is recorded (or the upload failed)"""
+    if not stored.pinned:
+        return
+    stored.pinned = False
+    key = os.path.abspath(stored.path)
+    with _locks_guard:
+        _pins[key] -= 1
+        if not _pins[key]:
+            del _pins[key]
+
+
+def remove_unreferenced_blob(path: str, is_referenced: Callable[[str], bool]) -> bool:
+    """
+    Delete a stored blob unless ``is_referenced(path)`` or an upload has it pinned.
+
+    The reference check runs under the blob's lock, so an upload that just
+    found this content already stored either pinned it first (and the blob
+    is kept) or stores a fresh copy after the delete.
+    """
+    with blob_lock(path) as key:
+        if _pins.get(key) or is_referenced(path):
+            return False
+        if os.path.exists(path):
+            os.remove(path)
+            return True
+    return False
+
+
+def store_stream(
+    source: BinaryIO,
+    dest_dir: str,
+    max_bytes: Optional[int] = None,
+    extension: str = "",
+    shard: bool = True,
+    pin: bool = False,
+) -> StoredUpload:
+    """
+    Copy ``source`` into the content-addressed store under ``dest_dir``.
+
+    Bytes are read ``upload_chunk_size`` at a time into a temporary file
+    while the SHA-256 is updated, so memory stays constant whatever the
+    file size. Going over ``max_bytes`` aborts the copy and raises
+    ``UploadTooLarge``. When the content is already stored the temporary
+    file is discarded and the existing path returned. With ``pin`` the blob
+    is protected from ``remove_unreferenced_blob`` until ``unpin_upload``,
+    so a caller can record its reference without the file vanishing.
+    """
+    if max_bytes is None:
+        max_bytes = settings.upload_max_bytes
+    chunk_size = max(64 * 1024, settings.upload_chunk_size)
+    os.makedirs(dest_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                tmp.write(chunk)
+
+        sha256 = digest.hexdigest()
+        path = content_path(dest_dir, sha256, extension, shard)
+        with blob_lock(path) as key:
+            deduplicated = os.path.exists(path)
+            if deduplicated:
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            if pin:
+                with _locks_guard:
+                    _pins[key] = _pins.get(key, 0) + 1
+        return StoredUpload(path=path, sha256=sha256, size=size, deduplicated=deduplicated, pinned=pin)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+async def store_upload(
+    file: UploadFile,
+    dest_dir: str,
+    max_bytes: Optional[int] = None,
+    extension: str = "",
+    shard: bool = True,
+    pin: bool = False,
+) -> StoredUpload:
+    """``store_stream`` for an ``UploadFile``, run in the threadpool so hashing and disk I/O stay off the event loop"""
+    await file.seek(0)
+    return await run_in_threadpool(store_stream, file.file, dest_dir, max_bytes, extension, shard, pin)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects upload request bodies over the limit with 413 while they arrive.
+
+    Multipart bodies are parsed (and spooled to disk) before an endpoint
+    runs, so the limit is enforced here: on ``Content-Length`` up front and
+    on the bytes actually received for chunked requests.
+    """
+
+    def __init__(self, app, max_bytes: Optional[int] = None, path_suffix: str = "/upload"):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_suffix = path_suffix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].endswith(self.path_suffix):
+            await self.app(scope, receive, send)
+            return
+
+        max_file_bytes = self.max_bytes or settings.upload_max_bytes
+        limit = max_file_bytes + MULTIPART_OVERHEAD
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    if int(value) > limit:
+                        await self._reject(send, max_file_bytes)
+                        return
+                except ValueError:
+                    pass
+                break
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        # FastAPI turns errors raised while reading the form into a 400, so on
+        # overflow the 413 is sent from here, the app sees a client disconnect
+        # and whatever it answers afterwards is dropped
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit and not response_started:
+                    rejected = True
+                    await self._reject(send, max_file_bytes)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+    @staticmethod
+    async def _reject(send, max_bytes: int) -> None:
+        body = json.dumps({"detail": str(UploadTooLarge(max_bytes))}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,15 +1,16 @@
 """
 Vercel integration service for creating projects and deployments
 """
-import aiohttp
 import asyncio
+import httpx
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
-logger = logging.getLogger(__name__)
+from app.services.http_clients import get_http_client
 
-VERCEL_API_BASE = "https://api.vercel.com"
+logger = logging.getLogger(__name__)
 
 
 class VercelAPIError(Exception):
@@ -25,6 +26,8 @@ class VercelService:
     
     def __init__(self, access_token: str):
         self.access_token = access_token
+        # Shared keep-alive pool (base URL from settings.vercel_api_url)
+        self.client = get_http_client("vercel")
         self.headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json"
@@ -33,25 +36,24 @@ class VercelService:
     async def check_token_validity(self) -> Dict[str, Any]:
         """Check if the Vercel token is valid and get user info"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{VERCEL_API_BASE}/v2/user",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        user_data = await response.json()
-                        return {
-                            "valid": True,
-                            "user_id": user_data.get("id"),
-                            "username": user_data.get("username"),
-                            "name": user_data.get("name"),
-                            "email": user_data.get("email")
-                        }
-                    elif response.status == 401:
-                        return {"valid": False, "error": "Invalid Vercel token"}
-                    else:
-                        error_text = await response.text()
-                        return {"valid": False, "error": f"API error: {error_text}"}
+            response = await self.client.get(
+                "/v2/user",
+                headers=self.headers
+            )
+            if response.status_code == 200:
+                user_data = response.json()
+                return {
+                    "valid": True,
+                    "user_id": user_data.get("id"),
+                    "username": user_data.get("username"),
+                    "name": user_data.get("name"),
+                    "email": user_data.get("email")
+                }
+            elif response.status_code == 401:
+                return {"valid": False, "error": "Invalid Vercel token"}
+            else:
+                error_text = response.text
+                return {"valid": False, "error": f"API error: {error_text}"}
         except Exception as e:
             logger.error(f"Error checking Vercel token validity: {e}")
             return {"valid": False, "error": str(e)}
@@ -77,36 +79,35 @@ class VercelService:
             }
             
             # Build the URL with optional team_id
-            url = f"{VERCEL_API_BASE}/v11/projects"
+            url = "/v11/projects"
             if team_id:
                 url += f"?teamId={team_id}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url,
-                    headers=self.headers,
-                    json=payload
-                ) as response:
-                    response_data = await response.json()
-                    
-                    if response.status == 200 or response.status == 201:
-                        project = response_data
-                        return {
-                            "success": True,
-                            "project_id": project.get("id"),
-                            "project_name": project.get("name"),
-                            "framework": project.get("framework"),
-                            "git_repository": project.get("link", {}).get("repo"),
-                            "created_at": project.get("createdAt"),
-                            "project_url": f"https://vercel.com/{project.get('accountId')}/{project.get('name')}",
-                            "raw_response": project
-                        }
-                    else:
-                        error_msg = response_data.get("error", {}).get("message", "Unknown error")
-                        logger.error(f"Failed to create Vercel project: {error_msg}")
-                        raise VercelAPIError(f"Failed to create project: {error_msg}", response.status)
-                        
-        except aiohttp.ClientError as e:
+            response = await self.client.post(
+                url,
+                headers=self.headers,
+                json=payload
+            )
+            response_data = response.json()
+            
+            if response.status_code == 200 or response.status_code == 201:
+                project = response_data
+                return {
+                    "success": True,
+                    "project_id": project.get("id"),
+                    "project_name": project.get("name"),
+                    "framework": project.get("framework"),
+                    "git_repository": project.get("link", {}).get("repo"),
+                    "created_at": project.get("createdAt"),
+                    "project_url": f"https://vercel.com/{project.get('accountId')}/{project.get('name')}",
+                    "raw_response": project
+                }
+            else:
+                error_msg = response_data.get("error", {}).get("message", "Unknown error")
+                logger.error(f"Failed to create Vercel project: {error_msg}")
+                raise VercelAPIError(f"Failed to create project: {error_msg}", response.status_code)
+                
+        except httpx.HTTPError as e:
             logger.error(f"Network error while creating Vercel project: {e}")
             raise VercelAPIError(f"Network error: {str(e)}")
         except Exception as e:
@@ -116,20 +117,19 @@ class VercelService:
     async def get_project(self, project_id: str) -> Dict[str, Any]:
         """Get project information by ID"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{VERCEL_API_BASE}/v9/projects/{project_id}",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        try:
-                            error_data = await response.json()
-                            error_msg = error_data.get("error", {}).get("message", "Unknown error")
-                        except:
-                            error_msg = await response.text()
-                        raise VercelAPIError(f"Failed to get project: {error_msg}", response.status)
+            response = await self.client.get(
+                f"/v9/projects/{project_id}",
+                headers=self.headers
+            )
+            if response.status_code == 200:
+                return response.json()
+            else:
+                try:
+                    error_data = response.json()
+                    error_msg = error_data.get("error", {}).get("message", "Unknown error")
+                except:
+                    error_msg = response.text
+                raise VercelAPIError(f"Failed to get project: {error_msg}", response.status_code)
         except VercelAPIError:
             raise
         except Exception as e:
@@ -159,43 +159,42 @@ class VercelService:
             }
             
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{VERCEL_API_BASE}/v13/deployments",
-                    headers=self.headers,
-                    json=payload
-                ) as response:
-                    response_data = await response.json()
-                    
-                    if response.status != 200 and response.status != 201:
-                        logger.error(f"Vercel API error: {response_data}")
-                    
-                    if response.status == 200 or response.status == 201:
-                        deployment = response_data
-                        
-                        # Extract best public URL
-                        deployment_url = deployment.get("url")
-                        # Try to get public alias if available
-                        aliases = deployment.get("automaticAliases", [])
-                        if aliases:
-                            # Use the first automatic alias which is usually more public
-                            deployment_url = aliases[0]
-                        
-                        return {
-                            "success": True,
-                            "deployment_id": deployment.get("id"),
-                            "deployment_url": deployment_url,
-                            "status": deployment.get("readyState"),  # QUEUED, BUILDING, READY, ERROR
-                            "ready": deployment.get("readyState") == "READY",
-                            "created_at": deployment.get("createdAt"),
-                            "raw_response": deployment
-                        }
-                    else:
-                        error_msg = response_data.get("error", {}).get("message", "Unknown error")
-                        logger.error(f"Failed to create Vercel deployment: {error_msg}")
-                        logger.error(f"Full error response: {response_data}")
-                        raise VercelAPIError(f"Failed to create deployment: {error_msg}", response.status)
-                        
+            response = await self.client.post(
+                "/v13/deployments",
+                headers=self.headers,
+                json=payload
+            )
+            response_data = response.json()
+            
+            if response.status_code != 200 and response.status_code != 201:
+                logger.error(f"Vercel API error: {response_data}")
+            
+            if response.status_code == 200 or response.status_code == 201:
+                deployment = response_data
+                
+                # Extract best public URL
+                deployment_url = deployment.get("url")
+                # Try to get public alias if available
+                aliases = deployment.get("automaticAliases", [])
+                if aliases:
+                    # Use the first automatic alias which is usually more public
+                    deployment_url = aliases[0]
+                
+                return {
+                    "success": True,
+                    "deployment_id": deployment.get("id"),
+                    "deployment_url": deployment_url,
+                    "status": deployment.get("readyState"),  # QUEUED, BUILDING, READY, ERROR
+                    "ready": deployment.get("readyState") == "READY",
+                    "created_at": deployment.get("createdAt"),
+                    "raw_response": deployment
+                }
+            else:
+                error_msg = response_data.get("error", {}).get("message", "Unknown error")
+                logger.error(f"Failed to create Vercel deployment: {error_msg}")
+                logger.error(f"Full error response: {response_data}")
+                raise VercelAPIError(f"Failed to create deployment: {error_msg}", response.status_code)
+                
         except Exception as e:
             logger.error(f"Error creating Vercel deployment: {e}")
             raise VercelAPIError(f"Error creating deployment: {str(e)}")
@@ -203,34 +202,33 @@ class VercelService:
     async def get_deployment_status(self, deployment_id: str) -> Dict[str, Any]:
         """Get deployment status by ID"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{VERCEL_API_BASE}/v13/deployments/{deployment_id}",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        deployment = await response.json()
-                        
-                        # Use aliasFinal, fallback to alias[0], then url
-                        final_url = (deployment.get("aliasFinal") or 
-                                   (deployment.get("alias")[0] if deployment.get("alias") else None) or 
-                                   deployment.get("url"))
-                        
-                        return {
-                            "id": deployment.get("id"),
-                            "url": final_url,  # Use aliasFinal instead of url
-                            "status": deployment.get("readyState"),
-                            "created_at": deployment.get("createdAt"),
-                            "ready": deployment.get("ready"),
-                            "raw_response": deployment
-                        }
-                    else:
-                        try:
-                            error_data = await response.json()
-                            error_msg = error_data.get("error", {}).get("message", "Unknown error")
-                        except:
-                            error_msg = await response.text()
-                        raise VercelAPIError(f"Failed to get deployment: {error_msg}", response.status)
+            response = await self.client.get(
+                f"/v13/deployments/{deployment_id}",
+                headers=self.headers
+            )
+            if response.status_code == 200:
+                deployment = response.json()
+                
+                # Use aliasFinal, fallback to alias[0], then url
+                final_url = (deployment.get("aliasFinal") or 
+                           (deployment.get("alias")[0] if deployment.get("alias") else None) or 
+                           deployment.get("url"))
+                
+                return {
+                    "id": deployment.get("id"),
+                    "url": final_url,  # Use aliasFinal instead of url
+                    "status": deployment.get("readyState"),
+                    "created_at": deployment.get("createdAt"),
+                    "ready": deployment.get("ready"),
+                    "raw_response": deployment
+                }
+            else:
+                try:
+                    error_data = response.json()
+                    error_msg = error_data.get("error", {}).get("message", "Unknown error")
+                except:
+                    error_msg = response.text
+                raise VercelAPIError(f"Failed to get deployment: {error_msg}", response.status_code)
         except Exception as e:
             logger.error(f"Error getting Vercel deployment: {e}")
             raise VercelAPIError(f"Error getting deployment: {str(e)}")
@@ -242,208 +240,278 @@ async def check_project_availability(access_token: str, project_name: str) -> Di
     
     try:
         # Get list of projects and check if name exists
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{VERCEL_API_BASE}/v10/projects",
-                headers=service.headers
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    projects = data.get("projects", [])
-                    
-                    # Check if project name already exists
-                    for project in projects:
-                        if project.get("name") == project_name:
-                            return {"available": False, "exists": True}
-                    
-                    # Name is available
-                    return {"available": True, "exists": False}
-                else:
-                    try:
-                        error_data = await response.json()
-                        error_msg = error_data.get("error", {}).get("message", "Unknown error")
-                    except:
-                        error_msg = await response.text()
-                    
-                    if response.status == 401:
-                        return {"available": False, "error": "Invalid Vercel token"}
-                    else:
-                        return {"available": False, "error": f"API error: {error_msg}"}
-                        
+        response = await service.client.get(
+            "/v10/projects",
+            headers=service.headers
+        )
+        if response.status_code == 200:
+            data = response.json()
+            projects = data.get("projects", [])
+            
+            # Check if project name already exists
+            for project in projects:
+                if project.get("name") == project_name:
+                    return {"available": False, "exists": True}
+            
+            # Name is available
+            return {"available": True, "exists": False}
+        else:
+            try:
+                error_data = response.json()
+                error_msg = error_data.get("error", {}).get("message", "Unknown error")
+            except:
+                error_msg = response.text
+            
+            if response.status_code == 401:
+                return {"available": False, "error": "Invalid Vercel token"}
+            else:
+                return {"available": False, "error": f"API error: {error_msg}"}
+                
     except Exception as e:
         logger.error(f"Error checking Vercel project availability: {e}")
         return {"available": False, "error": str(e)}
 
 
-# 활성 배포 모니터링 태스크들을 추적하는 딕셔너리
-active_monitoring_tasks: Dict[str, asyncio.Task] = {}
+# Poll interval by deployment age: (age below seconds, interval seconds).
+# Builds usually finish within minutes, so poll fast at first and back off.
+POLL_SCHEDULE = [(30, 2.0), (120, 5.0), (300, 10.0)]
+MAX_POLL_INTERVAL = 20.0
+ERROR_POLL_INTERVAL = 10.0
+MAX_MONITOR_SECONDS = 15 * 60
+MAX_CONCURRENT_CHECKS = 10
+FINAL_STATES = {"READY", "ERROR", "CANCELED"}
+
+
+def _poll_interval(age_seconds: float) -> float:
+    for max_age, interval in POLL_SCHEDULE:
+        if age_seconds < max_age:
+            return interval
+    return MAX_POLL_INTERVAL
+
+
+class DeploymentStatusScheduler:
+    """
+    Single background task that monitors every in-flight Vercel deployment.
+
+    Each tick checks all deployments whose next poll is due in one
+    concurrent batch over the shared HTTP pool, then writes the ones whose
+    state changed in a single DB transaction. Unchanged polls only update
+    the in-memory ``last_checked_at``. Poll intervals grow with deployment
+    age (see ``POLL_SCHEDULE``).
+    """
+
+    def __init__(self):
+        self._deployments: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._db_session_factory = None
+
+    def track(
+        self,
+        project_id: str,
+        deployment_id: str,
+        vercel_token: str,
+        db_session_factory,
+        initial_status: Optional[str] = None
+    ) -> None:
+        """Start (or replace) monitoring of a project's current deployment"""
+        now = time.time()
+        self._db_session_factory = db_session_factory
+        self._deployments[project_id] = {
+            "project_id": project_id,
+            "deployment_id": deployment_id,
+            "token": vercel_token,
+            "status": initial_status,
+            "started_at": now,
+            "last_checked_at": None,
+            "next_poll_at": now + POLL_SCHEDULE[0][1],
+            "polls": 0,
+            "errors": 0,
+        }
+        self._ensure_running()
+        self._wakeup.set()
+
+    def untrack(self, project_id: str) -> bool:
+        return self._deployments.pop(project_id, None) is not None
+
+    def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        return self._deployments.get(project_id)
+
+    def active_projects(self) -> List[str]:
+        return list(self._deployments.keys())
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        return [
+            {
+                "project_id": d["project_id"],
+                "deployment_id": d["deployment_id"],
+                "status": d["status"],
+                "polls": d["polls"],
+                "errors": d["errors"],
+                "started_at": _iso(d["started_at"]),
+                "last_checked_at": _iso(d["last_checked_at"]),
+                "next_poll_at": _iso(d["next_poll_at"]),
+                "next_poll_in_seconds": round(max(0.0, d["next_poll_at"] - now), 1),
+            }
+            for d in sorted(self._deployments.values(), key=lambda d: d["next_poll_at"])
+        ]
+
+    def _ensure_running(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if not self._deployments:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                delay = min(d["next_poll_at"] for d in self._deployments.values()) - time.time()
+                if delay > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Deployment scheduler tick failed: {e}")
+                await asyncio.sleep(ERROR_POLL_INTERVAL)
+
+    async def _tick(self) -> None:
+        now = time.time()
+        due = [d for d in self._deployments.values() if d["next_poll_at"] <= now]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
+
+        async def check(deployment: Dict[str, Any]):
+            async with semaphore:
+                try:
+                    service = VercelService(deployment["token"])
+                    return deployment, await service.get_deployment_status(deployment["deployment_id"]), None
+                except Exception as e:
+                    return deployment, None, e
+
+        results = await asyncio.gather(*(check(d) for d in due))
+
+        transitions = []
+        checked_at = time.time()
+        for deployment, status_data, error in results:
+            project_id = deployment["project_id"]
+            if self._deployments.get(project_id) is not deployment:
+                continue  # Replaced or stopped while the check was in flight
+            deployment["polls"] += 1
+            age = checked_at - deployment["started_at"]
+
+            if error is not None:
+                deployment["errors"] += 1
+                logger.error(f"Error checking deployment {deployment['deployment_id']}: {error}")
+                deployment["next_poll_at"] = checked_at + max(ERROR_POLL_INTERVAL, _poll_interval(age))
+            else:
+                deployment["last_checked_at"] = checked_at
+                status = status_data["status"]
+                if status == "READY" or status_data.get("ready") is True:
+                    status = status_data["status"] = "READY"
+                if status != deployment["status"]:
+                    logger.info(f"Deployment {deployment['deployment_id']} is now {status} (after {age:.0f}s)")
+                    deployment["status"] = status
+                    transitions.append((project_id, status_data))
+                if status in FINAL_STATES:
+                    self._deployments.pop(project_id, None)
+                    continue
+                deployment["next_poll_at"] = checked_at + _poll_interval(age)
+
+            if age > MAX_MONITOR_SECONDS:
+                logger.warning(f"Deployment {deployment['deployment_id']} monitoring timed out after {MAX_MONITOR_SECONDS // 60} minutes")
+                self._deployments.pop(project_id, None)
+
+        if transitions and self._db_session_factory is not None:
+            await asyncio.to_thread(update_deployment_statuses_in_db, transitions, self._db_session_factory)
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.utcfromtimestamp(timestamp).isoformat() + "Z"
+
+
+deployment_scheduler = DeploymentStatusScheduler()
 
 
 async def start_deployment_monitoring(
     project_id: str, 
     deployment_id: str, 
     vercel_token: str,
-    db_session_factory
+    db_session_factory,
+    initial_status: Optional[str] = None
 ) -> None:
-    """배포 모니터링 백그라운드 태스크 시작"""
-    
-    # 기존 모니터링이 있으면 취소
-    if project_id in active_monitoring_tasks:
-        active_monitoring_tasks[project_id].cancel()
-    
-    # 새 모니터링 태스크 시작
-    task = asyncio.create_task(
-        monitor_deployment_status(project_id, deployment_id, vercel_token, db_session_factory)
-    )
-    active_monitoring_tasks[project_id] = task
-    
+    """Hand a new deployment to the shared status scheduler"""
+    deployment_scheduler.track(project_id, deployment_id, vercel_token, db_session_factory, initial_status)
     logger.info(f"🚀 Started deployment monitoring for project {project_id}, deployment {deployment_id}")
 
 
-async def monitor_deployment_status(
-    project_id: str, 
-    deployment_id: str, 
-    vercel_token: str,
-    db_session_factory
-) -> None:
-    """3초마다 Vercel API 호출해서 배포 상태 모니터링"""
-    
-    vercel_service = VercelService(vercel_token)
-    start_time = datetime.utcnow()
-    max_duration_minutes = 15  # 15분 제한
-    
-    try:
-        while True:
-            try:
-                # 시간 제한 체크 (15분)
-                elapsed = (datetime.utcnow() - start_time).total_seconds() / 60
-                if elapsed > max_duration_minutes:
-                    logger.warning(f"⏰ Deployment {deployment_id} monitoring timed out after {max_duration_minutes} minutes")
-                    break
-                
-                # Vercel API에서 최신 상태 가져오기
-                status_data = await vercel_service.get_deployment_status(deployment_id)
-                
-                # 상태 변경 시에만 또는 READY/ERROR 시에만 로그
-                if status_data["status"] in ["READY", "ERROR"] or elapsed < 0.1:  # 처음 또는 완료 시에만
-                    logger.info(f"🔍 Checking deployment {deployment_id} status... (elapsed: {elapsed:.1f}min)")
-                    logger.info(f"🔍 Got status: {status_data['status']} for deployment {deployment_id}")
-                
-                # READY 상태일 때만 URL 정보 로그
-                if status_data["status"] == "READY":
-                    raw_response = status_data.get("raw_response", {})
-                    logger.info(f"🎉 READY response - aliasFinal: {raw_response.get('aliasFinal')}, alias: {raw_response.get('alias', [])[:2]}, url: {raw_response.get('url')}")
-                    logger.info(f"🎉 Final URL selected: {status_data['url']}")
-                
-                # DB 업데이트
-                await update_deployment_status_in_db(project_id, status_data, db_session_factory)
-                
-                # 완료 상태 체크 - ready 필드도 확인
-                is_ready = (status_data["status"] == "READY" or 
-                           status_data.get("ready") == True or
-                           status_data.get("readyState") == "READY")
-                is_error = status_data["status"] == "ERROR"
-                
-                if is_ready or is_error:
-                    logger.info(f"✅ Deployment {deployment_id} finished with status: {status_data['status']}")
-                    break
-                
-                # 3초 대기
-                await asyncio.sleep(3)
-                
-            except Exception as e:
-                logger.error(f"❌ Error monitoring deployment {deployment_id}: {e}")
-                import traceback
-                logger.error(f"❌ Full traceback: {traceback.format_exc()}")
-                # 에러 시 10초 대기 후 재시도
-                await asyncio.sleep(10)
-                
-    except asyncio.CancelledError:
-        logger.info(f"Deployment monitoring cancelled for project {project_id}")
-    except Exception as e:
-        logger.error(f"Unexpected error in deployment monitoring: {e}")
-    finally:
-        # 모니터링 완료 시 태스크 목록에서 제거
-        if project_id in active_monitoring_tasks:
-            del active_monitoring_tasks[project_id]
+def _apply_deployment_status(service_data: Dict[str, Any], status_data: Dict[str, Any]) -> Dict[str, Any]:
+    service_data = dict(service_data or {})
+    now = datetime.utcnow().isoformat() + "Z"
+    service_data["current_deployment"] = {
+        "deployment_id": status_data["id"],
+        "status": status_data["status"],
+        "deployment_url": status_data["url"],
+        "last_checked_at": now
+    }
+    if status_data["status"] == "READY":
+        url = str(status_data["url"])
+        service_data["deployment_url"] = url if url.startswith("http") else f"https://{url}"
+        service_data["last_deployment_at"] = now
+        service_data["current_deployment"] = None
+    elif status_data["status"] in FINAL_STATES:
+        service_data["current_deployment"] = None
+    return service_data
 
 
-async def update_deployment_status_in_db(
-    project_id: str, 
-    status_data: Dict[str, Any],
+def update_deployment_statuses_in_db(
+    updates: List[Tuple[str, Dict[str, Any]]],
     db_session_factory
 ) -> None:
-    """DB의 배포 상태 업데이트"""
-    
+    """Write deployment state transitions for several projects in one transaction"""
+    from app.models.project_services import ProjectServiceConnection
+
+    db = db_session_factory()
     try:
-        # DB 세션 생성 (비동기 환경에서 새 세션 필요)
-        from sqlalchemy.orm import sessionmaker
-        from app.models.project_services import ProjectServiceConnection
-        
-        Session = db_session_factory
-        db = Session()
-        
-        try:
-            # Vercel 연결 찾기
-            connection = db.query(ProjectServiceConnection).filter(
-                ProjectServiceConnection.project_id == project_id,
-                ProjectServiceConnection.provider == "vercel"
-            ).first()
-            
-            if connection:
-                service_data = dict(connection.service_data) if connection.service_data else {}
-                
-                # current_deployment 정보 업데이트
-                service_data["current_deployment"] = {
-                    "deployment_id": status_data["id"],
-                    "status": status_data["status"],
-                    "deployment_url": status_data["url"],
-                    "last_checked_at": datetime.utcnow().isoformat() + "Z"
-                }
-                
-                # 배포 완료 시 deployment_url 메인에도 업데이트
-                if status_data["status"] == "READY":
-                    service_data["deployment_url"] = f"https://{status_data['url']}" if not str(status_data["url"]).startswith("http") else status_data["url"]
-                    service_data["last_deployment_at"] = datetime.utcnow().isoformat() + "Z"
-                    # 모니터링 완료 시 current_deployment 제거
-                    service_data["current_deployment"] = None
-                elif status_data["status"] == "ERROR":
-                    # 에러 시에도 current_deployment 제거
-                    service_data["current_deployment"] = None
-                
-                # 명시적으로 새 dict 할당
-                connection.service_data = service_data
-                db.commit()
-                db.refresh(connection)
-                
-                # 검증: 실제로 저장되었는지 확인
-                updated_data = connection.service_data or {}
-                if "current_deployment" in updated_data:
-                    if status_data["status"] == "READY":
-                        logger.info(f"✅ Successfully saved READY deployment to DB for project {project_id}")
-                        logger.info(f"📝 Final service_data keys: {list(updated_data.keys())}")
-                else:
-                    logger.error(f"❌ DB update verification failed for project {project_id}")
-            else:
-                logger.error(f"❌ No Vercel connection found for project {project_id}")
-                
-        finally:
-            db.close()
-            
+        by_project = dict(updates)
+        connections = db.query(ProjectServiceConnection).filter(
+            ProjectServiceConnection.project_id.in_(list(by_project)),
+            ProjectServiceConnection.provider == "vercel"
+        ).all()
+        for connection in connections:
+            # Assign a new dict so the JSON column is marked dirty
+            connection.service_data = _apply_deployment_status(
+                connection.service_data, by_project[connection.project_id]
+            )
+        db.commit()
+
+        missing = set(by_project) - {c.project_id for c in connections}
+        for project_id in missing:
+            logger.error(f"❌ No Vercel connection found for project {project_id}")
     except Exception as e:
+        db.rollback()
         logger.error(f"❌ Failed to update deployment status in DB: {e}")
-        import traceback
-        logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+    finally:
+        db.close()
 
 
 def stop_deployment_monitoring(project_id: str) -> None:
-    """특정 프로젝트의 배포 모니터링 중단"""
-    if project_id in active_monitoring_tasks:
-        active_monitoring_tasks[project_id].cancel()
-        del active_monitoring_tasks[project_id]
+    """Stop monitoring a project's deployment"""
+    if deployment_scheduler.untrack(project_id):
         logger.info(f"Stopped deployment monitoring for project {project_id}")
 
 
 def get_active_monitoring_projects() -> list:
-    """현재 모니터링 중인 프로젝트 목록 반환"""
-    return list(active_monitoring_tasks.keys())
\ No newline at end of file
+    """Projects with a deployment being monitored"""
+    return deployment_scheduler.active_projects()
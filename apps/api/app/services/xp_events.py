@@ -0,0 +1,243 @@
+"""
+XP Event Log
+Write-behind, at-least-once delivery of gameplay and award events to xp_entries
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# First retry delay after a failed batch; doubles up to xp_event_retry_max_delay
+RETRY_INITIAL_DELAY = 0.5
+
+
+def supabase_xp_sink(rows: List[Dict[str, Any]]) -> None:
+    """Bulk-insert events into ``xp_entries``; rows already present (redelivery) are skipped"""
+    from postgrest.types import ReturnMethod
+
+    from app.core.supabase_client import get_supabase_auth_client
+
+    get_supabase_auth_client().table('xp_entries').upsert(
+        rows, on_conflict="id", ignore_duplicates=True, returning=ReturnMethod.minimal
+    ).execute()
+
+
+class XPEventLog:
+    """
+    Append-only stage between endpoints and the ``xp_entries`` table.
+
+    ``record`` gives the event an id and timestamp, appends it to the spool
+    file (when configured) and queues it; a writer thread delivers queued
+    events to the sink in bulk every ``xp_event_flush_interval`` seconds or
+    once ``xp_event_batch_size`` are pending. A failed batch is kept and
+    retried with exponential backoff, never dropped. Events are upserted on
+    their id, so redelivery after a lost response or a restart is harmless.
+    Events still in the spool when the process stops are replayed on the
+    next start. When the queue is full, ``record`` delivers synchronously
+    instead of losing the event.
+    """
+
+    def __init__(self, sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None, spool_path: Optional[str] = None):
+        self._sink = sink or supabase_xp_sink
+        self._spool_path = settings.xp_event_spool_path if spool_path is None else spool_path
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=settings.xp_event_queue_size)
+        self._spool_lock = threading.Lock()
+        self._spool = None
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._recovered = False
+        # Set once the spool holds events that are not queued; it is then only
+        # compacted on the next start instead of truncated when the queue drains
+        self._spool_has_backlog = False
+        # Batch taken off the queue but not yet acknowledged by the sink
+        self._in_flight: List[Dict[str, Any]] = []
+        self.delivered = 0
+        self.failed_attempts = 0
+        self.sync_writes = 0
+
+    def record(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue an ``xp_entries`` row for delivery; returns it with ``id``/``created_at`` filled in"""
+        event.setdefault("id", str(uuid.uuid4()))
+        event.setdefault("created_at", datetime.utcnow().isoformat())
+        self._ensure_running()
+        with self._spool_lock:
+            self._append_spool({"event": event})
+            try:
+                self._queue.put_nowait(event)
+                return event
+            except queue.Full:
+                pass
+        # Backpressure instead of loss: deliver this one inline
+        self.sync_writes += 1
+        try:
+            self._sink([event])
+            self._ack([event])
+        except Exception as e:
+            self._spool_has_backlog = True
+            logger.error("XP event %s could not be written (kept in spool: %s): %s",
+                         event["id"], bool(self._spool_path), e)
+        return event
+
+    def pending(self) -> int:
+        """Events queued or in flight (task_done is only called once the sink accepted them)"""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event is delivered; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self.pending():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Deliver what is queued (within ``timeout``), then stop the writer"""
+        if self._thread is not None:
+            self.flush(timeout)
+            self._stop.set()
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        left = self.pending()
+        if left:
+            logger.warning("XP event log stopped with %s undelivered events%s", left,
+                           " (replayed from spool on next start)" if self._spool_path else "")
+        with self._spool_lock:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+
+    # ----- writer -----
+
+    def _ensure_running(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not self._recovered:
+                self._recovered = True
+                self._recover_spool()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="xp-event-log", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        delay = 0.0
+        while not self._stop.is_set():
+            if not self._in_flight:
+                self._in_flight = self._take(block=True)
+                if not self._in_flight:
+                    continue
+            else:
+                # Retrying: top the batch up with events that arrived meanwhile
+                self._in_flight.extend(self._take(block=False, limit=settings.xp_event_batch_size - len(self._in_flight)))
+            batch = self._in_flight
+            try:
+                self._sink(batch)
+            except Exception as e:
+                self.failed_attempts += 1
+                delay = min(settings.xp_event_retry_max_delay, delay * 2 if delay else RETRY_INITIAL_DELAY)
+                logger.warning("XP event batch of %s failed, retrying in %.1fs: %s", len(batch), delay, e)
+                self._stop.wait(delay)
+                continue
+            delay = 0.0
+            self.delivered += len(batch)
+            self._in_flight = []
+            for _ in batch:
+                self._queue.task_done()
+            self._ack(batch)
+
+    def _take(self, block: bool, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Up to one batch of queued events, collecting for at most one flush interval"""
+        limit = settings.xp_event_batch_size if limit is None else limit
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + settings.xp_event_flush_interval
+        while len(batch) < limit:
+            try:
+                if block:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    # ----- spool -----
+
+    def _append_spool(self, record: Dict[str, Any]) -> None:
+        """Append one line to the spool (caller holds ``_spool_lock``)"""
+        if not self._spool_path:
+            return
+        try:
+            if self._spool is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self._spool_path)), exist_ok=True)
+                # Line buffered: every event reaches the OS before record() returns
+                self._spool = open(self._spool_path, "a", encoding="utf-8", buffering=1)
+            self._spool.write(json.dumps(record, default=str) + "\n")
+        except OSError as e:
+            logger.error("XP event spool write failed: %s", e)
+
+    def _ack(self, events: List[Dict[str, Any]]) -> None:
+        if not self._spool_path:
+            return
+        with self._spool_lock:
+            if not self._queue.unfinished_tasks and not self._spool_has_backlog:
+                # Nothing outstanding: start the spool over instead of growing it
+                try:
+                    if self._spool is not None:
+                        self._spool.seek(0)
+                        self._spool.truncate()
+                except OSError as e:
+                    logger.error("XP event spool truncate failed: %s", e)
+            else:
+                self._append_spool({"ack": [event["id"] for event in events]})
+
+    def _recover_spool(self) -> None:
+        """Queue events left unacknowledged in the spool by a previous run"""
+        if not self._spool_path or not os.path.exists(self._spool_path):
+            return
+        events: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self._spool_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn last line from a crash mid-write
+                        continue
+                    if "event" in record:
+                        events[record["event"]["id"]] = record["event"]
+                    for event_id in record.get("ack", ()):
+                        events.pop(event_id, None)
+        except OSError as e:
+            logger.error("XP event spool could not be read: %s", e)
+            return
+
+        with self._spool_lock:
+            # Compact: rewrite the spool with only the events still owed
+            with open(self._spool_path, "w", encoding="utf-8") as f:
+                for event in events.values():
+                    f.write(json.dumps({"event": event}, default=str) + "\n")
+            for event in events.values():
+                try:
+                    self._queue.put_nowait(event)
+                except queue.Full:
+                    # Stays in the spool for the next start
+                    self._spool_has_backlog = True
+                    break
+        if events:
+            logger.info("XP event log replaying %s undelivered events from %s", len(events), self._spool_path)
+
+
+xp_event_log = XPEventLog()
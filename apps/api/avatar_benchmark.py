@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Avatar Pipeline Benchmark
+Pushes N synthetic camera-sized profile pictures through the image pipeline
+(concurrently, on the image worker threads) and compares the bytes a
+leaderboard view downloads for N avatars before (original images) and after
+(thumbnail_url at the avatar size). Also reports processing throughput and
+that re-uploading the same pictures renders nothing.
+"""
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+import time
+
+
+def synthetic_photo(seed: int, width: int, height: int) -> bytes:
+    """A smooth, lightly grained JPEG that compresses about like a phone photo"""
+    from PIL import Image
+
+    # Smooth shapes from upscaled coarse noise, plus fine sensor-like grain
+    shapes = [Image.effect_noise((width // 32, height // 32), 96 + seed % 32).resize((width, height), Image.BICUBIC)
+              for _ in range(3)]
+    grain = Image.effect_noise((width, height), 6).point(lambda v: v - 128)
+    image = Image.merge("RGB", [Image.blend(channel, grain.convert("L"), 0.08) for channel in shapes])
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+def url_to_path(url: str) -> str:
+    from app.core.config import settings
+
+    relative = url[len(settings.image_url_prefix.rstrip("/")) + 1:]
+    return os.path.join(settings.image_upload_dir, *relative.split("/"))
+
+
+async def upload_all(photos):
+    from starlette.datastructures import Headers, UploadFile
+
+    from app.services.images import save_image_upload
+
+    async def one(i, data):
+        upload = UploadFile(io.BytesIO(data), filename=f"avatar-{i}.jpg",
+                            headers=Headers({"content-type": "image/jpeg"}))
+        return await save_image_upload(upload)
+
+    return await asyncio.gather(*(one(i, data) for i, data in enumerate(photos)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="Avatars on the leaderboard")
+    parser.add_argument("--width", type=int, default=3024)
+    parser.add_argument("--height", type=int, default=4032)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="avatar-bench-")
+    os.environ.setdefault("IMAGE_UPLOAD_DIR", os.path.join(workdir, "images"))
+
+    from app.core.config import settings
+    from app.services.images import shutdown_image_workers, thumbnail_url
+
+    photos = [synthetic_photo(i, args.width, args.height) for i in range(args.users)]
+
+    started = time.perf_counter()
+    stored = asyncio.run(upload_all(photos))
+    elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    again = asyncio.run(upload_all(photos))
+    elapsed_again = time.perf_counter() - started
+    shutdown_image_workers()
+
+    original_bytes = sum(os.path.getsize(url_to_path(s.url)) for s in stored)
+    avatar_bytes = sum(os.path.getsize(url_to_path(thumbnail_url(s.url))) for s in stored)
+    print(f"Avatar benchmark: {args.users} photos {args.width}x{args.height}, "
+          f"{settings.image_workers} image workers, sizes {settings.image_thumbnail_sizes}")
+    print(f"  processing           {elapsed:.2f}s ({args.users / elapsed:.1f} images/s)")
+    print(f"  re-upload (dedupe)   {elapsed_again:.2f}s, {sum(s.deduplicated for s in again)}/{args.users} deduplicated")
+    print(f"  leaderboard payload  originals {original_bytes / 2**20:,.1f} MiB -> "
+          f"{settings.image_avatar_size}px WebP {avatar_bytes / 1024:,.0f} KiB "
+          f"({original_bytes / max(1, avatar_bytes):,.0f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+-- Per-unit XP in a narrow table for indexed unit (quest) leaderboards
+-- This migration adds player_unit_xp, backfills it from player_stats.unit_xp
+-- and adds award_unit_xp(), which the API calls when XP is awarded for an
+-- assignment. player_stats.unit_xp is kept in sync for existing readers.
+
+CREATE TABLE IF NOT EXISTS player_unit_xp (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    unit_id UUID NOT NULL REFERENCES units(id) ON DELETE CASCADE,
+    xp INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, unit_id)
+);
+
+-- Top students in a unit: one range scan of this index, already in rank order
+CREATE INDEX IF NOT EXISTS idx_player_unit_xp_unit_xp ON player_unit_xp(unit_id, xp DESC, user_id);
+
+-- Backfill from the JSON blob (keys are unit ids as text); skips keys that
+-- are not ids of existing units, such as "None" from unit-less assignments
+INSERT INTO player_unit_xp (user_id, unit_id, xp)
+SELECT ps.user_id, entry.key::uuid, entry.value::integer
+FROM player_stats ps
+CROSS JOIN LATERAL jsonb_each_text(COALESCE(ps.unit_xp, '{}'::jsonb)) AS entry
+WHERE entry.key ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+  AND entry.value ~ '^-?[0-9]+$'
+  AND EXISTS (SELECT 1 FROM units u WHERE u.id = entry.key::uuid)
+ON CONFLICT (user_id, unit_id) DO UPDATE SET xp = EXCLUDED.xp, updated_at = NOW();
+
+-- Add XP to a student's unit total in one statement (no read-modify-write)
+-- and mirror the new total into player_stats.unit_xp in the same transaction
+CREATE OR REPLACE FUNCTION award_unit_xp(p_user_id UUID, p_unit_id UUID, p_xp INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    new_xp INTEGER;
+BEGIN
+    INSERT INTO player_unit_xp (user_id, unit_id, xp)
+    VALUES (p_user_id, p_unit_id, p_xp)
+    ON CONFLICT (user_id, unit_id)
+    DO UPDATE SET xp = player_unit_xp.xp + EXCLUDED.xp, updated_at = NOW()
+    RETURNING xp INTO new_xp;
+
+    UPDATE player_stats
+    SET unit_xp = jsonb_set(COALESCE(unit_xp, '{}'::jsonb), ARRAY[p_unit_id::text], to_jsonb(new_xp))
+    WHERE user_id = p_user_id;
+
+    RETURN new_xp;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the API (service role) may award XP
+REVOKE EXECUTE ON FUNCTION award_unit_xp(UUID, UUID, INTEGER) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION award_unit_xp(UUID, UUID, INTEGER) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION award_unit_xp(UUID, UUID, INTEGER) TO service_role;
+
+-- Unit leaderboards are visible to every signed-in user, like the overall one
+ALTER TABLE player_unit_xp ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Unit XP is readable by all authenticated users" ON player_unit_xp;
+CREATE POLICY "Unit XP is readable by all authenticated users" ON player_unit_xp FOR SELECT TO authenticated USING (true);
+
+COMMENT ON TABLE player_unit_xp IS 'XP per student per unit; player_stats.unit_xp is a mirror kept for compatibility';
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Event Loop Stall Benchmark
+Runs slow queries through the sync and async session layers while a ticker
+coroutine stands in for WebSocket delivery, and reports how long the ticker
+was held up
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+# Slow, read-only query: counts through a large recursive CTE
+SLOW_QUERY = (
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < :rows) "
+    "SELECT count(*) FROM n"
+)
+TICK_INTERVAL = 0.01
+
+
+async def ticker(stop: asyncio.Event, lags: list) -> None:
+    """Sleep in short steps and record how late each wake-up was"""
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK_INTERVAL
+        await asyncio.sleep(TICK_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run_sync_queries(queries: int, rows: int) -> None:
+    from sqlalchemy import text
+    from app.db.session import SessionLocal
+
+    for _ in range(queries):
+        db = SessionLocal()
+        try:
+            db.execute(text(SLOW_QUERY), {"rows": rows}).scalar()
+        finally:
+            db.close()
+        await asyncio.sleep(0)
+
+
+async def run_async_queries(queries: int, rows: int) -> None:
+    from sqlalchemy import text
+    from app.db.session import AsyncSessionLocal
+
+    for _ in range(queries):
+        async with AsyncSessionLocal() as db:
+            await db.scalar(text(SLOW_QUERY), {"rows": rows})
+
+
+async def measure(mode: str, queries: int, rows: int) -> dict:
+    runner = run_sync_queries if mode == "sync" else run_async_queries
+    stop = asyncio.Event()
+    lags: list = []
+    tick = asyncio.create_task(ticker(stop, lags))
+    started = time.perf_counter()
+    await runner(queries, rows)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "ticks": len(lags),
+        "median_lag_ms": round(statistics.median(lags_ms), 1),
+        "p99_lag_ms": round(lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))], 1),
+        "max_lag_ms": round(lags_ms[-1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Rows counted per slow query")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="loop-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ.setdefault("PROJECTS_ROOT", tmpdir)
+    try:
+        print(f"Event loop benchmark: {args.queries} slow queries per mode, {TICK_INTERVAL * 1000:.0f}ms ticker")
+        results = {mode: asyncio.run(measure(mode, args.queries, args.rows)) for mode in ("sync", "async")}
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print(f"{'mode':<6} {'elapsed':>8} {'ticks':>6} {'median':>8} {'p99':>8} {'max':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['elapsed_s']:>7}s {r['ticks']:>6} {r['median_lag_ms']:>6}ms {r['p99_lag_ms']:>6}ms {r['max_lag_ms']:>6}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Gameboard Engine Benchmark
+Compares spending a student's banked moves before (one roll-dice request
+per move: stats read, stats write and xp_entries insert each) and after
+(one roll-many request: skills read, stats read, one compare-and-set write,
+XP entries queued) against an in-memory Supabase stand-in with a fixed
+round-trip time. Then checks that concurrent roll-many requests for the
+same student never spend more moves than they have.
+"""
+import argparse
+import random
+import threading
+import time
+
+
+class SimulatedSupabase:
+    """Just enough of the Supabase table API for player_stats/player_skills, one round trip per execute()"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.tables = {"player_stats": [], "player_skills": [], "xp_entries": []}
+        self.round_trips = 0
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+class _Query:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.filters = []
+        self.values = None
+        self.op = "select"
+
+    def select(self, *_):
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def insert(self, values):
+        self.op, self.values = "insert", values
+        return self
+
+    def update(self, values):
+        self.op, self.values = "update", values
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def is_(self, column, _):
+        self.filters.append((column, None))
+        return self
+
+    def execute(self):
+        time.sleep(self.db.rtt)
+        with self.db.lock:
+            self.db.round_trips += 1
+            rows = self.db.tables[self.name]
+            if self.op == "insert":
+                rows.append(dict(self.values))
+                return _Result([dict(self.values)])
+            matched = [row for row in rows if all(row.get(c) == v for c, v in self.filters)]
+            if self.op == "update":
+                for row in matched:
+                    row.update(self.values)
+            return _Result([dict(row) for row in matched])
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+def legacy_roll(db, user_id):
+    """The old roll-dice handler's I/O: read stats, write stats, insert the XP entry"""
+    stats = db.table('player_stats').select('*').eq('user_id', user_id).execute().data[0]
+    if stats['gameboard_moves'] <= 0:
+        return
+    xp = random.randint(1, 25)
+    db.table('player_stats').update({
+        "gameboard_moves": stats['gameboard_moves'] - 1,
+        "total_xp": stats['total_xp'] + xp,
+    }).eq('user_id', user_id).execute()
+    db.table('xp_entries').insert({"user_id": user_id, "xp_amount": xp}).execute()
+
+
+def new_student(db, user_id, moves):
+    db.tables["player_stats"].append({
+        "user_id": user_id, "gameboard_moves": moves, "gameboard_position": 1, "total_xp": 0,
+        "current_xp": 0, "gold": 0, "gameboard_xp": 0, "updated_at": "2026-01-01T00:00:00",
+    })
+    db.tables["player_skills"].append({"user_id": user_id, "strength": 2, "endurance": 1, "speed": 3, "climbing": 1})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--moves", type=int, default=10, help="Banked moves spent per student")
+    parser.add_argument("--rtt-ms", type=float, default=40, help="Simulated Supabase round trip")
+    parser.add_argument("--racers", type=int, default=8, help="Concurrent roll-many requests in the race check")
+    args = parser.parse_args()
+
+    import app.services.xp_events as xp_events
+    from app.services.gameboard import GameboardConflict, play_moves, station_table
+
+    queued = []
+    xp_events.xp_event_log = xp_events.XPEventLog(sink=queued.extend, spool_path="")
+    station_table()  # warm the cache (falls back to the built-in board without Supabase)
+    rtt = args.rtt_ms / 1000
+
+    db = SimulatedSupabase(rtt)
+    new_student(db, "legacy", args.moves)
+    started = time.perf_counter()
+    for _ in range(args.moves):
+        legacy_roll(db, "legacy")
+    legacy_elapsed, legacy_trips = time.perf_counter() - started, db.round_trips
+
+    db = SimulatedSupabase(rtt)
+    new_student(db, "engine", args.moves)
+    started = time.perf_counter()
+    result = play_moves("engine", args.moves, client=db)
+    engine_elapsed, engine_trips = time.perf_counter() - started, db.round_trips
+    xp_events.xp_event_log.flush(10)
+
+    print(f"Gameboard benchmark: {args.moves} banked moves, {args.rtt_ms:.0f}ms round trip")
+    print(f"  roll-dice x{args.moves:<3}  {legacy_trips:3} round trips  {legacy_elapsed * 1000:7.0f}ms")
+    print(f"  roll-many {args.moves:<4}  {engine_trips:3} round trips  {engine_elapsed * 1000:7.0f}ms  "
+          f"({len(result.outcomes)} moves, position 1 -> {result.stats['gameboard_position']}, "
+          f"{len(queued)} XP entries queued)")
+
+    # Race: concurrent 2-move requests share one pool of moves; none is spent twice
+    db = SimulatedSupabase(rtt / 4)
+    new_student(db, "racer", args.moves)
+    spent, conflicts = [], []
+
+    def racer():
+        try:
+            spent.append(len(play_moves("racer", 2, client=db).outcomes))
+        except GameboardConflict:
+            conflicts.append(1)
+
+    threads = [threading.Thread(target=racer) for _ in range(args.racers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    left = db.tables["player_stats"][0]["gameboard_moves"]
+    print(f"  race: {args.racers} concurrent roll-many 2, {sum(spent)} moves resolved + {left} left "
+          f"= {sum(spent) + left}/{args.moves} banked, {len(conflicts)} requests answered 409")
+    xp_events.xp_event_log.shutdown()
+
+
+if __name__ == "__main__":
+    main()
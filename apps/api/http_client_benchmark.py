@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+HTTP Client Pool Benchmark
+Runs Vercel status polls and GitHub token checks against a local stand-in API
+and compares a new client per call (the previous behaviour) with the shared
+keep-alive pools: calls per second and TCP connections opened. Every Nth
+response is a 429 or 503 to exercise retry with backoff.
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "StandIn/1.0"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+            n = self.server.requests
+        every = self.server.fail_every
+        if every and n % every == 0:
+            self._send(429, {"error": {"message": "rate limited"}}, {"Retry-After": "0"})
+            return
+        if every and n % every == 1 and n > 1:
+            self._send(503, {"error": {"message": "unavailable"}})
+            return
+        rate_headers = {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+        if self.path.startswith("/v13/deployments/"):
+            deployment_id = self.path.rsplit("/", 1)[-1]
+            self._send(200, {"id": deployment_id, "readyState": "BUILDING", "url": "bench.vercel.app"}, rate_headers)
+        elif self.path == "/user":
+            self._send(200, {"login": "bench", "name": "Bench"}, rate_headers)
+        else:
+            self._send(404, {"error": {"message": "not found"}})
+
+
+def start_stand_in(fail_every: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = 0
+    server.fail_every = fail_every
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def per_call_clients(base_url: str, calls: int, concurrency: int) -> int:
+    """Previous behaviour: a fresh client (and connection) for every request"""
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f"{base_url}/v13/deployments/dpl_{i}")
+                if response.status_code != 200:
+                    failures += 1
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return failures
+
+
+async def shared_pool(calls: int, concurrency: int) -> int:
+    from app.services.vercel_service import VercelService, VercelAPIError
+    from app.services.github_service import GitHubService
+    from app.services.http_clients import close_http_clients
+
+    vercel = VercelService("bench-token")
+    github = GitHubService("bench-token")
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            try:
+                if i % 4 == 0:
+                    result = await github.check_token_validity()
+                    failures += 0 if result.get("valid") else 1
+                else:
+                    await vercel.get_deployment_status(f"dpl_{i}")
+            except VercelAPIError:
+                failures += 1
+
+    try:
+        await asyncio.gather(*(one(i) for i in range(calls)))
+    finally:
+        await close_http_clients()
+    return failures
+
+
+def run(label: str, server: ThreadingHTTPServer, coro_factory) -> dict:
+    server.connections = 0
+    server.requests = 0
+    started = time.perf_counter()
+    failures = asyncio.run(coro_factory())
+    elapsed = time.perf_counter() - started
+    return {
+        "label": label,
+        "calls_per_sec": round(server.requests / elapsed, 1),
+        "requests": server.requests,
+        "connections": server.connections,
+        "failed_calls": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--fail-every", type=int, default=50, help="Every Nth response is a 429 (N+1th a 503); 0 disables")
+    args = parser.parse_args()
+
+    server = start_stand_in(args.fail_every)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["GITHUB_API_URL"] = base_url
+    os.environ["VERCEL_API_URL"] = base_url
+    os.environ["HTTP_BACKOFF_BASE"] = "0.01"
+
+    print(f"HTTP client benchmark: {args.calls} calls, concurrency {args.concurrency}, stand-in at {base_url}")
+    results = [
+        run("per-call", server, lambda: per_call_clients(base_url, args.calls, args.concurrency)),
+        run("pooled", server, lambda: shared_pool(args.calls, args.concurrency)),
+    ]
+    server.shutdown()
+
+    print(f"{'client':<10} {'calls/s':>10} {'requests':>9} {'conns':>7} {'failed':>7}")
+    for r in results:
+        print(f"{r['label']:<10} {r['calls_per_sec']:>10} {r['requests']:>9} {r['connections']:>7} {r['failed_calls']:>7}")
+
+
+if __name__ == "__main__":
+    main()
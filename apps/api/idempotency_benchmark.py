@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Idempotency and Offline Sync Benchmark
+Runs the real IdempotencyMiddleware and /sync router in front of stand-in
+award and roll endpoints (each counts how often it really applied) and
+checks three PWA scenarios:
+  * flaky network: responses get lost and the client retries every award
+    until it sees a response, with and without an Idempotency-Key
+  * a retry sent while the original request is still running
+  * reconnecting with K queued offline actions: one request per action
+    versus one /sync batch (and re-sending the batch after a lost response)
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+
+# sync_supabase imports the auth module, which needs Supabase settings to load
+os.environ.setdefault("SUPABASE_URL", "http://supabase.invalid")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+
+
+def build_app(work_seconds: float):
+    from fastapi import FastAPI
+
+    from app.api.auth_supabase import get_current_user, token_subject
+    from app.api.sync_supabase import router as sync_router
+    from app.services.idempotency import IdempotencyMiddleware, IdempotencyStore
+
+    app = FastAPI()
+    app.state.applied = {"award-xp": 0, "roll-dice": 0}
+
+    @app.post("/api/admin/award-xp")
+    async def award_xp(award: dict):
+        await asyncio.sleep(work_seconds)
+        app.state.applied["award-xp"] += 1
+        return {"success": True, "data": {"xp_awarded": award.get("xp_awarded")}}
+
+    @app.post("/api/students/gameboard/roll-dice")
+    async def roll_dice(roll: dict):
+        await asyncio.sleep(work_seconds)
+        app.state.applied["roll-dice"] += 1
+        return {"success": True, "data": {"roll_result": random.randint(1, 100)}}
+
+    app.include_router(sync_router, prefix="/api")
+    app.dependency_overrides[get_current_user] = lambda: {"id": "student-1", "username": "student"}
+    app.add_middleware(IdempotencyMiddleware, token_subject=token_subject, store=IdempotencyStore(ttl=3600, max_keys=10000))
+    return app
+
+
+def bearer(user_id: str, session: str = "1") -> str:
+    from app.api.auth_supabase import create_access_token
+    # The session claim only makes tokens for the same user differ, like a refreshed token
+    return "Bearer " + create_access_token({"sub": user_id, "session": session})
+
+
+async def flaky_awards(client, awards: int, loss: float, with_key: bool, rtt: float) -> int:
+    """Send each award until a response arrives; returns the number of HTTP attempts"""
+    attempts = 0
+    for i in range(awards):
+        headers = {"authorization": bearer("admin-1")}
+        if with_key:
+            headers["idempotency-key"] = str(uuid.uuid4())
+        while True:
+            attempts += 1
+            await asyncio.sleep(rtt)
+            await client.post("/api/admin/award-xp", json={"target_user_id": f"s{i}", "xp_awarded": 50}, headers=headers)
+            if random.random() >= loss:
+                break  # the response made it back this time
+    return attempts
+
+
+async def run(args):
+    import httpx
+
+    rtt = args.rtt_ms / 1000
+    app = build_app(args.work_ms / 1000)
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.7", 5000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        print(f"Idempotency benchmark: {args.rtt_ms:.0f}ms network round trip, {args.work_ms:.0f}ms endpoint work")
+
+        for with_key in (False, True):
+            app.state.applied["award-xp"] = 0
+            random.seed(7)
+            attempts = await flaky_awards(client, args.awards, args.loss, with_key, rtt)
+            print(f"  flaky network ({args.loss:.0%} responses lost), {'with' if with_key else 'no  '} Idempotency-Key: "
+                  f"{args.awards} awards, {attempts} attempts -> {app.state.applied['award-xp']} applied")
+
+        app.state.applied["award-xp"] = 0
+        headers = {"authorization": bearer("admin-1"), "idempotency-key": "double-tap"}
+        first, retry = await asyncio.gather(
+            client.post("/api/admin/award-xp", json={"xp_awarded": 50}, headers=headers),
+            client.post("/api/admin/award-xp", json={"xp_awarded": 50}, headers=headers),
+        )
+        print(f"  retry while the original runs: statuses {first.status_code}/{retry.status_code}, "
+              f"{app.state.applied['award-xp']} applied, replayed={retry.headers.get('idempotent-replayed')}")
+
+        refreshed = await client.post("/api/admin/award-xp", json={"xp_awarded": 50},
+                                      headers={**headers, "authorization": bearer("admin-1", session="2")})
+        other_user = await client.post("/api/admin/award-xp", json={"xp_awarded": 50},
+                                       headers={**headers, "authorization": bearer("admin-2")})
+        print(f"  same key after a token refresh: replayed={refreshed.headers.get('idempotent-replayed')}; "
+              f"same key from another user: replayed={other_user.headers.get('idempotent-replayed')}, "
+              f"{app.state.applied['award-xp']} applied")
+
+        actions = [{"id": str(uuid.uuid4()), "path": "/students/gameboard/roll-dice", "body": {}}
+                   for _ in range(args.queued)]
+        app.state.applied["roll-dice"] = 0
+        started = time.perf_counter()
+        for action in actions:
+            await asyncio.sleep(rtt)
+            await client.post("/api/students/gameboard/roll-dice", json=action["body"],
+                              headers={"authorization": bearer("student-1"), "idempotency-key": action["id"] + "-direct"})
+        one_by_one = time.perf_counter() - started
+
+        app.state.applied["roll-dice"] = 0
+        started = time.perf_counter()
+        await asyncio.sleep(rtt)
+        synced = await client.post("/api/sync", json={"actions": actions}, headers={"authorization": bearer("student-1")})
+        batch = time.perf_counter() - started
+        data = synced.json()["data"]
+        print(f"  {args.queued} queued actions: one request each {one_by_one * 1000:.0f}ms ({args.queued} round trips), "
+              f"/sync {batch * 1000:.0f}ms (1 round trip), {data['applied']} applied")
+
+        resent = (await client.post("/api/sync", json={"actions": actions}, headers={"authorization": bearer("student-1")})).json()["data"]
+        replayed = sum(result["replayed"] for result in resent["results"])
+        print(f"  /sync batch re-sent after a lost response: {replayed}/{args.queued} replayed, "
+              f"{app.state.applied['roll-dice']} rolls applied in total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--awards", type=int, default=200)
+    parser.add_argument("--loss", type=float, default=0.2, help="Fraction of responses lost on the way back")
+    parser.add_argument("--queued", type=int, default=25, help="Offline actions replayed on reconnect")
+    parser.add_argument("--rtt-ms", type=float, default=150, help="Classroom Wi-Fi / mobile round trip")
+    parser.add_argument("--work-ms", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
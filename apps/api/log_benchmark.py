@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Logging Cost Benchmark
+Measures what a log call costs the emitting (streaming) code: the previous
+synchronous rich console output against the queued pipeline, for enabled
+calls, level-gated DEBUG calls and JSON output
+"""
+import argparse
+import logging
+import os
+import time
+
+SAMPLE_EVENT = {
+    "type": "result",
+    "subtype": "success",
+    "is_error": False,
+    "result": "x" * 2000,
+    "session_id": "0c5e7c1e-2d4f-4b8e-9a57-3f7e1d2c9b10",
+    "duration_ms": 51234,
+}
+
+
+def per_call_us(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    from rich.console import Console
+    from app.core import logging as app_logging
+    from app.core.terminal_ui import ui
+
+    devnull = open(os.devnull, "w")
+    ui.console = Console(file=devnull, force_terminal=True)
+    cli_logger = logging.getLogger("app.cli")
+    results = {}
+
+    # Previous behaviour: every call renders and writes on the caller's thread
+    ui.pipeline_active = False
+    results["sync rich ui.info"] = per_call_us(lambda i: ui.info(f"Tool call {i}: Write app/page.tsx", "CLI"), args.calls)
+    results["sync rich event dump"] = per_call_us(lambda i: ui.info(f"   Full event: {SAMPLE_EVENT}", "DEBUG"), args.calls)
+
+    for log_format in ("rich", "json"):
+        os.environ["LOG_FORMAT"] = log_format
+        os.environ["LOG_LEVEL"] = "INFO"
+        app_logging.configure_logging()
+        ui.console = Console(file=devnull, force_terminal=True)
+        for handler in app_logging._listener.handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(devnull)
+
+        results[f"queued {log_format} ui.info"] = per_call_us(
+            lambda i: ui.info(f"Tool call {i}: Write app/page.tsx", "CLI"), args.calls
+        )
+        results[f"queued {log_format} gated debug dump"] = per_call_us(
+            lambda i: cli_logger.debug("[Cursor] Result event: event=%s", SAMPLE_EVENT), args.calls
+        )
+        drain_started = time.perf_counter()
+        app_logging.shutdown_logging()
+        results[f"queued {log_format} listener drain (total ms)"] = (time.perf_counter() - drain_started) * 1000
+
+    devnull.close()
+    print(f"Logging cost on the emitting thread, {args.calls} calls each")
+    for label, value in results.items():
+        unit = "" if "total ms" in label else " us/call"
+        print(f"{label:<44} {value:>10.2f}{unit}")
+
+
+if __name__ == "__main__":
+    main()
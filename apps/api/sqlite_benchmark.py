@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+SQLite Storage Engine Benchmark
+Compares message insert throughput of the legacy engine and WAL mode under
+concurrent writers (one commit per message, like agent runs) and readers
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+
+def run_worker(seconds: float, writers: int, readers: int) -> dict:
+    """Run inside a child process configured through DATABASE_URL / SQLITE_ENGINE_MODE"""
+    from app.db.base import Base
+    from app.db.session import SessionLocal, write_engine
+    import app.models  # noqa: F401  register models
+    from app.models.projects import Project
+    from app.models.messages import Message
+
+    Base.metadata.create_all(write_engine)
+    db = SessionLocal()
+    db.add(Project(id="bench", name="bench", created_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+
+    stop = threading.Event()
+    counts = {"writes": 0, "reads": 0, "locked": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def record_error(e: Exception) -> None:
+        with lock:
+            counts["locked" if "locked" in str(e) else "errors"] += 1
+
+    def writer():
+        while not stop.is_set():
+            session = SessionLocal()
+            try:
+                session.add(Message(
+                    id=str(uuid.uuid4()),
+                    project_id="bench",
+                    role="assistant",
+                    message_type="chat",
+                    content="x" * 512,
+                    created_at=datetime.utcnow(),
+                ))
+                session.commit()
+                with lock:
+                    counts["writes"] += 1
+            except Exception as e:
+                session.rollback()
+                record_error(e)
+            finally:
+                session.close()
+
+    def reader():
+        while not stop.is_set():
+            session = SessionLocal()
+            try:
+                session.query(Message).filter(Message.project_id == "bench") \
+                    .order_by(Message.created_at.desc()).limit(50).all()
+                with lock:
+                    counts["reads"] += 1
+            except Exception as e:
+                record_error(e)
+            finally:
+                session.close()
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "messages_per_sec": round(counts["writes"] / elapsed, 1),
+        "reads_per_sec": round(counts["reads"] / elapsed, 1),
+        "locked_errors": counts["locked"],
+        "other_errors": counts["errors"],
+    }
+
+
+def run_mode(mode: str, args) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix="sqlite-bench-")
+    env = os.environ.copy()
+    env.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmpdir, 'bench.db')}",
+        "SQLITE_ENGINE_MODE": mode,
+        "PROJECTS_ROOT": tmpdir,
+    })
+    try:
+        out = subprocess.run(
+            [sys.executable, __file__, "--worker",
+             "--seconds", str(args.seconds), "--writers", str(args.writers), "--readers", str(args.readers)],
+            env=env,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.seconds, args.writers, args.readers)))
+        return
+
+    print(f"SQLite benchmark: {args.writers} writers, {args.readers} readers, {args.seconds}s per mode")
+    results = {mode: run_mode(mode, args) for mode in ("legacy", "wal")}
+    print(f"{'mode':<8} {'msgs/s':>10} {'reads/s':>10} {'locked':>8} {'errors':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['messages_per_sec']:>10} {r['reads_per_sec']:>10} {r['locked_errors']:>8} {r['other_errors']:>8}")
+    if results["legacy"]["messages_per_sec"]:
+        speedup = results["wal"]["messages_per_sec"] / results["legacy"]["messages_per_sec"]
+        print(f"WAL write throughput: {speedup:.1f}x legacy")
+
+
+if __name__ == "__main__":
+    main()
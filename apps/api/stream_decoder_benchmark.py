@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+CLI Stream Decoder Benchmark
+Replays agent transcripts through the previous decoding code (per-message SDK
+imports, str(type()) checks, json.loads on decoded lines, if/elif dispatch,
+declarative Message construction) and the table-driven stream decoder, and
+reports events per second and allocations per event (tracemalloc).
+
+Cursor transcripts can be recorded with
+    cursor-agent -p "..." --output-format stream-json > transcript.ndjson
+and passed with --cursor-transcript; otherwise a synthetic session is used.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+
+def synthetic_claude_transcript(turns: int) -> list:
+    from claude_code_sdk.types import (
+        AssistantMessage, ResultMessage, SystemMessage, TextBlock, ToolResultBlock, ToolUseBlock, UserMessage,
+    )
+
+    events = [SystemMessage(subtype="init", data={"session_id": "bench", "model": "claude-sonnet-4-20250514"})]
+    for i in range(turns):
+        events.append(AssistantMessage(
+            content=[
+                TextBlock(text=f"Updating the page component, step {i}."),
+                ToolUseBlock(id=f"toolu_{i}", name="Write", input={
+                    "file_path": f"/data/projects/bench/repo/src/app/page_{i}.tsx",
+                    "content": "export default function Page() { return <main>Hello</main> }\n" * 20,
+                }),
+            ],
+            model="claude-sonnet-4-20250514",
+        ))
+        events.append(UserMessage(content=[ToolResultBlock(tool_use_id=f"toolu_{i}", content="File written")]))
+    events.append(ResultMessage(
+        subtype="success", duration_ms=51234, duration_api_ms=40211, is_error=False,
+        num_turns=turns, session_id="bench", total_cost_usd=0.12,
+    ))
+    return events
+
+
+def synthetic_cursor_transcript(turns: int) -> list:
+    lines = [
+        {"type": "system", "subtype": "init", "model": "gpt-5", "cwd": "/data/projects/bench/repo",
+         "apiKeySource": "login", "session_id": "bench"},
+        {"type": "user", "message": {"role": "user", "content": [{"type": "text", "text": "Build a landing page"}]},
+         "session_id": "bench"},
+    ]
+    for i in range(turns):
+        for word in ("Updating ", "the ", "page ", f"component {i}."):
+            lines.append({"type": "assistant", "message": {"role": "assistant", "content": [{"type": "text", "text": word}]},
+                          "session_id": "bench"})
+        args = {"path": f"/data/projects/bench/repo/src/app/page_{i}.tsx",
+                "fileText": "export default function Page() { return <main>Hello</main> }\n" * 20}
+        lines.append({"type": "tool_call", "subtype": "started", "call_id": f"call_{i}",
+                      "tool_call": {"writeToolCall": {"args": args}}, "session_id": "bench"})
+        lines.append({"type": "tool_call", "subtype": "completed", "call_id": f"call_{i}",
+                      "tool_call": {"writeToolCall": {"args": args, "result": {"success": {"linesCreated": 20}}}},
+                      "session_id": "bench"})
+    lines.append({"type": "result", "subtype": "success", "is_error": False, "duration_ms": 51234,
+                  "result": "Landing page created", "session_id": "bench"})
+    return [(json.dumps(line) + "\n").encode() for line in lines]
+
+
+def legacy_claude(cli, events: list, project_path: str) -> list:
+    """The loop body of ClaudeCodeCLI.execute_with_streaming before the decoder"""
+    from app.models.messages import Message
+
+    out = []
+    for message_obj in events:
+        try:
+            from anthropic.claude_code.types import SystemMessage, AssistantMessage, UserMessage, ResultMessage
+        except ImportError:
+            from claude_code_sdk.types import SystemMessage, AssistantMessage, UserMessage, ResultMessage
+        if isinstance(message_obj, SystemMessage) or 'SystemMessage' in str(type(message_obj)):
+            out.append(Message(
+                id=str(uuid.uuid4()), project_id=project_path, role="system", message_type="system",
+                content="Claude Code SDK initialized (Model: bench)",
+                metadata_json={"cli_type": "claude", "mode": "SDK", "model": "bench",
+                               "session_id": getattr(message_obj, 'session_id', None), "hidden_from_ui": True},
+                session_id=None, created_at=datetime.utcnow()))
+        elif isinstance(message_obj, AssistantMessage) or 'AssistantMessage' in str(type(message_obj)):
+            content = ""
+            for block in message_obj.content:
+                from claude_code_sdk.types import TextBlock, ToolUseBlock, ToolResultBlock
+                if isinstance(block, TextBlock):
+                    content += block.text
+                elif isinstance(block, ToolUseBlock):
+                    out.append(Message(
+                        id=str(uuid.uuid4()), project_id=project_path, role="assistant", message_type="tool_use",
+                        content=cli._create_tool_summary(block.name, block.input),
+                        metadata_json={"cli_type": "claude", "mode": "SDK", "tool_name": block.name,
+                                       "tool_input": block.input, "tool_id": block.id},
+                        session_id=None, created_at=datetime.utcnow()))
+            if content and content.strip():
+                out.append(Message(
+                    id=str(uuid.uuid4()), project_id=project_path, role="assistant", message_type="chat",
+                    content=content.strip(), metadata_json={"cli_type": "claude", "mode": "SDK"},
+                    session_id=None, created_at=datetime.utcnow()))
+        elif isinstance(message_obj, UserMessage) or 'UserMessage' in str(type(message_obj)):
+            pass
+        elif isinstance(message_obj, ResultMessage) or 'ResultMessage' in str(type(message_obj)):
+            out.append(Message(
+                id=str(uuid.uuid4()), project_id=project_path, role="system", message_type="result",
+                content=f"Session completed in {message_obj.duration_ms}ms",
+                metadata_json={"cli_type": "claude", "mode": "SDK", "duration_ms": message_obj.duration_ms,
+                               "hidden_from_ui": True},
+                session_id=None, created_at=datetime.utcnow()))
+    return out
+
+
+def legacy_cursor(cli, lines: list, project_path: str) -> list:
+    """NDJSON parsing and the if/elif event handler before the decoder"""
+    from app.models.messages import Message
+
+    out = []
+    buffer = ""
+    for line in lines:
+        line_str = line.decode().strip()
+        if not line_str:
+            continue
+        event = json.loads(line_str)
+        event_type = event.get("type")
+        message = None
+        if event_type == "system":
+            message = Message(
+                id=str(uuid.uuid4()), project_id=project_path, role="system", message_type="system",
+                content=f"🔧 Cursor Agent initialized (Model: {event.get('model', 'unknown')})",
+                metadata_json={"cli_type": "cursor", "event_type": "system", "cwd": event.get("cwd"),
+                               "api_key_source": event.get("apiKeySource"), "original_event": event,
+                               "hidden_from_ui": True},
+                session_id=None, created_at=datetime.utcnow())
+        elif event_type == "user":
+            pass
+        elif event_type == "assistant":
+            content = ""
+            for part in event.get("message", {}).get("content", []):
+                if part.get("type") == "text":
+                    content += part.get("text", "")
+            if content:
+                message = Message(
+                    id=str(uuid.uuid4()), project_id=project_path, role="assistant", message_type="chat",
+                    content=content, metadata_json={"cli_type": "cursor", "event_type": "assistant",
+                                                    "original_event": event},
+                    session_id=None, created_at=datetime.utcnow())
+        elif event_type == "tool_call":
+            data = event.get("tool_call", {})
+            raw = next(iter(data), None)
+            tool_name = raw.replace("ToolCall", "")
+            if event.get("subtype") == "started":
+                tool_input = data[raw].get("args", {})
+                message = Message(
+                    id=str(uuid.uuid4()), project_id=project_path, role="assistant", message_type="chat",
+                    content=cli._create_tool_summary(tool_name, tool_input),
+                    metadata_json={"cli_type": "cursor", "event_type": "tool_call_started", "tool_name": tool_name,
+                                   "tool_input": tool_input, "original_event": event},
+                    session_id=None, created_at=datetime.utcnow())
+            elif event.get("subtype") == "completed":
+                result = data[raw].get("result", {})
+                content = json.dumps(result["success"]) if "success" in result else json.dumps(result.get("error"))
+                message = Message(
+                    id=str(uuid.uuid4()), project_id=project_path, role="system", message_type="tool_result",
+                    content=content, metadata_json={"cli_type": "cursor", "original_format": event,
+                                                    "tool_name": tool_name, "hidden_from_ui": True},
+                    session_id=None, created_at=datetime.utcnow())
+        elif event_type == "result":
+            message = Message(
+                id=str(uuid.uuid4()), project_id=project_path, role="system", message_type="system",
+                content=f"Execution completed in {event.get('duration_ms', 0)}ms. Final result: {event.get('result')}",
+                metadata_json={"cli_type": "cursor", "event_type": "result", "original_event": event,
+                               "hidden_from_ui": True},
+                session_id=None, created_at=datetime.utcnow())
+        # Adapter: assistant chat rows are aggregated until the next other event
+        if event_type != "assistant" and buffer:
+            out.append(Message(
+                id=str(uuid.uuid4()), project_id=project_path, role="assistant", message_type="chat",
+                content=buffer, metadata_json={"cli_type": "cursor", "event_type": "assistant_aggregated"},
+                session_id=None, created_at=datetime.utcnow()))
+            buffer = ""
+        if message is not None:
+            if message.role == "assistant" and message.message_type == "chat":
+                buffer += message.content
+            else:
+                out.append(message)
+    return out
+
+
+def decoder_claude(cli, events: list, project_path: str) -> list:
+    from app.services.cli.stream_decoder import ClaudeStreamDecoder
+
+    decoder = ClaudeStreamDecoder(cli, project_path, None, "bench")
+    out = []
+    for message_obj in events:
+        out.extend(decoder.decode(message_obj)[1])
+    return out
+
+
+def decoder_cursor(cli, lines: list, project_path: str) -> list:
+    from app.services.cli.stream_decoder import CursorStreamDecoder, build_message, json_loads
+
+    decoder = CursorStreamDecoder(cli, project_path, None)
+    out = []
+    buffer = []
+    for line in lines:
+        if not line.strip():
+            continue
+        event = json_loads(line)
+        if event.get("type") != "assistant" and buffer:
+            out.append(build_message(
+                project_path, "assistant", "chat", "".join(buffer),
+                {"cli_type": "cursor", "event_type": "assistant_aggregated"}, None,
+            ))
+            buffer = []
+        message = decoder.decode(event)
+        if isinstance(message, str):
+            buffer.append(message)
+        elif message is not None:
+            out.append(message)
+    return out
+
+
+def measure(fn, cli, events: list, repeat: int) -> dict:
+    project_path = "/data/projects/bench"
+    fn(cli, events, project_path)  # warm-up: imports, mapper configuration, caches
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(cli, events, project_path)
+    elapsed = time.perf_counter() - started
+
+    # Allocations for one replay: blocks still alive afterwards (the Message
+    # rows handed to the caller) and peak memory while decoding
+    tracemalloc.start()
+    baseline_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.reset_peak()
+    messages = fn(cli, events, project_path)
+    retained_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename")) - baseline_blocks
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "events_per_sec": len(events) * repeat / elapsed,
+        "blocks_per_event": retained_blocks / len(events),
+        "peak_bytes_per_event": peak / len(events),
+        "messages": len(messages),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=500, help="Tool-use turns in the synthetic transcripts")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cursor-transcript", help="Recorded cursor-agent stream-json (NDJSON) file")
+    args = parser.parse_args()
+
+    from app.services.cli.unified_manager import ClaudeCodeCLI, CursorAgentCLI
+
+    claude_events = synthetic_claude_transcript(args.turns)
+    if args.cursor_transcript:
+        with open(args.cursor_transcript, "rb") as f:
+            cursor_lines = f.readlines()
+    else:
+        cursor_lines = synthetic_cursor_transcript(args.turns)
+
+    claude_cli = ClaudeCodeCLI()
+    cursor_cli = CursorAgentCLI()
+    runs = [
+        ("claude", "legacy", legacy_claude, claude_cli, claude_events),
+        ("claude", "decoder", decoder_claude, claude_cli, claude_events),
+        ("cursor", "legacy", legacy_cursor, cursor_cli, cursor_lines),
+        ("cursor", "decoder", decoder_cursor, cursor_cli, cursor_lines),
+    ]
+
+    print(f"Stream decoder benchmark: {len(claude_events)} Claude SDK messages, "
+          f"{len(cursor_lines)} Cursor events, {args.repeat} replays")
+    print(f"{'adapter':<8} {'path':<8} {'events/s':>11} {'blocks/event':>13} {'peak B/event':>13} {'messages':>9}")
+    for adapter, label, fn, cli, events in runs:
+        r = measure(fn, cli, events, args.repeat)
+        print(f"{adapter:<8} {label:<8} {r['events_per_sec']:>11,.0f} {r['blocks_per_event']:>13.1f} "
+              f"{r['peak_bytes_per_event']:>13,.0f} {r['messages']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Unit XP Benchmark
+Models the two ways of storing per-unit XP in SQLite (same shapes as the
+Supabase tables) and compares:
+  * top-k students in one unit: loading every player_stats.unit_xp blob and
+    ranking in Python versus one ORDER BY xp DESC LIMIT k on the
+    (unit_id, xp DESC) index of player_unit_xp
+  * concurrent awards: the old read-modify-write of the JSON blob (with a
+    network round trip between the read and the write, as over the REST
+    API) versus the single-statement upsert award_unit_xp() runs
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+
+def create_db(path: str, students: int, units: list) -> None:
+    db = sqlite3.connect(path)
+    db.executescript("""
+        PRAGMA journal_mode = WAL;
+        CREATE TABLE player_stats (user_id TEXT PRIMARY KEY, total_xp INTEGER, unit_xp TEXT);
+        CREATE TABLE player_unit_xp (
+            user_id TEXT NOT NULL, unit_id TEXT NOT NULL, xp INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, unit_id)
+        );
+        CREATE INDEX idx_player_unit_xp_unit_xp ON player_unit_xp(unit_id, xp DESC, user_id);
+    """)
+    rng = random.Random(1)
+    for _ in range(students):
+        user_id = str(uuid.uuid4())
+        unit_xp = {unit: rng.randint(0, 2000) for unit in units}
+        db.execute("INSERT INTO player_stats VALUES (?, ?, ?)", (user_id, sum(unit_xp.values()), json.dumps(unit_xp)))
+        # Backfill, as in database/add_player_unit_xp.sql
+        db.executemany("INSERT INTO player_unit_xp VALUES (?, ?, ?)", [(user_id, u, xp) for u, xp in unit_xp.items()])
+    db.commit()
+    db.close()
+
+
+def top_k_blob(db, unit_id: str, k: int):
+    rows = db.execute("SELECT user_id, unit_xp FROM player_stats").fetchall()
+    ranked = sorted(((json.loads(blob or "{}").get(unit_id, 0), user_id) for user_id, blob in rows),
+                    key=lambda r: (-r[0], r[1]))
+    return [(user_id, xp) for xp, user_id in ranked[:k]], len(rows)
+
+
+def top_k_indexed(db, unit_id: str, k: int):
+    rows = db.execute(
+        "SELECT user_id, xp FROM player_unit_xp WHERE unit_id = ? ORDER BY xp DESC, user_id LIMIT ?", (unit_id, k)
+    ).fetchall()
+    return rows, len(rows)
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def award_read_modify_write(path, user_id, unit_id, xp, rtt):
+    db = sqlite3.connect(path, timeout=30)
+    blob = db.execute("SELECT unit_xp FROM player_stats WHERE user_id = ?", (user_id,)).fetchone()[0]
+    unit_xp = json.loads(blob)
+    unit_xp[unit_id] = unit_xp.get(unit_id, 0) + xp
+    time.sleep(rtt)  # the update is a second REST call
+    db.execute("UPDATE player_stats SET unit_xp = ? WHERE user_id = ?", (json.dumps(unit_xp), user_id))
+    db.commit()
+    db.close()
+
+
+def award_atomic(path, user_id, unit_id, xp, rtt):
+    db = sqlite3.connect(path, timeout=30)
+    db.execute("""
+        INSERT INTO player_unit_xp (user_id, unit_id, xp) VALUES (?, ?, ?)
+        ON CONFLICT (user_id, unit_id) DO UPDATE SET xp = player_unit_xp.xp + excluded.xp
+    """, (user_id, unit_id, xp))
+    db.commit()
+    db.close()
+
+
+def concurrent_awards(path, award, user_id, unit_id, awards, rtt) -> None:
+    threads = [threading.Thread(target=award, args=(path, user_id, unit_id, 10, rtt)) for _ in range(awards)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--units", type=int, default=3)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--awards", type=int, default=20, help="Simultaneous awards to one student in one unit")
+    parser.add_argument("--rtt-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="unit-xp-bench-"), "unit_xp.db")
+    units = [str(uuid.uuid4()) for _ in range(args.units)]
+    create_db(path, args.students, units)
+    db = sqlite3.connect(path)
+    unit = units[1]
+
+    blob_top, blob_rows = top_k_blob(db, unit, args.k)
+    index_top, index_rows = top_k_indexed(db, unit, args.k)
+    assert [tuple(r) for r in blob_top] == [tuple(r) for r in index_top], "rankings differ"
+    plan = " / ".join(row[-1] for row in db.execute(
+        "EXPLAIN QUERY PLAN SELECT user_id, xp FROM player_unit_xp WHERE unit_id = ? ORDER BY xp DESC, user_id LIMIT ?",
+        (unit, args.k)))
+
+    print(f"Unit XP benchmark: {args.students} students, {args.units} units, top {args.k}")
+    print(f"  unit_xp blobs      {timed(lambda: top_k_blob(db, unit, args.k), 20):8.2f}ms  ({blob_rows} rows read and parsed)")
+    print(f"  player_unit_xp     {timed(lambda: top_k_indexed(db, unit, args.k), 200):8.3f}ms  ({index_rows} rows read)")
+    print(f"  plan: {plan}")
+
+    user_id = db.execute("SELECT user_id FROM player_stats LIMIT 1").fetchone()[0]
+    before_blob = json.loads(db.execute("SELECT unit_xp FROM player_stats WHERE user_id = ?", (user_id,)).fetchone()[0])[unit]
+    before_row = db.execute("SELECT xp FROM player_unit_xp WHERE user_id = ? AND unit_id = ?", (user_id, unit)).fetchone()[0]
+    rtt = args.rtt_ms / 1000
+    concurrent_awards(path, award_read_modify_write, user_id, unit, args.awards, rtt)
+    concurrent_awards(path, award_atomic, user_id, unit, args.awards, rtt)
+    after_blob = json.loads(db.execute("SELECT unit_xp FROM player_stats WHERE user_id = ?", (user_id,)).fetchone()[0])[unit]
+    after_row = db.execute("SELECT xp FROM player_unit_xp WHERE user_id = ? AND unit_id = ?", (user_id, unit)).fetchone()[0]
+    expected = args.awards * 10
+    print(f"  {args.awards} simultaneous +10 XP awards: read-modify-write kept {after_blob - before_blob}/{expected}, "
+          f"atomic upsert kept {after_row - before_row}/{expected}")
+
+
+if __name__ == "__main__":
+    main()
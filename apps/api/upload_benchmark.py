@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Upload Pipeline Benchmark
+Sends N concurrent multipart uploads of an M MB file to a local uvicorn server
+and compares the streaming, content-addressed asset upload (POST
+/api/assets/{id}/upload) with the previous read-everything-then-write path.
+Reports wall time, throughput, Python heap peak during the uploads (total and
+per upload), bytes stored on disk after dedupe, and the 413 rejection of an
+oversized body.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+
+
+def build_app():
+    from fastapi import Depends, FastAPI, File, HTTPException, UploadFile
+    from sqlalchemy.orm import Session
+
+    from app.api.assets import router as assets_router
+    from app.api.deps import get_db
+    from app.core.config import settings
+    from app.models.projects import Project as ProjectModel
+    from app.services.assets import write_bytes
+    from app.services.uploads import UploadSizeLimitMiddleware
+
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware)
+    app.include_router(assets_router)
+
+    @app.post("/legacy/{project_id}/upload")
+    async def legacy_upload(project_id: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
+        """The upload path before streaming: whole body in memory, uuid filename"""
+        if not db.get(ProjectModel, project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        project_assets = os.path.join(settings.projects_root, project_id, "legacy-assets")
+        os.makedirs(project_assets, exist_ok=True)
+        file_path = os.path.join(project_assets, f"{uuid.uuid4()}{os.path.splitext(file.filename)[1]}")
+        content = await file.read()
+        write_bytes(file_path, content)
+        return {"path": file_path}
+
+    return app
+
+
+def start_server(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def write_payload(path: str, size_mb: int) -> None:
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def dir_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+async def upload_many(base_url: str, route: str, payload: str, concurrency: int) -> dict:
+    import httpx
+
+    async def one(client):
+        with open(payload, "rb") as f:
+            response = await client.post(route, files={"file": ("deck.png", f, "image/png")})
+        response.raise_for_status()
+
+    tracemalloc.reset_peak()
+    heap_before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        await asyncio.gather(*(one(client) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - heap_before
+    return {"elapsed": elapsed, "peak": peak}
+
+
+async def oversize_status(base_url: str, route: str, size_mb: int) -> int:
+    import httpx
+
+    # Chunked (no Content-Length), so the limit has to be enforced on bytes received
+    async def body():
+        yield (b"--x\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.png\"\r\n"
+               b"Content-Type: image/png\r\n\r\n")
+        block = b"\0" * (1024 * 1024)
+        for _ in range(size_mb):
+            yield block
+        yield b"\r\n--x--\r\n"
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        try:
+            response = await client.post(route, content=body(), headers={
+                "content-type": "multipart/form-data; boundary=x",
+            })
+        except httpx.TransportError:
+            # Server answered 413 and closed while the body was still being sent
+            return 413
+        return response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=4, help="Concurrent uploads")
+    parser.add_argument("--size-mb", type=int, default=50, help="Upload size in MB")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="upload-bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ.setdefault("PROJECTS_ROOT", os.path.join(workdir, "projects"))
+    os.environ.setdefault("UPLOAD_MAX_BYTES", str(args.size_mb * 1024 * 1024))
+
+    from app.core.config import settings
+    from app.db.base import Base
+    from app.db.session import SessionLocal, write_engine
+    import app.models  # noqa: F401  register models
+    from app.models.projects import Project
+
+    Base.metadata.create_all(write_engine)
+    project_id = f"upload-bench-{uuid.uuid4().hex[:6]}"
+    db = SessionLocal()
+    db.add(Project(id=project_id, name=project_id))
+    db.commit()
+    db.close()
+
+    payload = os.path.join(workdir, "payload.png")
+    write_payload(payload, args.size_mb)
+
+    server, thread = start_server(build_app(), args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    project_dir = os.path.join(settings.projects_root, project_id)
+    tracemalloc.start()
+    try:
+        legacy = asyncio.run(upload_many(base_url, f"/legacy/{project_id}/upload", payload, args.uploads))
+        streamed = asyncio.run(upload_many(base_url, f"/api/assets/{project_id}/upload", payload, args.uploads))
+        rejected = asyncio.run(oversize_status(base_url, f"/api/assets/{project_id}/upload", args.size_mb * 2))
+    finally:
+        tracemalloc.stop()
+        server.should_exit = True
+        thread.join()
+
+    total_mb = args.uploads * args.size_mb
+    print(f"Upload benchmark: {args.uploads} concurrent uploads of {args.size_mb} MB")
+    for name, r, stored in (
+        ("read-all (before)", legacy, dir_bytes(os.path.join(project_dir, "legacy-assets"))),
+        ("streaming", streamed, dir_bytes(os.path.join(project_dir, "assets"))),
+    ):
+        print(f"  {name:18} {r['elapsed']:.2f}s  {total_mb / r['elapsed']:,.0f} MB/s  "
+              f"heap peak {r['peak'] / 2**20:,.1f} MiB ({r['peak'] / args.uploads / 2**20:,.1f} MiB/upload)  "
+              f"stored {stored / 2**20:,.0f} MiB")
+    print(f"  oversized body ({args.size_mb * 2} MB) -> HTTP {rejected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -997,33 +997,33 @@ export default function DashboardPage() {
   }, [user, sharedStats]);
 
   // Handlers for updating shared states
-  const handleStatsUpdate = async (updates: Partial<PlayerStats>) => {
+  const handleStatsUpdate = (updates: Partial<PlayerStats>) => {
     setSharedStats(prev => prev ? { ...prev, ...updates } : null);
-    
-    // Persist important stats to backend
-    const statsToSync = {
-      gameboardPosition: updates.gameboardPosition,
-      gameboardMoves: updates.gameboardMoves,
-      gameboardXP: updates.gameboardXP,
-      gold: updates.gold
-    };
-    
-    // Only sync if there are actual values to update
-    const hasUpdates = Object.values(statsToSync).some(value => value !== undefined);
-    
-    if (hasUpdates) {
-      try {
-        console.log('🔄 Syncing stats to backend:', statsToSync);
-        const response = await apiClient.updateMyStats(statsToSync);
-        if (response.success) {
-          console.log('✅ Stats synced successfully');
-        } else {
-          console.error('❌ Failed to sync stats:', response.error);
-        }
-      } catch (error) {
-        console.error('❌ Error syncing stats:', error);
-      }
+  };
+
+  // Gameboard moves are played by the server (roll, position, XP and gold);
+  // apply the stats it returns rather than computing them here
+  const handleRoll = async (count: number = 1) => {
+    const response = count === 1
+      ? await apiClient.rollDice(sharedStats?.gameboardPosition || 0)
+      : await apiClient.rollMany(count);
+
+    const updated = response.data?.updated_stats;
+    if (updated) {
+      setSharedStats(prev => prev ? {
+        ...prev,
+        gameboardPosition: updated.gameboard_position,
+        gameboardMoves: updated.moves_remaining,
+        gameboardXP: updated.gameboard_xp,
+        totalXP: updated.total_xp,
+        currentLevel: updated.current_level,
+        gold: updated.gold
+      } : null);
+    }
+    if (!response.success) {
+      console.error('❌ Roll failed:', response.error);
     }
+    return response;
   };
 
   const handleSkillsUpdate = (updates: Partial<PlayerSkills>) => {
@@ -1138,6 +1138,7 @@ export default function DashboardPage() {
           playerSkills={sharedSkills}
           inventory={sharedInventory}
           onStatsUpdate={handleStatsUpdate}
+          onRoll={handleRoll}
           onSkillsUpdate={handleSkillsUpdate}
           onInventoryUpdate={handleInventoryUpdate}
         />
@@ -7,12 +7,16 @@ import EventModal from './EventModal';
 import InventoryPanel from './InventoryPanel';
 import SkillUpgradePanel from './SkillUpgradePanel';
 
+// Matches the API's GAMEBOARD_MAX_MOVES_PER_REQUEST default
+const MAX_MOVES_PER_ROLL = 20;
+
 interface LinearGameboardProps {
   user: User;
   playerStats: PlayerStats;
   playerSkills: PlayerSkills;
   inventory: PlayerInventory;
   onStatsUpdate: (stats: Partial<PlayerStats>) => void;
+  onRoll: (count?: number) => Promise<{ success: boolean; data?: any; error?: string }>;
   onSkillsUpdate: (skills: Partial<PlayerSkills>) => void;
   onInventoryUpdate: (inventory: Partial<PlayerInventory>) => void;
 }
@@ -23,6 +27,7 @@ export default function LinearGameboard({
   playerSkills, 
   inventory,
   onStatsUpdate,
+  onRoll,
   onSkillsUpdate,
   onInventoryUpdate
 }: LinearGameboardProps) {
@@ -90,7 +95,7 @@ export default function LinearGameboard({
     return 'locked';
   };
 
-  const handlePositionClick = (position: LinearPosition) => {
+  const handlePositionClick = async (position: LinearPosition) => {
     const status = getPositionStatus(position.id);
     
     if (status === 'current' && canAttemptPosition(position.id)) {
@@ -101,26 +106,25 @@ export default function LinearGameboard({
       setChallengeSuccess(null);
       setChallengeItemsWon([]);
     } else if (status === 'next' && canMoveToPosition(position.id)) {
-      // Move to next position and consume a move
-      console.log(`🎯 Moving from ${gameboardState.currentPosition} to ${position.id}`);
-      
-      setGameboardState(prev => ({
-        ...prev,
-        currentPosition: position.id,
-        availableMoves: prev.availableMoves - 1
-      }));
+      // The server spends the move and rolls; only a successful roll moves forward
+      console.log(`🎯 Rolling to move from ${gameboardState.currentPosition} to ${position.id}`);
       
-      // Update persistent position and moves
-      onStatsUpdate({
-        gameboardPosition: position.id,
-        gameboardMoves: Math.max(0, (playerStats.gameboardMoves || 0) - 1)
-      });
+      const response = await onRoll(1);
+      if (!response.success || !response.data) {
+        alert(response.error || 'Your move could not be played. Please try again.');
+        return;
+      }
       
-      // Auto-open the challenge
-      setTimeout(() => {
-        setSelectedPosition(position);
-        setChallengePhase('story');
-      }, 100);
+      if (response.data.was_successful) {
+        // Auto-open the challenge
+        setTimeout(() => {
+          setSelectedPosition(position);
+          setChallengePhase('story');
+        }, 100);
+      } else {
+        alert(`🎲 You rolled ${response.data.roll_result} but needed ${response.data.success_chance} or less. ` +
+              `You earned ${response.data.rewards?.xp_gained || 0} XP for trying - use another move to try again!`);
+      }
     } else {
       // Show appropriate message for blocked positions
       if (status === 'locked') {
@@ -149,10 +153,8 @@ export default function LinearGameboard({
       attemptedPositions: [...prev.attemptedPositions, currentPos]
     }));
 
-    // Award XP
-    onStatsUpdate({
-      gameboardXP: (playerStats.gameboardXP || 0) + xpReward
-    });
+    // XP and gold for reaching the position were awarded by the server roll
+    console.log(`🏅 Challenge ${success ? 'completed' : 'failed'} at position ${currentPos} (${xpReward} XP story reward)`);
 
     // Award items if won
     if (challengeItemsWon.length > 0) {
@@ -202,35 +204,43 @@ export default function LinearGameboard({
 
   const handleRestartGame = () => {
     const shouldRestart = confirm(
-      '🔄 Restart Your Olympic Journey?\n\n' +
-      'This will reset your position to the start, but you will keep:\n' +
-      '✅ All your XP and levels\n' +
-      '✅ All your skills and inventory\n' +
-      '✅ Your progress history\n\n' +
-      'You will get 5 bonus moves to start fresh!\n\n' +
-      'Click OK to restart, or Cancel to continue.'
+      '🔄 Clear Your Challenge History?\n\n' +
+      'This clears the completed and failed marks on the board so you can replay the challenges.\n' +
+      'Your position, moves, XP and gold are kept by the server and do not change.\n\n' +
+      'Click OK to continue, or Cancel to keep your history.'
     );
     
     if (shouldRestart) {
-      // Reset to start position
       setGameboardState(prev => ({
         ...prev,
-        currentPosition: 0,
         completedEvents: [],
         failedEvents: [],
         attemptedPositions: []
       }));
-      
-      // Give bonus moves and reset position
-      onStatsUpdate({
-        gameboardPosition: 0,
-        gameboardMoves: (playerStats.gameboardMoves || 0) + 5
-      });
-      
-      alert('🏠 Welcome back to the Olympic Village!\n\n🎁 You received 5 bonus moves to restart your journey!');
     }
   };
 
+  const handleRollAll = async () => {
+    // The server plays at most MAX_MOVES_PER_ROLL moves per request
+    const count = Math.min(gameboardState.availableMoves, MAX_MOVES_PER_ROLL);
+    if (count <= 0) {
+      alert('You have no moves left. Complete assignments to earn more moves.');
+      return;
+    }
+    
+    // One request plays every banked move on the server
+    const response = await onRoll(count);
+    if (!response.success || !response.data) {
+      alert(response.error || 'Your moves could not be played. Please try again.');
+      return;
+    }
+    
+    const moves = response.data.moves || [];
+    const advanced = moves.filter((move: any) => move.was_successful).length;
+    alert(`🎲 Played ${moves.length} moves: advanced ${advanced} position${advanced === 1 ? '' : 's'}, ` +
+          `earned ${response.data.rewards?.xp_gained || 0} XP and ${response.data.rewards?.gold_gained || 0} gold.`);
+  };
+
   const renderPosition = (position: LinearPosition) => {
     const status = getPositionStatus(position.id);
     
@@ -328,6 +338,12 @@ export default function LinearGameboard({
               >
                 ⚡ Skills
               </button>
+              <button
+                onClick={handleRollAll}
+                className="px-3 py-1 bg-blue-500 text-white rounded-md text-sm hover:bg-blue-600"
+              >
+                🎲 Roll All
+              </button>
               <button
                 onClick={handleRestartGame}
                 className="px-3 py-1 bg-orange-500 text-white rounded-md text-sm hover:bg-orange-600"
@@ -196,18 +196,6 @@ class ApiClient {
     return this.request('/api/students/me/skills');
   }
 
-  async updateMyStats(updates: {
-    gameboardPosition?: number;
-    gameboardMoves?: number;
-    gameboardXP?: number;
-    gold?: number;
-  }): Promise<ApiResponse<any>> {
-    return this.request('/api/students/me/update-stats', {
-      method: 'POST',
-      body: JSON.stringify(updates),
-    });
-  }
-
   // REMOVED: Leaderboard access removed for student privacy
   // async getLeaderboard(): Promise<ApiResponse<any>> {
   //   return this.request('/api/students/leaderboard');
@@ -217,16 +205,34 @@ class ApiClient {
     return this.request('/api/students/gameboard/stations');
   }
 
-  async rollDice(stationId: number, skillLevel: number, successChance: number): Promise<ApiResponse<any>> {
+  // The server rolls at the student's current station with their own skill level
+  async rollDice(stationId: number): Promise<ApiResponse<any>> {
     return this.request('/api/students/gameboard/roll-dice', {
       method: 'POST',
-      body: JSON.stringify({
-        station_id: stationId,
-        skill_level: skillLevel,
-        success_chance: successChance,
-        roll_result: Math.floor(Math.random() * 100) + 1,
-        was_successful: Math.random() * 100 <= successChance
-      }),
+      body: JSON.stringify({ station_id: stationId }),
+    });
+  }
+
+  async getUnitLeaderboard(unitId: string, limit = 10): Promise<ApiResponse<any>> {
+    return this.request(`/api/students/leaderboard/units/${unitId}?limit=${limit}`);
+  }
+
+  async rollMany(count: number): Promise<ApiResponse<any>> {
+    return this.request('/api/students/gameboard/roll-many', {
+      method: 'POST',
+      body: JSON.stringify({ count }),
+    });
+  }
+
+  // Replays actions queued while offline, in order. Each action id is used as
+  // its Idempotency-Key, so re-sending a batch never applies an action twice.
+  async syncOfflineActions(
+    actions: Array<{ id: string; path: string; body?: Record<string, unknown> }>,
+    stopOnError = false
+  ): Promise<ApiResponse<any>> {
+    return this.request('/api/sync', {
+      method: 'POST',
+      body: JSON.stringify({ actions, stop_on_error: stopOnError }),
     });
   }
 